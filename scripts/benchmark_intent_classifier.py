@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+意图理解对比脚本
+在带标注的样本集上对比本地意图分类器与LLM意图理解的准确率和p50/p99延迟，
+并统计在置信度阈值下本地分类器可以覆盖的查询比例及其准确率
+"""
+
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.models.adapter_pool import warm_up_adapters
+from src.models.qu_model import QuModel
+from src.query_understanding.financial_vocab import resolve_path
+from src.query_understanding.intent_classifier import (
+    LocalIntentClassifier, load_intent_samples, parse_intent_output
+)
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, latencies, correct, total, extra=None):
+    report = {
+        "path": name,
+        "samples": total,
+        "exact_match": correct / total if total else 0.0,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000
+    }
+    report.update(extra or {})
+    return report
+
+
+def run_local(classifier, samples, threshold):
+    latencies = []
+    correct = confident = confident_correct = 0
+    for query, expected in samples:
+        start = time.perf_counter()
+        predicted, confidence = classifier.predict(query)
+        latencies.append(time.perf_counter() - start)
+        hit = set(predicted) == set(expected)
+        correct += hit
+        if predicted and confidence >= threshold:
+            confident += 1
+            confident_correct += hit
+    return summarize("local", latencies, correct, len(samples), {
+        "threshold": threshold,
+        "coverage": confident / len(samples) if samples else 0.0,
+        "covered_exact_match": confident_correct / confident if confident else 0.0
+    })
+
+
+def run_llm(config, samples):
+    latencies = []
+    correct = 0
+    for query, expected in samples:
+        state = {"query": query, "config": config, "intent_model": config.get("api.qwen.intent_model")}
+        start = time.perf_counter()
+        result = QuModel(state, "intent").call_llm_by_aliyun_api()
+        latencies.append(time.perf_counter() - start)
+        correct += set(parse_intent_output(result.get("final_output"))) == set(expected)
+    return summarize("llm", latencies, correct, len(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地意图分类器与LLM意图理解对比')
+    parser.add_argument('--data', '-d', required=True,
+                        help='带标注的样本JSONL，每行包含query和intentions字段')
+    parser.add_argument('--model', '-m', default=None,
+                        help='模型路径(默认读取query_understanding.intent_classifier.path配置)')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--threshold', '-t', type=float, default=None,
+                        help='置信度阈值(默认读取配置)')
+    parser.add_argument('--limit', '-n', type=int, default=None,
+                        help='最多评估的样本数量')
+    parser.add_argument('--llm', action='store_true',
+                        help='同时调用LLM意图理解进行对比')
+    parser.add_argument('--output', '-o', default=None,
+                        help='结果输出的JSON文件')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    model_path = resolve_path(
+        args.model or config.get("query_understanding.intent_classifier.path", ".cache/intent_classifier.npz")
+    )
+    threshold = args.threshold
+    if threshold is None:
+        threshold = float(config.get("query_understanding.intent_classifier.confidence_threshold", 0.9))
+
+    samples = load_intent_samples(args.data)[:args.limit]
+    classifier = LocalIntentClassifier.load(str(model_path))
+
+    results = [run_local(classifier, samples, threshold)]
+    if args.llm:
+        config.update_config("llm_cache.enabled", False)
+        warm_up_adapters(config)
+        results.append(run_llm(config, samples))
+
+    for report in results:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
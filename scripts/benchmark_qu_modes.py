@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+查询理解模式对比脚本
+在问题集上分别运行parallel(三节点并行)和fused(单次融合调用)两种查询理解模式，
+统计每个问题的耗时、token使用量以及融合模式的回退次数
+"""
+
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.models.adapter_pool import warm_up_adapters
+from src.query_understanding.qu_subgraph import build_qu_subgraph
+from src.utils.logger import get_logger
+
+
+def load_questions(path: str, limit: int = None):
+    """读取JSONL格式的问题文件，每行包含question字段"""
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            questions.append(json.loads(line)['question'])
+            if limit and len(questions) >= limit:
+                break
+    return questions
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(graph, config, questions, mode):
+    """在指定模式下运行全部问题"""
+    latencies = []
+    total_tokens = 0
+    fallbacks = 0
+    errors = 0
+
+    for question in questions:
+        state = {
+            "query": question,
+            "config": config,
+            "qu_mode": mode,
+            "segment_model": config.get("api.qwen.segment_model"),
+            "ner_model": config.get("api.qwen.ner_model"),
+            "intent_model": config.get("api.qwen.intent_model"),
+            "fused_model": config.get("api.qwen.fused_model")
+        }
+        start = time.perf_counter()
+        try:
+            result = graph.invoke(state)
+        except Exception as e:
+            errors += 1
+            print(f"  ❌ {question[:30]}... 失败: {e}")
+            continue
+        latencies.append(time.perf_counter() - start)
+
+        for usage in result.get("qu_usage") or []:
+            total_tokens += int((usage.get("token_usage") or {}).get("total_tokens") or 0)
+        if result.get("qu_fused_failed"):
+            fallbacks += 1
+
+    return {
+        "mode": mode,
+        "questions": len(questions),
+        "errors": errors,
+        "fused_fallbacks": fallbacks,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p99": percentile(latencies, 99),
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "total_tokens": total_tokens,
+        "tokens_per_question": total_tokens / len(latencies) if latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询理解parallel/fused模式对比')
+    parser.add_argument('--questions', '-q',
+                        default='bs_challenge_financial_14b_dataset/question.json',
+                        help='JSONL格式的问题文件')
+    parser.add_argument('--modes', '-m', nargs='+', default=['parallel', 'fused'],
+                        choices=['parallel', 'fused'],
+                        help='需要对比的模式')
+    parser.add_argument('--limit', '-n', type=int, default=None,
+                        help='最多运行的问题数量')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--output', '-o', default=None,
+                        help='结果输出的JSON文件')
+    parser.add_argument('--use-cache', action='store_true',
+                        help='保留LLM响应缓存和语义缓存(默认关闭以测量真实调用)')
+
+    args = parser.parse_args()
+    logger = get_logger(__name__)
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    if not args.use_cache:
+        config.update_config("llm_cache.enabled", False)
+        config.update_config("qu_cache.enabled", False)
+
+    warm_up_adapters(config)
+    graph = build_qu_subgraph()
+    questions = load_questions(args.questions, args.limit)
+    logger.info(f"加载问题 {len(questions)} 个")
+
+    results = []
+    for mode in args.modes:
+        print(f"运行模式: {mode}")
+        report = run_mode(graph, config, questions, mode)
+        results.append(report)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
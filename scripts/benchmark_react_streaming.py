@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ReAct流式解析对比脚本
+分别在关闭/开启planner.streaming_parse的情况下运行Agent，
+统计首次工具调用耗时(time-to-first-tool-call)、总耗时和推理步数
+"""
+
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.models.adapter_pool import warm_up_adapters
+from src.planner.planner import create_default_custom_react_agent
+
+
+def load_questions(path: str, limit: int = None):
+    """读取JSONL格式的问题文件，每行包含question字段"""
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            questions.append(json.loads(line)['question'])
+            if limit and len(questions) >= limit:
+                break
+    return questions
+
+
+def percentile(values, pct):
+    """计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(agent, questions, streaming_parse):
+    agent.config.update_config("planner.streaming_parse", streaming_parse)
+    first_tool_latencies = []
+    total_latencies = []
+    steps = []
+    errors = 0
+    for question in questions:
+        start = time.perf_counter()
+        try:
+            result = agent.invoke(question)
+        except Exception as e:
+            errors += 1
+            print(f"  ❌ {question[:30]}... 失败: {e}")
+            continue
+        total_latencies.append(time.perf_counter() - start)
+        steps.append(result.get("steps_taken", 0))
+        if result.get("time_to_first_tool_call") is not None:
+            first_tool_latencies.append(result["time_to_first_tool_call"])
+
+    return {
+        "streaming_parse": streaming_parse,
+        "questions": len(questions),
+        "errors": errors,
+        "ttftc_p50": percentile(first_tool_latencies, 50),
+        "ttftc_p99": percentile(first_tool_latencies, 99),
+        "total_p50": percentile(total_latencies, 50),
+        "total_p99": percentile(total_latencies, 99),
+        "avg_steps": sum(steps) / len(steps) if steps else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ReAct流式解析开启/关闭对比')
+    parser.add_argument('--questions', '-q',
+                        default='bs_challenge_financial_14b_dataset/question.json',
+                        help='JSONL格式的问题文件')
+    parser.add_argument('--limit', '-n', type=int, default=20,
+                        help='最多运行的问题数量')
+    parser.add_argument('--model', '-m', default='qwen-turbo',
+                        help='Agent使用的模型')
+    parser.add_argument('--max-steps', type=int, default=8,
+                        help='最大推理步数')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--output', '-o', default=None,
+                        help='结果输出的JSON文件')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    # 关闭缓存以测量真实调用
+    config.update_config("llm_cache.enabled", False)
+    config.update_config("planner.tool_cache.enabled", False)
+
+    warm_up_adapters(config)
+    agent = create_default_custom_react_agent(model_name=args.model, config=config, max_steps=args.max_steps)
+    questions = load_questions(args.questions, args.limit)
+
+    results = []
+    for streaming_parse in (False, True):
+        print(f"streaming_parse={streaming_parse}")
+        report = run(agent, questions, streaming_parse)
+        results.append(report)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
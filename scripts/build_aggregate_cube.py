@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+聚合库构建脚本
+从比赛数据库预计算每日排名、行业每日聚合和基金前N大持仓，
+QueryDB在聚合库未过期时把匹配的查询改写到聚合表上执行
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.dao.aggregate_cube import build_cube
+
+
+def resolve(path: str) -> Path:
+    result = Path(path)
+    return result if result.is_absolute() else project_root / result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建预计算聚合库')
+    parser.add_argument('--db', default=None,
+                        help='源数据库路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='聚合库路径(默认读取database.aggregate_cube.path配置)')
+    parser.add_argument('--top-n', type=int, default=None,
+                        help='排名类聚合保留的条数(默认读取database.aggregate_cube.top_n配置)')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(resolve(args.config_dir))
+
+    db_path = resolve(args.db or config.get('database.sqlite.path',
+                                            'bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db'))
+    if not db_path.exists():
+        print(f"❌ 数据库文件不存在: {db_path}")
+        sys.exit(1)
+    output = resolve(args.output or config.get('database.aggregate_cube.path', 'data/aggregate_cube.db'))
+    top_n = args.top_n or config.get_int('database.aggregate_cube.top_n', 50)
+
+    start = time.perf_counter()
+    meta = build_cube(str(db_path), str(output), top_n=top_n)
+    for table, rows in meta["tables"].items():
+        print(f"  {table}: {rows} 行")
+    print(f"✅ 聚合库: {output} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
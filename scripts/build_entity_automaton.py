@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+实体自动机构建脚本
+从博金杯数据库和招股说明书标题列表构建Aho-Corasick实体自动机，供实体抽取节点快速匹配
+"""
+
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.query_understanding.entity_matcher import EntityMatcher, build_entity_matcher
+from src.query_understanding.financial_vocab import resolve_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建金融实体Aho-Corasick自动机')
+    parser.add_argument('--db-path', '-d', default=None,
+                        help='数据库文件路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--titles-path', '-t', default=None,
+                        help='招股说明书标题列表(默认读取query_understanding.titles_path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='自动机输出路径(默认读取query_understanding.entity_matcher.path配置)')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--sample', '-s', nargs='*', default=[],
+                        help='构建完成后对给定句子试匹配')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    db_path = args.db_path or config.get("database.sqlite.path")
+    titles_path = args.titles_path or config.get("query_understanding.titles_path", "data/extracted_titles.txt")
+    output = resolve_path(
+        args.output or config.get("query_understanding.entity_matcher.path", ".cache/entity_automaton.npz")
+    )
+
+    start = time.perf_counter()
+    build_entity_matcher(db_path, titles_path, str(output))
+    print(f"✅ 自动机构建完成: {output}，耗时 {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matcher = EntityMatcher.load(str(output))
+    print(f"加载耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for sentence in args.sample:
+        start = time.perf_counter()
+        entities = matcher.extract(sentence)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{sentence} ({elapsed:.3f}ms)")
+        print(json.dumps(entities, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
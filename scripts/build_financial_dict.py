@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+金融分词词典构建脚本
+从博金杯数据库和招股说明书标题列表构建jieba用户词典，供本地分词引擎使用
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.query_understanding.financial_vocab import resolve_path
+from src.query_understanding.segmenter import FinancialSegmenter, build_financial_dictionary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建金融领域分词词典')
+    parser.add_argument('--db-path', '-d', default=None,
+                        help='数据库文件路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--titles-path', '-t', default=None,
+                        help='招股说明书标题列表(默认读取query_understanding.titles_path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='词典输出路径(默认读取query_understanding.segment_dict_path配置)')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--sample', '-s', nargs='*', default=[],
+                        help='构建完成后对给定句子试分词')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    db_path = args.db_path or config.get("database.sqlite.path")
+    titles_path = args.titles_path or config.get("query_understanding.titles_path", "data/extracted_titles.txt")
+    output = resolve_path(
+        args.output or config.get("query_understanding.segment_dict_path", ".cache/financial_dict.txt")
+    )
+
+    start = time.perf_counter()
+    count = build_financial_dictionary(db_path, titles_path, str(output))
+    print(f"✅ 词典构建完成: {output}，词条 {count} 个，耗时 {time.perf_counter() - start:.2f}s")
+
+    if args.sample:
+        segmenter = FinancialSegmenter(str(output))
+        for sentence in args.sample:
+            start = time.perf_counter()
+            words = segmenter.segment(sentence)
+            print(f"{sentence}\n  -> {' / '.join(words)} ({(time.perf_counter() - start) * 1000:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
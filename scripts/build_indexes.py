@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+索引推荐与构建脚本
+从Agent日志/SQL文件收集执行过的查询，为全表扫描的查询推荐覆盖索引，
+在比赛数据库的副本上建索引，并输出前后查询计划和延迟的对比报告
+"""
+
+import sys
+import argparse
+import glob
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.dao.index_advisor import IndexAdvisor, extract_sql_from_logs, group_templates, load_sql_file
+
+
+def resolve(path: str) -> Path:
+    result = Path(path)
+    return result if result.is_absolute() else project_root / result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='为博金杯比赛数据库推荐并构建索引')
+    parser.add_argument('--db', default=None,
+                        help='源数据库路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--output-db', default=None,
+                        help='带索引的副本路径(默认在源数据库旁生成<name>_indexed.db)')
+    parser.add_argument('--logs', nargs='*', default=['logs/all.log*'],
+                        help='要提取query_db SQL的日志文件(支持通配符)')
+    parser.add_argument('--sql-file', nargs='*', default=[],
+                        help='额外的SQL文件(JSON列表、包含"sql"字段的JSON或每行一条SQL)')
+    parser.add_argument('--report', default='output/index_report.json',
+                        help='对比报告输出路径')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='只输出推荐的索引，不复制数据库')
+    parser.add_argument('--max-columns', type=int, default=6,
+                        help='单个索引的最大列数')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='每条样例SQL计时的重复次数')
+    parser.add_argument('--force', action='store_true',
+                        help='副本已存在时重新复制源数据库')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(resolve(args.config_dir))
+
+    db_path = resolve(args.db or config.get('database.sqlite.path',
+                                            'bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db'))
+    if not db_path.exists():
+        print(f"❌ 数据库文件不存在: {db_path}")
+        sys.exit(1)
+    output_db = resolve(args.output_db) if args.output_db else db_path.with_name(f"{db_path.stem}_indexed.db")
+
+    log_files = sorted({path for pattern in args.logs for path in glob.glob(str(resolve(pattern)))})
+    statements = extract_sql_from_logs(log_files)
+    for path in args.sql_file:
+        statements.extend(load_sql_file(str(resolve(path))))
+    print(f"从 {len(log_files)} 个日志文件和 {len(args.sql_file)} 个SQL文件收集到 {len(statements)} 条SQL")
+    if not statements:
+        print("❌ 没有可分析的SQL")
+        sys.exit(1)
+
+    advisor = IndexAdvisor(str(db_path), max_index_columns=args.max_columns, repeat=args.repeat)
+
+    if args.dry_run:
+        templates = group_templates(statements)
+        candidates = advisor.recommend(templates)
+        print(f"{len(templates)} 个查询模板，推荐 {len(candidates)} 个索引:")
+        for candidate in candidates:
+            print(f"  {candidate.create_sql};  -- {len(candidate.templates)} 个模板")
+        return
+
+    report = advisor.run(statements, str(output_db), overwrite=args.force)
+    report_path = resolve(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for index in report["indexes"]:
+        print(f"  {index['sql']};")
+    for row in report["queries"]:
+        print(f"  {row['before_ms']}ms -> {row['after_ms']}ms (x{row['speedup']})  {row['template'][:100]}")
+    print(f"✅ 索引副本: {output_db}")
+    print(f"✅ 对比报告: {report_path}")
+    print(f"将database.sqlite.path指向 {output_db} 即可使用带索引的数据库")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+日行情列式快照导出脚本
+把A股/港股/基金日行情表和A股行业划分表导出为按(日期, 代码)排序的.npy列文件，
+供QuoteAnalytics工具做向量化的横截面和时间序列查询
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.analytics.quote_snapshot import SNAPSHOT_TABLES, QuoteSnapshot, export_snapshot
+
+
+def resolve(path: str) -> Path:
+    result = Path(path)
+    return result if result.is_absolute() else project_root / result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出日行情列式快照')
+    parser.add_argument('--db', default=None,
+                        help='源数据库路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='快照目录(默认读取analytics.quote_snapshot.path配置)')
+    parser.add_argument('--tables', nargs='+', choices=list(SNAPSHOT_TABLES), default=list(SNAPSHOT_TABLES),
+                        help='要导出的表')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(resolve(args.config_dir))
+
+    db_path = resolve(args.db or config.get('database.sqlite.path',
+                                            'bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db'))
+    if not db_path.exists():
+        print(f"❌ 数据库文件不存在: {db_path}")
+        sys.exit(1)
+    output = resolve(args.output or config.get('analytics.quote_snapshot.path', 'data/quote_snapshot'))
+
+    start = time.perf_counter()
+    manifests = export_snapshot(str(db_path), str(output), args.tables)
+    for manifest in manifests:
+        print(f"  {manifest['table']}: {manifest['row_count']} 行, {len(manifest['partitions']['dates'])} 个交易日")
+    print(f"✅ 快照目录: {output} ({time.perf_counter() - start:.1f}s)")
+
+    # 单日横截面查询耗时
+    snapshot = QuoteSnapshot(str(output))
+    if "A股票日行情表" in args.tables:
+        table = snapshot.table("A股票日行情表")
+        if len(table.dates):
+            day = str(int(table.dates[-1]))
+            start = time.perf_counter()
+            snapshot.query("A股票日行情表", "最高价(元)-最低价(元)", date=day, top_k=10)
+            print(f"单日横截面top-k查询({day}): {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
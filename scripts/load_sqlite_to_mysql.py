@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+SQLite到MySQL批量导入脚本
+把比赛SQLite数据库的各表分批、并行导入MySQL(默认使用database.mysql配置)，
+导入后重建索引并报告每张表的rows/sec；--target-url可指定其他SQLAlchemy目标(如sqlite:///copy.db)
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from sqlalchemy import create_engine
+
+from src.config.config_manager import ConfigManager
+from src.dao.bulk_loader import BulkLoader
+
+
+def resolve(path: str) -> Path:
+    result = Path(path)
+    return result if result.is_absolute() else project_root / result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把博金杯SQLite数据库批量导入MySQL')
+    parser.add_argument('--db', default=None,
+                        help='源数据库路径(默认读取database.sqlite.path配置)')
+    parser.add_argument('--target-url', default=None,
+                        help='目标库的SQLAlchemy URL(默认使用database.mysql配置的MySQLClient)')
+    parser.add_argument('--tables', nargs='*', default=None,
+                        help='只导入这些表(默认全部)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='每批插入的行数(默认读取database.bulk_load.batch_size配置)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='并行导入的表数(默认读取database.bulk_load.workers配置)')
+    parser.add_argument('--replace', action='store_true',
+                        help='目标表已存在时删除重建')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(resolve(args.config_dir))
+
+    db_path = resolve(args.db or config.get('database.sqlite.path',
+                                            'bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db'))
+    if not db_path.exists():
+        print(f"❌ 数据库文件不存在: {db_path}")
+        sys.exit(1)
+
+    client = None
+    if args.target_url:
+        engine = create_engine(args.target_url, connect_args={"timeout": 60}
+                               if args.target_url.startswith('sqlite') else {})
+    else:
+        from src.dao.db import MySQLClient
+        client = MySQLClient()
+        engine = client.engine
+
+    loader = BulkLoader(
+        str(db_path), engine,
+        batch_size=args.batch_size or config.get_int('database.bulk_load.batch_size', 5000),
+        workers=args.workers or config.get_int('database.bulk_load.workers', 4),
+        replace=args.replace
+    )
+    start = time.perf_counter()
+    reports = loader.load(args.tables)
+    elapsed = time.perf_counter() - start
+
+    # 导入绕过了客户端，清理其结果缓存和表结构目录
+    if client is not None:
+        if client.result_cache is not None:
+            client.result_cache.clear()
+        if client.schema_catalog is not None:
+            client.schema_catalog.invalidate()
+
+    failed = [report for report in reports if report.error]
+    for report in reports:
+        if report.error:
+            print(f"  ❌ {report.table}: {report.error}")
+        else:
+            print(f"  {report.table}: {report.rows} 行，导入 {report.load_seconds:.1f}s "
+                  f"({report.rows_per_sec:.0f} rows/s)，建索引 {report.index_seconds:.1f}s")
+    total = sum(report.rows for report in reports)
+    print(f"{'❌' if failed else '✅'} 共 {len(reports)} 张表 {total} 行，{elapsed:.1f}s "
+          f"({total / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
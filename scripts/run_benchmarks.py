@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+问答流程基准测试脚本
+在固定语料上测量冷启动、SQL上下文加载、检索、query_db、查询理解各节点和Agent每步的耗时，
+输出键排序的JSON报告，可以直接在不同提交之间diff，或用--compare与基线报告对比
+"""
+
+import sys
+import argparse
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.benchmark.pipeline import BENCHMARK_GROUPS, load_corpus, run_pipeline_benchmarks
+from src.benchmark.suite import BenchmarkSuite, build_meta, compare_reports, write_report
+from src.utils.tracing import Tracer, set_tracer
+
+# 默认关闭的缓存，保证每次测量的都是实际执行路径
+CACHE_SWITCHES = ("llm_cache.enabled", "qu_cache.enabled", "planner.tool_cache.enabled",
+                  "database.result_cache.enabled")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='问答流程基准测试')
+    parser.add_argument('--corpus', default='data/benchmark/corpus.json',
+                        help='基准语料文件')
+    parser.add_argument('--groups', '-g', nargs='+', choices=BENCHMARK_GROUPS, default=list(BENCHMARK_GROUPS),
+                        help='要运行的基准分组')
+    parser.add_argument('--llm-backend', choices=['live', 'record', 'replay', 'synthetic'], default='replay',
+                        help='LLM后端，默认replay使用录制的响应保证可复现')
+    parser.add_argument('--replay-speed', type=float, default=None,
+                        help='replay后端的时间缩放(默认读取llm_backend.replay_speed配置)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='每个基准项重复的轮数')
+    parser.add_argument('--warmup', type=int, default=0,
+                        help='每个基准项预热调用次数(不计入样本)')
+    parser.add_argument('--model', '-m', default='qwen-turbo',
+                        help='Agent使用的模型')
+    parser.add_argument('--max-steps', type=int, default=8,
+                        help='Agent最大推理步数')
+    parser.add_argument('--qu-modes', nargs='+', choices=['sequential', 'parallel', 'fused'], default=['parallel'],
+                        help='查询理解子图测试的模式')
+    parser.add_argument('--with-caches', action='store_true',
+                        help='保留LLM/查询理解/工具缓存配置(默认关闭)')
+    parser.add_argument('--output', '-o', default='output/benchmark.json',
+                        help='报告输出路径')
+    parser.add_argument('--trace-output', default=None,
+                        help='启用链路追踪并把span写出为Chrome trace文件')
+    parser.add_argument('--compare', default=None,
+                        help='基线报告路径，输出p50/p99的变化')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='与基线对比时视为回退的相对变化')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='存在回退时以非零状态码退出')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config_dir = Path(args.config_dir)
+    if not config_dir.is_absolute():
+        config_dir = project_root / config_dir
+    config = ConfigManager()
+    config.init(config_dir)
+
+    config_overrides = {"llm_backend.mode": args.llm_backend}
+    if args.replay_speed is not None:
+        config_overrides["llm_backend.replay_speed"] = args.replay_speed
+    if args.llm_backend in ("replay", "synthetic"):
+        # 离线后端不访问API，限流只会引入与代码无关的等待
+        config_overrides["api.qwen.rate_limit.enabled"] = False
+    if not args.with_caches:
+        config_overrides.update({key: False for key in CACHE_SWITCHES})
+    for key, value in config_overrides.items():
+        config.update_config(key, value)
+
+    corpus_path = Path(args.corpus)
+    if not corpus_path.is_absolute():
+        corpus_path = project_root / corpus_path
+    corpus = load_corpus(str(corpus_path))
+
+    tracer = Tracer() if args.trace_output else None
+    if tracer is not None:
+        set_tracer(tracer)
+
+    suite = BenchmarkSuite(repeat=args.repeat, warmup=args.warmup)
+    run_pipeline_benchmarks(
+        suite, config, corpus,
+        groups=args.groups,
+        model=args.model,
+        max_steps=args.max_steps,
+        qu_modes=args.qu_modes
+    )
+
+    meta = build_meta(
+        str(corpus_path),
+        groups=args.groups,
+        llm_backend=args.llm_backend,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        model=args.model,
+        qu_modes=args.qu_modes,
+        config_overrides=config_overrides
+    )
+    # 报告中记录命令行给出的语料路径，避免绝对路径随机器不同产生diff
+    meta["corpus"] = args.corpus
+    report = suite.report(meta)
+    write_report(report, args.output)
+    print(json.dumps(report["benchmarks"], indent=2, ensure_ascii=False))
+    print(f"✅ 基准报告: {args.output}")
+    if tracer is not None:
+        tracer.write_chrome_trace(args.trace_output)
+        print(f"✅ Chrome trace: {args.trace_output}")
+
+    if not args.compare:
+        return
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare_reports(baseline, report, threshold=args.threshold)
+    regressions = [row for row in rows if row["status"] == "regression"]
+    for row in rows:
+        if row["status"] == "unchanged":
+            continue
+        if row["metric"] is None:
+            print(f"  {row['status']:<12} {row['name']}")
+        else:
+            print(f"  {row['status']:<12} {row['name']} {row['metric']}: "
+                  f"{row['baseline']} -> {row['current']} ({row['change']:+.1%})")
+    print(f"对比基线 {args.compare}: {len(regressions)} 项回退")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+批量答题脚本
+从JSONL问题文件读取问题，多进程+多线程并发调用ReAct Agent答题，
+结果实时写入检查点文件，中断后重新运行会从上次进度继续，最后生成提交文件
+"""
+
+import sys
+import argparse
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.runner.batch_runner import BatchRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='博金杯问题批量答题')
+    parser.add_argument('--questions', '-q', default=None,
+                        help='JSONL格式的问题文件(默认读取runner.questions_path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='提交文件路径(默认读取runner.output_path配置)')
+    parser.add_argument('--checkpoint', default=None,
+                        help='检查点文件路径(默认读取runner.checkpoint_path配置)')
+    parser.add_argument('--processes', '-p', type=int, default=None,
+                        help='工作进程数，0表示在当前进程内执行')
+    parser.add_argument('--concurrency', '-j', type=int, default=None,
+                        help='每个进程内并发处理的问题数')
+    parser.add_argument('--limit', '-n', type=int, default=None,
+                        help='最多处理的问题数量')
+    parser.add_argument('--no-retry-failed', action='store_true',
+                        help='不重试检查点中失败的问题')
+    parser.add_argument('--llm-backend', choices=['live', 'record', 'replay', 'synthetic'], default=None,
+                        help='LLM后端(默认读取llm_backend.mode配置)，replay/synthetic用于离线基准测试')
+    parser.add_argument('--submission-only', action='store_true',
+                        help='只根据检查点生成提交文件')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+
+    args = parser.parse_args()
+
+    config_dir = Path(args.config_dir)
+    if not config_dir.is_absolute():
+        config_dir = project_root / config_dir
+    config = ConfigManager()
+    config.init(config_dir)
+
+    config_overrides = {}
+    if args.llm_backend:
+        config_overrides["llm_backend.mode"] = args.llm_backend
+    for key, value in config_overrides.items():
+        config.update_config(key, value)
+
+    runner = BatchRunner(
+        questions_path=args.questions or config.get(
+            "runner.questions_path", "bs_challenge_financial_14b_dataset/question.json"
+        ),
+        checkpoint_path=args.checkpoint or config.get("runner.checkpoint_path", "output/checkpoint.jsonl"),
+        output_path=args.output or config.get("runner.output_path", "output/submission.jsonl"),
+        processes=args.processes if args.processes is not None else config.get_int("runner.processes", 2),
+        concurrency=args.concurrency if args.concurrency is not None else config.get_int("runner.concurrency", 4),
+        config_dir=str(config_dir),
+        retry_failed=not args.no_retry_failed,
+        limit=args.limit,
+        config_overrides=config_overrides
+    )
+
+    if args.submission_only:
+        answered = runner.write_submission(runner.output_path)
+        print(f"✅ 提交文件已生成: {runner.output_path}，已回答 {answered} 个问题")
+        return
+
+    stats = runner.run()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    print(f"✅ 提交文件: {runner.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+本地意图分类器训练脚本
+使用意图理解节点记录的LLM输出(JSONL)训练字符n-gram哈希 + 逻辑回归的多标签意图分类器
+"""
+
+import sys
+import argparse
+import json
+import random
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.config.config_manager import ConfigManager
+from src.query_understanding.financial_vocab import resolve_path
+from src.query_understanding.intent_classifier import LocalIntentClassifier, load_intent_samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='训练本地意图分类器')
+    parser.add_argument('--data', '-d', default=None,
+                        help='训练样本JSONL(默认读取query_understanding.intent_classifier.sample_log_path配置)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='模型输出路径(默认读取query_understanding.intent_classifier.path配置)')
+    parser.add_argument('--config-dir', '-c', default='src/conf',
+                        help='配置文件目录')
+    parser.add_argument('--dimension', type=int, default=4096,
+                        help='哈希特征维度')
+    parser.add_argument('--epochs', type=int, default=300,
+                        help='训练轮数')
+    parser.add_argument('--learning-rate', type=float, default=2.0,
+                        help='学习率')
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help='留出验证集比例，0表示全部用于训练')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='随机种子')
+
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    config.init(Path(args.config_dir))
+    data_path = resolve_path(
+        args.data or config.get("query_understanding.intent_classifier.sample_log_path", ".cache/intent_samples.jsonl")
+    )
+    output = resolve_path(
+        args.output or config.get("query_understanding.intent_classifier.path", ".cache/intent_classifier.npz")
+    )
+
+    samples = load_intent_samples(str(data_path))
+    print(f"加载样本 {len(samples)} 个: {data_path}")
+
+    random.Random(args.seed).shuffle(samples)
+    holdout_size = int(len(samples) * args.holdout)
+    valid_samples, train_samples = samples[:holdout_size], samples[holdout_size:]
+
+    classifier = LocalIntentClassifier.train(
+        train_samples,
+        dimension=args.dimension,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate
+    )
+    print("训练集:", json.dumps(classifier.evaluate(train_samples), ensure_ascii=False))
+    if valid_samples:
+        print("验证集:", json.dumps(classifier.evaluate(valid_samples), ensure_ascii=False))
+
+    classifier.save(str(output))
+    print(f"✅ 模型已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
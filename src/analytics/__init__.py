@@ -0,0 +1,19 @@
+"""
+Analytics module
+"""
+
+from src.analytics.quote_snapshot import (
+    SNAPSHOT_TABLES,
+    ColumnarTable,
+    QuoteSnapshot,
+    export_snapshot,
+    get_quote_snapshot
+)
+
+__all__ = [
+    'SNAPSHOT_TABLES',
+    'ColumnarTable',
+    'QuoteSnapshot',
+    'export_snapshot',
+    'get_quote_snapshot'
+]
@@ -0,0 +1,501 @@
+"""
+Columnar Quote Snapshot
+
+日行情表的列式快照，用于向量化的横截面/时间序列分析:
+1. 离线导出: 股票/基金代码等文本列字典编码为int32，日期转为int32(YYYYMMDD)，价格和成交量为float64，
+   每列一个.npy文件，可以mmap方式加载
+2. 行按(日期, 代码)排序，每个交易日是一段连续的行，manifest记录各交易日的起止行号，
+   单日查询只需切片，不复制数据
+3. 查询接口: 按日期/日期区间/代码/行业过滤，列表达式(如"最高价(元)-最低价(元)")，
+   滚动窗口、分组聚合和top-k
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+DICT = "dict"
+DATE = "date"
+FLOAT = "float"
+
+_PRICE_COLUMNS = ["昨收盘(元)", "今开盘(元)", "最高价(元)", "最低价(元)", "收盘价(元)", "成交量(股)", "成交金额(元)"]
+
+
+@dataclass(frozen=True)
+class SnapshotTableSpec:
+    """导出的表: code_column为主体代码列，date_column为分区日期列"""
+    name: str
+    code_column: str
+    date_column: str
+    columns: Tuple[Tuple[str, str], ...]
+
+
+SNAPSHOT_TABLES = {
+    spec.name: spec for spec in (
+        SnapshotTableSpec("A股票日行情表", "股票代码", "交易日",
+                          (("股票代码", DICT), ("交易日", DATE)) + tuple((c, FLOAT) for c in _PRICE_COLUMNS)),
+        SnapshotTableSpec("港股票日行情表", "股票代码", "交易日",
+                          (("股票代码", DICT), ("交易日", DATE)) + tuple((c, FLOAT) for c in _PRICE_COLUMNS)),
+        SnapshotTableSpec("基金日行情表", "基金代码", "交易日期",
+                          (("基金代码", DICT), ("交易日期", DATE), ("单位净值", FLOAT), ("复权单位净值", FLOAT),
+                           ("累计单位净值", FLOAT), ("资产净值", FLOAT))),
+        SnapshotTableSpec("A股公司行业划分表", "股票代码", "交易日期",
+                          (("股票代码", DICT), ("交易日期", DATE), ("行业划分标准", DICT),
+                           ("一级行业名称", DICT), ("二级行业名称", DICT)))
+    )
+}
+
+INDUSTRY_TABLE = "A股公司行业划分表"
+
+AGGREGATIONS = ("mean", "sum", "max", "min", "count", "first", "last")
+ROLLING_AGGREGATIONS = ("mean", "sum", "max", "min", "change", "pct_change")
+
+
+def parse_date(value: Any) -> int:
+    """'20211125'、'2021-11-25 00:00:00'或20211125转为int YYYYMMDD，无法解析时返回0"""
+    digits = re.sub(r"\D", "", str(value or ""))[:8]
+    return int(digits) if len(digits) == 8 else 0
+
+
+def _encode_chunk(values: List[Any], kind: str, vocabulary: Dict[str, int]) -> np.ndarray:
+    if kind == DICT:
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            key = "" if value is None else str(value)
+            code = vocabulary.get(key)
+            if code is None:
+                code = vocabulary[key] = len(vocabulary)
+            codes[i] = code
+        return codes
+    if kind == DATE:
+        return np.fromiter((parse_date(value) for value in values), dtype=np.int32, count=len(values))
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def export_table(
+    conn: sqlite3.Connection,
+    spec: SnapshotTableSpec,
+    output_dir: Path,
+    chunk_size: int = 200000
+) -> Dict[str, Any]:
+    """
+    导出一张表为列式文件
+
+    Args:
+        conn: SQLite连接
+        spec: 表定义
+        output_dir: 输出目录(每张表一个子目录)
+        chunk_size: 每次读取的行数
+
+    Returns:
+        表的manifest
+    """
+    start = time.perf_counter()
+    names = [name for name, _ in spec.columns]
+    vocabularies: Dict[str, Dict[str, int]] = {name: {} for name, kind in spec.columns if kind == DICT}
+    chunks: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+    select = ", ".join(f'"{name}"' for name in names)
+    cursor = conn.execute(f'SELECT {select} FROM "{spec.name}"')
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for index, (name, kind) in enumerate(spec.columns):
+            chunks[name].append(_encode_chunk([row[index] for row in rows], kind, vocabularies.get(name)))
+
+    arrays = {
+        name: np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype=np.float64 if kind == FLOAT else np.int32)
+        for name, kind in spec.columns
+    }
+    # 字典按字符串排序，使编码顺序与字符串顺序一致
+    dictionaries = {}
+    for name, vocabulary in vocabularies.items():
+        ordered = sorted(vocabulary)
+        remap = np.empty(len(vocabulary), dtype=np.int32)
+        for new_code, value in enumerate(ordered):
+            remap[vocabulary[value]] = new_code
+        arrays[name] = remap[arrays[name]] if len(arrays[name]) else arrays[name]
+        dictionaries[name] = ordered
+
+    order = np.lexsort((arrays[spec.code_column], arrays[spec.date_column]))
+    table_dir = output_dir / spec.name
+    table_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for index, (name, kind) in enumerate(spec.columns):
+        files[name] = f"c{index}.npy"
+        np.save(table_dir / files[name], arrays[name][order])
+        if kind == DICT:
+            with open(table_dir / f"c{index}.dict.json", 'w', encoding='utf-8') as f:
+                json.dump(dictionaries[name], f, ensure_ascii=False)
+
+    dates, offsets = np.unique(arrays[spec.date_column][order], return_index=True)
+    manifest = {
+        "table": spec.name,
+        "code_column": spec.code_column,
+        "date_column": spec.date_column,
+        "row_count": int(len(order)),
+        "columns": [{"name": name, "kind": kind, "file": files[name]} for name, kind in spec.columns],
+        "partitions": {"dates": dates.tolist(), "offsets": offsets.tolist()},
+        "exported_at": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    with open(table_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    log.info(f"[QUOTE_SNAPSHOT] 导出 {spec.name}: {len(order)} 行，{len(dates)} 个交易日 "
+             f"({time.perf_counter() - start:.1f}s)")
+    return manifest
+
+
+def export_snapshot(db_path: str, output_dir: str, tables: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    从SQLite数据库导出列式快照
+
+    Args:
+        db_path: 博金杯比赛数据库路径
+        output_dir: 快照目录
+        tables: 要导出的表，默认SNAPSHOT_TABLES中的全部表
+
+    Returns:
+        各表的manifest
+    """
+    conn = sqlite3.connect(f"file:{quote(str(db_path))}?mode=ro", uri=True)
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        manifests = []
+        for name in tables or SNAPSHOT_TABLES:
+            if name not in existing:
+                log.warning(f"[QUOTE_SNAPSHOT] 数据库中没有表 {name}，跳过")
+                continue
+            manifests.append(export_table(conn, SNAPSHOT_TABLES[name], Path(output_dir)))
+        return manifests
+    finally:
+        conn.close()
+
+
+class ColumnarTable:
+    """一张已导出的列式表，列数据按需以mmap方式加载"""
+
+    def __init__(self, table_dir: Path, mmap: bool = True):
+        self.table_dir = Path(table_dir)
+        self.mmap = mmap
+        with open(self.table_dir / "manifest.json", 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.name = self.manifest["table"]
+        self.code_column = self.manifest["code_column"]
+        self.date_column = self.manifest["date_column"]
+        self.row_count = self.manifest["row_count"]
+        self.kinds = {column["name"]: column["kind"] for column in self.manifest["columns"]}
+        self._files = {column["name"]: column["file"] for column in self.manifest["columns"]}
+        self.dates = np.asarray(self.manifest["partitions"]["dates"], dtype=np.int32)
+        self.offsets = np.append(np.asarray(self.manifest["partitions"]["offsets"], dtype=np.int64), self.row_count)
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._dictionaries: Dict[str, np.ndarray] = {}
+        self._lookups: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def column(self, name: str) -> np.ndarray:
+        """列数据(字典列为编码)"""
+        if name not in self._arrays:
+            if name not in self._files:
+                raise KeyError(f"{self.name} 没有列 {name}")
+            with self._lock:
+                if name not in self._arrays:
+                    self._arrays[name] = np.load(self.table_dir / self._files[name],
+                                                 mmap_mode="r" if self.mmap else None)
+        return self._arrays[name]
+
+    def dictionary(self, name: str) -> np.ndarray:
+        """字典列的取值表，编码即下标"""
+        if name not in self._dictionaries:
+            path = self.table_dir / self._files[name].replace(".npy", ".dict.json")
+            with open(path, 'r', encoding='utf-8') as f:
+                values = json.load(f)
+            with self._lock:
+                self._dictionaries[name] = np.asarray(values, dtype=object)
+                self._lookups[name] = {value: code for code, value in enumerate(values)}
+        return self._dictionaries[name]
+
+    def encode(self, name: str, values: Sequence[str]) -> np.ndarray:
+        """字符串转编码，不存在的值被忽略"""
+        self.dictionary(name)
+        lookup = self._lookups[name]
+        return np.asarray([lookup[value] for value in values if value in lookup], dtype=np.int32)
+
+    def decode(self, name: str, codes: np.ndarray) -> List[str]:
+        return self.dictionary(name)[np.asarray(codes, dtype=np.int64)].tolist()
+
+    def row_range(self, start_date: Optional[int] = None, end_date: Optional[int] = None) -> slice:
+        """日期区间[start_date, end_date]对应的连续行"""
+        first = 0 if start_date is None else int(np.searchsorted(self.dates, start_date, side="left"))
+        last = len(self.dates) if end_date is None else int(np.searchsorted(self.dates, end_date, side="right"))
+        return slice(int(self.offsets[first]), int(self.offsets[max(first, last)]))
+
+
+_EXPRESSION_TOKENS = re.compile(r"^[\sv\d.+\-*/()]+$")
+
+
+def evaluate_expression(expression: str, columns: Sequence[str], fetch) -> np.ndarray:
+    """
+    计算列表达式，只允许列名、数字、+-*/和括号
+
+    Args:
+        expression: 如"最高价(元)-最低价(元)"或"(收盘价(元)-昨收盘(元))/昨收盘(元)"
+        columns: 可用的数值列
+        fetch: 列名到数组的函数
+
+    Returns:
+        计算结果
+    """
+    names = {}
+    text = expression
+    # 列名本身可能包含括号，按长度从长到短替换为占位变量
+    for index, column in enumerate(sorted(columns, key=len, reverse=True)):
+        if column in text:
+            placeholder = f"v{index}"
+            text = text.replace(column, f" {placeholder} ")
+            names[placeholder] = column
+    if not names or not _EXPRESSION_TOKENS.match(text) or re.search(r"v(?!\d)", text):
+        raise ValueError(f"无法解析的表达式: {expression}")
+    variables = {placeholder: np.asarray(fetch(column), dtype=np.float64) for placeholder, column in names.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(eval(text, {"__builtins__": {}}, variables), dtype=np.float64)
+
+
+def _group_reduce(keys: np.ndarray, values: np.ndarray, agg: str) -> Tuple[np.ndarray, np.ndarray]:
+    """按键分组聚合，行已按日期排序，first/last即最早/最晚一天的值"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.empty(0, int)
+    groups = sorted_keys[starts]
+    if agg == "count":
+        return groups, np.diff(np.r_[starts, len(keys)]).astype(np.float64)
+    if agg == "first":
+        return groups, sorted_values[starts]
+    if agg == "last":
+        return groups, sorted_values[np.r_[starts[1:], len(keys)] - 1]
+    ufunc = {"sum": np.add, "max": np.fmax, "min": np.fmin, "mean": np.add}[agg]
+    reduced = ufunc.reduceat(np.nan_to_num(sorted_values, nan=0.0) if agg in ("sum", "mean") else sorted_values,
+                             starts) if len(starts) else np.empty(0)
+    if agg == "mean":
+        counts = np.add.reduceat((~np.isnan(sorted_values)).astype(np.float64), starts) if len(starts) else reduced
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reduced = reduced / counts
+    return groups, reduced
+
+
+def _rolling(codes: np.ndarray, values: np.ndarray, window: int, agg: str) -> np.ndarray:
+    """每个代码各自的时间序列上计算滚动窗口，窗口未满时为NaN"""
+    result = np.full(len(values), np.nan)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        series = values[order[begin:end]]
+        if agg in ("change", "pct_change"):
+            if len(series) <= window:
+                continue
+            previous = series[:-window]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                delta = series[window:] - previous
+                rolled = delta / previous if agg == "pct_change" else delta
+            result[order[begin + window:end]] = rolled
+            continue
+        if len(series) < window:
+            continue
+        view = np.lib.stride_tricks.sliding_window_view(series, window)
+        rolled = {"mean": np.mean, "sum": np.sum, "max": np.max, "min": np.min}[agg](view, axis=1)
+        result[order[begin + window - 1:end]] = rolled
+    return result
+
+
+class QuoteSnapshot:
+    """列式快照的查询接口"""
+
+    def __init__(self, root: str, mmap: bool = True):
+        self.root = Path(root)
+        self.mmap = mmap
+        self._tables: Dict[str, ColumnarTable] = {}
+        self._lock = threading.Lock()
+
+    def available_tables(self) -> List[str]:
+        return sorted(path.parent.name for path in self.root.glob("*/manifest.json"))
+
+    def table(self, name: str) -> ColumnarTable:
+        if name not in self._tables:
+            table_dir = self.root / name
+            if not (table_dir / "manifest.json").exists():
+                raise KeyError(f"快照中没有表 {name}，可用的表: {self.available_tables()}")
+            with self._lock:
+                if name not in self._tables:
+                    self._tables[name] = ColumnarTable(table_dir, self.mmap)
+        return self._tables[name]
+
+    def industry_codes(self, industry: str, date: Optional[int] = None, standard: Optional[str] = None) -> List[str]:
+        """
+        行业成分股代码: 一级或二级行业名称匹配，取不晚于date的最近一次行业划分
+
+        Args:
+            industry: 行业名称
+            date: 日期(YYYYMMDD)，默认使用最新的划分
+            standard: 行业划分标准，如"中信行业分类"、"申万行业分类"
+
+        Returns:
+            股票代码列表
+        """
+        table = self.table(INDUSTRY_TABLE)
+        mask = np.zeros(table.row_count, dtype=bool)
+        for level in ("一级行业名称", "二级行业名称"):
+            codes = table.encode(level, [industry])
+            if len(codes):
+                mask |= np.asarray(table.column(level)) == codes[0]
+        if standard:
+            codes = table.encode("行业划分标准", [standard])
+            mask &= np.asarray(table.column("行业划分标准")) == (codes[0] if len(codes) else -1)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return []
+        dates = np.asarray(table.column(table.date_column))[rows]
+        candidates = dates[dates <= date] if date else dates
+        latest = candidates.max() if len(candidates) else dates.min()
+        return sorted(set(table.decode(table.code_column, table.column(table.code_column)[rows[dates == latest]])))
+
+    def query(
+        self,
+        table: str,
+        metric: str,
+        date: Optional[Union[str, int]] = None,
+        start_date: Optional[Union[str, int]] = None,
+        end_date: Optional[Union[str, int]] = None,
+        codes: Optional[Sequence[str]] = None,
+        industry: Optional[str] = None,
+        industry_standard: Optional[str] = None,
+        rolling_window: Optional[int] = None,
+        rolling_agg: str = "mean",
+        group_by: Optional[str] = None,
+        agg: str = "mean",
+        top_k: Optional[int] = None,
+        ascending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        查询快照
+
+        Args:
+            table: 表名，如"A股票日行情表"
+            metric: 数值列或列表达式，如"最高价(元)-最低价(元)"
+            date: 单个交易日，与start_date/end_date二选一
+            start_date / end_date: 日期区间(含两端)
+            codes: 只保留这些代码
+            industry / industry_standard: 只保留该行业的股票(A股)
+            rolling_window / rolling_agg: 按代码计算滚动窗口(mean/sum/max/min/change/pct_change)，
+                在过滤日期之前的数据不参与窗口计算
+            group_by: 按"code"或"date"分组聚合
+            agg: 分组聚合方式(mean/sum/max/min/count/first/last)
+            top_k: 按结果值排序后返回的条数，默认返回全部
+            ascending: 升序排序(默认降序，即最大的在前)
+
+        Returns:
+            [{"code", "date", "value"}, ...]，分组时只包含分组键和value
+        """
+        columnar = self.table(table)
+        if date is not None:
+            start_date = end_date = date
+        rows = columnar.row_range(parse_date(start_date) if start_date else None,
+                                  parse_date(end_date) if end_date else None)
+        code_array = np.asarray(columnar.column(columnar.code_column)[rows])
+        date_array = np.asarray(columnar.column(columnar.date_column)[rows])
+
+        selected_codes = list(codes or [])
+        if industry:
+            members = self.industry_codes(industry, parse_date(end_date) if end_date else None, industry_standard)
+            selected_codes = [code for code in selected_codes if code in set(members)] if codes else members
+        mask = None
+        if codes or industry:
+            mask = np.isin(code_array, columnar.encode(columnar.code_column, selected_codes))
+
+        numeric = [name for name, kind in columnar.kinds.items() if kind == FLOAT]
+        values = evaluate_expression(metric, numeric, lambda name: columnar.column(name)[rows])
+        if mask is not None:
+            code_array, date_array, values = code_array[mask], date_array[mask], values[mask]
+
+        if rolling_window:
+            if rolling_agg not in ROLLING_AGGREGATIONS:
+                raise ValueError(f"不支持的滚动聚合: {rolling_agg}")
+            values = _rolling(code_array, values, int(rolling_window), rolling_agg)
+
+        if group_by:
+            if agg not in AGGREGATIONS:
+                raise ValueError(f"不支持的聚合: {agg}")
+            key_name = {"code": "code", "date": "date"}.get(group_by)
+            if key_name is None:
+                raise ValueError(f"不支持的分组: {group_by}")
+            keys, values = _group_reduce(code_array if key_name == "code" else date_array, values, agg)
+            records = {key_name: keys}
+        else:
+            records = {"code": code_array, "date": date_array}
+
+        valid = ~np.isnan(values)
+        positions = np.flatnonzero(valid)
+        ordered = positions[np.argsort(values[positions] if ascending else -values[positions], kind="stable")]
+        if top_k:
+            ordered = ordered[:int(top_k)]
+
+        result = []
+        decoded = columnar.decode(columnar.code_column, records["code"][ordered]) if "code" in records else None
+        for index, position in enumerate(ordered):
+            item = {}
+            if decoded is not None:
+                item["code"] = decoded[index]
+            if "date" in records:
+                item["date"] = str(int(records["date"][position]))
+            item["value"] = round(float(values[position]), 6)
+            result.append(item)
+        return result
+
+
+_snapshot: Optional[QuoteSnapshot] = None
+_snapshot_loaded = False
+_snapshot_lock = threading.Lock()
+
+
+def get_quote_snapshot() -> Optional[QuoteSnapshot]:
+    """
+    获取进程级共享的行情快照
+
+    配置项:
+        analytics.quote_snapshot.path: 快照目录(scripts/export_quote_snapshot.py的输出)
+        analytics.quote_snapshot.mmap: 是否以mmap方式加载列
+
+    Returns:
+        QuoteSnapshot实例，快照目录不存在时返回None
+    """
+    global _snapshot, _snapshot_loaded
+    if _snapshot_loaded:
+        return _snapshot
+    with _snapshot_lock:
+        if not _snapshot_loaded:
+            config = ConfigManager()
+            path = Path(config.get("analytics.quote_snapshot.path", "data/quote_snapshot"))
+            if not path.is_absolute():
+                path = project_root / path
+            if any(path.glob("*/manifest.json")):
+                _snapshot = QuoteSnapshot(str(path), mmap=config.get_boolean("analytics.quote_snapshot.mmap", True))
+                log.info(f"[QUOTE_SNAPSHOT] 加载行情快照: {path} {_snapshot.available_tables()}")
+            else:
+                log.info(f"[QUOTE_SNAPSHOT] 行情快照不存在: {path}")
+            _snapshot_loaded = True
+    return _snapshot
@@ -0,0 +1,15 @@
+"""
+Benchmark module
+"""
+
+from src.benchmark.suite import BenchmarkSuite, BenchmarkResult, compare_reports
+from src.benchmark.pipeline import BENCHMARK_GROUPS, load_corpus, run_pipeline_benchmarks
+
+__all__ = [
+    'BenchmarkSuite',
+    'BenchmarkResult',
+    'compare_reports',
+    'BENCHMARK_GROUPS',
+    'load_corpus',
+    'run_pipeline_benchmarks'
+]
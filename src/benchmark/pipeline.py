@@ -0,0 +1,234 @@
+"""
+Pipeline Benchmarks
+
+问答流程各环节的基准测试项:
+1. cold_start: 新进程中导入主要模块的耗时
+2. sql_context: SQL上下文文件加载耗时
+3. retrieval: numpy向量检索(哈希向量 + 余弦相似度)和Milvus检索的耗时
+4. query_db: QueryDB工具执行固定SQL的耗时
+5. qu: 查询理解子图各节点以及整个子图的耗时
+6. agent: ReAct Agent每个问题、每一步LLM调用、首次工具调用和各工具调用的耗时
+
+LLM调用由llm_backend配置决定，离线环境下使用replay后端保证结果可复现。
+"""
+
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.benchmark.suite import BenchmarkSuite, project_root
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+BENCHMARK_GROUPS = ("cold_start", "sql_context", "retrieval", "query_db", "qu", "agent")
+
+# 冷启动测试导入的模块
+COLD_START_MODULES = ("src.query_understanding.qu_subgraph", "src.planner.planner")
+
+SQL_CONTEXT_DIR = "data/sql_context"
+SQL_CONTEXT_FILE = "data/sql_context/博金杯比赛数据_context.json"
+
+_IMPORT_MARKER = "__BENCHMARK_IMPORT_SECONDS__"
+
+
+def load_corpus(path: str) -> Dict[str, Any]:
+    """读取基准语料: {"questions": [{"id", "question"}], "sql": [...]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _import_seconds(module: str) -> float:
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(project_root)!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        f"print({_IMPORT_MARKER!r}, time.perf_counter() - start)\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, timeout=300
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(_IMPORT_MARKER):
+            return float(line.split()[-1])
+    raise RuntimeError(f"导入 {module} 失败: {completed.stderr.strip()[-500:]}")
+
+
+def bench_cold_start(suite: BenchmarkSuite, modules: Sequence[str] = COLD_START_MODULES, runs: int = 3) -> None:
+    """每次在新的Python进程中导入模块，记录导入耗时"""
+    for module in modules:
+        for _ in range(runs):
+            try:
+                suite.record(f"cold_start.import.{module}", _import_seconds(module))
+            except (RuntimeError, subprocess.SubprocessError) as e:
+                suite.record_error(f"cold_start.import.{module}")
+                log.warning(f"[BENCHMARK] {e}")
+
+
+def bench_sql_context(suite: BenchmarkSuite) -> None:
+    """SQL上下文(表结构描述和向量)的加载耗时"""
+    from src.embedding.sql_context import SQLContextRetriever
+    context_dir = project_root / SQL_CONTEXT_DIR
+    if not context_dir.exists():
+        suite.skip("sql_context.load", f"目录不存在: {context_dir}")
+        return
+    suite.measure("sql_context.load", lambda _: SQLContextRetriever(str(context_dir)), [None] * 5)
+
+
+def _load_context_chunks() -> List[Dict[str, str]]:
+    from src.knowledge.knowledge import FinancialKnowledgeManager
+    manager = FinancialKnowledgeManager()
+    with open(project_root / SQL_CONTEXT_FILE, 'r', encoding='utf-8') as f:
+        manager.context_data = json.load(f)
+    return manager._generate_context_chunks()
+
+
+def bench_retrieval(suite: BenchmarkSuite, questions: List[str], top_k: int = 5) -> None:
+    """numpy向量检索和Milvus检索的耗时"""
+    from src.query_understanding.semantic_cache import HashingEmbedder
+
+    if not (project_root / SQL_CONTEXT_FILE).exists():
+        suite.skip("retrieval.numpy.search", f"文件不存在: {SQL_CONTEXT_FILE}")
+    else:
+        chunks = _load_context_chunks()
+        embedder = HashingEmbedder()
+        index: Dict[str, Any] = {}
+
+        def build(_):
+            index["matrix"] = np.vstack([embedder.encode(chunk["content"]) for chunk in chunks])
+
+        def search(question):
+            scores = index["matrix"] @ embedder.encode(question)
+            top = np.argpartition(-scores, min(top_k, len(scores) - 1))[:top_k]
+            return [chunks[i]["table_name"] for i in top[np.argsort(-scores[top])]]
+
+        suite.measure("retrieval.numpy.build", build, [None])
+        suite.measure("retrieval.numpy.search", search, questions)
+
+    from src.knowledge import knowledge
+    if not knowledge.MILVUS_AVAILABLE:
+        suite.skip("retrieval.milvus.search", "pymilvus未安装")
+        return
+    manager = knowledge.FinancialKnowledgeManager()
+    try:
+        manager.init()
+    except Exception as e:
+        suite.skip("retrieval.milvus.search", f"Milvus初始化失败: {e}")
+        return
+    try:
+        suite.measure("retrieval.milvus.search", lambda question: manager.retrieve(question, top_k), questions,
+                      is_error=lambda results: not results)
+    finally:
+        manager.close()
+
+
+def bench_query_db(suite: BenchmarkSuite, sqls: List[str]) -> None:
+    """QueryDB工具执行固定SQL的耗时，以字符串返回的错误计为失败"""
+    from src.tools.db_tool import query_db
+    suite.measure("tool.query_db", query_db, sqls,
+                  is_error=lambda output: isinstance(output, str) and output.startswith("query_db:"))
+
+
+def _qu_state(config: ConfigManager, question: str, mode: str) -> Dict[str, Any]:
+    return {
+        "query": question,
+        "config": config,
+        "qu_mode": mode,
+        "segment_model": config.get("api.qwen.segment_model"),
+        "ner_model": config.get("api.qwen.ner_model"),
+        "intent_model": config.get("api.qwen.intent_model"),
+        "fused_model": config.get("api.qwen.fused_model")
+    }
+
+
+def _qu_error(output: Optional[Dict[str, Any]]) -> bool:
+    return bool(output and output.get("error"))
+
+
+def bench_qu(suite: BenchmarkSuite, config: ConfigManager, questions: List[str],
+             modes: Sequence[str] = ("parallel",)) -> None:
+    """查询理解子图各节点单独执行的耗时，以及每种模式下整个子图的耗时"""
+    from src.query_understanding import qu_subgraph
+
+    nodes = {
+        "word_segmentation": qu_subgraph.word_segmentation_node,
+        "ner": qu_subgraph.ner_node,
+        "intent_recognition": qu_subgraph.intent_recognition_node
+    }
+    if "fused" in modes:
+        nodes["fused_qu"] = qu_subgraph.fused_qu_node
+
+    for name, node in nodes.items():
+        suite.measure(f"qu.node.{name}", lambda question, node=node: node(_qu_state(config, question, "parallel")),
+                      questions, is_error=_qu_error)
+
+    graph = qu_subgraph.build_qu_subgraph()
+    for mode in modes:
+        suite.measure(f"qu.subgraph.{mode}", lambda question, mode=mode: graph.invoke(_qu_state(config, question, mode)),
+                      questions, is_error=_qu_error)
+
+
+def bench_agent(suite: BenchmarkSuite, config: ConfigManager, questions: List[str],
+                model: str = "qwen-turbo", max_steps: int = 8) -> None:
+    """ReAct Agent端到端耗时，并拆分为每步LLM调用、首次工具调用和各工具调用耗时"""
+    from src.planner.planner import create_default_custom_react_agent
+
+    agent = create_default_custom_react_agent(model_name=model, config=config, max_steps=max_steps)
+    results = suite.measure("agent.question", agent.invoke, questions,
+                            is_error=lambda result: bool(result.get("error")) and not result.get("final_answer"))
+    for result in results:
+        if result is None:
+            continue
+        suite.record("agent.time_to_first_tool_call", result.get("time_to_first_tool_call"))
+        for latency in result.get("agent_step_latencies", []):
+            suite.record("agent.step", latency)
+        for tool_result in result.get("tool_results", []):
+            name = f"agent.tool.{tool_result['tool']}"
+            if tool_result.get("error"):
+                suite.record_error(name)
+            else:
+                suite.record(name, tool_result.get("duration"))
+
+
+def run_pipeline_benchmarks(
+    suite: BenchmarkSuite,
+    config: ConfigManager,
+    corpus: Dict[str, Any],
+    groups: Sequence[str] = BENCHMARK_GROUPS,
+    model: str = "qwen-turbo",
+    max_steps: int = 8,
+    qu_modes: Sequence[str] = ("parallel",)
+) -> BenchmarkSuite:
+    """
+    按分组运行基准测试
+
+    Args:
+        suite: 基准测试集合
+        config: 配置管理器
+        corpus: 基准语料
+        groups: 要运行的分组，取值见BENCHMARK_GROUPS
+        model: Agent使用的模型
+        max_steps: Agent最大推理步数
+        qu_modes: 查询理解子图测试的模式
+
+    Returns:
+        填充了结果的suite
+    """
+    questions = [item["question"] for item in corpus.get("questions", [])]
+    runners = {
+        "cold_start": lambda: bench_cold_start(suite),
+        "sql_context": lambda: bench_sql_context(suite),
+        "retrieval": lambda: bench_retrieval(suite, questions),
+        "query_db": lambda: bench_query_db(suite, corpus.get("sql", [])),
+        "qu": lambda: bench_qu(suite, config, questions, qu_modes),
+        "agent": lambda: bench_agent(suite, config, questions, model, max_steps)
+    }
+    for group in groups:
+        log.info(f"[BENCHMARK] 运行 {group}")
+        runners[group]()
+    return suite
@@ -0,0 +1,224 @@
+"""
+Benchmark Suite
+
+基准测试的计时、统计和报告:
+1. 每个基准项记录若干次耗时样本，统计count/mean/p50/p90/p99/min/max(毫秒)
+2. 报告为JSON，基准项按名称排序、数值统一保留3位小数，便于在不同提交之间直接diff
+3. compare_reports对比两份报告的p50/p99，超过阈值的变化标记为回退
+"""
+
+import hashlib
+import json
+import platform
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数(最近秩)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class BenchmarkResult:
+    """单个基准项的样本"""
+    name: str
+    samples: List[float] = field(default_factory=list)
+    errors: int = 0
+    skipped: Optional[str] = None
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """统计信息，耗时单位为毫秒"""
+        if self.skipped:
+            return {"skipped": self.skipped}
+        ms = [sample * 1000 for sample in self.samples]
+        stats = {
+            "count": len(ms),
+            "errors": self.errors,
+            "mean_ms": sum(ms) / len(ms) if ms else 0.0,
+            "p50_ms": percentile(ms, 50),
+            "p90_ms": percentile(ms, 90),
+            "p99_ms": percentile(ms, 99),
+            "min_ms": min(ms) if ms else 0.0,
+            "max_ms": max(ms) if ms else 0.0
+        }
+        return {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+
+
+class BenchmarkSuite:
+    """基准测试集合"""
+
+    def __init__(self, repeat: int = 1, warmup: int = 0):
+        self.repeat = max(1, repeat)
+        self.warmup = warmup
+        self.results: Dict[str, BenchmarkResult] = {}
+
+    def result(self, name: str) -> BenchmarkResult:
+        """获取(不存在时创建)基准项"""
+        if name not in self.results:
+            self.results[name] = BenchmarkResult(name)
+        return self.results[name]
+
+    def record(self, name: str, seconds: Optional[float]) -> None:
+        """记录外部测得的耗时(如Agent返回的每步耗时)"""
+        if seconds is not None:
+            self.result(name).add(seconds)
+
+    def record_error(self, name: str) -> None:
+        self.result(name).errors += 1
+
+    def skip(self, name: str, reason: str) -> None:
+        """标记基准项因环境原因跳过(如Milvus不可用)"""
+        self.result(name).skipped = reason
+        log.warning(f"[BENCHMARK] 跳过 {name}: {reason}")
+
+    def measure(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        inputs: Iterable[Any] = (None,),
+        is_error: Callable[[Any], bool] = lambda output: False
+    ) -> List[Any]:
+        """
+        对每个输入计时执行fn，重复repeat次，预热调用不计入样本
+
+        Args:
+            name: 基准项名称
+            fn: 被测函数，接收一个输入
+            inputs: 输入列表
+            is_error: 根据返回值判断是否失败(如工具以字符串返回的错误)
+
+        Returns:
+            最后一轮的输出列表
+        """
+        inputs = list(inputs)
+        for item in inputs[:self.warmup]:
+            try:
+                fn(item)
+            except Exception:
+                pass
+
+        result = self.result(name)
+        outputs = []
+        for _ in range(self.repeat):
+            outputs = []
+            for item in inputs:
+                start = time.perf_counter()
+                try:
+                    output = fn(item)
+                except Exception as e:
+                    result.errors += 1
+                    log.warning(f"[BENCHMARK] {name} 执行失败: {e}")
+                    outputs.append(None)
+                    continue
+                elapsed = time.perf_counter() - start
+                if is_error(output):
+                    result.errors += 1
+                else:
+                    result.add(elapsed)
+                outputs.append(output)
+        return outputs
+
+    def report(self, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """生成报告"""
+        return {
+            "meta": meta or {},
+            "benchmarks": {name: self.results[name].summary() for name in sorted(self.results)}
+        }
+
+
+def git_revision() -> Optional[str]:
+    """当前提交的短哈希，不在git仓库中时返回None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def corpus_digest(path: str) -> str:
+    """语料文件的sha256前12位，用于确认两份报告使用了相同的语料"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def build_meta(corpus_path: str, **extra) -> Dict[str, Any]:
+    """报告元信息: 提交、Python版本、语料摘要以及运行参数"""
+    meta = {
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": str(corpus_path),
+        "corpus_sha256": corpus_digest(corpus_path)
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """写出报告，键排序、缩进2，保证diff稳定"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.1,
+    metrics: Iterable[str] = ("p50_ms", "p99_ms")
+) -> List[Dict[str, Any]]:
+    """
+    对比两份报告
+
+    Args:
+        baseline: 基线报告
+        current: 当前报告
+        threshold: 相对变化超过该比例视为回退/提升
+        metrics: 对比的统计项
+
+    Returns:
+        [{"name", "metric", "baseline", "current", "change", "status"}, ...]，
+        status为regression/improvement/unchanged/new/removed
+    """
+    rows = []
+    base_benchmarks = baseline.get("benchmarks", {})
+    current_benchmarks = current.get("benchmarks", {})
+    for name in sorted(set(base_benchmarks) | set(current_benchmarks)):
+        before = base_benchmarks.get(name)
+        after = current_benchmarks.get(name)
+        if before is None or after is None:
+            rows.append({"name": name, "metric": None, "baseline": None, "current": None,
+                         "change": None, "status": "new" if before is None else "removed"})
+            continue
+        for metric in metrics:
+            if metric not in before or metric not in after:
+                continue
+            change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            status = "unchanged"
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+            rows.append({"name": name, "metric": metric, "baseline": before[metric], "current": after[metric],
+                         "change": round(change, 4), "status": status})
+    return rows
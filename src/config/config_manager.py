@@ -225,6 +225,8 @@ class ConfigManager:
         
         # 设置最终键的值
         config[keys[-1]] = value
+        # 清空读取缓存，使已读取过的键获取到新值
+        self._cache.clear()
         
         self._logger.info(f"已更新配置: {key_path}")
 
@@ -0,0 +1,709 @@
+"""
+Aggregate Cube
+
+常见问题模板的预计算聚合库:
+1. 离线任务(scripts/build_aggregate_cube.py)从比赛数据库生成独立的SQLite聚合库:
+   - cube_daily_rank: A股/港股每个交易日按成交量、成交金额、收盘价、振幅排序的前N名和后N名
+   - cube_industry_daily: 交易日 × 行业(划分标准、一级/二级行业) × 行情指标的AVG/SUM/MAX/MIN/COUNT
+   - cube_fund_top_holdings: 每只基金每个持仓日期按市值排序的前N大持仓
+   - cube_meta: 构建时源数据库的大小和mtime
+2. QueryDB执行SQL前由CubeRouter匹配查询形状，能由聚合库等价回答的查询改写到聚合表上执行，
+   无法确认等价的查询(OR、子查询、额外过滤条件、LIMIT超过N等)一律回退到原表
+3. 源数据库的大小或mtime与构建时不一致时聚合库视为过期，不再路由
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import quote
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+from src.utils.tracing import annotate_span
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+CUBE_VERSION = 1
+
+QUOTE_TABLES = ("A股票日行情表", "港股票日行情表")
+INDUSTRY_TABLE = "A股公司行业划分表"
+HOLDINGS_TABLE = "基金股票持仓明细"
+QUOTE_METRICS = ("昨收盘(元)", "今开盘(元)", "最高价(元)", "最低价(元)", "收盘价(元)", "成交量(股)", "成交金额(元)")
+INDUSTRY_LEVELS = ("一级行业名称", "二级行业名称")
+AGGREGATES = ("AVG", "SUM", "MAX", "MIN", "COUNT")
+FUND_KEYS = ("基金代码", "基金简称")
+
+# 排名指标: 键为去掉引号、表别名和空白后的表达式
+RANK_METRICS = {
+    "成交量(股)": '"成交量(股)"',
+    "成交金额(元)": '"成交金额(元)"',
+    "收盘价(元)": '"收盘价(元)"',
+    "最高价(元)-最低价(元)": '"最高价(元)" - "最低价(元)"'
+}
+
+TABLE_COLUMNS = {
+    "A股票日行情表": ("股票代码", "交易日") + QUOTE_METRICS,
+    "港股票日行情表": ("股票代码", "交易日") + QUOTE_METRICS,
+    INDUSTRY_TABLE: ("股票代码", "交易日期", "行业划分标准") + INDUSTRY_LEVELS
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_IDENT = r'(?:\[[^\]]+\]|"[^"]+"|`[^`]+`|\w+)'
+_COLREF = re.compile(rf"^\s*(?:(?P<qualifier>{_IDENT})\s*\.\s*)?(?P<column>{_IDENT})\s*$")
+_COLREF_ANYWHERE = re.compile(rf"(?:{_IDENT}\s*\.\s*)?({_IDENT})")
+_LITERAL = re.compile(r"^\s*\x00(\d+)\x00\s*$")
+_SELECT = re.compile(
+    r"^SELECT\s+(?P<select>.+?)\s+FROM\s+(?P<from>.+?)(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+GROUP\s+BY\s+(?P<group>.+?))?(?:\s+ORDER\s+BY\s+(?P<order>.+?))?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+)(?:\s+OFFSET\s+(?P<offset>\d+))?)?$",
+    re.IGNORECASE | re.DOTALL
+)
+_TABLE_REF = rf"(?P<table{{n}}>{_IDENT})(?:\s+(?:AS\s+)?(?!(?:JOIN|INNER|ON)\b)(?P<alias{{n}}>{_IDENT}))?"
+_SINGLE_FROM = re.compile(rf"^{_TABLE_REF.format(n=1)}$", re.IGNORECASE)
+_JOIN_FROM = re.compile(
+    rf"^{_TABLE_REF.format(n=1)}\s+(?:INNER\s+)?JOIN\s+{_TABLE_REF.format(n=2)}\s+ON\s+(?P<on>.+)$",
+    re.IGNORECASE | re.DOTALL
+)
+_COMMA_FROM = re.compile(rf"^{_TABLE_REF.format(n=1)}\s*,\s*{_TABLE_REF.format(n=2)}$", re.IGNORECASE)
+_UNSUPPORTED = re.compile(r"\b(?:OR|UNION|INTERSECT|EXCEPT|HAVING|NOT|LEFT|RIGHT|OUTER|CROSS|WINDOW|OVER)\b|\(\s*SELECT\b",
+                          re.IGNORECASE)
+_AGGREGATE_CALL = re.compile(r"\b(?:AVG|SUM|MAX|MIN|COUNT|TOTAL|GROUP_CONCAT)\s*\(", re.IGNORECASE)
+_AGGREGATE_ITEM = re.compile(
+    rf"^(?P<agg>AVG|SUM|MAX|MIN|COUNT)\s*\(\s*(?:(?P<distinct>DISTINCT)\s+)?(?P<arg>\*|(?:{_IDENT}\s*\.\s*)?{_IDENT})\s*\)"
+    rf"(?:\s+(?:AS\s+)?(?P<alias>{_IDENT}))?$",
+    re.IGNORECASE
+)
+_COLUMN_ITEM = re.compile(rf"^(?P<ref>(?:{_IDENT}\s*\.\s*)?{_IDENT})(?:\s+(?:AS\s+)?(?P<alias>{_IDENT}))?$", re.IGNORECASE)
+_ALIASED_ITEM = re.compile(rf"^(?P<expr>.*?[^\s\-+*/%|<>=,(])\s+(?:AS\s+)?(?P<alias>{_IDENT})$", re.IGNORECASE | re.DOTALL)
+_ORDER = re.compile(r"^(?P<expr>.+?)(?:\s+(?P<direction>ASC|DESC))?$", re.IGNORECASE | re.DOTALL)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unquote(identifier: str) -> str:
+    identifier = identifier.strip()
+    if identifier[:1] in ('"', '`', '[') and len(identifier) > 1:
+        return identifier[1:-1]
+    return identifier
+
+
+def cube_column(agg: str, column: str) -> str:
+    """聚合列名，如AVG(收盘价(元))"""
+    return f"{agg}({column})"
+
+
+def source_signature(path: Path) -> Dict[str, Any]:
+    """源数据库的大小和mtime，用于判断聚合库是否过期"""
+    stat = Path(path).stat()
+    return {"source_size": stat.st_size, "source_mtime": stat.st_mtime}
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA src.table_info({_quote(table)})")]
+
+
+def _build_daily_rank(conn: sqlite3.Connection, markets: List[str], top_n: int) -> int:
+    columns = ", ".join(_quote(c) for c in _table_columns(conn, markets[0]))
+    conn.execute(f"CREATE TABLE cube_daily_rank AS SELECT '' AS 市场, '' AS 指标, '' AS 方向, 0 AS 名次, {columns} "
+                 f"FROM src.{_quote(markets[0])} WHERE 0")
+    for market in markets:
+        for key, expression in RANK_METRICS.items():
+            for direction in ("DESC", "ASC"):
+                conn.execute(
+                    f"INSERT INTO cube_daily_rank SELECT ?, ?, ?, 名次, {columns} FROM ("
+                    f"SELECT *, ROW_NUMBER() OVER (PARTITION BY 交易日 ORDER BY {expression} {direction}) AS 名次 "
+                    f"FROM src.{_quote(market)}) WHERE 名次 <= ?",
+                    (market, key, direction, top_n)
+                )
+    conn.execute("CREATE INDEX idx_cube_daily_rank ON cube_daily_rank (市场, 指标, 方向, 交易日, 名次)")
+    return conn.execute("SELECT COUNT(*) FROM cube_daily_rank").fetchone()[0]
+
+
+def _build_industry_daily(conn: sqlite3.Connection) -> int:
+    aggregates = ", ".join(
+        f"{agg}(q.{_quote(metric)}) AS {_quote(cube_column(agg, metric))}"
+        for metric in QUOTE_METRICS for agg in AGGREGATES
+    )
+    for index, level in enumerate(INDUSTRY_LEVELS):
+        select = (
+            f"SELECT q.交易日 AS 交易日, i.行业划分标准 AS 行业划分标准, '{level}' AS 行业级别, i.{level} AS 行业名称, "
+            f"COUNT(*) AS 行数, COUNT(DISTINCT q.股票代码) AS 股票数, {aggregates} "
+            f"FROM src.{_quote(QUOTE_TABLES[0])} q JOIN src.{_quote(INDUSTRY_TABLE)} i "
+            f"ON q.股票代码 = i.股票代码 AND q.交易日 = i.交易日期 "
+            f"GROUP BY q.交易日, i.行业划分标准, i.{level}"
+        )
+        conn.execute(f"CREATE TABLE cube_industry_daily AS {select}" if index == 0
+                     else f"INSERT INTO cube_industry_daily {select}")
+    conn.execute("CREATE INDEX idx_cube_industry_daily ON cube_industry_daily (交易日, 行业划分标准, 行业级别, 行业名称)")
+    return conn.execute("SELECT COUNT(*) FROM cube_industry_daily").fetchone()[0]
+
+
+def _build_fund_top_holdings(conn: sqlite3.Connection, top_n: int) -> int:
+    # 与原表列完全一致，SELECT *也能直接改写
+    columns = ", ".join(_quote(c) for c in _table_columns(conn, HOLDINGS_TABLE))
+    conn.execute(
+        f"CREATE TABLE cube_fund_top_holdings AS SELECT {columns} FROM ("
+        f"SELECT *, ROW_NUMBER() OVER (PARTITION BY 基金代码, 基金简称, 持仓日期 ORDER BY 市值 DESC) AS 名次 "
+        f"FROM src.{_quote(HOLDINGS_TABLE)}) WHERE 名次 <= {int(top_n)}"
+    )
+    conn.execute("CREATE INDEX idx_cube_fund_code ON cube_fund_top_holdings (基金代码, 持仓日期, 市值)")
+    conn.execute("CREATE INDEX idx_cube_fund_name ON cube_fund_top_holdings (基金简称, 持仓日期, 市值)")
+    return conn.execute("SELECT COUNT(*) FROM cube_fund_top_holdings").fetchone()[0]
+
+
+def build_cube(source_path: str, cube_path: str, top_n: int = 50) -> Dict[str, Any]:
+    """
+    从比赛数据库构建聚合库，先写临时文件再原子替换，运行中的路由器在下次检查时切换到新文件
+
+    Args:
+        source_path: 比赛数据库路径
+        cube_path: 聚合库路径
+        top_n: 排名类聚合保留的条数
+
+    Returns:
+        聚合库元信息
+    """
+    source = Path(source_path).resolve()
+    target = Path(cube_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(target.name + ".tmp")
+    if temp.exists():
+        temp.unlink()
+
+    # 在读取数据之前记录源文件签名，构建期间源文件被修改时聚合库会被判定为过期
+    meta: Dict[str, Any] = {"version": CUBE_VERSION, "source_path": str(source), **source_signature(source),
+                            "top_n": top_n}
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{quote(str(temp))}", uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (f"file:{quote(str(source))}?mode=ro",))
+        existing = {row[0] for row in conn.execute("SELECT name FROM src.sqlite_master WHERE type='table'")}
+        tables = {}
+        markets = [name for name in QUOTE_TABLES if name in existing]
+        if markets:
+            tables["cube_daily_rank"] = _build_daily_rank(conn, markets, top_n)
+        if QUOTE_TABLES[0] in existing and INDUSTRY_TABLE in existing:
+            tables["cube_industry_daily"] = _build_industry_daily(conn)
+        if HOLDINGS_TABLE in existing:
+            tables["cube_fund_top_holdings"] = _build_fund_top_holdings(conn, top_n)
+        meta.update(tables=tables, built_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        conn.execute("CREATE TABLE cube_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO cube_meta VALUES (?, ?)",
+                         [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()])
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp, target)
+    log.info(f"[AGGREGATE_CUBE] 聚合库构建完成: {target} {meta['tables']} ({time.perf_counter() - start:.1f}s)")
+    return meta
+
+
+@dataclass
+class CubeRoute:
+    """改写到聚合表上的查询"""
+    name: str
+    sql: str
+    params: Tuple[Any, ...] = ()
+
+
+@dataclass
+class _ParsedQuery:
+    select: str
+    items: List[str]
+    tables: Dict[str, str]
+    joins: FrozenSet[FrozenSet[Tuple[str, str]]]
+    filters: Dict[Tuple[str, str], str]
+    where: str
+    group_by: List[Tuple[str, str]]
+    order: Optional[str]
+    limit: Optional[int]
+    offset: int
+    literals: List[str]
+
+    def unmask(self, text: str) -> str:
+        return re.sub(r"\x00(\d+)\x00", lambda m: self.literals[int(m.group(1))], text)
+
+    def literal(self, key: Tuple[str, str]) -> Optional[str]:
+        value = self.filters.get(key)
+        return None if value is None else value[1:-1].replace("''", "'")
+
+    @property
+    def tail(self) -> str:
+        text = f" ORDER BY {self.unmask(self.order)}" if self.order else ""
+        if self.limit is not None:
+            text += f" LIMIT {self.limit}" + (f" OFFSET {self.offset}" if self.offset else "")
+        return text
+
+
+def _split_top_level(text: str) -> List[str]:
+    """按顶层逗号切分，括号和带引号的标识符内部的逗号不切分"""
+    parts, depth, closing, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if closing:
+            if char == closing:
+                closing = None
+        elif char in '["`':
+            closing = ']' if char == '[' else char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:index].strip())
+            start = index + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def _expression_key(expression: str) -> str:
+    """去掉表别名、标识符引号和空白，用于比较表达式"""
+    return re.sub(r"\s+", "", _COLREF_ANYWHERE.sub(lambda m: _unquote(m.group(1)), expression))
+
+
+def _resolve_column(qualifier: Optional[str], column: str, tables: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    column = _unquote(column)
+    if qualifier:
+        table = tables.get(_unquote(qualifier))
+        return (table, column) if table else None
+    if len(set(tables.values())) == 1:
+        return next(iter(tables.values())), column
+    owners = [table for table in set(tables.values()) if column in TABLE_COLUMNS.get(table, ())]
+    return (owners[0], column) if len(owners) == 1 else None
+
+
+def parse_query(sql: str) -> Optional[_ParsedQuery]:
+    """
+    解析只包含等值条件的单表查询或两表内连接查询，其余形式返回None
+
+    Args:
+        sql: SQL语句
+
+    Returns:
+        解析结果
+    """
+    literals: List[str] = []
+
+    def mask(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    masked = _STRING_LITERAL.sub(mask, sql.strip().rstrip(";").strip())
+    if ";" in masked or _UNSUPPORTED.search(masked):
+        return None
+    match = _SELECT.match(masked)
+    if match is None or re.match(r"DISTINCT\b", match.group("select"), re.IGNORECASE):
+        return None
+
+    from_clause = match.group("from").strip()
+    conditions = [match.group("where")] if match.group("where") else []
+    references = []
+    single = _SINGLE_FROM.match(from_clause)
+    if single:
+        references.append((single.group("table1"), single.group("alias1")))
+    else:
+        joined = _JOIN_FROM.match(from_clause) or _COMMA_FROM.match(from_clause)
+        if joined is None:
+            return None
+        references.extend([(joined.group("table1"), joined.group("alias1")),
+                           (joined.group("table2"), joined.group("alias2"))])
+        if "on" in joined.groupdict():
+            conditions.append(joined.group("on"))
+    tables = {}
+    for table, alias in references:
+        tables[_unquote(alias or table)] = _unquote(table)
+    if len(tables) != len(references):
+        return None
+
+    joins, filters = set(), {}
+    for condition in conditions:
+        for conjunct in re.split(r"\s+AND\s+", condition, flags=re.IGNORECASE):
+            sides = re.split(r"\s*==?\s*", conjunct.strip())
+            if len(sides) != 2:
+                return None
+            literal_sides = [_LITERAL.match(side) for side in sides]
+            column_sides = [_COLREF.match(side) for side in sides]
+            if all(column_sides) and not any(literal_sides):
+                left, right = (_resolve_column(m.group("qualifier"), m.group("column"), tables) for m in column_sides)
+                if left is None or right is None:
+                    return None
+                joins.add(frozenset((left, right)))
+                continue
+            literal_index = 0 if literal_sides[0] else 1
+            column = column_sides[1 - literal_index]
+            if not literal_sides[literal_index] or column is None:
+                return None
+            key = _resolve_column(column.group("qualifier"), column.group("column"), tables)
+            value = literals[int(literal_sides[literal_index].group(1))]
+            if key is None or filters.get(key, value) != value:
+                return None
+            filters[key] = value
+
+    group_by = []
+    if match.group("group"):
+        for item in _split_top_level(match.group("group")):
+            column = _COLREF.match(item)
+            key = _resolve_column(column.group("qualifier"), column.group("column"), tables) if column else None
+            if key is None:
+                return None
+            group_by.append(key)
+
+    order = match.group("order")
+    if order and len(_split_top_level(order)) != 1:
+        return None
+    return _ParsedQuery(
+        select=match.group("select"),
+        items=_split_top_level(match.group("select")),
+        tables=tables,
+        joins=frozenset(joins),
+        filters=filters,
+        where=match.group("where") or "",
+        group_by=group_by,
+        order=order,
+        limit=int(match.group("limit")) if match.group("limit") else None,
+        offset=int(match.group("offset") or 0),
+        literals=literals
+    )
+
+
+def _order_expression(query: _ParsedQuery) -> Tuple[str, bool]:
+    """ORDER BY的表达式(展开列别名和序号)及是否降序"""
+    match = _ORDER.match(query.order.strip())
+    expression = match.group("expr").strip()
+    descending = (match.group("direction") or "ASC").upper() == "DESC"
+    if expression.isdigit() and 0 < int(expression) <= len(query.items):
+        expression = query.items[int(expression) - 1]
+    for item in query.items:
+        aliased = _ALIASED_ITEM.match(item)
+        if aliased and _unquote(aliased.group("alias")) == _unquote(expression):
+            expression = aliased.group("expr")
+            break
+    return expression, descending
+
+
+def _is_row_level_select(query: _ParsedQuery) -> bool:
+    return not query.group_by and _AGGREGATE_CALL.search(query.select) is None
+
+
+def _source_alias(query: _ParsedQuery) -> str:
+    return _quote(next(iter(query.tables)))
+
+
+def route_daily_rank(query: _ParsedQuery, top_n: int) -> Optional[CubeRoute]:
+    """某个交易日按排名指标取前N名/后N名的查询"""
+    if len(query.tables) != 1 or query.joins or query.limit is None or query.limit + query.offset > top_n:
+        return None
+    market = next(iter(query.tables.values()))
+    if market not in QUOTE_TABLES or set(query.filters) != {(market, "交易日")} or not query.order:
+        return None
+    if not _is_row_level_select(query) or re.search(r"(?:^|[\s,.])\*", query.select):
+        return None
+    expression, descending = _order_expression(query)
+    metric = _expression_key(expression)
+    if metric not in RANK_METRICS:
+        return None
+    sql = (f"SELECT {query.unmask(query.select)} FROM cube_daily_rank AS {_source_alias(query)} "
+           f"WHERE 市场 = ? AND 指标 = ? AND 方向 = ? AND ({query.unmask(query.where)}){query.tail}")
+    return CubeRoute("daily_rank", sql, (market, metric, "DESC" if descending else "ASC"))
+
+
+def route_fund_top_holdings(query: _ParsedQuery, top_n: int) -> Optional[CubeRoute]:
+    """某只基金某个持仓日期按市值取前N大持仓的查询"""
+    if len(query.tables) != 1 or query.joins or query.limit is None or query.limit + query.offset > top_n:
+        return None
+    if next(iter(query.tables.values())) != HOLDINGS_TABLE or not query.order:
+        return None
+    columns = {column for _, column in query.filters}
+    if "持仓日期" not in columns or not columns & set(FUND_KEYS) or columns - {"持仓日期", *FUND_KEYS}:
+        return None
+    expression, descending = _order_expression(query)
+    if not descending or _expression_key(expression) != "市值" or not _is_row_level_select(query):
+        return None
+    sql = (f"SELECT {query.unmask(query.select)} FROM cube_fund_top_holdings AS {_source_alias(query)} "
+           f"WHERE {query.unmask(query.where)}{query.tail}")
+    return CubeRoute("fund_top_holdings", sql)
+
+
+def _industry_item(item: str, query: _ParsedQuery, level: str) -> Optional[Tuple[str, str]]:
+    """行业聚合查询的SELECT项 -> (聚合库上的表达式, 输出列名)"""
+    aggregate = _AGGREGATE_ITEM.match(item)
+    if aggregate:
+        agg, argument = aggregate.group("agg").upper(), aggregate.group("arg")
+        name = _unquote(aggregate.group("alias")) if aggregate.group("alias") else item
+        if argument == "*":
+            return ("行数" if agg == "COUNT" and not aggregate.group("distinct") else None), name
+        column = _COLREF.match(argument)
+        key = _resolve_column(column.group("qualifier"), column.group("column"), query.tables)
+        if key is None or agg != "COUNT" and key[0] != QUOTE_TABLES[0]:
+            return None
+        if key[1] == "股票代码" and agg == "COUNT":
+            # 连接条件保证两张表的股票代码相同且非空
+            return ("股票数" if aggregate.group("distinct") else "行数"), name
+        if key[1] not in QUOTE_METRICS or key[0] != QUOTE_TABLES[0] or aggregate.group("distinct"):
+            return None
+        return _quote(cube_column(agg, key[1])), name
+    column_item = _COLUMN_ITEM.match(item)
+    if column_item:
+        column = _COLREF.match(column_item.group("ref"))
+        key = _resolve_column(column.group("qualifier"), column.group("column"), query.tables)
+        if key == (INDUSTRY_TABLE, level):
+            name = _unquote(column_item.group("alias") or column.group("column"))
+            return "行业名称", name
+    return None
+
+
+def route_industry_daily(query: _ParsedQuery) -> Optional[CubeRoute]:
+    """某个交易日按行业聚合行情指标的查询(单个行业或按行业分组)"""
+    quote_table = QUOTE_TABLES[0]
+    if sorted(query.tables.values()) != sorted([quote_table, INDUSTRY_TABLE]):
+        return None
+    expected_joins = {frozenset({(quote_table, "股票代码"), (INDUSTRY_TABLE, "股票代码")}),
+                      frozenset({(quote_table, "交易日"), (INDUSTRY_TABLE, "交易日期")})}
+    if set(query.joins) != expected_joins:
+        return None
+    allowed = {(quote_table, "交易日"), (INDUSTRY_TABLE, "交易日期"), (INDUSTRY_TABLE, "行业划分标准")}
+    allowed.update((INDUSTRY_TABLE, level) for level in INDUSTRY_LEVELS)
+    if set(query.filters) - allowed:
+        return None
+    dates = {query.literal(key) for key in [(quote_table, "交易日"), (INDUSTRY_TABLE, "交易日期")]} - {None}
+    standard = query.literal((INDUSTRY_TABLE, "行业划分标准"))
+    level_filters = [level for level in INDUSTRY_LEVELS if (INDUSTRY_TABLE, level) in query.filters]
+    if len(dates) != 1 or standard is None or len(level_filters) > 1:
+        return None
+
+    if query.group_by:
+        if len(query.group_by) != 1 or query.group_by[0][0] != INDUSTRY_TABLE or query.group_by[0][1] not in INDUSTRY_LEVELS:
+            return None
+        level = query.group_by[0][1]
+        if level_filters and level_filters != [level]:
+            return None
+    elif level_filters:
+        level = level_filters[0]
+    else:
+        return None
+
+    columns = []
+    for item in query.items:
+        mapped = _industry_item(item, query, level)
+        if mapped is None or mapped[0] is None or (mapped[0] == "行业名称" and not query.group_by):
+            return None
+        columns.append(mapped)
+
+    params: List[Any] = [dates.pop(), standard, level]
+    where = "交易日 = ? AND 行业划分标准 = ? AND 行业级别 = ?"
+    if level_filters:
+        where += " AND 行业名称 = ?"
+        params.append(query.literal((INDUSTRY_TABLE, level)))
+
+    if not query.group_by:
+        # 没有GROUP BY的聚合查询在没有匹配行时也返回一行(COUNT为0，其余为NULL)
+        select = ", ".join(
+            f"COALESCE(MAX({expr}), 0) AS {_quote(name)}" if expr in ("行数", "股票数") else f"MAX({expr}) AS {_quote(name)}"
+            for expr, name in columns
+        )
+        sql = f"SELECT {select} FROM cube_industry_daily WHERE {where}"
+        if query.limit is not None:
+            sql += f" LIMIT {query.limit}" + (f" OFFSET {query.offset}" if query.offset else "")
+        return CubeRoute("industry_daily", sql, tuple(params))
+
+    order = "行业名称"
+    if query.order:
+        expression, descending = _order_expression(query)
+        mapped = _industry_item(expression, query, level)
+        if mapped is None or mapped[0] is None:
+            names = [name for _, name in columns]
+            if _unquote(expression) not in names:
+                return None
+            mapped = (_quote(_unquote(expression)), None)
+        order = f"{mapped[0]} {'DESC' if descending else 'ASC'}"
+    select = ", ".join(f"{expr} AS {_quote(name)}" for expr, name in columns)
+    sql = f"SELECT {select} FROM cube_industry_daily WHERE {where} ORDER BY {order}"
+    if query.limit is not None:
+        sql += f" LIMIT {query.limit}" + (f" OFFSET {query.offset}" if query.offset else "")
+    return CubeRoute("industry_daily", sql, tuple(params))
+
+
+class CubeRouter:
+    """把可由聚合库等价回答的QueryDB查询改写到聚合表上执行"""
+
+    def __init__(self, cube_path: str, source_path: str, check_interval: float = 30.0):
+        self.cube_path = Path(cube_path)
+        self.source_path = Path(source_path)
+        self.check_interval = check_interval
+        self.meta: Dict[str, Any] = {}
+        self._cube_mtime: Optional[float] = None
+        self._generation = 0
+        self._fresh = False
+        self._checked_at: Optional[float] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "fallback": 0, "stale": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{quote(str(self.cube_path))}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _check(self) -> bool:
+        try:
+            cube_mtime = self.cube_path.stat().st_mtime
+            signature = source_signature(self.source_path)
+        except OSError:
+            return False
+        if cube_mtime != self._cube_mtime:
+            conn = self._connect()
+            try:
+                self.meta = {row["key"]: json.loads(row["value"]) for row in conn.execute("SELECT key, value FROM cube_meta")}
+            except sqlite3.Error as e:
+                log.warning(f"[AGGREGATE_CUBE] 无法读取聚合库元信息: {e}")
+                self.meta = {}
+            finally:
+                conn.close()
+            self._cube_mtime = cube_mtime
+            self._generation += 1
+        fresh = (self.meta.get("version") == CUBE_VERSION
+                 and all(self.meta.get(key) == value for key, value in signature.items()))
+        if self._fresh and not fresh or self._checked_at is None and not fresh:
+            log.warning(f"[AGGREGATE_CUBE] 聚合库已过期(源数据库已更新)，查询回退到原表: {self.cube_path}")
+        return fresh
+
+    def is_fresh(self) -> bool:
+        """聚合库是否与源数据库一致，按check_interval节流检查"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._fresh
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= self.check_interval:
+                self._fresh = self._check()
+                self._checked_at = now
+        return self._fresh
+
+    def route(self, sql: str) -> Optional[CubeRoute]:
+        """
+        匹配查询形状，返回改写后的查询
+
+        Args:
+            sql: QueryDB收到的SQL
+
+        Returns:
+            改写后的查询，无法等价改写或聚合库过期时返回None
+        """
+        if not self.is_fresh():
+            return None
+        query = parse_query(sql)
+        if query is None:
+            return None
+        tables = self.meta.get("tables", {})
+        top_n = int(self.meta.get("top_n", 0))
+        if "cube_daily_rank" in tables:
+            route = route_daily_rank(query, top_n)
+            if route:
+                return route
+        if "cube_fund_top_holdings" in tables:
+            route = route_fund_top_holdings(query, top_n)
+            if route:
+                return route
+        if "cube_industry_daily" in tables:
+            return route_industry_daily(query)
+        return None
+
+    def get_connection(self) -> sqlite3.Connection:
+        """当前线程的只读连接，聚合库文件被替换后重新打开"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            if conn is not None:
+                conn.close()
+            conn = self._local.conn = self._connect()
+            self._local.generation = self._generation
+        return conn
+
+    def execute(self, route: CubeRoute) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.get_connection().execute(route.sql, route.params).fetchall()]
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    def answer(self, sql: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        尝试用聚合库回答查询
+
+        Returns:
+            查询结果，无法路由或聚合库执行失败时返回None(调用方回退到原表)
+        """
+        if not self.is_fresh():
+            self._count("stale")
+            return None
+        route = self.route(sql)
+        if route is None:
+            self._count("fallback")
+            return None
+        try:
+            result = self.execute(route)
+        except sqlite3.Error as e:
+            log.warning(f"[AGGREGATE_CUBE] 聚合库查询失败，回退到原表: {e}: {route.sql}")
+            self._count("fallback")
+            return None
+        self._count("routed")
+        annotate_span(cube_route=route.name)
+        log.info(f"[AGGREGATE_CUBE] {route.name} 命中聚合库")
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+_cube_router: Optional[CubeRouter] = None
+_cube_router_loaded = False
+_cube_router_lock = threading.Lock()
+
+
+def get_cube_router() -> Optional[CubeRouter]:
+    """
+    获取进程级共享的聚合库路由器
+
+    配置项:
+        database.aggregate_cube.enabled: 是否启用
+        database.aggregate_cube.path: 聚合库路径(scripts/build_aggregate_cube.py的输出)
+        database.aggregate_cube.check_interval: 检查源数据库是否更新的间隔(秒)
+        database.sqlite.path: 源数据库，仅database.engine为sqlite时路由
+
+    Returns:
+        CubeRouter实例，未启用或聚合库不存在时返回None
+    """
+    global _cube_router, _cube_router_loaded
+    if _cube_router_loaded:
+        return _cube_router
+    with _cube_router_lock:
+        if not _cube_router_loaded:
+            config = ConfigManager()
+            if (config.get_boolean("database.aggregate_cube.enabled", True)
+                    and config.get("database.engine", "sqlite") == "sqlite"):
+                cube_path = Path(config.get("database.aggregate_cube.path", "data/aggregate_cube.db"))
+                source_path = Path(config.get("database.sqlite.path",
+                                              "bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db"))
+                cube_path = cube_path if cube_path.is_absolute() else project_root / cube_path
+                source_path = source_path if source_path.is_absolute() else project_root / source_path
+                if cube_path.exists():
+                    _cube_router = CubeRouter(
+                        str(cube_path), str(source_path),
+                        check_interval=float(config.get("database.aggregate_cube.check_interval", 30))
+                    )
+                    log.info(f"[AGGREGATE_CUBE] 启用聚合库路由: {cube_path}")
+                else:
+                    log.info(f"[AGGREGATE_CUBE] 聚合库不存在: {cube_path}")
+            _cube_router_loaded = True
+    return _cube_router
@@ -0,0 +1,315 @@
+"""
+Bulk Loader
+
+把比赛SQLite数据库批量导入MySQL(或任意SQLAlchemy支持的库，测试时可用SQLite文件作为目标):
+1. 每张表先统计各列实际存储类型和最大长度，映射为目标库的BIGINT/DOUBLE/VARCHAR/TEXT/BLOB，
+   混合类型的列统一转换(例如数字和文本混存的列按文本导入)
+2. 建表时只保留主键，按batch_size流式读取源表，每批一次executemany插入并提交
+   (PyMySQL把executemany的INSERT改写为多行VALUES)，MySQL连接导入期间关闭unique_checks/foreign_key_checks
+3. 数据导入完成后再创建二级索引，MySQL中TEXT列的索引使用前缀长度
+4. 多张表由线程池并行导入，每张表报告行数、耗时和rows/sec
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+from sqlalchemy import (BigInteger, Column, Float, Index, LargeBinary, MetaData, String, Table, Text,
+                        inspect, text)
+from sqlalchemy.engine import Engine
+
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# MySQL utf8mb4下可完整建索引的VARCHAR最大长度(3072字节 / 4)
+MAX_VARCHAR = 768
+MIN_VARCHAR = 16
+# TEXT列建索引时的前缀长度
+TEXT_INDEX_PREFIX = 255
+# 每导入多少批输出一次进度
+PROGRESS_BATCHES = 100
+
+
+@dataclass
+class ColumnPlan:
+    """源表一列在目标库中的类型"""
+    name: str
+    kind: str  # integer / real / text / blob
+    max_length: int = 0
+    primary_key: bool = False
+    mixed: bool = False  # 存在其他存储类型的值，导入时需要转换
+
+    def sqlalchemy_type(self):
+        if self.kind == "integer":
+            return BigInteger()
+        if self.kind == "real":
+            return Float(precision=53)
+        if self.kind == "blob":
+            return LargeBinary()
+        if self.primary_key or self.max_length <= MAX_VARCHAR:
+            # 按2的幂取整后不超过MAX_VARCHAR，保证主键和索引列可以完整建索引
+            length = min(MAX_VARCHAR, 2 ** math.ceil(math.log2(max(self.max_length, 1))))
+            return String(max(MIN_VARCHAR, length, self.max_length))
+        return Text()
+
+    def converter(self) -> Optional[Callable[[Any], Any]]:
+        if not self.mixed:
+            return None
+        if self.kind == "text":
+            return lambda value: value if value is None or isinstance(value, str) else str(value)
+        if self.kind == "blob":
+            return lambda value: value.encode("utf-8") if isinstance(value, str) else value
+        return None
+
+
+@dataclass
+class TablePlan:
+    """源表的导入计划"""
+    name: str
+    columns: List[ColumnPlan]
+    indexes: List[Dict[str, Any]] = field(default_factory=list)
+    rows: int = 0
+
+
+@dataclass
+class TableReport:
+    """单表导入结果"""
+    table: str
+    rows: int = 0
+    load_seconds: float = 0.0
+    index_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.load_seconds if self.load_seconds > 0 else 0.0
+
+
+def _declared_kind(declared: str) -> str:
+    """SQLite的类型亲和性规则"""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "integer"
+    if any(word in declared for word in ("CHAR", "CLOB", "TEXT")):
+        return "text"
+    if "BLOB" in declared:
+        return "blob"
+    if any(word in declared for word in ("REAL", "FLOA", "DOUB")):
+        return "real"
+    return "text"
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect_source(path: str) -> sqlite3.Connection:
+    """以只读方式打开源SQLite数据库"""
+    return sqlite3.connect(f"file:{quote(str(path))}?mode=ro", uri=True, check_same_thread=False)
+
+
+def list_tables(conn: sqlite3.Connection) -> List[str]:
+    """源库中的用户表"""
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+                        "ORDER BY name").fetchall()
+    return [row[0] for row in rows]
+
+
+def plan_table(conn: sqlite3.Connection, table: str) -> TablePlan:
+    """
+    扫描一遍源表，按实际存储类型和最大长度确定目标列类型
+
+    Args:
+        conn: 源库连接
+        table: 表名
+
+    Returns:
+        TablePlan
+    """
+    info = conn.execute("SELECT name, type, pk FROM pragma_table_info(?) ORDER BY cid", (table,)).fetchall()
+    stats = []
+    for name, _, _ in info:
+        column = _quote_ident(name)
+        stats.append(f"SUM(typeof({column}) = 'integer'), SUM(typeof({column}) = 'real'), "
+                     f"SUM(typeof({column}) = 'text'), SUM(typeof({column}) = 'blob'), "
+                     f"MAX(CASE WHEN typeof({column}) IN ('text', 'blob') THEN length({column}) END)")
+    row = conn.execute(f"SELECT COUNT(*), {', '.join(stats)} FROM {_quote_ident(table)}").fetchone()
+
+    columns = []
+    for index, (name, declared, pk) in enumerate(info):
+        integers, reals, texts, blobs, max_length = (value or 0 for value in row[1 + index * 5: 6 + index * 5])
+        if blobs:
+            kind = "blob"
+        elif texts:
+            kind = "text"
+        elif reals:
+            kind = "real"
+        elif integers:
+            kind = "integer"
+        else:
+            kind = _declared_kind(declared)
+        present = [count for count in (integers, reals, texts, blobs) if count]
+        # 整数写入DOUBLE列不需要转换
+        mixed = len(present) > 1 and kind in ("text", "blob")
+        if kind == "text" and mixed:
+            # 数字转为文本后的长度
+            max_length = max(max_length, 24)
+        columns.append(ColumnPlan(name, kind, max_length, primary_key=bool(pk), mixed=mixed))
+
+    indexes = []
+    for index_name, unique, origin in conn.execute(
+        "SELECT name, \"unique\", origin FROM pragma_index_list(?) ORDER BY name", (table,)
+    ).fetchall():
+        if origin == "pk":
+            continue
+        index_columns = [item[0] for item in conn.execute(
+            "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (index_name,)).fetchall()]
+        # 表达式索引没有列名，无法迁移
+        if not index_columns or None in index_columns:
+            log.warning(f"[BULK_LOAD] 跳过表达式索引: {table}.{index_name}")
+            continue
+        if origin != "c":
+            index_name = f"uq_{table}_{len(indexes) + 1}"
+        indexes.append({"name": index_name, "unique": bool(unique), "columns": index_columns})
+    return TablePlan(table, columns, indexes, rows=row[0])
+
+
+class BulkLoader:
+    """
+    SQLite到目标库的批量导入
+
+    Attributes:
+        source_path: 源SQLite数据库路径
+        engine: 目标库的SQLAlchemy引擎(MySQLClient.engine或create_engine创建的任意引擎)
+        batch_size: 每批插入的行数
+        workers: 并行导入的表数
+        replace: 目标表已存在时是否删除重建，否则该表报错
+    """
+
+    def __init__(self, source_path: str, engine: Engine, batch_size: int = 5000, workers: int = 4,
+                 replace: bool = False):
+        self.source_path = source_path
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.replace = replace
+        # 检查表是否存在、删表和建表串行执行
+        self._ddl_lock = threading.Lock()
+
+    def _build_table(self, plan: TablePlan, metadata: MetaData) -> Table:
+        columns = [
+            Column(column.name, column.sqlalchemy_type(), key=f"c{index}", primary_key=column.primary_key,
+                   autoincrement=False)
+            for index, column in enumerate(plan.columns)
+        ]
+        return Table(plan.name, metadata, *columns)
+
+    def _create_table(self, table: Table) -> None:
+        with self._ddl_lock, self.engine.begin() as conn:
+            if inspect(conn).has_table(table.name):
+                if not self.replace:
+                    raise ValueError(f"目标表已存在: {table.name}")
+                table.drop(conn)
+            table.create(conn)
+
+    def _create_indexes(self, plan: TablePlan, table: Table) -> None:
+        text_columns = {column.name for column in plan.columns if isinstance(column.sqlalchemy_type(), Text)}
+        # 列的key为c0、c1...，按列名查找
+        by_name = {column.name: column for column in table.columns}
+        with self.engine.begin() as conn:
+            for spec in plan.indexes:
+                prefix = {name: TEXT_INDEX_PREFIX for name in spec["columns"] if name in text_columns}
+                index = Index(spec["name"], *(by_name[name] for name in spec["columns"]),
+                              unique=spec["unique"], mysql_length=prefix or None)
+                index.create(conn)
+
+    def load_table(self, table_name: str) -> TableReport:
+        """
+        导入一张表: 建表(仅主键) -> 分批插入 -> 建二级索引
+
+        Args:
+            table_name: 源表名
+
+        Returns:
+            TableReport，失败时error为错误信息
+        """
+        report = TableReport(table_name)
+        source = connect_source(self.source_path)
+        try:
+            plan = plan_table(source, table_name)
+            table = self._build_table(plan, MetaData())
+            self._create_table(table)
+
+            keys = [f"c{index}" for index in range(len(plan.columns))]
+            converters = [(index, column.converter()) for index, column in enumerate(plan.columns)
+                          if column.converter() is not None]
+            names = ", ".join(_quote_ident(column.name) for column in plan.columns)
+            cursor = source.execute(f"SELECT {names} FROM {_quote_ident(table_name)}")
+
+            start = time.perf_counter()
+            batches = 0
+            with self.engine.connect() as conn:
+                mysql = conn.dialect.name == "mysql"
+                if mysql:
+                    conn.execute(text("SET SESSION unique_checks = 0, foreign_key_checks = 0"))
+                insert = table.insert()
+                try:
+                    while True:
+                        rows = cursor.fetchmany(self.batch_size)
+                        if not rows:
+                            break
+                        if converters:
+                            rows = [list(row) for row in rows]
+                            for row in rows:
+                                for index, convert in converters:
+                                    row[index] = convert(row[index])
+                        conn.execute(insert, [dict(zip(keys, row)) for row in rows])
+                        conn.commit()
+                        report.rows += len(rows)
+                        batches += 1
+                        if batches % PROGRESS_BATCHES == 0:
+                            elapsed = time.perf_counter() - start
+                            log.info(f"[BULK_LOAD] {table_name}: {report.rows}/{plan.rows} 行 "
+                                     f"({report.rows / elapsed:.0f} rows/s)")
+                finally:
+                    if mysql:
+                        conn.execute(text("SET SESSION unique_checks = 1, foreign_key_checks = 1"))
+                        conn.commit()
+            report.load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self._create_indexes(plan, table)
+            report.index_seconds = time.perf_counter() - start
+            log.info(f"[BULK_LOAD] {table_name}: {report.rows} 行，导入 {report.load_seconds:.1f}s "
+                     f"({report.rows_per_sec:.0f} rows/s)，建索引 {report.index_seconds:.1f}s")
+        except Exception as e:
+            report.error = str(e)
+            log.error(f"[BULK_LOAD] {table_name} 导入失败: {e}")
+        finally:
+            source.close()
+        return report
+
+    def load(self, tables: Optional[Sequence[str]] = None) -> List[TableReport]:
+        """
+        并行导入多张表
+
+        Args:
+            tables: 要导入的表名，默认源库中的全部用户表
+
+        Returns:
+            与tables顺序一致的导入结果
+        """
+        if tables is None:
+            source = connect_source(self.source_path)
+            try:
+                tables = list_tables(source)
+            finally:
+                source.close()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-load") as executor:
+            return list(executor.map(self.load_table, tables))
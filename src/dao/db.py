@@ -1,5 +1,5 @@
 import pymysql
-from typing import List, Dict, Any, Optional, Type, TypeVar
+from typing import List, Dict, Any, Iterator, Optional, Type, TypeVar
 from contextlib import contextmanager
 import threading
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, Float, MetaData, text
@@ -9,6 +9,9 @@ from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 from src.config import ConfigManager
+from src.dao.result_cache import create_result_cache
+from src.dao.schema_catalog import changes_schema, create_schema_catalog
+from src.dao.streaming import FetchLimits, QueryResult, RowBatch, collect_rows
 from src.utils.logger import get_logger
 
 log = get_logger()
@@ -40,6 +43,9 @@ class MySQLClient:
             self.engine = None
             self.Session = None
             self._init_connection()
+            self.result_cache = create_result_cache("mysql")
+            self.fetch_limits = FetchLimits.from_config()
+            self.schema_catalog = create_schema_catalog("mysql", self.load_schema, self.schema_fingerprint)
             self._initialized = True
     
     def _init_connection(self):
@@ -86,7 +92,19 @@ class MySQLClient:
         except Exception as e:
             log.error(f"初始化数据库连接失败: {e}")
             raise
+
+    def _invalidate_tables(self, *tables: str):
+        """ORM写入后失效读取了这些表的缓存结果"""
+        if self.result_cache is not None:
+            self.result_cache.invalidate_tables(tables)
     
+    def _after_write(self, sql: str):
+        """写语句执行后失效缓存的查询结果，DDL还会使表结构目录失效"""
+        if self.result_cache is not None:
+            self.result_cache.invalidate_sql(sql)
+        if self.schema_catalog is not None and changes_schema(sql):
+            self.schema_catalog.invalidate()
+
     @contextmanager
     def get_session(self) -> Session:
         """获取数据库会话的上下文管理器"""
@@ -108,6 +126,10 @@ class MySQLClient:
         """创建所有表"""
         try:
             Base.metadata.create_all(self.engine)
+            if self.result_cache is not None:
+                self.result_cache.clear()
+            if self.schema_catalog is not None:
+                self.schema_catalog.invalidate()
             log.info("数据库表创建成功")
         except Exception as e:
             log.error(f"创建表失败: {e}")
@@ -117,6 +139,10 @@ class MySQLClient:
         """删除所有表"""
         try:
             Base.metadata.drop_all(self.engine)
+            if self.result_cache is not None:
+                self.result_cache.clear()
+            if self.schema_catalog is not None:
+                self.schema_catalog.invalidate()
             log.info("数据库表删除成功")
         except Exception as e:
             log.error(f"删除表失败: {e}")
@@ -137,7 +163,8 @@ class MySQLClient:
                 session.add(obj)
                 session.flush()
                 session.refresh(obj)
-                return obj
+            self._invalidate_tables(obj.__tablename__)
+            return obj
         except Exception as e:
             log.error(f"添加对象失败: {e}")
             raise
@@ -158,7 +185,8 @@ class MySQLClient:
                 session.flush()
                 for obj in objects:
                     session.refresh(obj)
-                return objects
+            self._invalidate_tables(*{obj.__tablename__ for obj in objects})
+            return objects
         except Exception as e:
             log.error(f"批量添加对象失败: {e}")
             raise
@@ -217,7 +245,8 @@ class MySQLClient:
                 session.merge(obj)
                 session.flush()
                 session.refresh(obj)
-                return obj
+            self._invalidate_tables(obj.__tablename__)
+            return obj
         except Exception as e:
             log.error(f"更新对象失败: {e}")
             raise
@@ -235,7 +264,8 @@ class MySQLClient:
         try:
             with self.get_session() as session:
                 session.delete(obj)
-                return True
+            self._invalidate_tables(obj.__tablename__)
+            return True
         except Exception as e:
             log.error(f"删除对象失败: {e}")
             raise
@@ -254,10 +284,11 @@ class MySQLClient:
         try:
             with self.get_session() as session:
                 obj = session.query(model_class).filter_by(id=id_value).first()
-                if obj:
-                    session.delete(obj)
-                    return True
-                return False
+                if not obj:
+                    return False
+                session.delete(obj)
+            self._invalidate_tables(model_class.__tablename__)
+            return True
         except Exception as e:
             log.error(f"根据ID删除对象失败: {e}")
             raise
@@ -281,21 +312,55 @@ class MySQLClient:
     
     def execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        直接执行SQL查询
+        直接执行SQL查询，结果超过database.fetch.max_rows/max_bytes时截断
         
         Args:
             sql: SQL查询语句
             params: 查询参数
             
         Returns:
-            查询结果列表
+            查询结果列表(QueryResult)，被截断时truncated为True
+        """
+        if self.result_cache is None:
+            rows = self._execute_sql(sql, params)
+        else:
+            rows = self.result_cache.execute(sql, params, lambda: self._execute_sql(sql, params))
+        if self.schema_catalog is not None and changes_schema(sql):
+            self.schema_catalog.invalidate()
+        return rows
+
+    def _execute_sql(self, sql: str, params: Optional[Dict[str, Any]] = None) -> QueryResult:
+        return collect_rows(self.iter_batches(sql, params), self.fetch_limits)
+
+    def iter_batches(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[RowBatch]:
         """
+        使用服务端游标按批读取查询结果，不经过结果缓存，也不受行数/字节数上限约束
+        
+        Args:
+            sql: SQL查询语句
+            params: 查询参数
+            batch_size: 每批行数，默认使用database.fetch.batch_size
+            
+        Yields:
+            RowBatch
+        """
+        batch_size = batch_size or self.fetch_limits.batch_size
         try:
             with self.get_session() as session:
-                result = session.execute(text(sql), params or {})
-                if result.returns_rows:
-                    return [dict(row._mapping) for row in result]
-                return []
+                result = session.execute(
+                    text(sql), params or {},
+                    execution_options={"stream_results": True, "yield_per": batch_size}
+                )
+                if not result.returns_rows:
+                    return
+                columns = list(result.keys())
+                for partition in result.partitions(batch_size):
+                    yield RowBatch(columns, [tuple(row) for row in partition])
         except Exception as e:
             log.error(f"SQL查询执行失败: {e}")
             raise
@@ -315,7 +380,9 @@ class MySQLClient:
             with self.get_session() as session:
                 result = session.execute(text(sql), params or {})
                 session.commit()
-                return result.rowcount
+                rowcount = result.rowcount
+            self._after_write(sql)
+            return rowcount
         except Exception as e:
             log.error(f"SQL更新执行失败: {e}")
             raise
@@ -335,7 +402,9 @@ class MySQLClient:
             with self.get_session() as session:
                 result = session.execute(text(sql), params_list)
                 session.commit()
-                return result.rowcount
+                rowcount = result.rowcount
+            self._after_write(sql)
+            return rowcount
         except Exception as e:
             log.error(f"批量SQL执行失败: {e}")
             raise
@@ -362,11 +431,128 @@ class MySQLClient:
             log.info("数据库连接已关闭")
 
 
+    def _iter_dicts(self, sql: str):
+        for batch in self.iter_batches(sql):
+            yield from batch.to_dicts()
+
+    def schema_fingerprint(self) -> str:
+        """当前库的列和索引定义的校验和，表结构变化后改变"""
+        row, = self._iter_dicts(
+            "SELECT DATABASE() AS db, "
+            "(SELECT CONCAT(COUNT(*), ':', COALESCE(SUM(CRC32(CONCAT_WS(',', TABLE_NAME, COLUMN_NAME, "
+            "ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, COLUMN_COMMENT))), 0)) "
+            "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()) AS columns_checksum, "
+            "(SELECT CONCAT(COUNT(*), ':', COALESCE(SUM(CRC32(CONCAT_WS(',', TABLE_NAME, INDEX_NAME, "
+            "NON_UNIQUE, SEQ_IN_INDEX, COLUMN_NAME))), 0)) "
+            "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()) AS indexes_checksum"
+        )
+        return f"{row['db']}/{row['columns_checksum']}/{row['indexes_checksum']}"
+
+    def load_schema(self) -> Dict[str, Dict[str, Any]]:
+        """
+        从information_schema批量读取当前库所有表的列和索引，供表结构目录使用
+
+        三条查询取代逐表的SHOW CREATE TABLE，create_sql由列和索引定义重建
+        """
+        tables: Dict[str, Dict[str, Any]] = {}
+        for row in self._iter_dicts(
+            "SELECT TABLE_NAME AS table_name, ENGINE AS engine, TABLE_COMMENT AS table_comment "
+            "FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'"
+        ):
+            tables[row["table_name"]] = {"engine": row["engine"], "comment": row["table_comment"],
+                                         "columns": [], "indexes": []}
+        for row in self._iter_dicts(
+            "SELECT TABLE_NAME AS table_name, COLUMN_NAME AS name, COLUMN_TYPE AS type, "
+            "IS_NULLABLE AS nullable, COLUMN_DEFAULT AS default_value, COLUMN_KEY AS column_key, "
+            "EXTRA AS extra, COLUMN_COMMENT AS comment FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        ):
+            if row["table_name"] in tables:
+                tables[row["table_name"]]["columns"].append({
+                    "name": row["name"], "type": row["type"], "nullable": row["nullable"] == "YES",
+                    "default": row["default_value"], "primary_key": row["column_key"] == "PRI",
+                    "extra": row["extra"], "comment": row["comment"]
+                })
+        for row in self._iter_dicts(
+            "SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, NON_UNIQUE AS non_unique, "
+            "COLUMN_NAME AS column_name FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+        ):
+            if row["table_name"] not in tables:
+                continue
+            indexes = tables[row["table_name"]]["indexes"]
+            if not indexes or indexes[-1]["name"] != row["index_name"]:
+                indexes.append({"name": row["index_name"], "unique": not int(row["non_unique"]), "columns": []})
+            indexes[-1]["columns"].append(row["column_name"])
+        for name, table in tables.items():
+            table["create_sql"] = _render_create_table(name, table)
+        return tables
+
     def get_tables(self) -> List[str]:
         """获取所有表名"""
-        return self.execute_sql("SHOW TABLES")
+        if self.schema_catalog is not None:
+            return self.schema_catalog.get_tables()
+        return [next(iter(row.values())) for row in self.execute_sql("SHOW TABLES")]
     
     def get_table_info(self, table_name: str) -> List[Dict[str, Any]]:
         """获取表结构信息"""
+        if self.schema_catalog is not None:
+            info = self.schema_catalog.get_table_info(table_name)
+            if info:
+                return info
         return self.execute_sql(f"SHOW CREATE TABLE {table_name}")
-    
\ No newline at end of file
+
+
+def _quote_literal(value: Any) -> str:
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def _render_create_table(name: str, table: Dict[str, Any]) -> str:
+    """由information_schema的列和索引定义重建与SHOW CREATE TABLE相近的建表语句"""
+    lines = []
+    for column in table["columns"]:
+        line = f"  `{column['name']}` {column['type']}"
+        if not column["nullable"]:
+            line += " NOT NULL"
+        default = column["default"]
+        if default is not None:
+            # CURRENT_TIMESTAMP等表达式默认值不加引号
+            is_expression = str(default).upper().startswith("CURRENT_TIMESTAMP")
+            line += f" DEFAULT {default if is_expression else _quote_literal(default)}"
+        if column.get("extra"):
+            line += f" {column['extra']}"
+        if column.get("comment"):
+            line += f" COMMENT {_quote_literal(column['comment'])}"
+        lines.append(line)
+    for index in table["indexes"]:
+        columns = ",".join(f"`{column}`" for column in index["columns"])
+        if index["name"] == "PRIMARY":
+            lines.append(f"  PRIMARY KEY ({columns})")
+        else:
+            kind = "UNIQUE KEY" if index["unique"] else "KEY"
+            lines.append(f"  {kind} `{index['name']}` ({columns})")
+    sql = f"CREATE TABLE `{name}` (\n" + ",\n".join(lines) + "\n)"
+    if table.get("engine"):
+        sql += f" ENGINE={table['engine']}"
+    if table.get("comment"):
+        sql += f" COMMENT={_quote_literal(table['comment'])}"
+    return sql
+
+
+def get_db_client():
+    """
+    按配置获取QueryDB使用的数据库客户端
+
+    配置项:
+        database.engine: 'sqlite'使用本地只读SQLite文件，'mysql'使用MySQL服务
+
+    Returns:
+        SQLiteClient或MySQLClient实例
+    """
+    engine = ConfigManager().get('database.engine', 'sqlite')
+    if engine == 'sqlite':
+        from src.dao.sqlite_client import SQLiteClient
+        return SQLiteClient()
+    if engine == 'mysql':
+        return MySQLClient()
+    raise ValueError(f"不支持的数据库引擎: {engine}")
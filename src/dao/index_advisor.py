@@ -0,0 +1,376 @@
+"""
+SQLite Index Advisor
+
+为博金杯比赛数据库自动推荐并构建索引:
+1. 从日志(query_db输出的SQL)、工具缓存或SQL文件收集Agent执行过的查询，按去掉字面量后的模板归并
+2. 对每个模板执行EXPLAIN QUERY PLAN，找出全表扫描的表，
+   按"等值条件列 -> 一个范围条件列 -> 查询引用的其余列(覆盖索引)"的顺序生成候选索引
+3. 在数据库的可写副本上创建索引并ANALYZE，原库保持只读不变
+4. 分别在原库和副本上执行每个模板的样例SQL，报告前后的查询计划和延迟
+"""
+
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from src.planner.tool_cache import ToolResultCache, normalize_tool_input
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# 日志行首: "2024-01-01 12:00:00 [INFO] [name:10] - message"
+LOG_LINE_START = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ")
+QUERY_DB_LOG = re.compile(r"\] - \[DEBUG\] query_db: (.*)$", re.DOTALL)
+SELECT_START = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\]\"`])-?\d+(?:\.\d+)?(?![\w\[\"`])")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_TABLE_REFERENCE = re.compile(
+    r"\b(?:FROM|JOIN)\s+[\"`\[]?([^\s\"`\[\](),;]+)[\"`\]]?(?:\s+(?:AS\s+)?(?!WHERE|JOIN|ON|LEFT|INNER|GROUP|ORDER|LIMIT)([^\s\"`\[\](),;]+))?",
+    re.IGNORECASE
+)
+_PLAN_SCAN = re.compile(r"^SCAN (?:TABLE )?(\S+)(.*)$")
+
+EQUALITY_OPERATORS = re.compile(r"^\s*(?:==?|IN\b|IS\b)", re.IGNORECASE)
+RANGE_OPERATORS = re.compile(r"^\s*(?:>=|<=|>(?!=)|<(?![>=])|BETWEEN\b)", re.IGNORECASE)
+
+
+def sql_template(sql: str) -> str:
+    """去掉字符串/数字字面量并压缩空白，得到查询模板"""
+    text = _STRING_LITERAL.sub("?", normalize_tool_input(sql))
+    text = _NUMBER_LITERAL.sub("?", text)
+    return _IN_LIST.sub("(?)", text)
+
+
+def extract_sql_from_logs(paths: Iterable[str]) -> List[str]:
+    """
+    从日志文件中提取query_db执行的SQL，支持跨多行的SQL
+
+    Args:
+        paths: 日志文件路径
+
+    Returns:
+        SQL列表(按出现顺序)
+    """
+    statements = []
+    for path in paths:
+        message = None
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if LOG_LINE_START.match(line):
+                    if message is not None:
+                        statements.append(message)
+                    match = QUERY_DB_LOG.search(line.rstrip("\n"))
+                    message = match.group(1) if match and SELECT_START.match(match.group(1)) else None
+                elif message is not None:
+                    message += "\n" + line.rstrip("\n")
+        if message is not None:
+            statements.append(message)
+    return statements
+
+
+def extract_sql_from_tool_cache(cache: ToolResultCache, tool_name: str = "QueryDB") -> List[str]:
+    """从进程内工具缓存中取出QueryDB执行过的SQL"""
+    return [sql for sql in cache.inputs(tool_name) if SELECT_START.match(sql)]
+
+
+def load_sql_file(path: str) -> List[str]:
+    """读取SQL文件: JSON列表、带"sql"键的JSON(如基准语料)，或每行一条SQL的文本"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [line.strip() for line in text.splitlines() if SELECT_START.match(line)]
+    if isinstance(data, dict):
+        data = data.get("sql", [])
+    return [sql for sql in data if isinstance(sql, str)]
+
+
+@dataclass
+class QueryTemplate:
+    """同一模板的查询"""
+    template: str
+    sample_sql: str
+    count: int = 0
+
+
+def group_templates(statements: Iterable[str]) -> List[QueryTemplate]:
+    """按模板归并SQL，按出现次数降序"""
+    templates: Dict[str, QueryTemplate] = {}
+    for sql in statements:
+        key = sql_template(sql)
+        if key not in templates:
+            templates[key] = QueryTemplate(key, normalize_tool_input(sql))
+        templates[key].count += 1
+    return sorted(templates.values(), key=lambda item: -item.count)
+
+
+@dataclass
+class IndexCandidate:
+    """候选索引"""
+    table: str
+    columns: Tuple[str, ...]
+    templates: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        digest = hashlib.sha1(f"{self.table}\0{'|'.join(self.columns)}".encode("utf-8")).hexdigest()[:10]
+        return f"idx_auto_{digest}"
+
+    @property
+    def create_sql(self) -> str:
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({columns})'
+
+
+def _column_pattern(column: str) -> re.Pattern:
+    escaped = re.escape(column)
+    return re.compile(rf"(?:(?<=[\s.,(=<>!])|^)(?:\"{escaped}\"|`{escaped}`|\[{escaped}\]|{escaped}(?![\w(]))")
+
+
+class IndexAdvisor:
+    """索引推荐和构建"""
+
+    def __init__(self, db_path: str, max_index_columns: int = 6, repeat: int = 3, query_timeout: float = 60.0):
+        self.db_path = Path(db_path)
+        self.max_index_columns = max_index_columns
+        self.repeat = max(1, repeat)
+        self.query_timeout = query_timeout
+        self._schema: Optional[Dict[str, List[str]]] = None
+
+    @staticmethod
+    def connect(path: Path, readonly: bool = True) -> sqlite3.Connection:
+        if readonly:
+            return sqlite3.connect(f"file:{quote(str(path))}?mode=ro", uri=True)
+        return sqlite3.connect(str(path))
+
+    def schema(self) -> Dict[str, List[str]]:
+        """表名到列名列表的映射"""
+        if self._schema is None:
+            conn = self.connect(self.db_path)
+            try:
+                tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+                self._schema = {
+                    table: [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')] for table in tables
+                }
+            finally:
+                conn.close()
+        return self._schema
+
+    @staticmethod
+    def query_plan(conn: sqlite3.Connection, sql: str) -> List[str]:
+        """EXPLAIN QUERY PLAN的明细行"""
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+    def _table_aliases(self, sql: str) -> Dict[str, str]:
+        """FROM/JOIN中的表名和别名到表名的映射"""
+        schema = self.schema()
+        aliases = {}
+        for table, alias in _TABLE_REFERENCE.findall(sql):
+            if table in schema:
+                aliases[table] = table
+                if alias:
+                    aliases[alias] = table
+        return aliases
+
+    def scanned_tables(self, sql: str, plan: List[str]) -> List[str]:
+        """查询计划中被全表扫描的表"""
+        aliases = self._table_aliases(sql)
+        tables = []
+        for detail in plan:
+            match = _PLAN_SCAN.match(detail)
+            if not match or "INDEX" in match.group(2):
+                continue
+            table = aliases.get(match.group(1), match.group(1))
+            if table in self.schema() and table not in tables:
+                tables.append(table)
+        return tables
+
+    def candidate_columns(self, table: str, sql: str) -> Tuple[str, ...]:
+        """
+        为表生成索引列: 等值条件列在前，其次一个范围条件列，
+        列数不超过上限时再加入查询引用的其余列，使索引覆盖查询
+
+        Args:
+            table: 表名
+            sql: 查询SQL
+
+        Returns:
+            索引列，没有可用的条件列时为空
+        """
+        equality, ranges, referenced = [], [], []
+        for column in self.schema()[table]:
+            operators = [sql[match.end():match.end() + 12] for match in _column_pattern(column).finditer(sql)]
+            if not operators:
+                continue
+            referenced.append(column)
+            if any(EQUALITY_OPERATORS.match(op) for op in operators):
+                equality.append(column)
+            elif any(RANGE_OPERATORS.match(op) for op in operators):
+                ranges.append(column)
+        leading = equality + ranges[:1]
+        if not leading:
+            return ()
+        covering = leading + [column for column in referenced if column not in leading]
+        if len(covering) <= self.max_index_columns:
+            return tuple(covering)
+        return tuple(leading[:self.max_index_columns])
+
+    def recommend(self, templates: Sequence[QueryTemplate]) -> List[IndexCandidate]:
+        """
+        为全表扫描的查询推荐索引，同一张表上作为其他候选前缀的索引被合并
+
+        Args:
+            templates: 查询模板
+
+        Returns:
+            候选索引列表
+        """
+        candidates: Dict[Tuple[str, Tuple[str, ...]], IndexCandidate] = {}
+        conn = self.connect(self.db_path)
+        try:
+            for item in templates:
+                try:
+                    plan = self.query_plan(conn, item.sample_sql)
+                except sqlite3.Error as e:
+                    log.warning(f"[INDEX_ADVISOR] 无法解析查询计划: {e}: {item.sample_sql}")
+                    continue
+                for table in self.scanned_tables(item.sample_sql, plan):
+                    columns = self.candidate_columns(table, item.sample_sql)
+                    if not columns:
+                        continue
+                    key = (table, columns)
+                    if key not in candidates:
+                        candidates[key] = IndexCandidate(table, columns)
+                    candidates[key].templates.append(item.template)
+        finally:
+            conn.close()
+
+        result = []
+        for (table, columns), candidate in candidates.items():
+            wider = [other for (other_table, other_columns), other in candidates.items()
+                     if other_table == table and len(other_columns) > len(columns)
+                     and other_columns[:len(columns)] == columns]
+            if wider:
+                wider[0].templates.extend(candidate.templates)
+                continue
+            result.append(candidate)
+        return result
+
+    def build(self, target_path: str, candidates: Sequence[IndexCandidate], overwrite: bool = False) -> Path:
+        """
+        复制数据库并在副本上创建索引
+
+        Args:
+            target_path: 副本路径
+            candidates: 要创建的索引
+            overwrite: 副本已存在时是否覆盖
+
+        Returns:
+            副本路径
+        """
+        target = Path(target_path)
+        if target.resolve() == self.db_path.resolve():
+            raise ValueError("索引只能建在数据库副本上")
+        if target.exists() and not overwrite:
+            log.info(f"[INDEX_ADVISOR] 在已有副本上追加索引: {target}")
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            log.info(f"[INDEX_ADVISOR] 复制数据库 {self.db_path} -> {target}")
+            shutil.copyfile(self.db_path, target)
+
+        conn = self.connect(target, readonly=False)
+        try:
+            for candidate in candidates:
+                start = time.perf_counter()
+                conn.execute(candidate.create_sql)
+                log.info(f"[INDEX_ADVISOR] 创建索引 {candidate.name} ON {candidate.table}{candidate.columns} "
+                         f"({time.perf_counter() - start:.1f}s)")
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        return target
+
+    def time_query(self, conn: sqlite3.Connection, sql: str) -> Optional[float]:
+        """多次执行取中位数(毫秒)，超时或出错返回None"""
+        samples = []
+        for _ in range(self.repeat):
+            deadline = time.monotonic() + self.query_timeout
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+            start = time.perf_counter()
+            try:
+                conn.execute(sql).fetchall()
+            except sqlite3.Error as e:
+                log.warning(f"[INDEX_ADVISOR] 查询失败: {e}: {sql}")
+                return None
+            finally:
+                conn.set_progress_handler(None, 10000)
+            samples.append((time.perf_counter() - start) * 1000)
+        return round(statistics.median(samples), 3)
+
+    def compare(self, templates: Sequence[QueryTemplate], target_path: str) -> List[Dict[str, Any]]:
+        """在原库和带索引的副本上分别执行样例SQL，对比查询计划和延迟"""
+        before_conn = self.connect(self.db_path)
+        after_conn = self.connect(Path(target_path))
+        rows = []
+        try:
+            for item in templates:
+                try:
+                    plan_before = self.query_plan(before_conn, item.sample_sql)
+                    plan_after = self.query_plan(after_conn, item.sample_sql)
+                except sqlite3.Error:
+                    continue
+                before_ms = self.time_query(before_conn, item.sample_sql)
+                after_ms = self.time_query(after_conn, item.sample_sql)
+                rows.append({
+                    "template": item.template,
+                    "count": item.count,
+                    "sample_sql": item.sample_sql,
+                    "plan_before": plan_before,
+                    "plan_after": plan_after,
+                    "before_ms": before_ms,
+                    "after_ms": after_ms,
+                    "speedup": round(before_ms / after_ms, 2) if before_ms and after_ms else None
+                })
+        finally:
+            before_conn.close()
+            after_conn.close()
+        return rows
+
+    def run(self, statements: Iterable[str], target_path: str, overwrite: bool = False) -> Dict[str, Any]:
+        """
+        完整流程: 归并模板 -> 推荐索引 -> 在副本上建索引 -> 对比前后延迟
+
+        Args:
+            statements: 收集到的SQL
+            target_path: 带索引的数据库副本路径
+            overwrite: 副本已存在时是否重新复制
+
+        Returns:
+            报告: {"db_path", "target_path", "indexes", "queries"}
+        """
+        templates = group_templates(statements)
+        candidates = self.recommend(templates)
+        log.info(f"[INDEX_ADVISOR] {len(templates)} 个查询模板，推荐 {len(candidates)} 个索引")
+        target = self.build(target_path, candidates, overwrite=overwrite)
+        return {
+            "db_path": str(self.db_path),
+            "target_path": str(target),
+            "indexes": [
+                {"name": c.name, "table": c.table, "columns": list(c.columns), "sql": c.create_sql,
+                 "templates": len(c.templates)}
+                for c in candidates
+            ],
+            "queries": self.compare(templates, str(target))
+        }
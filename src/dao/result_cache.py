@@ -0,0 +1,602 @@
+"""
+SQL Result Cache
+
+execute_sql前的查询结果缓存，MySQLClient和SQLiteClient共用:
+1. SQL按词法规范化为缓存键: 压缩空白和注释、关键字大写、统一标识符引号、表别名按出现顺序重命名、
+   去掉可省略的AS、WHERE/ON/HAVING中顶层AND条件和IN列表按字典序排列
+2. 结果以列名 + 行元组的pickle存储，较大的结果用zlib压缩，按字节数和条目数LRU淘汰
+3. 写语句(execute_update/execute_many或execute_sql执行的INSERT/UPDATE/DELETE等)按表失效，
+   无法识别写入的表时清空；查询执行期间表被写入时结果不写入缓存
+4. 可选的数据版本函数(如SQLite文件的大小和mtime)变化后条目失效
+5. 按去掉字面量后的模板统计命中率
+"""
+
+import functools
+import json
+import pickle
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+_TOKEN = re.compile(
+    r"(?P<space>\s+|--[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<quoted>\[[^\]]*\]|`[^`]*`)"
+    r"|(?P<dquoted>\"(?:[^\"]|\"\")*\")"
+    r"|(?P<number>\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(?P<param>:\w+|%\(\w+\)s|\?)"
+    r"|(?P<word>\w+)"
+    r"|(?P<op><>|<=|>=|!=|==|\|\||\S)",
+    re.DOTALL
+)
+
+_IN_LIST_TEMPLATE = re.compile(r"\( \?(?: , \?)+ \)")
+
+KEYWORDS = frozenset("""
+    SELECT FROM WHERE AND OR NOT IN IS NULL LIKE GLOB REGEXP BETWEEN EXISTS GROUP BY ORDER HAVING LIMIT OFFSET AS ON
+    USING JOIN INNER LEFT RIGHT FULL OUTER CROSS NATURAL UNION ALL INTERSECT EXCEPT DISTINCT CASE WHEN THEN ELSE END
+    ASC DESC WITH RECURSIVE INSERT INTO VALUES UPDATE SET DELETE REPLACE CREATE TABLE DROP ALTER TRUNCATE INDEX VIEW
+    IF TRUE FALSE COLLATE ESCAPE SHOW DESCRIBE EXPLAIN PRAGMA
+""".split())
+
+READ_STATEMENTS = frozenset({"SELECT", "WITH"})
+WRITE_STATEMENTS = frozenset({"INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER", "TRUNCATE"})
+# 结果随时间或随机变化的函数，包含它们的查询不缓存
+VOLATILE_FUNCTIONS = frozenset({
+    "NOW", "RAND", "RANDOM", "UUID", "CURDATE", "CURTIME", "CURRENT_DATE", "CURRENT_TIME", "CURRENT_TIMESTAMP",
+    "SYSDATE", "UNIX_TIMESTAMP", "LAST_INSERT_ID", "ROW_COUNT", "FOUND_ROWS", "CHANGES", "RANDOMBLOB"
+})
+CLAUSE_END = frozenset({"GROUP", "ORDER", "HAVING", "LIMIT", "UNION", "INTERSECT", "EXCEPT", "WINDOW", "WHERE",
+                        "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL", "ON", "USING"})
+
+
+@dataclass(frozen=True)
+class CanonicalQuery:
+    """规范化后的SQL"""
+    kind: str  # read / write / other
+    canonical: str
+    template: str
+    tables: FrozenSet[str]
+    cacheable: bool
+
+    def key(self, params: Any = None) -> str:
+        if not params:
+            return self.canonical
+        return f"{self.canonical}\x00{json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)}"
+
+
+def _tokenize(sql: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "space":
+            continue
+        if kind == "word":
+            upper = text.upper()
+            if upper in KEYWORDS:
+                kind, text = "keyword", upper
+            else:
+                kind = "ident"
+        elif kind == "quoted":
+            kind, text = "ident", text[1:-1]
+        tokens.append((kind, text))
+    # 函数名不区分大小写
+    for index, (kind, text) in enumerate(tokens[:-1]):
+        if kind == "ident" and tokens[index + 1] == ("op", "("):
+            tokens[index] = ("function", text.upper())
+    while tokens and tokens[-1] == ("op", ";"):
+        tokens.pop()
+    return tokens
+
+
+def _table_name(tokens: List[Tuple[str, str]], index: int) -> Tuple[Optional[str], int]:
+    """index处的(可带库名的)表名，返回(小写表名, 表名之后的位置)"""
+    if index >= len(tokens) or tokens[index][0] not in ("ident", "dquoted", "function"):
+        return None, index
+    name = tokens[index][1]
+    while index + 2 < len(tokens) and tokens[index + 1] == ("op", ".") and tokens[index + 2][0] in ("ident", "dquoted"):
+        index += 2
+        name = tokens[index][1]
+    return name.strip('"').lower(), index + 1
+
+
+def _rename_aliases(tokens: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], FrozenSet[str]]:
+    """表别名按出现顺序重命名为#1、#2...，同时收集查询读取的表"""
+    aliases: Dict[str, str] = {}
+    tables = set()
+    alias_positions = []
+    depth = 0
+    from_depths = []
+    index = 0
+    expect_table = False
+    while index < len(tokens):
+        kind, text = tokens[index]
+        if text == "(" and kind == "op":
+            depth += 1
+        elif text == ")" and kind == "op":
+            depth -= 1
+            if from_depths and from_depths[-1] == depth:
+                # FROM (子查询) alias
+                from_depths.pop()
+                position = index + 1
+                if position < len(tokens) and tokens[position] == ("keyword", "AS"):
+                    position += 1
+                if position < len(tokens) and tokens[position][0] == "ident":
+                    alias_positions.append(position)
+                    aliases.setdefault(tokens[position][1], f"#{len(aliases) + 1}")
+        if kind == "keyword" and text in ("FROM", "JOIN", "INTO", "UPDATE"):
+            expect_table = True
+            index += 1
+            continue
+        if expect_table:
+            expect_table = False
+            if (kind, text) == ("op", "("):
+                from_depths.append(depth - 1)
+                index += 1
+                continue
+            name, position = _table_name(tokens, index)
+            if name is not None:
+                tables.add(name)
+                if position < len(tokens) and tokens[position] == ("keyword", "AS"):
+                    position += 1
+                if position < len(tokens) and tokens[position][0] == "ident":
+                    alias_positions.append(position)
+                    aliases.setdefault(tokens[position][1], f"#{len(aliases) + 1}")
+                    position += 1
+                if position < len(tokens) and tokens[position] == ("op", ","):
+                    expect_table = True
+                    position += 1
+                index = position
+                continue
+        index += 1
+
+    if not aliases:
+        return tokens, frozenset(tables)
+    renamed = list(tokens)
+    for position in alias_positions:
+        renamed[position] = ("alias", aliases[tokens[position][1]])
+    for index, (kind, text) in enumerate(tokens[:-1]):
+        if kind == "ident" and text in aliases and tokens[index + 1] == ("op", "."):
+            renamed[index] = ("alias", aliases[text])
+    return renamed, frozenset(tables)
+
+
+def _render(tokens: Iterable[Tuple[str, str]], template: bool = False) -> str:
+    parts = []
+    for kind, text in tokens:
+        if template and kind in ("string", "number"):
+            parts.append("?")
+        elif kind == "ident":
+            parts.append(text if re.fullmatch(r"\w+", text) else f"`{text}`")
+        else:
+            parts.append(text)
+    text = " ".join(parts)
+    return _IN_LIST_TEMPLATE.sub("( ? )", text) if template else text
+
+
+def _opens(token: Tuple[str, str]) -> bool:
+    """括号和CASE ... END都算作嵌套，其中的AND不能拆分"""
+    return token in (("op", "("), ("keyword", "CASE"))
+
+
+def _closes(token: Tuple[str, str]) -> bool:
+    return token in (("op", ")"), ("keyword", "END"))
+
+
+def _clause_spans(tokens: List[Tuple[str, str]]) -> List[Tuple[int, int]]:
+    """WHERE/ON/HAVING子句的(起点, 终点)，起点不含关键字本身"""
+    spans = []
+    depth_of = []
+    depth = 0
+    for token in tokens:
+        if _opens(token):
+            depth += 1
+        depth_of.append(depth)
+        if _closes(token):
+            depth -= 1
+    for start, (kind, text) in enumerate(tokens):
+        if kind != "keyword" or text not in ("WHERE", "ON", "HAVING"):
+            continue
+        end = start + 1
+        while end < len(tokens):
+            end_kind, end_text = tokens[end]
+            if depth_of[end] < depth_of[start] or (
+                    depth_of[end] == depth_of[start] and end_kind == "keyword" and end_text in CLAUSE_END):
+                break
+            if (end_kind, end_text) == ("op", ")") and depth_of[end] == depth_of[start]:
+                break
+            end += 1
+        spans.append((start + 1, end))
+    return spans
+
+
+def _sort_conjuncts(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    tokens = list(tokens)
+    for start, end in reversed(_clause_spans(tokens)):
+        conjuncts, current, depth, between = [], [], 0, False
+        for kind, text in tokens[start:end]:
+            if _opens((kind, text)):
+                depth += 1
+            elif _closes((kind, text)):
+                depth -= 1
+            if depth == 0 and kind == "keyword" and text == "OR":
+                break
+            if depth == 0 and kind == "keyword" and text == "BETWEEN":
+                between = True
+            elif depth == 0 and kind == "keyword" and text == "AND":
+                if between:
+                    between = False
+                else:
+                    conjuncts.append(current)
+                    current = []
+                    continue
+            current.append((kind, text))
+        else:
+            conjuncts.append(current)
+            normalized = []
+            for conjunct in conjuncts:
+                # 'x' = a.col 与 a.col = 'x' 等价
+                if (len(conjunct) >= 3 and conjunct[1] in (("op", "="), ("op", "=="))
+                        and conjunct[0][0] in ("string", "number")
+                        and all(kind in ("ident", "alias", "dquoted") or token == "." for kind, token in conjunct[2:])):
+                    conjunct = conjunct[2:] + [conjunct[1], conjunct[0]]
+                normalized.append(conjunct)
+            normalized.sort(key=_render)
+            merged = []
+            for index, conjunct in enumerate(normalized):
+                if index:
+                    merged.append(("keyword", "AND"))
+                merged.extend(conjunct)
+            tokens[start:end] = merged
+    return tokens
+
+
+def _sort_in_lists(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    result = []
+    index = 0
+    while index < len(tokens):
+        result.append(tokens[index])
+        if tokens[index] == ("keyword", "IN") and index + 1 < len(tokens) and tokens[index + 1] == ("op", "("):
+            close = index + 2
+            while close < len(tokens) and tokens[close] != ("op", ")"):
+                close += 1
+            items = tokens[index + 2:close]
+            values = items[0::2]
+            separators = items[1::2]
+            if (values and all(kind in ("string", "number") for kind, _ in values)
+                    and all(separator == ("op", ",") for separator in separators)):
+                ordered = sorted(set(values), key=lambda token: (token[0], token[1]))
+                result.append(("op", "("))
+                for position, value in enumerate(ordered):
+                    if position:
+                        result.append(("op", ","))
+                    result.append(value)
+                result.append(("op", ")"))
+                index = close + 1
+                continue
+        index += 1
+    return result
+
+
+def _written_tables(tokens: List[Tuple[str, str]]) -> FrozenSet[str]:
+    """写语句修改的表，无法识别时返回空集合"""
+    position = 1
+    while position < len(tokens) and tokens[position][1].upper() in (
+            "INTO", "FROM", "TABLE", "IF", "NOT", "EXISTS", "IGNORE", "LOW_PRIORITY", "TEMPORARY"):
+        position += 1
+    if tokens and tokens[0] in (("keyword", text) for text in WRITE_STATEMENTS):
+        name, _ = _table_name(tokens, position)
+        if name is not None:
+            return frozenset({name})
+    return frozenset()
+
+
+@functools.lru_cache(maxsize=4096)
+def canonicalize_sql(sql: str) -> CanonicalQuery:
+    """
+    规范化SQL
+
+    Args:
+        sql: SQL语句
+
+    Returns:
+        CanonicalQuery，只读且不含易变函数的查询cacheable为True
+    """
+    tokens = _tokenize(sql)
+    first = tokens[0][1] if tokens and tokens[0][0] == "keyword" else ""
+    if first in WRITE_STATEMENTS or first == "WITH" and any(
+            token in (("keyword", "INSERT"), ("keyword", "UPDATE"), ("keyword", "DELETE")) for token in tokens):
+        canonical = _render(tokens)
+        return CanonicalQuery("write", canonical, _render(tokens, template=True), _written_tables(tokens), False)
+    if first not in READ_STATEMENTS:
+        canonical = _render(tokens)
+        return CanonicalQuery("other", canonical, _render(tokens, template=True), frozenset(), False)
+
+    tokens, tables = _rename_aliases(tokens)
+    # 别名识别完成后去掉可省略的AS(CAST(x AS type)中的AS保留)
+    cast_depths = []
+    stripped = []
+    depth = 0
+    for index, (kind, text) in enumerate(tokens):
+        if (kind, text) == ("op", "("):
+            depth += 1
+            if index and tokens[index - 1] == ("function", "CAST"):
+                cast_depths.append(depth)
+        elif (kind, text) == ("op", ")"):
+            if cast_depths and cast_depths[-1] == depth:
+                cast_depths.pop()
+            depth -= 1
+        if (kind, text) == ("keyword", "AS") and not (cast_depths and cast_depths[-1] == depth):
+            continue
+        stripped.append((kind, text))
+    tokens = _sort_in_lists(_sort_conjuncts(stripped))
+    volatile = any(kind == "function" and text in VOLATILE_FUNCTIONS or kind == "ident" and text.upper() in VOLATILE_FUNCTIONS
+                   for kind, text in tokens)
+    return CanonicalQuery("read", _render(tokens), _render(tokens, template=True), tables, not volatile)
+
+
+def encode_rows(rows: List[Dict[str, Any]], compress_min_bytes: int = 4096) -> bytes:
+    """查询结果编码为列名 + 行元组的pickle，超过compress_min_bytes时zlib压缩"""
+    columns = list(rows[0]) if rows else []
+    payload = pickle.dumps((columns, [tuple(row[column] for column in columns) for row in rows]),
+                           protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) >= compress_min_bytes:
+        return b"z" + zlib.compress(payload, 1)
+    return b"p" + payload
+
+
+def decode_rows(blob: bytes) -> List[Dict[str, Any]]:
+    payload = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    columns, values = pickle.loads(payload)
+    return [dict(zip(columns, row)) for row in values]
+
+
+@dataclass
+class _Entry:
+    blob: bytes
+    tables: FrozenSet[str]
+    template: str
+    version: Any
+
+
+OTHER_TEMPLATES = "<other>"
+
+
+class ResultCache:
+    """按字节数和条目数LRU淘汰的SQL结果缓存"""
+
+    def __init__(
+        self,
+        name: str = "default",
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 4096,
+        max_entry_bytes: int = 4 * 1024 * 1024,
+        compress_min_bytes: int = 4096,
+        version_fn: Optional[Callable[[], Any]] = None,
+        max_templates: int = 1000
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.version_fn = version_fn
+        self.max_templates = max_templates
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_table: Dict[str, set] = {}
+        self._bytes = 0
+        self._table_versions: Dict[str, int] = {}
+        self._generation = 0
+        self._templates: Dict[str, Dict[str, int]] = {}
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "invalidations": 0, "oversized": 0}
+        self._lock = threading.Lock()
+
+    def _template_stats(self, template: str) -> Dict[str, int]:
+        stats = self._templates.get(template)
+        if stats is None:
+            if len(self._templates) >= self.max_templates:
+                template = OTHER_TEMPLATES
+            stats = self._templates.setdefault(template, {"hits": 0, "misses": 0})
+        return stats
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.blob)
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def _snapshot(self, tables: FrozenSet[str]) -> Tuple[int, Tuple[int, ...]]:
+        return self._generation, tuple(self._table_versions.get(table, 0) for table in sorted(tables))
+
+    def get(self, query: CanonicalQuery, params: Any = None) -> Optional[List[Dict[str, Any]]]:
+        """查找缓存，未命中返回None"""
+        key = query.key(params)
+        version = self.version_fn() if self.version_fn else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+                entry = None
+            template_stats = self._template_stats(query.template)
+            if entry is None:
+                self._stats["misses"] += 1
+                template_stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            template_stats["hits"] += 1
+            blob = entry.blob
+        return decode_rows(blob)
+
+    def put(self, query: CanonicalQuery, params: Any, rows: List[Dict[str, Any]], snapshot=None) -> bool:
+        """
+        写入缓存
+
+        Args:
+            query: 规范化后的查询
+            params: 查询参数
+            rows: 查询结果
+            snapshot: 执行查询前的表版本快照，执行期间表被写入时放弃写入
+
+        Returns:
+            是否写入
+        """
+        blob = encode_rows(rows, self.compress_min_bytes)
+        if len(blob) > self.max_entry_bytes:
+            with self._lock:
+                self._stats["oversized"] += 1
+            return False
+        key = query.key(params)
+        version = self.version_fn() if self.version_fn else None
+        with self._lock:
+            if snapshot is not None and snapshot != self._snapshot(query.tables):
+                return False
+            self._remove(key)
+            self._entries[key] = _Entry(blob, query.tables, query.template, version)
+            self._bytes += len(blob)
+            for table in query.tables:
+                self._by_table.setdefault(table, set()).add(key)
+            self._stats["writes"] += 1
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        return True
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """失效读取了这些表的条目，返回失效的条目数"""
+        removed = 0
+        with self._lock:
+            for table in {table.lower() for table in tables}:
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    removed += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def invalidate_sql(self, sql: str) -> None:
+        """写语句执行后调用: 按写入的表失效，无法识别写入的表时清空"""
+        query = canonicalize_sql(sql)
+        if query.kind == "read":
+            return
+        if query.tables:
+            self.invalidate_tables(query.tables)
+        else:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    def execute(self, sql: str, params: Any, run: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        经过缓存执行SQL: 可缓存的只读查询先查缓存，写语句执行后按表失效
+
+        Args:
+            sql: SQL语句
+            params: 查询参数
+            run: 实际执行查询的函数
+
+        Returns:
+            查询结果
+        """
+        query = canonicalize_sql(sql)
+        if query.kind != "read":
+            result = run()
+            if query.kind == "write":
+                self.invalidate_sql(sql)
+            return result
+        if not query.cacheable:
+            return run()
+        cached = self.get(query, params)
+        if cached is not None:
+            return cached
+        with self._lock:
+            snapshot = self._snapshot(query.tables)
+        rows = run()
+        # 截断的结果不缓存，缓存只保存行数据，命中时会丢失截断标记
+        if not getattr(rows, "truncated", False):
+            self.put(query, params, rows, snapshot)
+        return rows
+
+    def get_stats(self, top_templates: int = 20) -> Dict[str, Any]:
+        """缓存统计，templates按查找次数降序列出各模板的命中率"""
+        with self._lock:
+            stats = dict(self._stats)
+            templates = [
+                {"template": template, "hits": item["hits"], "misses": item["misses"],
+                 "hit_rate": item["hits"] / (item["hits"] + item["misses"]) if item["hits"] + item["misses"] else 0.0}
+                for template, item in self._templates.items()
+            ]
+            stats.update(entries=len(self._entries), bytes=self._bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        templates.sort(key=lambda item: (-(item["hits"] + item["misses"]), item["template"]))
+        stats["templates"] = templates[:top_templates]
+        return stats
+
+
+_result_caches: Dict[str, ResultCache] = {}
+_result_caches_lock = threading.Lock()
+
+
+def create_result_cache(name: str, version_fn: Optional[Callable[[], Any]] = None) -> Optional[ResultCache]:
+    """
+    按配置为数据库客户端创建结果缓存
+
+    配置项:
+        database.result_cache.enabled: 是否启用
+        database.result_cache.max_bytes: 缓存结果的总字节数上限
+        database.result_cache.max_entries: 条目数上限
+        database.result_cache.max_entry_bytes: 单条结果超过该字节数时不缓存
+        database.result_cache.compress_min_bytes: 超过该字节数的结果zlib压缩
+
+    Args:
+        name: 缓存名称(如sqlite、mysql)，用于统计
+        version_fn: 数据版本函数，返回值变化后已有条目失效
+
+    Returns:
+        ResultCache实例，未启用时返回None
+    """
+    config = ConfigManager()
+    if not config.get_boolean("database.result_cache.enabled", True):
+        return None
+    cache = ResultCache(
+        name=name,
+        max_bytes=config.get_int("database.result_cache.max_bytes", 64 * 1024 * 1024),
+        max_entries=config.get_int("database.result_cache.max_entries", 4096),
+        max_entry_bytes=config.get_int("database.result_cache.max_entry_bytes", 4 * 1024 * 1024),
+        compress_min_bytes=config.get_int("database.result_cache.compress_min_bytes", 4096),
+        version_fn=version_fn
+    )
+    with _result_caches_lock:
+        _result_caches[name] = cache
+    log.info(f"[RESULT_CACHE] {name} 启用SQL结果缓存")
+    return cache
+
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    """已创建的各结果缓存的统计"""
+    with _result_caches_lock:
+        caches = dict(_result_caches)
+    return {name: cache.get_stats() for name, cache in caches.items()}
@@ -0,0 +1,215 @@
+"""
+Schema Catalog
+
+数据库表结构目录，CheckDBInfo和客户端的get_tables/get_table_info由内存中的目录回答:
+1. 首次使用时通过客户端的load_schema()批量读取所有表/列/索引元数据(固定几条查询，不随表数增长)
+2. 目录序列化为JSON保存到磁盘，附带表结构指纹；下次启动时指纹一致则直接读取磁盘文件
+3. 运行期间不再访问数据库，表结构变更后调用refresh()或refresh_schema_catalogs()重新加载，
+   并通知add_schema_listener注册的回调(如清理CheckDBInfo的工具结果缓存)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# 磁盘文件格式版本，表结构字段变化时递增
+CATALOG_FORMAT = 1
+
+_SCHEMA_STATEMENT = re.compile(r"^\s*(CREATE|ALTER|DROP|RENAME)\b", re.IGNORECASE)
+
+
+def changes_schema(sql: str) -> bool:
+    """是否为可能改变表结构的DDL语句"""
+    return bool(_SCHEMA_STATEMENT.match(sql))
+
+
+class SchemaCatalog:
+    """
+    一个数据库的表结构目录
+
+    loader返回{表名: {"create_sql", "columns", "indexes"}}，其中columns为
+    [{"name", "type", "nullable", "default", "primary_key"}]，indexes为[{"name", "unique", "columns"}]。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Dict[str, Dict[str, Any]]],
+        fingerprint_fn: Callable[[], str],
+        path: Optional[Path] = None
+    ):
+        self.name = name
+        self.loader = loader
+        self.fingerprint_fn = fingerprint_fn
+        self.path = path
+        self._lock = threading.Lock()
+        self._tables: Optional[Dict[str, Dict[str, Any]]] = None
+        self._fingerprint: Optional[str] = None
+        self._stats = {"loads": 0, "disk_loads": 0, "lookups": 0}
+
+    def _read_disk(self, fingerprint: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"[SCHEMA] 读取表结构目录失败，重新加载: {e}")
+            return None
+        if data.get("format") != CATALOG_FORMAT or data.get("fingerprint") != fingerprint:
+            log.info(f"[SCHEMA] {self.name} 表结构指纹变化，重新加载")
+            return None
+        return data["tables"]
+
+    def _write_disk(self, fingerprint: str, tables: Dict[str, Dict[str, Any]]) -> None:
+        if self.path is None:
+            return
+        data = {"format": CATALOG_FORMAT, "fingerprint": fingerprint, "loaded_at": time.time(), "tables": tables}
+        temp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(temp, self.path)
+        except OSError as e:
+            log.warning(f"[SCHEMA] 写入表结构目录失败: {e}")
+
+    def _load(self, use_disk: bool) -> Dict[str, Dict[str, Any]]:
+        fingerprint = self.fingerprint_fn()
+        tables = self._read_disk(fingerprint) if use_disk else None
+        if tables is not None:
+            self._stats["disk_loads"] += 1
+            log.info(f"[SCHEMA] {self.name} 从磁盘加载 {len(tables)} 张表的结构")
+        else:
+            start = time.perf_counter()
+            tables = self.loader()
+            self._stats["loads"] += 1
+            log.info(f"[SCHEMA] {self.name} 从数据库加载 {len(tables)} 张表的结构 "
+                     f"({time.perf_counter() - start:.3f}s)")
+            self._write_disk(fingerprint, tables)
+        self._tables = tables
+        self._fingerprint = fingerprint
+        return tables
+
+    def _get(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._stats["lookups"] += 1
+            if self._tables is None:
+                return self._load(use_disk=True)
+            return self._tables
+
+    def refresh(self) -> None:
+        """忽略磁盘文件，从数据库重新加载并覆盖磁盘文件"""
+        with self._lock:
+            self._load(use_disk=False)
+        _notify_schema_change(self.name)
+
+    def invalidate(self) -> None:
+        """丢弃内存中的目录，下次使用时按指纹重新加载"""
+        with self._lock:
+            self._tables = None
+            self._fingerprint = None
+        _notify_schema_change(self.name)
+
+    def get_tables(self) -> List[str]:
+        """所有表名"""
+        return sorted(self._get())
+
+    def get_table(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """表的结构，包含create_sql/columns/indexes，表不存在时返回None"""
+        return self._get().get(table_name)
+
+    def get_table_info(self, table_name: str) -> List[Dict[str, Any]]:
+        """格式与SHOW CREATE TABLE一致的表结构，表不存在时返回空列表"""
+        table = self.get_table(table_name)
+        if table is None:
+            return []
+        return [{"Table": table_name, "Create Table": table["create_sql"]}]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """加载次数统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(tables=len(self._tables) if self._tables is not None else 0,
+                         fingerprint=self._fingerprint)
+        return stats
+
+
+_schema_catalogs: Dict[str, SchemaCatalog] = {}
+_schema_catalogs_lock = threading.Lock()
+_schema_listeners: List[Callable[[str], None]] = []
+
+
+def add_schema_listener(callback: Callable[[str], None]) -> None:
+    """
+    注册表结构目录刷新或失效时的回调
+
+    Args:
+        callback: 参数为目录名称(如sqlite、mysql)
+    """
+    with _schema_catalogs_lock:
+        if callback not in _schema_listeners:
+            _schema_listeners.append(callback)
+
+
+def _notify_schema_change(name: str) -> None:
+    with _schema_catalogs_lock:
+        listeners = list(_schema_listeners)
+    for callback in listeners:
+        try:
+            callback(name)
+        except Exception as e:
+            log.warning(f"[SCHEMA] 表结构变更回调失败: {e}")
+
+
+def create_schema_catalog(
+    name: str,
+    loader: Callable[[], Dict[str, Dict[str, Any]]],
+    fingerprint_fn: Callable[[], str]
+) -> Optional[SchemaCatalog]:
+    """
+    按配置为数据库客户端创建表结构目录
+
+    配置项:
+        database.schema_catalog.enabled: 是否启用
+        database.schema_catalog.dir: 目录文件保存位置(相对项目根目录)，为空则只保存在内存中
+
+    Args:
+        name: 目录名称(如sqlite、mysql)，磁盘文件为schema_<name>.json
+        loader: 批量读取表结构的函数
+        fingerprint_fn: 表结构指纹函数，与磁盘文件中的指纹不一致时重新加载
+
+    Returns:
+        SchemaCatalog实例，未启用时返回None
+    """
+    config = ConfigManager()
+    if not config.get_boolean("database.schema_catalog.enabled", True):
+        return None
+    directory = config.get("database.schema_catalog.dir", ".cache/schema")
+    path = None
+    if directory:
+        path = Path(directory)
+        path = (path if path.is_absolute() else project_root / path) / f"schema_{name}.json"
+    catalog = SchemaCatalog(name, loader, fingerprint_fn, path)
+    with _schema_catalogs_lock:
+        _schema_catalogs[name] = catalog
+    return catalog
+
+
+def refresh_schema_catalogs() -> None:
+    """表结构变更后重新加载已创建的所有目录"""
+    with _schema_catalogs_lock:
+        catalogs = list(_schema_catalogs.values())
+    for catalog in catalogs:
+        catalog.refresh()
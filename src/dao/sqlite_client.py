@@ -0,0 +1,257 @@
+"""
+SQLite Query Engine
+
+博金杯比赛数据以单个SQLite文件发布，QueryDB可以直接在本地只读执行SQL，省去MySQL服务和网络往返:
+1. 每个线程一个只读连接(URI mode=ro，可选immutable=1跳过文件锁)，工具线程池中的查询互不阻塞
+2. 连接级pragma: mmap读取、较大的页缓存、临时表放在内存
+3. 使用sqlite3内置的预编译语句缓存，相同SQL不重复解析
+4. 通过progress handler实现单条查询超时，超时的查询被中断并抛出TimeoutError
+5. 结果通过fetchmany按批读取(iter_batches)，execute_sql受database.fetch行数/字节数上限约束
+6. get_tables/get_table_info由表结构目录(schema_catalog)回答，目录通过pragma表值函数批量加载
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import quote
+
+from src.config import ConfigManager
+from src.dao.result_cache import create_result_cache
+from src.dao.schema_catalog import create_schema_catalog
+from src.dao.streaming import FetchLimits, QueryResult, RowBatch, collect_rows
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# progress handler每执行多少条虚拟机指令检查一次超时
+PROGRESS_INTERVAL = 10000
+
+
+class SQLiteClient:
+    """只读SQLite客户端，接口与MySQLClient的查询部分一致"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """初始化SQLite客户端（单例模式）"""
+        if not hasattr(self, '_initialized'):
+            config = ConfigManager()
+            path = Path(config.get('database.sqlite.path', 'bs_challenge_financial_14b_dataset/dataset/博金杯比赛数据.db'))
+            self.db_path = path if path.is_absolute() else project_root / path
+            self.immutable = config.get_boolean('database.sqlite.immutable', True)
+            self.mmap_size = config.get_int('database.sqlite.mmap_size', 268435456)
+            self.cache_size_kb = config.get_int('database.sqlite.cache_size_kb', 65536)
+            self.statement_cache_size = config.get_int('database.sqlite.statement_cache_size', 256)
+            self.query_timeout = float(config.get('database.sqlite.query_timeout', 30))
+            self.fetch_limits = FetchLimits.from_config(config)
+            self._local = threading.local()
+            self._connections: List[sqlite3.Connection] = []
+            self._connections_lock = threading.Lock()
+            self.result_cache = create_result_cache("sqlite", version_fn=self.db_version)
+            self.schema_catalog = create_schema_catalog("sqlite", self.load_schema, self.schema_fingerprint)
+            self._initialized = True
+            log.info(f"SQLite客户端初始化: {self.db_path} (immutable={self.immutable})")
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"SQLite数据库文件不存在: {self.db_path}")
+        uri = f"file:{quote(str(self.db_path))}?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1"
+        # 连接只在创建它的线程中使用，关闭时可能在其他线程
+        conn = sqlite3.connect(uri, uri=True, cached_statements=self.statement_cache_size, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA query_only=1")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def db_version(self) -> Optional[tuple]:
+        """数据库文件的大小和mtime，文件被替换后缓存的查询结果失效"""
+        try:
+            stat = self.db_path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的只读连接，首次调用时创建"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def execute_sql(
+        self,
+        sql: str,
+        params: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行只读SQL查询，结果超过database.fetch.max_rows/max_bytes时截断
+
+        Args:
+            sql: SQL查询语句
+            params: 查询参数(:name命名参数或?位置参数)
+            timeout: 超时时间(秒)，默认使用database.sqlite.query_timeout，0表示不限制
+
+        Returns:
+            查询结果列表(QueryResult)，被截断时truncated为True
+        """
+        if self.result_cache is None:
+            return self._execute_sql(sql, params, timeout)
+        return self.result_cache.execute(sql, params, lambda: self._execute_sql(sql, params, timeout))
+
+    def _execute_sql(
+        self,
+        sql: str,
+        params: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> QueryResult:
+        return collect_rows(self.iter_batches(sql, params, timeout=timeout), self.fetch_limits)
+
+    def iter_batches(
+        self,
+        sql: str,
+        params: Optional[Union[Dict[str, Any], List[Any]]] = None,
+        batch_size: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[RowBatch]:
+        """
+        按批读取查询结果，不经过结果缓存，也不受行数/字节数上限约束
+
+        超时从开始执行计算，覆盖整个读取过程；提前停止迭代时应关闭生成器以重置超时设置。
+
+        Args:
+            sql: SQL查询语句
+            params: 查询参数(:name命名参数或?位置参数)
+            batch_size: 每批行数，默认使用database.fetch.batch_size
+            timeout: 超时时间(秒)，默认使用database.sqlite.query_timeout，0表示不限制
+
+        Yields:
+            RowBatch
+        """
+        batch_size = batch_size or self.fetch_limits.batch_size
+        timeout = self.query_timeout if timeout is None else timeout
+        conn = self.get_connection()
+        deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+        if deadline is not None:
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_INTERVAL)
+        cursor = conn.cursor()
+        # 批次中的行保持为元组，不经过sqlite3.Row
+        cursor.row_factory = None
+        try:
+            cursor.execute(sql, params or {})
+            columns = [item[0] for item in cursor.description or ()]
+            while columns:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield RowBatch(columns, rows)
+        except sqlite3.OperationalError as e:
+            if deadline is not None and time.monotonic() > deadline and "interrupted" in str(e):
+                log.error(f"SQL查询超时({timeout:g}秒): {sql}")
+                raise TimeoutError(f"SQL查询超时({timeout:g}秒)") from e
+            log.error(f"SQL查询执行失败: {e}")
+            raise
+        except Exception as e:
+            log.error(f"SQL查询执行失败: {e}")
+            raise
+        finally:
+            cursor.close()
+            if deadline is not None:
+                conn.set_progress_handler(None, PROGRESS_INTERVAL)
+
+    def check_connection(self) -> bool:
+        """
+        检查数据库连接是否正常
+
+        Returns:
+            连接状态
+        """
+        try:
+            self.execute_sql("SELECT 1")
+            return True
+        except Exception as e:
+            log.error(f"数据库连接检查失败: {e}")
+            return False
+
+    def _iter_dicts(self, sql: str):
+        for batch in self.iter_batches(sql):
+            yield from batch.to_dicts()
+
+    def schema_fingerprint(self) -> str:
+        """sqlite_master内容的摘要，表或索引定义变化后改变"""
+        digest = hashlib.sha1()
+        for batch in self.iter_batches("SELECT type, name, tbl_name, sql FROM sqlite_master ORDER BY type, name"):
+            for row in batch.rows:
+                digest.update(repr(row).encode("utf-8"))
+        return digest.hexdigest()
+
+    def load_schema(self) -> Dict[str, Dict[str, Any]]:
+        """两条查询批量读取所有表的列和索引，供表结构目录使用"""
+        tables: Dict[str, Dict[str, Any]] = {}
+        for row in self._iter_dicts(
+            "SELECT m.name AS table_name, m.sql AS create_sql, p.name, p.type, p.\"notnull\" AS not_null, "
+            "p.dflt_value, p.pk FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+            "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name, p.cid"
+        ):
+            table = tables.setdefault(row["table_name"], {"create_sql": row["create_sql"], "columns": [], "indexes": []})
+            table["columns"].append({"name": row["name"], "type": row["type"], "nullable": not row["not_null"],
+                                     "default": row["dflt_value"], "primary_key": bool(row["pk"])})
+        for row in self._iter_dicts(
+            "SELECT m.name AS table_name, l.name AS index_name, l.\"unique\" AS is_unique, i.name AS column_name "
+            "FROM sqlite_master m JOIN pragma_index_list(m.name) l JOIN pragma_index_info(l.name) i "
+            "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name, l.name, i.seqno"
+        ):
+            indexes = tables[row["table_name"]]["indexes"]
+            if not indexes or indexes[-1]["name"] != row["index_name"]:
+                indexes.append({"name": row["index_name"], "unique": bool(row["is_unique"]), "columns": []})
+            indexes[-1]["columns"].append(row["column_name"])
+        return tables
+
+    def get_tables(self) -> List[str]:
+        """获取所有表名"""
+        if self.schema_catalog is not None:
+            return self.schema_catalog.get_tables()
+        rows = self.execute_sql("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+        return [row["name"] for row in rows]
+
+    def get_table_info(self, table_name: str) -> List[Dict[str, Any]]:
+        """获取表结构信息，格式与MySQL的SHOW CREATE TABLE一致"""
+        if self.schema_catalog is not None:
+            info = self.schema_catalog.get_table_info(table_name)
+            if info:
+                return info
+        rows = self.execute_sql("SELECT name, sql FROM sqlite_master WHERE type='table' AND name = :name",
+                                {"name": table_name})
+        return [{"Table": row["name"], "Create Table": row["sql"]} for row in rows]
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
+        log.info("SQLite连接已关闭")
@@ -0,0 +1,183 @@
+"""
+Streaming Fetch
+
+查询结果按批次流式读取，避免一条不加LIMIT的行情查询把数百万行一次性转成Python字典:
+1. 客户端的iter_batches()使用服务端游标(MySQL stream_results/yield_per，SQLite fetchmany)，
+   每次只取batch_size行，产出RowBatch(列名 + 行元组)，可按需转为字典或NumPy列数组
+2. collect_rows()按行数上限和估算字节数上限汇总批次，超限时停止读取并关闭游标，
+   返回带truncated标记的QueryResult，Observation中据此注明结果已截断
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# 每行的固定开销估算(行元组 + 字典)
+ROW_OVERHEAD_BYTES = 64
+
+
+class RowBatch:
+    """一批查询结果，行以元组保存"""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: List[Tuple[Any, ...]]):
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """转为与execute_sql相同的字典列表"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """
+        转为列式数组
+
+        全为整数/浮点数(允许NULL)的列转为int64/float64，NULL在数值列中为nan；其余列为object数组
+        """
+        arrays = {}
+        for index, column in enumerate(self.columns):
+            values = [row[index] for row in self.rows]
+            arrays[column] = _column_array(values)
+        return arrays
+
+
+def _column_array(values: List[Any]) -> np.ndarray:
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        if len(present) == len(values) and all(isinstance(value, int) for value in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def estimate_row_bytes(row: Sequence[Any]) -> int:
+    """估算一行转为字典后占用的内存，只区分字符串/字节和定长类型，不做递归sizeof"""
+    size = ROW_OVERHEAD_BYTES
+    for value in row:
+        if isinstance(value, str):
+            size += 49 + len(value) * (1 if value.isascii() else 4)
+        elif isinstance(value, (bytes, bytearray)):
+            size += 33 + len(value)
+        elif isinstance(value, (Decimal, datetime, date)):
+            size += 104
+        elif value is None:
+            size += 8
+        else:
+            size += 32
+    return size
+
+
+class QueryResult(list):
+    """
+    execute_sql的返回值，行为与字典列表一致
+
+    Attributes:
+        columns: 列名
+        truncated: 是否因超过行数/字节数上限被截断
+        reason: 截断原因，'max_rows'或'max_bytes'
+        approx_bytes: 已读取行的估算字节数
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), columns: Sequence[str] = (),
+                 truncated: bool = False, reason: Optional[str] = None, approx_bytes: int = 0):
+        super().__init__(rows)
+        self.columns = tuple(columns)
+        self.truncated = truncated
+        self.reason = reason
+        self.approx_bytes = approx_bytes
+
+    @property
+    def truncation_note(self) -> Optional[str]:
+        """截断说明，未截断时为None"""
+        if not self.truncated:
+            return None
+        limit = "行数" if self.reason == "max_rows" else "大小"
+        return (f"结果超过{limit}上限，已截断为前{len(self)}行(约{self.approx_bytes // 1024}KB)，"
+                f"请增加过滤条件、使用聚合或LIMIT缩小结果")
+
+
+class FetchLimits:
+    """
+    结果读取的批次大小和上限
+
+    Attributes:
+        batch_size: 每批读取的行数
+        max_rows: 最多读取的行数，0表示不限制
+        max_bytes: 最多读取的估算字节数，0表示不限制
+    """
+
+    def __init__(self, batch_size: int = 1000, max_rows: int = 0, max_bytes: int = 0):
+        self.batch_size = max(1, batch_size)
+        self.max_rows = max(0, max_rows)
+        self.max_bytes = max(0, max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "FetchLimits":
+        """
+        根据配置创建
+
+        配置项:
+            database.fetch.batch_size: 每批读取的行数
+            database.fetch.max_rows: execute_sql最多返回的行数
+            database.fetch.max_bytes: execute_sql最多返回的估算字节数
+        """
+        config = config or ConfigManager()
+        return cls(
+            batch_size=config.get_int("database.fetch.batch_size", 1000),
+            max_rows=config.get_int("database.fetch.max_rows", 10000),
+            max_bytes=config.get_int("database.fetch.max_bytes", 33554432)
+        )
+
+
+def collect_rows(batches: Iterable[RowBatch], limits: FetchLimits) -> QueryResult:
+    """
+    汇总批次为字典列表，超过上限时停止读取
+
+    Args:
+        batches: iter_batches()返回的批次迭代器
+        limits: 行数和字节数上限
+
+    Returns:
+        QueryResult，超限时truncated为True且只包含上限以内的行
+    """
+    rows: List[Dict[str, Any]] = []
+    columns: Tuple[str, ...] = ()
+    total_bytes = 0
+    reason = None
+    try:
+        for batch in batches:
+            columns = batch.columns
+            for row in batch.rows:
+                if limits.max_rows and len(rows) >= limits.max_rows:
+                    reason = "max_rows"
+                    break
+                row_bytes = estimate_row_bytes(row)
+                if limits.max_bytes and total_bytes + row_bytes > limits.max_bytes:
+                    reason = "max_bytes"
+                    break
+                total_bytes += row_bytes
+                rows.append(dict(zip(columns, row)))
+            if reason is not None:
+                break
+    finally:
+        # 提前退出时关闭生成器，释放服务端游标
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+    if reason is not None:
+        log.warning(f"[FETCH] 查询结果超过{reason}上限，已截断为{len(rows)}行(约{total_bytes}字节)")
+    return QueryResult(rows, columns, truncated=reason is not None, reason=reason, approx_bytes=total_bytes)
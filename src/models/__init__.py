@@ -2,5 +2,10 @@ from .base import BaseModel
 from .qu_model import QuModel
 from .qwen import QWENModel
 from .streaming_adapter import StreamingLLMAdapter, STREAMING_MODELS
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .adapter_pool import get_streaming_adapter, warm_up_adapters
+from .rate_limiter import ModelRateLimiter, get_rate_limiter
 
-__all__ = ['BaseModel', 'QuModel', 'QWENModel', 'StreamingLLMAdapter', 'STREAMING_MODELS'] 
\ No newline at end of file
+__all__ = ['BaseModel', 'QuModel', 'QWENModel', 'StreamingLLMAdapter', 'STREAMING_MODELS',
+           'LLMResponseCache', 'get_llm_cache', 'get_streaming_adapter', 'warm_up_adapters',
+           'ModelRateLimiter', 'get_rate_limiter'] 
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+StreamingLLMAdapter Registry
+
+进程级的LLM适配器注册表。
+按(模型, base_url, 参数)复用StreamingLLMAdapter实例，避免每次节点调用都重新构造适配器、
+重新读取配置和设置API密钥；同一base_url下的所有适配器共享一个开启keep-alive的HTTP会话，
+查询理解子图的并行分支因此可以复用已建立的TLS连接。
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config.config_manager import ConfigManager
+from src.models.streaming_adapter import STREAMING_MODELS, StreamingLLMAdapter
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# DashScope默认服务地址，base_url为空时用于会话预热
+DEFAULT_DASHSCOPE_URL = "https://dashscope.aliyuncs.com"
+
+_adapters: Dict[Tuple, StreamingLLMAdapter] = {}
+_sessions: Dict[str, requests.Session] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    """创建开启连接池和keep-alive的HTTP会话"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_http_session(base_url: Optional[str] = None) -> requests.Session:
+    """
+    获取指定base_url共享的HTTP会话
+
+    Args:
+        base_url: API基础URL
+
+    Returns:
+        requests.Session实例
+    """
+    key = base_url or DEFAULT_DASHSCOPE_URL
+    with _registry_lock:
+        session = _sessions.get(key)
+        if session is None:
+            pool_size = ConfigManager().get_int("api.qwen.http_pool_size", 16)
+            session = _create_session(pool_size)
+            _sessions[key] = session
+            log.info(f"创建共享HTTP会话: {key}, 连接池大小: {pool_size}")
+        return session
+
+
+def _registry_key(
+    model: str,
+    base_url: Optional[str],
+    streaming_models: Optional[List[str]],
+    stream_enabled: bool,
+    cache_enabled: bool,
+    params: Dict[str, Any]
+) -> Tuple:
+    return (
+        model,
+        base_url or "",
+        tuple(streaming_models or STREAMING_MODELS),
+        bool(stream_enabled),
+        bool(cache_enabled),
+        json.dumps(params, sort_keys=True, default=str)
+    )
+
+
+def get_streaming_adapter(
+    model: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    streaming_models: Optional[List[str]] = None,
+    stream_enabled: bool = True,
+    cache_enabled: bool = True,
+    **params
+) -> StreamingLLMAdapter:
+    """
+    获取共享的StreamingLLMAdapter实例，不存在时创建
+
+    Args:
+        model: 模型名称
+        api_key: API密钥
+        base_url: API基础URL
+        streaming_models: 支持流式输出的模型列表
+        stream_enabled: 是否启用流式输出
+        cache_enabled: 是否启用响应缓存
+        **params: 默认模型参数
+
+    Returns:
+        StreamingLLMAdapter实例
+    """
+    key = _registry_key(model, base_url, streaming_models, stream_enabled, cache_enabled, params)
+    adapter = _adapters.get(key)
+    if adapter is not None:
+        return adapter
+
+    session = get_http_session(base_url)
+    with _registry_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = StreamingLLMAdapter(
+                model=model,
+                api_key=api_key,
+                base_url=base_url,
+                streaming_models=streaming_models,
+                stream_enabled=stream_enabled,
+                cache_enabled=cache_enabled,
+                **params
+            )
+            adapter.set_http_session(session)
+            _adapters[key] = adapter
+            log.info(f"注册共享LLM适配器: {model}, 当前适配器数量: {len(_adapters)}")
+        return adapter
+
+
+def get_adapter_from_config(config: ConfigManager, model: str) -> StreamingLLMAdapter:
+    """
+    根据api.qwen配置获取共享适配器
+
+    Args:
+        config: 配置管理器
+        model: 模型名称
+
+    Returns:
+        StreamingLLMAdapter实例
+    """
+    return get_streaming_adapter(
+        model=model,
+        api_key=config.get("api.qwen.api_key"),
+        base_url=config.get("api.qwen.base_url", ""),
+        streaming_models=config.get("api.qwen.streaming_models", STREAMING_MODELS),
+        stream_enabled=config.get("api.qwen.stream_enabled", True),
+        **config.get("api.qwen.default_params", {})
+    )
+
+
+def warm_up_adapters(config: Optional[ConfigManager] = None) -> List[str]:
+    """
+    进程启动时预热适配器和HTTP连接
+
+    为查询理解各节点和默认模型创建共享适配器，并对服务地址发起一次轻量请求，
+    提前完成DNS解析和TLS握手。预热失败不影响后续正常调用。
+
+    Args:
+        config: 配置管理器
+
+    Returns:
+        预热的模型列表
+    """
+    config = config or ConfigManager()
+    if not config.get_boolean("api.qwen.warm_up", True):
+        return []
+
+    models = []
+    for key in ("model_version", "segment_model", "ner_model", "intent_model"):
+        model = config.get(f"api.qwen.{key}")
+        if model and model not in models:
+            models.append(model)
+
+    for model in models:
+        try:
+            get_adapter_from_config(config, model)
+        except Exception as e:
+            log.warning(f"预热LLM适配器 {model} 失败: {e}")
+
+    # 离线后端不访问DashScope
+    if config.get("llm_backend.mode", "live") in ("replay", "synthetic"):
+        return models
+
+    base_url = config.get("api.qwen.base_url", "")
+    try:
+        get_http_session(base_url).head(base_url or DEFAULT_DASHSCOPE_URL, timeout=5)
+        log.info(f"HTTP连接预热完成: {base_url or DEFAULT_DASHSCOPE_URL}")
+    except requests.RequestException as e:
+        log.warning(f"HTTP连接预热失败: {e}")
+
+    return models
+
+
+def clear_adapters() -> None:
+    """清空注册表并关闭所有共享HTTP会话"""
+    with _registry_lock:
+        _adapters.clear()
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
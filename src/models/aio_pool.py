@@ -0,0 +1,65 @@
+"""
+Async HTTP Resources for LLM Calls
+
+为异步LLM调用提供按事件循环隔离的共享资源:
+1. aiohttp.ClientSession，带连接池和keep-alive
+2. asyncio.Semaphore，限制同一事件循环内的并发请求数
+
+aiohttp会话和信号量都绑定创建时的事件循环，因此按事件循环分别缓存。
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Tuple
+
+import aiohttp
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+_loop_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_resources_lock = threading.Lock()
+
+
+def get_aio_resources() -> Tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+    """
+    获取当前事件循环共享的aiohttp会话和并发信号量，必须在协程中调用
+
+    配置项:
+        api.qwen.async_max_concurrency: 同时在途的LLM请求上限
+        api.qwen.async_connector_limit: 连接池最大连接数
+        api.qwen.async_keepalive_timeout: 空闲连接保持时间(秒)
+
+    Returns:
+        (aiohttp.ClientSession, asyncio.Semaphore)
+    """
+    loop = asyncio.get_running_loop()
+    with _resources_lock:
+        resources = _loop_resources.get(loop)
+        if resources is None or resources[0].closed:
+            config = ConfigManager()
+            max_concurrency = config.get_int("api.qwen.async_max_concurrency", 64)
+            connector = aiohttp.TCPConnector(
+                limit=config.get_int("api.qwen.async_connector_limit", 100),
+                keepalive_timeout=config.get_int("api.qwen.async_keepalive_timeout", 30)
+            )
+            session = aiohttp.ClientSession(connector=connector, trust_env=True)
+            semaphore = asyncio.Semaphore(max_concurrency)
+            resources = (session, semaphore)
+            _loop_resources[loop] = resources
+            log.info(f"创建异步HTTP会话，最大并发: {max_concurrency}")
+        return resources
+
+
+async def close_aio_resources() -> None:
+    """关闭当前事件循环的共享aiohttp会话，通常在异步服务退出前调用"""
+    loop = asyncio.get_running_loop()
+    with _resources_lock:
+        resources = _loop_resources.pop(loop, None)
+    if resources is not None and not resources[0].closed:
+        await resources[0].close()
@@ -0,0 +1,254 @@
+"""
+Hedged LLM Requests
+
+降低LLM调用尾延迟的对冲请求:
+1. 按模型维护滚动延迟窗口(流式按首个chunk到达时间、非流式按完整响应时间分别统计)，主请求超过窗口的指定分位数(如p95)仍未完成时，再发出一个相同的请求
+2. 两个请求中先成功完成的作为结果，落后的请求被取消: 尚未开始的直接取消，
+   已经开始的流式请求关闭响应流，非流式请求无法中断HTTP调用，结果在完成后被丢弃
+3. 额外请求受预算限制: 每个主请求积累max_extra_ratio个额度，对冲一次消耗1个额度，
+   因此额外请求数不超过主请求数的max_extra_ratio
+"""
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+
+class LatencyTracker:
+    """滚动窗口延迟统计"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        计算分位数
+
+        Args:
+            q: 分位数(0-100)
+
+        Returns:
+            延迟秒数，没有样本时返回None
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class HedgeBudget:
+    """额外请求预算: 每个主请求积累ratio个额度，对冲一次消耗1个额度，额度不超过burst"""
+
+    def __init__(self, ratio: float, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._credits = 0.0
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self._credits = min(self.burst, self._credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._credits < 1:
+                return False
+            self._credits -= 1
+            return True
+
+
+class HedgedCaller:
+    """单个模型的对冲请求执行器"""
+
+    def __init__(
+        self,
+        model: str,
+        executor: ThreadPoolExecutor,
+        percentile: float = 95,
+        min_samples: int = 20,
+        window: int = 200,
+        max_extra_ratio: float = 0.05,
+        min_delay: float = 0.2
+    ):
+        self.model = model
+        self.executor = executor
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latency = LatencyTracker(window)
+        self.budget = HedgeBudget(max_extra_ratio)
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_exhausted": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            self.stats[field] += 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """发出对冲请求前的等待时间，样本不足时返回None(不对冲)"""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    def _timed(self, fn: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            start = time.perf_counter()
+            result = fn()
+            self.latency.record(time.perf_counter() - start)
+            return result
+        return run
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        """在线程池中执行，沿用调用方的上下文(追踪span等contextvars)"""
+        return self.executor.submit(contextvars.copy_context().run, self._timed(fn))
+
+    @staticmethod
+    def _discard(future: Future, discard: Optional[Callable[[Any], None]]) -> None:
+        """取消落后的请求: 未开始的直接取消，已开始的在完成后交给discard释放资源"""
+        if future.cancel() or discard is None:
+            return
+
+        def on_done(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                discard(done.result())
+
+        future.add_done_callback(on_done)
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        accept: Callable[[Any], bool] = lambda result: True,
+        discard: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        执行一次可能被对冲的调用
+
+        Args:
+            fn: 发起请求的函数，可能在两个线程中各执行一次
+            accept: 判断结果是否成功，不成功的结果不会立即胜出
+            discard: 释放落后请求结果的函数(如关闭响应流)
+
+        Returns:
+            先成功完成的请求结果；都不成功时返回先完成的结果或抛出其异常
+        """
+        self._count("requests")
+        self.budget.on_request()
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(fn)()
+
+        futures: List[Future] = [self._submit(fn)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            if self.budget.try_spend():
+                self._count("hedged")
+                log.info(f"[HEDGE] {self.model} 请求超过p{self.percentile:g}延迟 {delay:.2f}秒，发出对冲请求")
+                futures.append(self._submit(fn))
+            else:
+                self._count("budget_exhausted")
+
+        pending = set(futures)
+        fallback: Optional[Future] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.index):
+                if future.exception() is None and accept(future.result()):
+                    for loser in futures:
+                        if loser is not future:
+                            self._discard(loser, discard)
+                    if future is not futures[0]:
+                        self._count("hedge_wins")
+                    return future.result()
+                if fallback is None:
+                    fallback = future
+        for loser in futures:
+            if loser is not fallback:
+                self._discard(loser, discard)
+        return fallback.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取对冲次数、对冲胜出次数和当前对冲延迟"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["samples"] = len(self.latency)
+        stats["hedge_delay"] = self.hedge_delay()
+        return stats
+
+
+_hedged_callers: Dict[Tuple[str, bool], Optional[HedgedCaller]] = {}
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedged_callers_lock = threading.Lock()
+
+
+def get_hedged_caller(model: str, stream: bool = False) -> Optional[HedgedCaller]:
+    """
+    获取模型共享的对冲请求执行器
+
+    流式和非流式调用的延迟分布不同(首个chunk到达时间远小于完整响应时间)，
+    按(model, stream)分别维护执行器和延迟窗口，两者共用配置、线程池
+
+    配置项(api.qwen.hedging.*，models下可按模型覆盖):
+        enabled: 是否启用
+        percentile: 发出对冲请求的延迟分位数
+        min_samples: 延迟样本数达到该值后才开始对冲
+        window: 滚动延迟窗口大小
+        max_extra_ratio: 额外请求数占主请求数的上限
+        min_delay: 对冲延迟的下限(秒)
+        max_workers: 执行请求的共享线程池大小
+
+    Args:
+        model: 模型名称
+        stream: 是否为流式调用
+
+    Returns:
+        HedgedCaller实例，未启用时返回None
+    """
+    global _hedge_executor
+    key = (model, stream)
+    if key in _hedged_callers:
+        return _hedged_callers[key]
+    with _hedged_callers_lock:
+        if key not in _hedged_callers:
+            config = ConfigManager()
+            options = dict(config.get("api.qwen.hedging", {}) or {})
+            options.update((options.get("models") or {}).get(model) or {})
+            if not options.get("enabled", False):
+                _hedged_callers[key] = None
+                return None
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=int(options.get("max_workers", 32)),
+                    thread_name_prefix="llm-hedge"
+                )
+            _hedged_callers[key] = HedgedCaller(
+                f"{model}(stream)" if stream else model,
+                _hedge_executor,
+                percentile=float(options.get("percentile", 95)),
+                min_samples=int(options.get("min_samples", 20)),
+                window=int(options.get("window", 200)),
+                max_extra_ratio=float(options.get("max_extra_ratio", 0.05)),
+                min_delay=float(options.get("min_delay", 0.2))
+            )
+            log.info(f"[HEDGE] 启用对冲请求 {_hedged_callers[key].model}: p{options.get('percentile', 95)}, "
+                     f"额外请求上限 {options.get('max_extra_ratio', 0.05)}")
+    return _hedged_callers[key]
@@ -0,0 +1,458 @@
+"""
+LLM Backends
+
+DashScope Generation调用的可替换后端，用于离线基准测试:
+1. live: 直接调用DashScope(默认)
+2. record: 调用DashScope并把请求和响应(包括流式chunk的到达时间)写入本地SQLite记录库
+3. replay: 按请求内容从记录库回放响应，按记录的时间间隔(可按比例缩放)输出流式chunk，
+   结果完全确定，不访问网络
+4. synthetic: 按配置的延迟分布(对数正态)生成响应延迟和流式输出节奏，
+   内容优先取自记录库，其次按正则规则匹配，最后使用默认回复
+
+记录键与LLM响应缓存一致(模型 + 参数 + 消息)，但不包含stream/incremental_output/session等传输参数，
+因此流式和非流式调用可以互相回放。
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import dashscope
+
+from src.config.config_manager import ConfigManager
+from src.models.llm_cache import make_cache_key
+from src.utils.logger import get_logger
+from src.utils.token_counter import estimate_message_tokens, estimate_tokens
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# 不影响生成内容的传输参数，不参与记录键计算
+TRANSPORT_PARAMS = ("stream", "incremental_output", "result_format", "session")
+
+# 回放时流式输出每个chunk的字符数(记录中没有chunk信息时)
+SYNTHETIC_CHUNK_CHARS = 8
+
+
+def record_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    """计算请求的记录键"""
+    params = {key: value for key, value in params.items() if key not in TRANSPORT_PARAMS}
+    return make_cache_key(model, params, messages)
+
+
+def make_response(
+    content: str = "",
+    reasoning: str = "",
+    usage: Optional[Dict[str, Any]] = None,
+    status_code: int = 200,
+    code: str = "",
+    message: str = ""
+) -> Any:
+    """构造与DashScope响应结构一致的对象(status_code/code/message/usage/output.choices[0].message)"""
+    return SimpleNamespace(
+        status_code=status_code,
+        code=code,
+        message=message,
+        request_id="offline",
+        usage=usage or {},
+        output=SimpleNamespace(choices=[SimpleNamespace(
+            finish_reason="stop",
+            message=SimpleNamespace(role="assistant", content=content, reasoning_content=reasoning)
+        )])
+    )
+
+
+def _split_chunk(chunk: Any):
+    message = chunk.output.choices[0].message
+    return message.content or "", getattr(message, "reasoning_content", "") or ""
+
+
+class LLMRecordStore:
+    """
+    请求/响应记录库
+
+    每条记录为zlib压缩的JSON:
+    {"content", "reasoning", "usage", "latency", "chunks": [[相对开始时间, 回复片段, 思考片段], ...]}
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_records (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                record BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM llm_records WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key: str, model: str, record: Dict[str, Any]) -> None:
+        blob = zlib.compress(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_records (key, model, record, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, blob, time.time())
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_records").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMBackend:
+    """后端基类，接口与dashscope.Generation.call / dashscope.AioGeneration.call一致"""
+
+    name = "base"
+
+    def call(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        raise NotImplementedError
+
+    async def acall(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        raise NotImplementedError
+
+
+class RecordingBackend(LLMBackend):
+    """调用DashScope并记录响应，只记录成功且完整的响应"""
+
+    name = "record"
+
+    def __init__(self, store: LLMRecordStore):
+        self.store = store
+
+    def _save(self, model: str, key: str, start: float, content: str, reasoning: str,
+              usage: Any, chunks: Optional[List[List[Any]]] = None) -> None:
+        self.store.put(key, model, {
+            "content": content,
+            "reasoning": reasoning,
+            "usage": dict(usage or {}),
+            "latency": time.perf_counter() - start,
+            "chunks": chunks
+        })
+
+    def call(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        key = record_key(model, messages, kwargs)
+        start = time.perf_counter()
+        response = dashscope.Generation.call(model=model, messages=messages, **kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(model, key, start, response)
+        if response.status_code == 200:
+            content, reasoning = _split_chunk(response)
+            self._save(model, key, start, content, reasoning, response.usage)
+        return response
+
+    def _record_stream(self, model: str, key: str, start: float, response: Iterator[Any]) -> Iterator[Any]:
+        chunks = []
+        last_chunk = None
+        try:
+            for chunk in response:
+                last_chunk = chunk
+                if getattr(chunk, "status_code", 200) == 200:
+                    content, reasoning = _split_chunk(chunk)
+                    chunks.append([round(time.perf_counter() - start, 4), content, reasoning])
+                yield chunk
+        finally:
+            # 调用方提前关闭流时记录不完整，不写入
+            if hasattr(response, "close"):
+                response.close()
+        if last_chunk is not None and getattr(last_chunk, "status_code", 200) == 200:
+            self._save(model, key, start, "".join(c[1] for c in chunks), "".join(c[2] for c in chunks),
+                       getattr(last_chunk, "usage", None), chunks)
+
+    async def acall(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        key = record_key(model, messages, kwargs)
+        start = time.perf_counter()
+        response = await dashscope.AioGeneration.call(model=model, messages=messages, **kwargs)
+        if kwargs.get("stream"):
+            return self._arecord_stream(model, key, start, response)
+        if response.status_code == 200:
+            content, reasoning = _split_chunk(response)
+            self._save(model, key, start, content, reasoning, response.usage)
+        return response
+
+    async def _arecord_stream(self, model: str, key: str, start: float, response: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        chunks = []
+        last_chunk = None
+        async for chunk in response:
+            last_chunk = chunk
+            if getattr(chunk, "status_code", 200) == 200:
+                content, reasoning = _split_chunk(chunk)
+                chunks.append([round(time.perf_counter() - start, 4), content, reasoning])
+            yield chunk
+        if last_chunk is not None and getattr(last_chunk, "status_code", 200) == 200:
+            self._save(model, key, start, "".join(c[1] for c in chunks), "".join(c[2] for c in chunks),
+                       getattr(last_chunk, "usage", None), chunks)
+
+
+class TimedResponseBackend(LLMBackend):
+    """按"响应内容 + chunk时间表"输出结果的离线后端基类"""
+
+    def plan(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        生成响应计划
+
+        Returns:
+            {"content", "reasoning", "usage", "latency", "chunks": [[相对开始时间, 回复片段, 思考片段], ...]}，
+            无法生成时包含status_code/code/message
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _chunks(plan: Dict[str, Any]) -> List[List[Any]]:
+        if plan.get("chunks"):
+            return plan["chunks"]
+        # 只有非流式记录时，把内容按固定长度切分，均匀分布在延迟时间内
+        pieces = [["", plan.get("reasoning", "")]] if plan.get("reasoning") else []
+        content = plan.get("content", "")
+        pieces += [[content[i:i + SYNTHETIC_CHUNK_CHARS], ""] for i in range(0, len(content), SYNTHETIC_CHUNK_CHARS)]
+        latency = plan.get("latency", 0.0)
+        count = max(1, len(pieces))
+        return [[latency * (i + 1) / count, text, reasoning] for i, (text, reasoning) in enumerate(pieces)]
+
+    def call(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        plan = self.plan(model, messages, kwargs)
+        if plan.get("status_code", 200) != 200:
+            return make_response(status_code=plan["status_code"], code=plan.get("code", ""),
+                                 message=plan.get("message", ""))
+        if kwargs.get("stream"):
+            return self._stream(plan)
+        time.sleep(plan.get("latency", 0.0))
+        return make_response(plan.get("content", ""), plan.get("reasoning", ""), plan.get("usage"))
+
+    def _stream(self, plan: Dict[str, Any]) -> Iterator[Any]:
+        start = time.perf_counter()
+        chunks = self._chunks(plan)
+        for index, (offset, text, reasoning) in enumerate(chunks):
+            wait = offset - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+            yield make_response(text, reasoning, plan.get("usage") if index == len(chunks) - 1 else None)
+
+    async def acall(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        plan = self.plan(model, messages, kwargs)
+        if plan.get("status_code", 200) != 200:
+            return make_response(status_code=plan["status_code"], code=plan.get("code", ""),
+                                 message=plan.get("message", ""))
+        if kwargs.get("stream"):
+            return self._astream(plan)
+        await asyncio.sleep(plan.get("latency", 0.0))
+        return make_response(plan.get("content", ""), plan.get("reasoning", ""), plan.get("usage"))
+
+    async def _astream(self, plan: Dict[str, Any]) -> AsyncIterator[Any]:
+        start = time.perf_counter()
+        chunks = self._chunks(plan)
+        for index, (offset, text, reasoning) in enumerate(chunks):
+            wait = offset - (time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield make_response(text, reasoning, plan.get("usage") if index == len(chunks) - 1 else None)
+
+
+class ReplayBackend(TimedResponseBackend):
+    """从记录库确定性地回放响应，speed为时间缩放比例(0表示不等待)"""
+
+    name = "replay"
+
+    def __init__(self, store: LLMRecordStore, speed: float = 1.0):
+        self.store = store
+        self.speed = speed
+        self.stats = {"hits": 0, "misses": 0}
+
+    def plan(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.store.get(record_key(model, messages, params))
+        if record is None:
+            self.stats["misses"] += 1
+            log.warning(f"[LLM_BACKEND] 回放记录缺失 {model}")
+            return {"status_code": 404, "code": "ReplayMiss", "message": "no recorded response for request"}
+        self.stats["hits"] += 1
+        record["latency"] = record.get("latency", 0.0) * self.speed
+        if record.get("chunks"):
+            record["chunks"] = [[offset * self.speed, text, reasoning] for offset, text, reasoning in record["chunks"]]
+        return record
+
+
+class SyntheticBackend(TimedResponseBackend):
+    """
+    合成后端
+
+    延迟为对数正态分布: 非流式总延迟按latency_median/latency_sigma采样；
+    流式首个chunk按ttft_median/ttft_sigma采样，之后按tokens_per_second输出。
+    随机数生成器使用固定seed，同样的调用顺序得到同样的延迟序列。
+    """
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        latency_median: float = 1.5,
+        latency_sigma: float = 0.5,
+        ttft_median: float = 0.4,
+        ttft_sigma: float = 0.5,
+        tokens_per_second: float = 40.0,
+        responses: Optional[List[Dict[str, str]]] = None,
+        default_response: str = "",
+        store: Optional[LLMRecordStore] = None,
+        seed: int = 0
+    ):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.ttft_median = ttft_median
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.rules = [(re.compile(rule["pattern"], re.DOTALL), rule["response"]) for rule in responses or []]
+        self.default_response = default_response
+        self.store = store
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample(self, median: float, sigma: float) -> float:
+        with self._lock:
+            return self._random.lognormvariate(math.log(max(median, 1e-6)), sigma)
+
+    def _content(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.store is not None:
+            record = self.store.get(record_key(model, messages, params))
+            if record is not None:
+                return {"content": record.get("content", ""), "reasoning": record.get("reasoning", ""),
+                        "usage": record.get("usage")}
+        prompt = str(messages[-1].get("content", "")) if messages else ""
+        for pattern, response in self.rules:
+            if pattern.search(prompt):
+                return {"content": response}
+        return {"content": self.default_response}
+
+    def plan(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        plan = self._content(model, messages, params)
+        text = plan.get("reasoning", "") + plan.get("content", "")
+        if not plan.get("usage"):
+            output_tokens = estimate_tokens(text)
+            input_tokens = estimate_message_tokens(messages)
+            plan["usage"] = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                             "total_tokens": input_tokens + output_tokens}
+
+        if not params.get("stream"):
+            plan["latency"] = self._sample(self.latency_median, self.latency_sigma)
+            return plan
+
+        ttft = self._sample(self.ttft_median, self.ttft_sigma)
+        seconds_per_char = plan["usage"]["output_tokens"] / max(len(text), 1) / self.tokens_per_second
+        chunks = []
+        offset = ttft
+        for source in ("reasoning", "content"):
+            value = plan.get(source, "")
+            for i in range(0, len(value), SYNTHETIC_CHUNK_CHARS):
+                piece = value[i:i + SYNTHETIC_CHUNK_CHARS]
+                chunks.append([offset, piece if source == "content" else "", piece if source == "reasoning" else ""])
+                offset += len(piece) * seconds_per_char
+        plan["chunks"] = chunks or [[ttft, "", ""]]
+        return plan
+
+
+_backend: Optional[LLMBackend] = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def _resolve_path(path: str) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else project_root / path
+
+
+def create_llm_backend(config: Optional[ConfigManager] = None) -> Optional[LLMBackend]:
+    """
+    根据配置创建后端
+
+    配置项(llm_backend.*):
+        mode: live / record / replay / synthetic
+        store_path: 记录库路径
+        replay_speed: 回放时间缩放比例，0表示不等待
+        synthetic.*: 合成后端的延迟分布、回复规则和随机种子
+
+    Returns:
+        LLMBackend实例，live模式返回None
+    """
+    config = config or ConfigManager()
+    mode = config.get("llm_backend.mode", "live") or "live"
+    if mode == "live":
+        return None
+
+    store_path = _resolve_path(config.get("llm_backend.store_path", ".cache/llm_records.sqlite3"))
+    if mode == "record":
+        return RecordingBackend(LLMRecordStore(store_path))
+    if mode == "replay":
+        return ReplayBackend(LLMRecordStore(store_path), speed=float(config.get("llm_backend.replay_speed", 1.0)))
+    if mode == "synthetic":
+        options = dict(config.get("llm_backend.synthetic", {}) or {})
+        store = LLMRecordStore(store_path) if options.pop("content_from_store", True) and store_path.exists() else None
+        return SyntheticBackend(store=store, **options)
+    raise ValueError(f"Unknown llm_backend.mode: {mode}")
+
+
+def get_llm_backend() -> Optional[LLMBackend]:
+    """
+    获取进程级共享的LLM后端
+
+    Returns:
+        LLMBackend实例，live模式返回None
+    """
+    global _backend, _backend_loaded
+    if not _backend_loaded:
+        with _backend_lock:
+            if not _backend_loaded:
+                _backend = create_llm_backend()
+                if _backend is not None:
+                    log.info(f"[LLM_BACKEND] 使用 {_backend.name} 后端")
+                _backend_loaded = True
+    return _backend
+
+
+def set_llm_backend(backend: Optional[LLMBackend]) -> None:
+    """替换进程级LLM后端(基准测试和单元测试使用)，None表示恢复直接调用DashScope"""
+    global _backend, _backend_loaded
+    with _backend_lock:
+        _backend = backend
+        _backend_loaded = True
+
+
+def generation_call(model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+    """dashscope.Generation.call的替代入口，按配置转发到离线后端"""
+    backend = get_llm_backend()
+    if backend is None:
+        return dashscope.Generation.call(model=model, messages=messages, **kwargs)
+    return backend.call(model, messages, **kwargs)
+
+
+async def aio_generation_call(model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+    """dashscope.AioGeneration.call的替代入口，按配置转发到离线后端"""
+    backend = get_llm_backend()
+    if backend is None:
+        return await dashscope.AioGeneration.call(model=model, messages=messages, **kwargs)
+    return await backend.acall(model, messages, **kwargs)
@@ -0,0 +1,369 @@
+"""
+LLM Response Cache
+
+为LLM调用提供基于内容寻址的响应缓存。
+缓存键由模型版本、调用参数以及转换后的DashScope消息计算规范化哈希得到，
+相同请求在缓存有效期内直接返回已有结果，无需再次访问DashScope。
+
+缓存分为两层:
+1. 内存LRU缓存，进程内毫秒级命中
+2. 磁盘SQLite缓存，跨进程/跨运行复用，支持TTL过期和按容量淘汰
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# 项目根目录，用于解析相对缓存路径
+project_root = Path(__file__).resolve().parent.parent.parent
+
+
+def make_cache_key(model_version: str, params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+    """
+    计算请求的规范化缓存键
+
+    Args:
+        model_version: 模型名称
+        params: 调用参数(默认参数与调用参数合并后的结果)
+        messages: DashScope格式的消息列表
+
+    Returns:
+        sha256十六进制摘要
+    """
+    payload = {
+        "model": model_version,
+        "params": params or {},
+        "messages": messages or []
+    }
+    canonical = json.dumps(
+        payload,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUCache:
+    """线程安全的内存LRU缓存，支持TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取缓存值，过期或不存在时返回None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """写入缓存值，超出容量时淘汰最久未使用的条目"""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> List[str]:
+        """当前缓存的键(含尚未清理的过期条目)"""
+        with self._lock:
+            return list(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheStore:
+    """
+    基于SQLite的磁盘缓存
+
+    特点:
+    1. 条目按TTL过期
+    2. 总大小超过max_bytes时按最近访问时间淘汰
+    3. WAL模式，允许多个进程同时读写
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: Optional[float] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取缓存值，过期或不存在时返回None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """写入缓存值，并在超出容量时淘汰旧条目"""
+        now = time.time()
+        serialized = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(serialized.encode("utf-8"))
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, serialized, size, now, now, expires_at)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目，并按最近访问时间淘汰直到总大小不超过max_bytes"""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        overflow = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+            victims.append((key,))
+            overflow -= size
+            if overflow <= 0:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        log.info(f"LLM磁盘缓存淘汰 {len(victims)} 条记录")
+
+    def total_bytes(self) -> int:
+        """缓存占用的总字节数"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    两级LLM响应缓存
+
+    缓存值为字典，至少包含:
+    - content: 模型回复内容
+    - reasoning: 思考过程(可选)
+    - usage: token使用量(可选)
+    - latency: 原始调用耗时(秒)，用于统计命中节省的时间
+    """
+
+    def __init__(
+        self,
+        memory_cache: Optional[MemoryLRUCache] = None,
+        disk_cache: Optional[SQLiteCacheStore] = None,
+        enabled: bool = True
+    ):
+        self.memory_cache = memory_cache if memory_cache is not None else MemoryLRUCache()
+        self.disk_cache = disk_cache
+        self.enabled = enabled
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "saved_seconds": 0.0,
+            "saved_tokens": 0
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存，依次查找内存和磁盘
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，未命中时返回None
+        """
+        if not self.enabled:
+            return None
+
+        value = self.memory_cache.get(key)
+        tier = "memory_hits"
+        if value is None and self.disk_cache is not None:
+            try:
+                value = self.disk_cache.get(key)
+            except sqlite3.Error as e:
+                log.error(f"读取LLM磁盘缓存失败: {e}")
+                value = None
+            if value is not None:
+                # 回填内存层
+                self.memory_cache.set(key, value)
+                tier = "disk_hits"
+
+        with self._stats_lock:
+            if value is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats[tier] += 1
+                self._stats["saved_seconds"] += float(value.get("latency") or 0.0)
+                self._stats["saved_tokens"] += int((value.get("usage") or {}).get("total_tokens") or 0)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if not self.enabled:
+            return
+
+        self.memory_cache.set(key, value)
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.set(key, value)
+            except sqlite3.Error as e:
+                log.error(f"写入LLM磁盘缓存失败: {e}")
+        with self._stats_lock:
+            self._stats["writes"] += 1
+
+    def clear(self) -> None:
+        """清空所有缓存层"""
+        self.memory_cache.clear()
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中/未命中次数、命中率以及节省的时间和token
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory_cache)
+        return stats
+
+    def reset_stats(self) -> None:
+        """重置统计信息"""
+        with self._stats_lock:
+            for key in self._stats:
+                self._stats[key] = 0.0 if isinstance(self._stats[key], float) else 0
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """
+    获取进程级共享的LLM响应缓存，首次调用时根据配置创建
+
+    配置项(llm_cache.*):
+        enabled: 是否启用缓存
+        memory_max_entries: 内存层最大条目数
+        disk_enabled: 是否启用磁盘层
+        disk_path: 磁盘缓存文件路径(相对路径基于项目根目录)
+        ttl_seconds: 缓存有效期(秒)，0表示永不过期
+        max_disk_bytes: 磁盘层最大字节数
+
+    Returns:
+        LLMResponseCache实例
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                config = ConfigManager()
+                ttl_seconds = config.get_int("llm_cache.ttl_seconds", 7 * 24 * 3600) or None
+                memory_cache = MemoryLRUCache(
+                    max_entries=config.get_int("llm_cache.memory_max_entries", 1024),
+                    ttl_seconds=ttl_seconds
+                )
+
+                disk_cache = None
+                if config.get_boolean("llm_cache.disk_enabled", True):
+                    disk_path = Path(config.get_string("llm_cache.disk_path", ".cache/llm_cache.sqlite3"))
+                    if not disk_path.is_absolute():
+                        disk_path = project_root / disk_path
+                    try:
+                        disk_cache = SQLiteCacheStore(
+                            disk_path,
+                            ttl_seconds=ttl_seconds,
+                            max_bytes=config.get_int("llm_cache.max_disk_bytes", 256 * 1024 * 1024)
+                        )
+                    except sqlite3.Error as e:
+                        log.error(f"初始化LLM磁盘缓存失败，仅使用内存缓存: {e}")
+
+                _llm_cache = LLMResponseCache(
+                    memory_cache=memory_cache,
+                    disk_cache=disk_cache,
+                    enabled=config.get_boolean("llm_cache.enabled", True)
+                )
+                log.info(f"LLM响应缓存初始化完成，启用: {_llm_cache.enabled}, 磁盘层: {disk_cache is not None}")
+    return _llm_cache
@@ -1,7 +1,7 @@
-from src.prompts import WORD_SEGMENTATION_PROMPT, ENTITY_EXTRACTION_PROMPT, QUERY_UNDERSTANDING_PROMPT
+from src.prompts import WORD_SEGMENTATION_PROMPT, ENTITY_EXTRACTION_PROMPT, QUERY_UNDERSTANDING_PROMPT, FUSED_QU_PROMPT
 from src.utils.logger import get_logger
 from langchain_core.prompts import ChatPromptTemplate
-from src.models.streaming_adapter import STREAMING_MODELS, StreamingLLMAdapter
+from src.models.adapter_pool import get_adapter_from_config
 
 class QuModel:
     def __init__(self, state, node_name):
@@ -11,14 +11,8 @@ class QuModel:
         self.model = self.get_model_by_node_name(node_name)
         self.prompt = self.get_prompt_by_node_name(node_name)
         self.template_variables = self.get_template_variables_by_node_name(node_name)
-        self.qwen_llm = StreamingLLMAdapter(
-            model=self.model,
-            api_key=self.state["config"].get("api.qwen.api_key"),
-            base_url=self.state["config"].get("api.qwen.base_url", ""),
-            streaming_models=self.state["config"].get("api.qwen.streaming_models", STREAMING_MODELS),
-            stream_enabled=self.state["config"].get("api.qwen.stream_enabled", True),
-            **self.state["config"].get("api.qwen.default_params", {})
-        )
+        # 从注册表获取共享适配器，复用HTTP连接
+        self.qwen_llm = get_adapter_from_config(self.state["config"], self.model)
     
     def get_model_by_node_name(self, node_name) -> str:
         if node_name == "word_segmentation":
@@ -27,6 +21,8 @@ class QuModel:
             return self.state.get("ner_model")
         elif node_name == "intent":
             return self.state.get("intent_model")
+        elif node_name == "fused":
+            return self.state.get("fused_model") or self.state.get("intent_model")
         else:
             return None
     
@@ -37,6 +33,8 @@ class QuModel:
             return ENTITY_EXTRACTION_PROMPT
         elif node_name == "intent":
             return QUERY_UNDERSTANDING_PROMPT
+        elif node_name == "fused":
+            return FUSED_QU_PROMPT
         else:
             return None
     
@@ -47,6 +45,8 @@ class QuModel:
             return {"INPUT_TEXT": self.state.get("query")}
         elif node_name == "intent":
             return {"INPUT_TEXT": self.state.get("query")}
+        elif node_name == "fused":
+            return {"INPUT_TEXT": self.state.get("query")}
         else:
             return None
 
@@ -77,8 +77,11 @@ class QuModel:
             
             self.log.info(f"{self.node_name} 完成，结果长度: {len(result.content)}, 结果: {result.content}")
             
-            # 返回结果，包括思考过程（如果有）
-            result_dict = {"final_output": result.content}
+            # 返回结果，包括思考过程（如果有）和token使用量
+            result_dict = {
+                "final_output": result.content,
+                "token_usage": result.response_metadata.get("token_usage", {})
+            }
             if reasoning:
                 result_dict["final_reasoning"] = reasoning
                 
@@ -1,6 +1,10 @@
 import dashscope
+import time
 from typing import Any, Dict, Optional
 from .base import BaseModel
+from .llm_backend import generation_call
+from .llm_cache import get_llm_cache, make_cache_key
+from .rate_limiter import estimate_call_tokens, get_rate_limiter
 from src.config.config_manager import ConfigManager
 from src.utils.logger import get_logger
 
@@ -18,6 +22,7 @@ class QWENModel(BaseModel):
         dashscope.api_key = config.get('api_key')
         self.model_version = config.get('model_version', 'qwen-turbo')
         self.default_params = config.get('default_params', {})
+        self.cache_enabled = config.get('cache_enabled', True)
         
         self.log.debug(f"使用模型版本: {self.model_version}")
         self.log.debug(f"默认参数: {self.default_params}")
@@ -25,6 +30,21 @@ class QWENModel(BaseModel):
             self.log.error("缺少API密钥，无法初始化QWEN模型")
             raise ValueError("API key is required for QWEN model")
 
+    def _call_generation(self, messages, **kwargs):
+        """
+        Call DashScope Generation through the per-model rate limiter
+        (token buckets, adaptive concurrency and retry with backoff)
+        """
+        def call():
+            return generation_call(self.model_version, messages, **kwargs)
+
+        limiter = get_rate_limiter(self.model_version)
+        if limiter is None:
+            return call()
+        if kwargs.get('stream'):
+            return limiter.call_stream(call, estimate_call_tokens(messages))
+        return limiter.call(call, estimate_call_tokens(messages))
+
     def generateDistributor(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Distribute the generation task to the model
@@ -51,9 +71,24 @@ class QWENModel(BaseModel):
             
             messages = [{'role': 'user', 'content': prompt}]
             
-            response = dashscope.Generation.call(
-                model=self.model_version,
-                messages=messages,
+            cache_key = None
+            if self.cache_enabled:
+                cache_key = make_cache_key(self.model_version, {**self.default_params, **kwargs}, messages)
+                cached = get_llm_cache().get(cache_key)
+                if cached is not None:
+                    self.log.info(f"命中LLM响应缓存，响应长度: {len(cached['content'])}")
+                    return {
+                        'success': True,
+                        'response': cached['content'],
+                        'raw_response': None,
+                        'status_code': 200,
+                        'usage': cached.get('usage'),
+                        'cached': True
+                    }
+            
+            start_time = time.time()
+            response = self._call_generation(
+                messages,
                 result_format='message',  # or 'text'
                 **kwargs  # Additional parameters like temperature, top_p
             )
@@ -63,6 +98,13 @@ class QWENModel(BaseModel):
                 self.log.info(f"生成成功，响应长度: {len(content)}")
                 self.log.debug(f"使用令牌: {response.usage}")
                 
+                if cache_key:
+                    get_llm_cache().set(cache_key, {
+                        'content': content,
+                        'usage': dict(response.usage or {}),
+                        'latency': time.time() - start_time
+                    })
+                
                 return {
                     'success': True,
                     'response': content,
@@ -110,9 +152,8 @@ class QWENModel(BaseModel):
 
             messages = [{'role': 'user', 'content': prompt}]
 
-            response = dashscope.Generation.call(
-                model=self.model_version,
-                messages=messages,
+            response = self._call_generation(
+                messages,
                 stream=True,
                 **kwargs
             )
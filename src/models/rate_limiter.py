@@ -0,0 +1,595 @@
+"""
+LLM Rate Limiter
+
+DashScope调用的限流与重试层，按模型分别控制:
+1. 令牌桶: 同时限制每分钟请求数(RPM)和每分钟token数(TPM)。调用前按prompt估算token数预留配额，
+   调用完成后按实际用量校正；配置shared_state_dir时桶状态保存在本地文件中并用文件锁保护，
+   同一台机器上的多个进程(如批量答题的工作进程)共享配额
+2. AIMD自适应并发: 每次调用成功时并发上限缓慢增加，遇到限流错误时按比例减小
+3. 限流错误、5xx和网络异常按带抖动的指数退避重试，重试耗尽后把最后一次的响应或异常交给调用方
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import requests
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+from src.utils.token_counter import estimate_message_tokens
+from src.utils.tracing import increment_span
+
+try:
+    import fcntl
+except ImportError:  # Windows没有fcntl，共享配额退化为进程内配额
+    fcntl = None
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# 可以重试的网络异常
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    ConnectionError,
+    TimeoutError
+)
+
+
+def is_throttling_response(response: Any) -> bool:
+    """DashScope限流响应: HTTP 429或错误码以Throttling开头(如Throttling.RateQuota)"""
+    code = str(getattr(response, "code", "") or "")
+    return getattr(response, "status_code", None) == 429 or code.startswith("Throttling")
+
+
+def is_retryable_response(response: Any) -> bool:
+    """限流和服务端错误可以重试，参数错误等4xx不重试"""
+    status_code = getattr(response, "status_code", None)
+    return is_throttling_response(response) or (isinstance(status_code, int) and status_code >= 500)
+
+
+def response_tokens(response: Any) -> Optional[int]:
+    """从响应的usage中读取实际消耗的token数，没有usage时返回None"""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return None
+    usage = dict(usage)
+    total = usage.get("total_tokens")
+    if total is None:
+        total = (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+    return total or None
+
+
+def estimate_call_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    预留配额时的token数: prompt估计值 + 配置的输出token估计值
+
+    Args:
+        messages: DashScope格式的消息列表
+
+    Returns:
+        估计的token数
+    """
+    output_tokens = ConfigManager().get_int("api.qwen.rate_limit.estimated_output_tokens", 256)
+    return estimate_message_tokens(messages) + output_tokens
+
+
+class TokenBucket:
+    """
+    进程内令牌桶
+
+    采用预留语义: reserve()立即扣减令牌(允许为负)并返回需要等待的秒数，
+    大于桶容量的请求同样可以通过，只是等待更久。
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        预留令牌
+
+        Args:
+            amount: 令牌数
+
+        Returns:
+            需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """按实际用量校正: delta为正表示追加扣减，为负表示归还"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class FileTokenBucket:
+    """
+    跨进程共享的令牌桶
+
+    状态({"tokens", "updated"})保存在本地JSON文件中，每次读写持有文件排他锁，
+    时间使用墙上时钟，保证不同进程的计算一致。
+    """
+
+    def __init__(self, path: Path, rate_per_second: float, capacity: float):
+        self.path = Path(path)
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+
+    def _update(self, delta: float) -> float:
+        with open(self.path, "r+", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                content = f.read()
+                state = json.loads(content) if content.strip() else {}
+                now = time.time()
+                tokens = state.get("tokens", self.capacity)
+                updated = state.get("updated", now)
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate) - delta
+                tokens = min(self.capacity, tokens)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "updated": now}))
+                f.flush()
+                return tokens
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def reserve(self, amount: float) -> float:
+        tokens = self._update(amount)
+        return max(0.0, -tokens / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        self._update(delta)
+
+
+def _wake_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD自适应并发上限
+
+    成功一次上限增加increase/limit(约每轮增加increase)，限流一次上限乘以decrease_factor。
+    同一时间窗口内的多次限流只减小一次，避免在途请求同时失败时上限直接降到最小值。
+    同步调用(acquire)和各事件循环中的异步调用(aacquire)共用同一个上限。
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_interval: float = 1.0
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def acquire(self) -> None:
+        """阻塞直到在途请求数低于当前上限"""
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def aacquire(self) -> None:
+        """异步等待直到在途请求数低于当前上限，等待期间不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < max(1, int(self.limit)):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def _notify(self) -> None:
+        """唤醒一个同步等待者和全部异步等待者(被唤醒后重新检查上限)，调用方需持有_condition"""
+        self._condition.notify()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_waiter, waiter)
+            except RuntimeError:  # 事件循环已关闭
+                pass
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            before = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + self.increase / max(self.limit, 1.0))
+            if int(self.limit) > before:
+                self._notify()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.decrease_interval:
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            log.warning(f"[RATE_LIMIT] 触发限流，并发上限降为 {self.limit:.1f}")
+
+
+class ModelRateLimiter:
+    """单个模型的限流器: 令牌桶 + AIMD并发 + 退避重试"""
+
+    def __init__(
+        self,
+        model: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+        max_attempts: int = 3,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        shared_state_dir: Optional[str] = None
+    ):
+        self.model = model
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter()
+        self.max_attempts = max(1, max_attempts)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.request_bucket = self._create_bucket("requests", requests_per_minute, shared_state_dir)
+        self.token_bucket = self._create_bucket("tokens", tokens_per_minute, shared_state_dir)
+        # 文件令牌桶读写时持有阻塞的文件锁，异步调用中放到线程里执行
+        self._file_buckets = any(isinstance(bucket, FileTokenBucket)
+                                 for bucket in (self.request_bucket, self.token_bucket))
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "wait_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _create_bucket(self, kind: str, per_minute: float, shared_state_dir: Optional[str]):
+        if not per_minute:
+            return None
+        rate = per_minute / 60.0
+        if shared_state_dir and fcntl is not None:
+            safe_name = re.sub(r"[^\w.-]", "_", self.model)
+            return FileTokenBucket(Path(shared_state_dir) / f"{safe_name}.{kind}.json", rate, per_minute)
+        return TokenBucket(rate, per_minute)
+
+    def _count(self, field: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[field] += value
+
+    def _count_retry(self) -> None:
+        """统计重试次数，同时记到当前追踪span上"""
+        self._count("retries")
+        increment_span("retries")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第attempt次重试前的等待时间: 指数增长，取上限的一半到全部之间的随机值"""
+        delay = min(self.max_delay, self.initial_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = self.request_bucket.reserve(1)
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+        if wait > 0:
+            self._count("wait_seconds", wait)
+            log.info(f"[RATE_LIMIT] {self.model} 配额不足，等待 {wait:.2f}秒")
+        return wait
+
+    def _settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        if self.token_bucket is not None and actual_tokens is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+
+    async def _areserve(self, estimated_tokens: int) -> float:
+        if self._file_buckets:
+            return await asyncio.to_thread(self._reserve, estimated_tokens)
+        return self._reserve(estimated_tokens)
+
+    async def _asettle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        if self._file_buckets:
+            await asyncio.to_thread(self._settle, estimated_tokens, actual_tokens)
+        else:
+            self._settle(estimated_tokens, actual_tokens)
+
+    def _on_retryable_response(self, response: Any, attempt: int) -> bool:
+        """记录可重试的失败响应，返回是否还能继续重试"""
+        if is_throttling_response(response):
+            self._count("throttled")
+            self.concurrency.on_throttle()
+        if attempt + 1 >= self.max_attempts:
+            log.error(f"[RATE_LIMIT] {self.model} 重试{self.max_attempts}次后仍失败: "
+                      f"{getattr(response, 'code', '')} {getattr(response, 'message', '')}")
+            return False
+        self._count_retry()
+        return True
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """
+        在限流和重试保护下执行一次非流式调用
+
+        Args:
+            fn: 发起DashScope调用的函数
+            estimated_tokens: 预估消耗的token数
+
+        Returns:
+            DashScope响应，重试耗尽时返回最后一次的失败响应
+        """
+        self._count("calls")
+        for attempt in range(self.max_attempts):
+            time.sleep(self._reserve(estimated_tokens))
+            self.concurrency.acquire()
+            try:
+                response = fn()
+            except RETRYABLE_EXCEPTIONS as e:
+                self._settle(estimated_tokens, 0)
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                self._count_retry()
+                log.warning(f"[RATE_LIMIT] {self.model} 网络异常，准备重试: {e}")
+                time.sleep(self.backoff_delay(attempt))
+                continue
+            finally:
+                self.concurrency.release()
+
+            if getattr(response, "status_code", 200) == 200:
+                self.concurrency.on_success()
+                self._settle(estimated_tokens, response_tokens(response))
+                return response
+            self._settle(estimated_tokens, 0)
+            if not is_retryable_response(response) or not self._on_retryable_response(response, attempt):
+                return response
+            time.sleep(self.backoff_delay(attempt))
+        return response
+
+    def call_stream(self, fn: Callable[[], Iterator[Any]], estimated_tokens: int = 0) -> Iterator[Any]:
+        """
+        在限流和重试保护下执行一次流式调用
+
+        读取第一个chunk判断是否被限流，只有在产出任何内容之前才会重试；
+        并发名额一直占用到流读取完毕或被调用方关闭。
+
+        Args:
+            fn: 发起DashScope流式调用的函数
+            estimated_tokens: 预估消耗的token数
+
+        Yields:
+            DashScope流式响应chunk
+        """
+        self._count("calls")
+        for attempt in range(self.max_attempts):
+            time.sleep(self._reserve(estimated_tokens))
+            self.concurrency.acquire()
+            response = None
+            last_chunk = None
+            try:
+                try:
+                    response = fn()
+                    first = next(iter(response), None)
+                except RETRYABLE_EXCEPTIONS as e:
+                    self._settle(estimated_tokens, 0)
+                    if attempt + 1 >= self.max_attempts:
+                        raise
+                    self._count_retry()
+                    log.warning(f"[RATE_LIMIT] {self.model} 网络异常，准备重试: {e}")
+                    delay = self.backoff_delay(attempt)
+                else:
+                    if first is not None and getattr(first, "status_code", 200) != 200:
+                        self._settle(estimated_tokens, 0)
+                        if is_retryable_response(first) and self._on_retryable_response(first, attempt):
+                            delay = self.backoff_delay(attempt)
+                        else:
+                            yield first
+                            return
+                    else:
+                        if first is not None:
+                            last_chunk = first
+                            yield first
+                        for chunk in response:
+                            last_chunk = chunk
+                            yield chunk
+                        self.concurrency.on_success()
+                        self._settle(estimated_tokens, response_tokens(last_chunk))
+                        return
+            finally:
+                self.concurrency.release()
+                if response is not None and hasattr(response, "close"):
+                    response.close()
+            time.sleep(delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """
+        在限流和重试保护下执行一次异步非流式调用
+
+        Args:
+            fn: 返回DashScope调用协程的函数
+            estimated_tokens: 预估消耗的token数
+
+        Returns:
+            DashScope响应，重试耗尽时返回最后一次的失败响应
+        """
+        self._count("calls")
+        for attempt in range(self.max_attempts):
+            await asyncio.sleep(await self._areserve(estimated_tokens))
+            await self.concurrency.aacquire()
+            try:
+                response = await fn()
+            except RETRYABLE_EXCEPTIONS as e:
+                await self._asettle(estimated_tokens, 0)
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                self._count_retry()
+                log.warning(f"[RATE_LIMIT] {self.model} 网络异常，准备重试: {e}")
+                await asyncio.sleep(self.backoff_delay(attempt))
+                continue
+            finally:
+                self.concurrency.release()
+
+            if getattr(response, "status_code", 200) == 200:
+                self.concurrency.on_success()
+                await self._asettle(estimated_tokens, response_tokens(response))
+                return response
+            await self._asettle(estimated_tokens, 0)
+            if not is_retryable_response(response) or not self._on_retryable_response(response, attempt):
+                return response
+            await asyncio.sleep(self.backoff_delay(attempt))
+        return response
+
+    async def acall_stream(
+        self,
+        fn: Callable[[], Awaitable[AsyncIterator[Any]]],
+        estimated_tokens: int = 0
+    ) -> AsyncIterator[Any]:
+        """
+        在限流和重试保护下执行一次异步流式调用
+
+        只有在产出任何内容之前才会重试；并发名额一直占用到流读取完毕或被调用方关闭。
+
+        Args:
+            fn: 返回DashScope异步流式调用协程的函数
+            estimated_tokens: 预估消耗的token数
+
+        Yields:
+            DashScope流式响应chunk
+        """
+        self._count("calls")
+        for attempt in range(self.max_attempts):
+            await asyncio.sleep(await self._areserve(estimated_tokens))
+            await self.concurrency.aacquire()
+            try:
+                try:
+                    response = await fn()
+                    first = await response.__anext__()
+                except StopAsyncIteration:
+                    return
+                except RETRYABLE_EXCEPTIONS as e:
+                    await self._asettle(estimated_tokens, 0)
+                    if attempt + 1 >= self.max_attempts:
+                        raise
+                    self._count_retry()
+                    log.warning(f"[RATE_LIMIT] {self.model} 网络异常，准备重试: {e}")
+                    delay = self.backoff_delay(attempt)
+                else:
+                    if getattr(first, "status_code", 200) != 200:
+                        await self._asettle(estimated_tokens, 0)
+                        if is_retryable_response(first) and self._on_retryable_response(first, attempt):
+                            delay = self.backoff_delay(attempt)
+                        else:
+                            yield first
+                            return
+                    else:
+                        last_chunk = first
+                        yield first
+                        async for chunk in response:
+                            last_chunk = chunk
+                            yield chunk
+                        self.concurrency.on_success()
+                        await self._asettle(estimated_tokens, response_tokens(last_chunk))
+                        return
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调用、重试、限流次数和当前并发上限"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["concurrency_limit"] = self.concurrency.limit
+        stats["in_flight"] = self.concurrency.in_flight
+        return stats
+
+
+_rate_limiters: Dict[str, Optional[ModelRateLimiter]] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> Optional[ModelRateLimiter]:
+    """
+    获取模型共享的限流器
+
+    配置项(api.qwen.rate_limit.*，models下可按模型覆盖):
+        enabled: 是否启用
+        requests_per_minute: 每分钟请求数，0表示不限制
+        tokens_per_minute: 每分钟token数，0表示不限制
+        estimated_output_tokens: 预留配额时估计的输出token数
+        shared_state_dir: 跨进程共享配额的状态目录，为空时只在进程内限流
+        concurrency.initial/min/max: AIMD并发上限
+    重试配置(api.qwen.retry.*): max_attempts, initial_delay, max_delay
+
+    Args:
+        model: 模型名称
+
+    Returns:
+        ModelRateLimiter实例，未启用时返回None
+    """
+    if model in _rate_limiters:
+        return _rate_limiters[model]
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            config = ConfigManager()
+            if not config.get_boolean("api.qwen.rate_limit.enabled", True):
+                _rate_limiters[model] = None
+                return None
+            options = dict(config.get("api.qwen.rate_limit", {}) or {})
+            options.update((options.get("models") or {}).get(model) or {})
+            concurrency = options.get("concurrency") or {}
+
+            shared_state_dir = options.get("shared_state_dir")
+            if shared_state_dir and not Path(shared_state_dir).is_absolute():
+                shared_state_dir = str(project_root / shared_state_dir)
+
+            _rate_limiters[model] = ModelRateLimiter(
+                model,
+                requests_per_minute=float(options.get("requests_per_minute") or 0),
+                tokens_per_minute=float(options.get("tokens_per_minute") or 0),
+                concurrency=AdaptiveConcurrencyLimiter(
+                    initial_limit=concurrency.get("initial", 8),
+                    min_limit=concurrency.get("min", 1),
+                    max_limit=concurrency.get("max", 32)
+                ),
+                max_attempts=config.get_int("api.qwen.retry.max_attempts", 3),
+                initial_delay=float(config.get("api.qwen.retry.initial_delay", 1)),
+                max_delay=float(config.get("api.qwen.retry.max_delay", 30)),
+                shared_state_dir=shared_state_dir
+            )
+            log.info(f"[RATE_LIMIT] 创建模型限流器 {model}: {options.get('requests_per_minute')} RPM, "
+                     f"{options.get('tokens_per_minute')} TPM, 共享配额: {bool(shared_state_dir)}")
+    return _rate_limiters[model]
@@ -6,7 +6,8 @@ Streaming LLM Adapter for LangChain
 支持工具调用功能。
 """
 
-from typing import Any, Dict, List, Optional, Union, Iterator, Callable
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union, Iterator, Callable
+import itertools
 import time
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
@@ -18,11 +19,18 @@ from langchain_core.messages import (
     ToolMessage
 )
 from langchain_core.outputs import ChatGenerationChunk, ChatResult
-from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+from langchain_core.callbacks.manager import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 from langchain_core.tools import BaseTool
 from src.utils.logger import get_logger
 import dashscope
 from src.config.config_manager import ConfigManager
+from src.models.llm_cache import get_llm_cache, make_cache_key
+from src.models.aio_pool import get_aio_resources
+from src.models.hedging import get_hedged_caller
+from src.models.llm_backend import aio_generation_call, generation_call
+from src.models.rate_limiter import estimate_call_tokens, get_rate_limiter
+from src.utils.token_counter import estimate_message_tokens, estimate_tokens
+from src.utils.tracing import annotate_span, traced
 
 log = get_logger()
 
@@ -30,6 +38,11 @@ log = get_logger()
 STREAMING_MODELS = ['qwq-32b', 'qwq-plus', 'qwq-plus-latest']
 
 
+def _llm_span_name(adapter: "StreamingLLMAdapter", *args, **kwargs) -> str:
+    """LLM调用的追踪span以模型名称命名"""
+    return adapter.model_version
+
+
 class StreamingLLMAdapter(BaseChatModel):
     """
     同时支持流式和非流式输出的LangChain适配器
@@ -40,15 +53,23 @@ class StreamingLLMAdapter(BaseChatModel):
     3. 完全兼容LangChain接口
     4. 支持回调，可用于UI展示流式输出
     5. 支持工具调用功能
+    6. 支持基于内容寻址的响应缓存
+    7. 原生异步调用(_agenerate/_astream)，共享连接池并限制并发
+    8. 按模型限流(RPM/TPM令牌桶、AIMD自适应并发)，限流错误自动退避重试
+    9. 可选的对冲请求，降低同步调用的尾延迟
+    10. 可切换为录制/回放/合成后端(llm_backend.mode)，用于离线基准测试
+    11. 每次调用记录llm类别的追踪span(token数、缓存命中、重试次数)
     """
     
     model_version: str = "qwen-turbo"
     streaming_models: List[str] = STREAMING_MODELS
     stream_enabled: bool = True
+    cache_enabled: bool = True
     api_key: Optional[str] = None
     base_url: Optional[str] = None
     default_params: Dict[str, Any] = {}
     _tools: Optional[List[BaseTool]] = None
+    _session: Optional[Any] = None
     
     def __init__(
         self,
@@ -57,6 +78,7 @@ class StreamingLLMAdapter(BaseChatModel):
         base_url: Optional[str] = None,
         streaming_models: Optional[List[str]] = None,
         stream_enabled: bool = True,
+        cache_enabled: bool = True,
         **kwargs
     ):
         """
@@ -68,6 +90,7 @@ class StreamingLLMAdapter(BaseChatModel):
             base_url: API基础URL
             streaming_models: 支持流式输出的模型列表
             stream_enabled: 是否启用流式输出(如设为False将强制禁用流式)
+            cache_enabled: 是否启用响应缓存
             **kwargs: 其他参数，将作为默认参数传递给模型
         """
         super().__init__(**kwargs)
@@ -76,6 +99,7 @@ class StreamingLLMAdapter(BaseChatModel):
         self.base_url = base_url
         self.default_params = kwargs
         self.stream_enabled = stream_enabled
+        self.cache_enabled = cache_enabled
         self._tools = []
         
         if streaming_models:
@@ -113,14 +137,109 @@ class StreamingLLMAdapter(BaseChatModel):
             base_url=self.base_url,
             streaming_models=self.streaming_models,
             stream_enabled=self.stream_enabled,
+            cache_enabled=self.cache_enabled,
             **self.default_params
         )
         
         # 存储工具信息
         new_instance._tools = tools
+        new_instance._session = self._session
         
         return new_instance
     
+    def set_http_session(self, session: Any) -> None:
+        """
+        设置调用DashScope时复用的HTTP会话
+        
+        Args:
+            session: requests.Session实例，为None时由DashScope自行管理连接
+        """
+        self._session = session
+    
+    def _call_kwargs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        构造DashScope调用参数，存在共享会话时附加session
+        
+        Args:
+            params: 模型参数
+            
+        Returns:
+            调用参数
+        """
+        if self._session is None:
+            return params
+        return {**params, "session": self._session}
+    
+    def _call_generation(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """
+        调用DashScope Generation接口，经过模型限流器(令牌桶、自适应并发、退避重试)
+        
+        Args:
+            messages: DashScope格式的消息列表
+            **kwargs: 调用参数，stream=True时返回chunk迭代器
+            
+        Returns:
+            DashScope响应或流式chunk迭代器
+        """
+        def call():
+            return generation_call(self.model_version, messages, **kwargs)
+        
+        limiter = get_rate_limiter(self.model_version)
+        if limiter is None:
+            return call()
+        if kwargs.get("stream"):
+            return limiter.call_stream(call, estimate_call_tokens(messages))
+        return limiter.call(call, estimate_call_tokens(messages))
+    
+    def _hedged_call(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """
+        非流式调用，启用对冲时主请求超过延迟分位数后发出对冲请求，先成功返回的胜出
+        
+        Args:
+            messages: DashScope格式的消息列表
+            **kwargs: 调用参数
+            
+        Returns:
+            DashScope响应
+        """
+        def call():
+            return self._call_generation(messages, **kwargs)
+        
+        hedger = get_hedged_caller(self.model_version)
+        if hedger is None:
+            return call()
+        return hedger.call(call, accept=lambda response: getattr(response, "status_code", 200) == 200)
+    
+    def _open_hedged_stream(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[Any]:
+        """
+        打开流式响应，启用对冲时按首个chunk的到达时间竞速，落后的响应流被关闭
+        
+        Args:
+            messages: DashScope格式的消息列表
+            **kwargs: 调用参数
+            
+        Returns:
+            流式chunk迭代器
+        """
+        hedger = get_hedged_caller(self.model_version, stream=True)
+        if hedger is None:
+            return self._call_generation(messages, stream=True, **kwargs)
+        
+        def open_stream():
+            response = self._call_generation(messages, stream=True, **kwargs)
+            return next(iter(response), None), response
+        
+        def close_stream(opened):
+            if hasattr(opened[1], "close"):
+                opened[1].close()
+        
+        first, response = hedger.call(
+            open_stream,
+            accept=lambda opened: opened[0] is not None and getattr(opened[0], "status_code", 200) == 200,
+            discard=close_stream
+        )
+        return itertools.chain([] if first is None else [first], response)
+    
     def is_streaming_model(self) -> bool:
         """
         根据当前配置判断是否使用流式API
@@ -280,24 +399,22 @@ Final Answer: 最终答案
         log.info(f"解析完成，共找到 {len(tool_calls)} 个工具调用")
         return tool_calls
     
-    def _generate(
+    def _prepare_request(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs
-    ) -> ChatResult:
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         """
-        生成回复
+        合并调用参数并转换消息格式
         
         Args:
             messages: 输入消息列表
             stop: 停止序列
-            run_manager: 回调管理器
             **kwargs: 其他参数
             
         Returns:
-            ChatResult对象
+            (DashScope格式的消息列表, 调用参数)
         """
         # 合并默认参数和传入的参数
         params = {**self.default_params, **kwargs}
@@ -320,13 +437,124 @@ Final Answer: 最终答案
             # 转换消息格式
             dashscope_messages = self._convert_messages_to_prompt(messages)
         
-        # 是否使用流式API
-        use_stream = self.is_streaming_model()
+        return dashscope_messages, params
+    
+    def _build_ai_message(self, content: str, usage: Optional[Dict[str, Any]] = None) -> AIMessage:
+        """
+        根据模型输出创建AIMessage，有工具绑定时解析工具调用
+        
+        Args:
+            content: 模型输出内容
+            usage: token使用量，会写入response_metadata["token_usage"]
+            
+        Returns:
+            AIMessage对象
+        """
+        response_metadata = {"token_usage": usage} if usage else {}
+        if self._tools:
+            tool_calls = self._parse_tool_calls(content)
+            if tool_calls:
+                log.info(f"检测到工具调用: {tool_calls}")
+                return AIMessage(content=content, tool_calls=tool_calls, response_metadata=response_metadata)
+        return AIMessage(content=content, response_metadata=response_metadata)
+    
+    def _get_cache_key(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+        """
+        计算请求的缓存键，未启用缓存时返回None
         
-        if use_stream:
-            return self._stream_generate(dashscope_messages, run_manager, **params)
+        Args:
+            messages: DashScope格式的消息列表
+            params: 调用参数
+            
+        Returns:
+            缓存键
+        """
+        if not self.cache_enabled:
+            return None
+        return make_cache_key(self.model_version, params, messages)
+    
+    @staticmethod
+    def _annotate_span(
+        messages: List[Dict[str, str]],
+        content: str,
+        usage: Optional[Dict[str, Any]] = None,
+        cache_hit: bool = False
+    ) -> None:
+        """记录当前LLM span的token数和缓存命中，响应没有usage时按文本估算"""
+        usage = usage or {}
+        annotate_span(
+            cache_hit=cache_hit,
+            tokens_in=usage.get("input_tokens") or estimate_message_tokens(messages),
+            tokens_out=usage.get("output_tokens") or estimate_tokens(content)
+        )
+    
+    @traced("llm", _llm_span_name)
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> ChatResult:
+        """
+        生成回复
+        
+        Args:
+            messages: 输入消息列表
+            stop: 停止序列
+            run_manager: 回调管理器
+            **kwargs: 其他参数
+            
+        Returns:
+            ChatResult对象
+        """
+        dashscope_messages, params = self._prepare_request(messages, stop, **kwargs)
+        return self._cached_generate(dashscope_messages, run_manager, **params)
+    
+    def _cached_generate(
+        self,
+        messages: List[Dict[str, str]],
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> ChatResult:
+        """
+        先查询响应缓存，未命中时调用模型并写入缓存
+        
+        Args:
+            messages: DashScope格式的消息列表
+            run_manager: 回调管理器
+            **kwargs: 调用参数
+            
+        Returns:
+            ChatResult对象
+        """
+        cache_key = self._get_cache_key(messages, kwargs)
+        if cache_key:
+            cached = get_llm_cache().get(cache_key)
+            if cached is not None:
+                log.info(f"命中LLM响应缓存 {self.model_version}")
+                self._annotate_span(messages, cached["content"], cached.get("usage"), cache_hit=True)
+                if run_manager:
+                    run_manager.on_llm_new_token(cached["content"])
+                return ChatResult(generations=[{"message": self._build_ai_message(cached["content"])}])
+        
+        start_time = time.time()
+        
+        # 是否使用流式API
+        if self.is_streaming_model():
+            result = self._stream_generate(messages, run_manager, **kwargs)
         else:
-            return self._non_stream_generate(dashscope_messages, run_manager, **params)
+            result = self._non_stream_generate(messages, run_manager, **kwargs)
+        self._annotate_span(messages, result.generations[0].message.content, (result.llm_output or {}).get("token_usage"))
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, {
+                "content": result.generations[0].message.content,
+                "usage": (result.llm_output or {}).get("token_usage", {}),
+                "latency": time.time() - start_time
+            })
+        
+        return result
     
     def _non_stream_generate(
         self,
@@ -349,11 +577,10 @@ Final Answer: 最终答案
         log.info(f"非流式调用模型 {self.model_version}")
         
         try:
-            response = dashscope.Generation.call(
-                model=self.model_version,
-                messages=messages,
+            response = self._hedged_call(
+                messages,
                 result_format='message',
-                **kwargs
+                **self._call_kwargs(kwargs)
             )
             
             end_time = time.time()
@@ -362,28 +589,19 @@ Final Answer: 最终答案
             if response.status_code == 200:
                 content = response.output.choices[0].message.content
                 
+                usage = dict(response.usage or {})
+                
                 # 如果有工具绑定，尝试解析工具调用
-                if self._tools:
-                    tool_calls = self._parse_tool_calls(content)
-                    if tool_calls:
-                        # 创建包含工具调用的AIMessage
-                        message = AIMessage(
-                            content=content,
-                            tool_calls=tool_calls
-                        )
-                        log.info(f"检测到工具调用: {tool_calls}")
-                    else:
-                        # 创建普通AIMessage
-                        message = AIMessage(content=content)
-                else:
-                    # 创建普通AIMessage
-                    message = AIMessage(content=content)
+                message = self._build_ai_message(content, usage)
                 
                 # 回调
                 if run_manager:
                     run_manager.on_llm_new_token(content)
                 
-                return ChatResult(generations=[{"message": message}])
+                return ChatResult(
+                    generations=[{"message": message}],
+                    llm_output={"token_usage": usage}
+                )
             else:
                 error_msg = response.message
                 log.error(f"模型调用失败: {error_msg}")
@@ -419,11 +637,9 @@ Final Answer: 最终答案
             # 完整思考过程
             reasoning_content = ""
             
-            response = dashscope.Generation.call(
-                model=self.model_version,
-                messages=messages,
-                stream=True,
-                **kwargs
+            response = self._open_hedged_stream(
+                messages,
+                **self._call_kwargs(kwargs)
             )
             
             for chunk in response:
@@ -459,21 +675,7 @@ Final Answer: 最终答案
             final_content = reasoning_content + answer_content
             
             # 如果有工具绑定，尝试解析工具调用
-            if self._tools:
-                tool_calls = self._parse_tool_calls(final_content)
-                if tool_calls:
-                    # 创建包含工具调用的AIMessage
-                    message = AIMessage(
-                        content=final_content,
-                        tool_calls=tool_calls
-                    )
-                    log.info(f"检测到工具调用: {tool_calls}")
-                else:
-                    # 创建普通AIMessage
-                    message = AIMessage(content=final_content)
-            else:
-                # 创建普通AIMessage
-                message = AIMessage(content=final_content)
+            message = self._build_ai_message(final_content)
             
             return ChatResult(generations=[{"message": message}])
             
@@ -481,6 +683,7 @@ Final Answer: 最终答案
             log.error(f"流式调用异常: {str(e)}")
             raise
     
+    @traced("llm", _llm_span_name)
     def _stream(
         self,
         messages: List[BaseMessage],
@@ -500,37 +703,31 @@ Final Answer: 最终答案
         Yields:
             ChatGenerationChunk对象
         """
-        # 合并默认参数和传入的参数
-        params = {**self.default_params, **kwargs}
-        
-        # 添加停止序列
-        if stop:
-            params["stop_sequences"] = stop
-        
-        # 如果有工具绑定，创建包含工具信息的prompt
-        if self._tools:
-            # 创建包含工具信息的prompt
-            tool_prompt = self._create_tool_calling_prompt(messages)
-            
-            # 转换消息格式，使用工具prompt
-            dashscope_messages = [{
-                "role": "user",
-                "content": tool_prompt
-            }]
-        else:
-            # 转换消息格式
-            dashscope_messages = self._convert_messages_to_prompt(messages)
+        # force_stream: 调用方需要逐段处理输出(如提前终止生成)时，非流式模型也使用流式API
+        force_stream = kwargs.pop("force_stream", False)
+        # early_stop: 调用方提前停止读取时使用的停止条件名称(如"react_action")，
+        # 计入缓存键，提前终止的输出也按该键写入缓存，命中时由调用方按同样的条件截断
+        early_stop = kwargs.pop("early_stop", None)
+        dashscope_messages, params = self._prepare_request(messages, stop, **kwargs)
         
         # 是否使用流式API
-        use_stream = self.is_streaming_model()
+        use_stream = force_stream or self.is_streaming_model()
         
-        if not use_stream:
-            # 如果不支持流式，使用非流式API并模拟流式输出
-            result = self._non_stream_generate(dashscope_messages, run_manager, **params)
-            message = result.generations[0]["message"]
+        cache_key = self._get_cache_key(dashscope_messages, {**params, "early_stop": early_stop}
+                                        if early_stop else params)
+        cached = get_llm_cache().get(cache_key) if (use_stream and cache_key) else None
+        
+        if not use_stream or cached is not None:
+            # 如果不支持流式或命中缓存，使用完整结果并模拟流式输出
+            if cached is not None:
+                log.info(f"命中LLM响应缓存 {self.model_version}")
+                content = cached["content"]
+                self._annotate_span(dashscope_messages, content, cached.get("usage"), cache_hit=True)
+            else:
+                result = self._cached_generate(dashscope_messages, run_manager, **params)
+                content = result.generations[0].message.content
             
             # 模拟流式输出
-            content = message.content
             for i in range(0, len(content), 10):  # 每次输出10个字符
                 chunk_content = content[i:i+10]
                 chunk = ChatGenerationChunk(message=AIMessageChunk(content=chunk_content))
@@ -540,12 +737,15 @@ Final Answer: 最终答案
             start_time = time.time()
             log.info(f"流式调用模型 {self.model_version}")
             
+            # 累积输出，用于写入缓存
+            full_content = ""
+            
             try:
-                response = dashscope.Generation.call(
-                    model=self.model_version,
-                    messages=dashscope_messages,
+                # 增量输出，每个chunk只包含新生成的内容
+                response = self._call_generation(
+                    dashscope_messages,
                     stream=True,
-                    **params
+                    **self._call_kwargs({"result_format": "message", "incremental_output": True, **params})
                 )
                 
                 for chunk in response:
@@ -559,6 +759,7 @@ Final Answer: 最终答案
                         chunk.output.choices[0].message.reasoning_content != "" and 
                         chunk.output.choices[0].message.content == ""):
                         reasoning_chunk = chunk.output.choices[0].message.reasoning_content
+                        full_content += reasoning_chunk
                         
                         # 回调思考过程
                         if run_manager:
@@ -573,6 +774,7 @@ Final Answer: 最终答案
                     # 处理回复内容
                     elif chunk.output.choices[0].message.content != "":
                         content_chunk = chunk.output.choices[0].message.content
+                        full_content += content_chunk
                         
                         # 回调回复内容
                         if run_manager:
@@ -586,7 +788,259 @@ Final Answer: 最终答案
                 
                 end_time = time.time()
                 log.info(f"流式调用完成，耗时: {end_time - start_time:.2f}秒")
+                self._annotate_span(dashscope_messages, full_content)
+                
+                if cache_key:
+                    get_llm_cache().set(cache_key, {
+                        "content": full_content,
+                        "latency": end_time - start_time
+                    })
                 
+            except GeneratorExit:
+                # 调用方提前停止读取，关闭响应流以取消剩余生成；
+                # 未声明停止条件时不完整的输出不写入缓存
+                log.info(f"流式调用被提前终止，已生成 {len(full_content)} 字符，耗时: {time.time() - start_time:.2f}秒")
+                self._annotate_span(dashscope_messages, full_content)
+                if hasattr(response, "close"):
+                    response.close()
+                if early_stop and cache_key and full_content:
+                    get_llm_cache().set(cache_key, {
+                        "content": full_content,
+                        "latency": time.time() - start_time,
+                        "early_stop": early_stop
+                    })
+                raise
             except Exception as e:
                 log.error(f"流式调用异常: {str(e)}")
-                raise 
\ No newline at end of file
+                raise
+
+    @staticmethod
+    def _split_stream_chunk(chunk: Any) -> Optional[Tuple[str, str]]:
+        """
+        解析流式响应的单个chunk
+        
+        Args:
+            chunk: DashScope流式响应chunk
+            
+        Returns:
+            ("reasoning"或"content", 文本)，空chunk返回None
+        """
+        message = chunk.output.choices[0].message
+        content = message.content or ""
+        reasoning = getattr(message, "reasoning_content", "") or ""
+        if content:
+            return "content", content
+        if reasoning:
+            return "reasoning", reasoning
+        return None
+    
+    @traced("llm", _llm_span_name)
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> ChatResult:
+        """
+        异步生成回复
+        
+        Args:
+            messages: 输入消息列表
+            stop: 停止序列
+            run_manager: 异步回调管理器
+            **kwargs: 其他参数
+            
+        Returns:
+            ChatResult对象
+        """
+        dashscope_messages, params = self._prepare_request(messages, stop, **kwargs)
+        
+        cache_key = self._get_cache_key(dashscope_messages, params)
+        if cache_key:
+            cached = get_llm_cache().get(cache_key)
+            if cached is not None:
+                log.info(f"命中LLM响应缓存 {self.model_version}")
+                self._annotate_span(dashscope_messages, cached["content"], cached.get("usage"), cache_hit=True)
+                if run_manager:
+                    await run_manager.on_llm_new_token(cached["content"])
+                return ChatResult(generations=[{"message": self._build_ai_message(cached["content"])}])
+        
+        start_time = time.time()
+        usage = {}
+        content = ""
+        
+        if self.is_streaming_model():
+            async for chunk in self._astream_dashscope(dashscope_messages, run_manager, **params):
+                content += chunk
+        else:
+            content, usage = await self._anon_stream_call(dashscope_messages, **params)
+            if run_manager:
+                await run_manager.on_llm_new_token(content)
+        self._annotate_span(dashscope_messages, content, usage)
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, {
+                "content": content,
+                "usage": usage,
+                "latency": time.time() - start_time
+            })
+        
+        return ChatResult(
+            generations=[{"message": self._build_ai_message(content, usage)}],
+            llm_output={"token_usage": usage}
+        )
+    
+    async def _anon_stream_call(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        异步非流式调用模型
+        
+        Args:
+            messages: DashScope格式的消息列表
+            **kwargs: 调用参数
+            
+        Returns:
+            (回复内容, token使用量)
+        """
+        session, semaphore = get_aio_resources()
+        start_time = time.time()
+        log.info(f"异步非流式调用模型 {self.model_version}")
+        
+        def call():
+            return aio_generation_call(
+                self.model_version,
+                messages,
+                result_format='message',
+                session=session,
+                **kwargs
+            )
+        
+        limiter = get_rate_limiter(self.model_version)
+        async with semaphore:
+            try:
+                if limiter is None:
+                    response = await call()
+                else:
+                    response = await limiter.acall(call, estimate_call_tokens(messages))
+            except Exception as e:
+                log.error(f"异步模型调用异常: {str(e)}")
+                raise
+        
+        log.info(f"异步模型调用完成，耗时: {time.time() - start_time:.2f}秒")
+        if response.status_code != 200:
+            log.error(f"异步模型调用失败: {response.message}")
+            raise ValueError(f"Model call failed: {response.message}")
+        
+        return response.output.choices[0].message.content, dict(response.usage or {})
+    
+    async def _astream_dashscope(
+        self,
+        messages: List[Dict[str, str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        异步流式调用模型，逐段产出思考过程和回复内容
+        
+        Args:
+            messages: DashScope格式的消息列表
+            run_manager: 异步回调管理器
+            **kwargs: 调用参数
+            
+        Yields:
+            文本片段
+        """
+        session, semaphore = get_aio_resources()
+        start_time = time.time()
+        log.info(f"异步流式调用模型 {self.model_version}")
+        
+        def call():
+            return aio_generation_call(
+                self.model_version,
+                messages,
+                stream=True,
+                session=session,
+                **kwargs
+            )
+        
+        limiter = get_rate_limiter(self.model_version)
+        async with semaphore:
+            try:
+                if limiter is None:
+                    response = await call()
+                else:
+                    response = limiter.acall_stream(call, estimate_call_tokens(messages))
+                
+                async for chunk in response:
+                    parsed = self._split_stream_chunk(chunk)
+                    if parsed is None:
+                        continue
+                    text = parsed[1]
+                    
+                    # 回调思考过程或回复内容
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text)
+                    yield text
+                    
+            except Exception as e:
+                log.error(f"异步流式调用异常: {str(e)}")
+                raise
+        
+        log.info(f"异步流式调用完成，耗时: {time.time() - start_time:.2f}秒")
+    
+    @traced("llm", _llm_span_name)
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        异步流式生成回复
+        
+        Args:
+            messages: 输入消息列表
+            stop: 停止序列
+            run_manager: 异步回调管理器
+            **kwargs: 其他参数
+            
+        Yields:
+            ChatGenerationChunk对象
+        """
+        if not self.is_streaming_model():
+            # 如果不支持流式，使用异步非流式结果并模拟流式输出
+            result = await self._agenerate(messages, stop, run_manager, **kwargs)
+            content = result.generations[0].message.content
+            for i in range(0, len(content), 10):  # 每次输出10个字符
+                yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i+10]))
+            return
+        
+        dashscope_messages, params = self._prepare_request(messages, stop, **kwargs)
+        cache_key = self._get_cache_key(dashscope_messages, params)
+        cached = get_llm_cache().get(cache_key) if cache_key else None
+        
+        if cached is not None:
+            log.info(f"命中LLM响应缓存 {self.model_version}")
+            content = cached["content"]
+            self._annotate_span(dashscope_messages, content, cached.get("usage"), cache_hit=True)
+            for i in range(0, len(content), 10):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i+10]))
+            return
+        
+        start_time = time.time()
+        full_content = ""
+        async for text in self._astream_dashscope(dashscope_messages, run_manager, **params):
+            full_content += text
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+        self._annotate_span(dashscope_messages, full_content)
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, {
+                "content": full_content,
+                "latency": time.time() - start_time
+            })
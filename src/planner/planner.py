@@ -1,11 +1,12 @@
 import sys
 from pathlib import Path
 import logging
-from typing import TypedDict, List, Dict, Optional, Any, Annotated, Literal
+from typing import TypedDict, List, Dict, Optional, Any, Annotated, Literal, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import json
 import hashlib
+import time
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from langchain_core.prompts import PromptTemplate
@@ -23,7 +24,7 @@ if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
 # Now import local modules
-from src.models.streaming_adapter import StreamingLLMAdapter
+from src.models.adapter_pool import get_streaming_adapter, warm_up_adapters
 from src.utils.logger import get_logger
 from src.config.config_manager import ConfigManager
 from src.tools.db_tool import query_db, check_db_info
@@ -31,11 +32,25 @@ from src.tools.embedding_tool import embedding_search
 from src.tools.es_tool import search_es
 from src.tools.file_tool import select_file
 from src.tools.query2sql import query_to_sql
+from src.tools.quote_tool import quote_analytics
 from src.prompts import REACT_PROMPT
+from src.planner.tool_executor import get_tool_executor
+from src.planner.tool_cache import get_tool_cache, memoize_tool, memoize_tools
+from src.dao.result_cache import get_result_cache_stats
+from src.planner.scratchpad import ScratchpadManager
+from src.planner.stream_parser import IncrementalReActParser
+from src.utils.tracing import trace_span, traced_node
 
 
 log = get_logger()
 
+# 匹配 "Action 2: QueryDB[...]"、"Action 2.1 QueryDB" 等动作行
+ACTION_LINE_PATTERN = re.compile(r'^\s*Action\s*[\d.]*\s*[:：]?\s*(.*)$', re.IGNORECASE)
+ACTION_INPUT_LINE_PATTERN = re.compile(r'^\s*Action\s+Input\s*[\d.]*\s*[:：]\s*(.*)$', re.IGNORECASE)
+# 流式解析提前结束生成时的停止条件名称
+REACT_EARLY_STOP = "react_action"
+TOOL_CALL_PATTERN = re.compile(r'^([\w\-]+)\s*(?:\[(.*)\])?\s*$', re.DOTALL)
+
 tools = [
     Tool(
         name="ESSearch",
@@ -67,6 +82,17 @@ tools = [
         description="Check the DB info",
         func=check_db_info
     ),
+    Tool(
+        name="QuoteAnalytics",
+        description=(
+            "Vectorized analytics over the daily quote tables (A股票日行情表, 港股票日行情表, 基金日行情表). "
+            "Input is JSON: {\"table\", \"metric\" (column or arithmetic expression of columns), "
+            "\"date\" or \"start_date\"/\"end_date\" (YYYYMMDD), \"codes\", \"industry\", "
+            "\"industry_standard\", \"rolling_window\", \"rolling_agg\", \"group_by\" (code/date), "
+            "\"agg\", \"top_k\", \"ascending\"}"
+        ),
+        func=quote_analytics
+    ),
 ]
 
 # 定义状态类型
@@ -80,6 +106,9 @@ class AgentState(TypedDict):
     final_answer: Optional[str]  # 最终答案
     error: Optional[str]  # 错误信息
     is_finished: bool  # 是否完成
+    next_tools: Optional[List[Dict[str, Any]]]  # 本轮待执行的工具调用
+    scratchpad_manager: Optional[ScratchpadManager]  # 有token预算的scratchpad，保存原始Observation
+    timings: Dict[str, float]  # 执行计时，包括开始时间和首次工具调用时间
 
 
 class ResponseFormat(BaseModel):
@@ -150,6 +179,17 @@ class ToolExecutionCallback(BaseCallbackHandler):
         """LLM执行错误时的回调"""
         self.log.error(f"[LLM_ERROR] 模型推理失败: {error}")
     
+    def record_tool_call(self, result: Dict[str, Any]):
+        """记录由工具执行器完成的工具调用"""
+        self.tool_calls.append({
+            "name": result["tool"],
+            "input": result["input"],
+            "output": result.get("output"),
+            "error": result.get("error"),
+            "duration": result.get("duration", 0.0),
+            "end_time": datetime.now()
+        })
+    
     def get_tool_execution_summary(self):
         """获取工具执行摘要"""
         return {
@@ -193,7 +233,9 @@ class CustomReActAgent:
             **kwargs: 其他参数
         """
         self.model_name = model_name
-        self.tools = tools or []
+        # 工具调用结果缓存，跨问题共享
+        self.tool_cache = get_tool_cache()
+        self.tools = memoize_tools(tools or [], self.tool_cache)
         self.prompt = prompt or REACT_PROMPT
         self.config = config
         self.max_steps = max_steps
@@ -202,15 +244,14 @@ class CustomReActAgent:
         # 初始化回调处理器
         self.callback_handler = ToolExecutionCallback()
         
-        # 初始化模型
-        self.llm = StreamingLLMAdapter(
+        # 初始化模型(从注册表获取共享适配器，复用HTTP连接)
+        self.llm = get_streaming_adapter(
             model=model_name,
             api_key=self.config.get("api.qwen.api_key"),
             base_url=self.config.get("api.qwen.base_url"),
             streaming_models=self.config.get("api.qwen.streaming_models"),
-            stream_enabled=self.config.get("api.qwen.stream_enabled"),
-            default_params=self.config.get("api.qwen.default_params"),
-            **kwargs
+            stream_enabled=self.config.get("api.qwen.stream_enabled", True),
+            **{**self.config.get("api.qwen.default_params", {}), **kwargs}
         )
         
         # 创建工具映射
@@ -232,8 +273,8 @@ class CustomReActAgent:
         workflow = StateGraph(AgentState)
         
         # 添加节点
-        workflow.add_node("agent", self._agent_node)
-        workflow.add_node("tools", self._tools_node)
+        workflow.add_node("agent", traced_node("agent", self._agent_node))
+        workflow.add_node("tools", traced_node("tools", self._tools_node))
         
         # 设置入口和出口
         workflow.set_entry_point("agent")
@@ -272,25 +313,35 @@ class CustomReActAgent:
             full_prompt = self._build_prompt(state)
             
             # 调用LLM
-            response = self.llm.invoke(full_prompt)
+            llm_start = time.perf_counter()
+            response = self._call_llm(full_prompt)
+            timings = state.get("timings")
+            if timings is not None:
+                timings.setdefault("agent_steps", []).append(time.perf_counter() - llm_start)
+            
+            scratchpad = self._get_scratchpad_manager(state)
+            usage = getattr(response, "response_metadata", {}).get("token_usage")
+            prompt_record = scratchpad.record_prompt(state["current_step"], full_prompt, usage)
+            self.log.info(f"[AGENT_NODE] 步骤 {state['current_step']} prompt tokens: {prompt_record}")
             
             # 解析响应
             parsed_response = self._parse_agent_response(response)
             
             # 更新状态
-            state["scratchpad"] += f"\n{parsed_response['thought']}\n{parsed_response['action']}"
+            scratchpad.add_step(parsed_response['thought'], parsed_response['action'])
+            state["scratchpad"] = scratchpad.render()
             
             if parsed_response["action_type"] == "finish":
                 state["final_answer"] = parsed_response["action_input"]
                 state["is_finished"] = True
                 self.log.info(f"[AGENT_NODE] 推理完成，最终答案: {state['final_answer']}")
+            elif parsed_response["action_type"] == "error" or not parsed_response["tool_calls"]:
+                state["error"] = f"Failed to parse agent response: {parsed_response['action_input']}"
+                state["is_finished"] = True
             else:
-                # 准备工具调用
-                state["next_tool"] = {
-                    "name": parsed_response["action_input"],
-                    "input": parsed_response.get("tool_input", "")
-                }
-                self.log.info(f"[AGENT_NODE] 准备调用工具: {parsed_response['action_input']}")
+                # 准备工具调用，同一轮中的多个动作并发执行
+                state["next_tools"] = parsed_response["tool_calls"]
+                self.log.info(f"[AGENT_NODE] 准备调用工具: {[call['name'] for call in state['next_tools']]}")
             
             return state
             
@@ -300,6 +351,35 @@ class CustomReActAgent:
             state["is_finished"] = True
             return state
     
+    def _call_llm(self, prompt: str) -> AIMessage:
+        """
+        调用LLM，启用流式解析时动作一完整就停止读取流，取消剩余生成
+        
+        配置项:
+            planner.streaming_parse: 是否启用流式解析
+        
+        Args:
+            prompt: 完整prompt
+            
+        Returns:
+            本轮模型输出
+        """
+        if not (self.config and self.config.get_boolean("planner.streaming_parse", False)):
+            return self.llm.invoke(prompt)
+        
+        parser = IncrementalReActParser()
+        start_time = time.perf_counter()
+        # 停止条件计入LLM缓存键，提前结束的输出也可以缓存，命中时由解析器按同样的位置截断
+        stream = self.llm.stream(prompt, force_stream=True, early_stop=REACT_EARLY_STOP)
+        try:
+            for chunk in stream:
+                if parser.feed(chunk.content):
+                    self.log.info(f"[AGENT_NODE] 动作已完整，提前结束生成 ({time.perf_counter() - start_time:.2f}s)")
+                    break
+        finally:
+            stream.close()
+        return AIMessage(content=parser.finalize())
+    
     def _tools_node(self, state: AgentState) -> AgentState:
         """
         工具执行节点
@@ -311,54 +391,42 @@ class CustomReActAgent:
             更新后的状态
         """
         try:
-            tool_info = state.get("next_tool")
-            if not tool_info:
-                state["error"] = "No tool to execute"
-                state["is_finished"] = True
-                return state
-            
-            tool_name = tool_info["name"]
-            tool_input = tool_info["input"]
-            
-            self.log.info(f"[TOOLS_NODE] 执行工具: {tool_name}")
+            timings = state.get("timings")
+            if timings is not None and "first_tool_call" not in timings:
+                timings["first_tool_call"] = time.perf_counter()
             
-            # 查找工具
-            if tool_name not in self.tool_map:
-                error_msg = f"Tool '{tool_name}' not found"
-                self.log.error(f"[TOOLS_NODE] {error_msg}")
-                state["error"] = error_msg
+            tool_calls = state.get("next_tools")
+            if not tool_calls:
+                state["error"] = "No tool to execute"
                 state["is_finished"] = True
                 return state
             
-            tool = self.tool_map[tool_name]
+            self.log.info(f"[TOOLS_NODE] 执行工具: {[call['name'] for call in tool_calls]}")
             
-            # 执行工具
-            try:
-                tool_result = tool.func(tool_input)
-                self.log.info(f"[TOOLS_NODE] 工具执行成功: {tool_result}")
+            # 并发执行，结果按动作顺序合并到scratchpad
+            results = get_tool_executor().execute(tool_calls, self.tool_map)
+            scratchpad = self._get_scratchpad_manager(state)
+            for index, result in enumerate(results, 1):
+                self.callback_handler.record_tool_call(result)
+                
+                # 大结果在scratchpad中替换为摘要，原始结果通过ref引用
+                observation = f"Error: {result['error']}" if result["error"] else result["output"]
+                label = "Observation" if len(results) == 1 else f"Observation {index} [{result['tool']}]"
+                ref = scratchpad.add_observation(observation, label)
                 
-                # 添加工具结果到状态
                 state["tool_results"].append({
-                    "tool": tool_name,
-                    "input": tool_input,
-                    "output": tool_result,
-                    "step": state["current_step"]
+                    "tool": result["tool"],
+                    "input": result["input"],
+                    "output": result["output"],
+                    "error": result["error"],
+                    "duration": result.get("duration"),
+                    "step": state["current_step"],
+                    "ref": ref
                 })
-                
-                # 添加观察结果到scratchpad
-                state["scratchpad"] += f"\nObservation: {tool_result}"
-                
-            except Exception as e:
-                error_msg = f"Tool execution failed: {str(e)}"
-                self.log.error(f"[TOOLS_NODE] {error_msg}")
-                state["error"] = error_msg
-                state["is_finished"] = True
-                return state
-            
-            # 清理next_tool
-            if "next_tool" in state:
-                del state["next_tool"]
+            state["scratchpad"] = scratchpad.render()
             
+            self.log.info(f"[TOOLS_NODE] 工具执行完成: {len(results)} 个")
+            state["next_tools"] = None
             return state
             
         except Exception as e:
@@ -367,6 +435,12 @@ class CustomReActAgent:
             state["is_finished"] = True
             return state
     
+    def _get_scratchpad_manager(self, state: AgentState) -> ScratchpadManager:
+        """获取本次执行的scratchpad管理器，不存在时按配置创建"""
+        if state.get("scratchpad_manager") is None:
+            state["scratchpad_manager"] = ScratchpadManager.from_config(self.config)
+        return state["scratchpad_manager"]
+    
     def _should_continue(self, state: AgentState) -> str:
         """
         判断是否应该继续执行
@@ -388,7 +462,7 @@ class CustomReActAgent:
             return "end"
         
         # 检查是否有工具需要执行
-        if "next_tool" in state:
+        if state.get("next_tools"):
             return "tools"
         
         # 继续推理
@@ -428,46 +502,113 @@ class CustomReActAgent:
         
         return prompt
     
-    def _parse_agent_response(self, response: str) -> Dict[str, Any]:
+    def _parse_tool_call(self, action: str) -> Dict[str, Any]:
+        """解析 "ToolName[input]" 或 "ToolName input" 形式的动作"""
+        match = TOOL_CALL_PATTERN.match(action)
+        if match:
+            return {"name": match.group(1), "input": (match.group(2) or "").strip()}
+        name, _, tool_input = action.partition(" ")
+        return {"name": name.strip(), "input": tool_input.strip()}
+    
+    @staticmethod
+    def _split_actions(response: str) -> List[Tuple[str, str]]:
         """
-        解析Agent响应
+        按出现顺序切分Action和Action Input
+        
+        与IncrementalReActParser一致，方括号未闭合时后续行属于同一个动作，
+        多行SQL等输入保持原有换行；动作块之后出现的第一个非Action行(如模型自行编造的
+        "Observation N")或Finish动作结束本轮，之后的内容不属于这一步
+        
+        Returns:
+            [("action" | "input", 文本), ...]
+        """
+        items: List[Tuple[str, str]] = []
+        open_brackets = 0
+        for line in response.splitlines():
+            if open_brackets > 0:
+                kind, text = items[-1]
+                items[-1] = (kind, f"{text}\n{line}")
+                open_brackets += line.count("[") - line.count("]")
+                continue
+            if items and items[-1][0] == "action" and items[-1][1].lower().startswith("finish"):
+                break
+            input_match = ACTION_INPUT_LINE_PATTERN.match(line)
+            if input_match:
+                items.append(("input", input_match.group(1).strip()))
+                continue
+            action_match = ACTION_LINE_PATTERN.match(line)
+            if not action_match:
+                if items and line.strip():
+                    break
+                continue
+            action = action_match.group(1).strip()
+            if not action:
+                continue
+            items.append(("action", action))
+            open_brackets = max(0, action.count("[") - action.count("]"))
+        return [(kind, text.strip()) for kind, text in items]
+    
+    def _parse_agent_response(self, response: Any) -> Dict[str, Any]:
+        """
+        解析Agent响应，一轮响应中可以包含多个相互独立的动作
         
         Args:
-            response: LLM响应
+            response: LLM响应(AIMessage或字符串)
             
         Returns:
-            解析后的响应字典
+            解析后的响应字典，tool_calls为按出现顺序排列的工具调用
         """
         try:
-            # 提取Thought
-            thought_match = re.search(r'Thought\s*\d*:\s*(.*?)(?=\nAction|\n$)', response, re.DOTALL)
-            thought = thought_match.group(1).strip() if thought_match else ""
-            
-            # 提取Action
-            action_match = re.search(r'Action\s*\d*:\s*(.*?)(?=\n|$)', response, re.DOTALL)
-            action = action_match.group(1).strip() if action_match else ""
+            if not isinstance(response, str):
+                response = getattr(response, "content", str(response))
             
-            # 解析Action
-            if action.lower().startswith("finish"):
+            # 提取Thought
+            thought_match = re.search(r'Thought\s*\d*:?\s*(.*?)(?=\nAction|\n$|$)', response, re.DOTALL)
+            if thought_match:
+                thought = thought_match.group(1).strip()
+            else:
+                # prompt以"Thought:"结尾，模型输出可能直接从思考内容开始
+                thought = re.split(r'^\s*Action', response, maxsplit=1, flags=re.MULTILINE)[0].strip()
+            
+            # 提取全部Action，Action Input行作为上一个动作的输入
+            actions = []
+            tool_calls = []
+            finish = None
+            for kind, text in self._split_actions(response):
+                if kind == "input":
+                    if tool_calls and not tool_calls[-1]["input"]:
+                        tool_calls[-1]["input"] = text
+                    continue
+                if text.lower().startswith("finish"):
+                    if finish is None:
+                        finish = text
+                    continue
+                actions.append(text)
+                tool_calls.append(self._parse_tool_call(text))
+            
+            if finish is not None and not tool_calls:
                 # 提取最终答案
-                answer_match = re.search(r'finish\[(.*?)\]', action, re.IGNORECASE)
-                answer = answer_match.group(1) if answer_match else action
-                
+                answer_match = re.search(r'finish\[(.*?)\]', finish, re.IGNORECASE | re.DOTALL)
                 return {
                     "thought": thought,
-                    "action": action,
+                    "action": finish,
                     "action_type": "finish",
-                    "action_input": answer
-                }
-            else:
-                # 工具调用
-                tool_name = action.strip()
-                return {
-                    "thought": thought,
-                    "action": action,
-                    "action_type": "tool",
-                    "action_input": tool_name
+                    "action_input": answer_match.group(1) if answer_match else finish,
+                    "tool_calls": []
                 }
+            
+            parsed = {
+                "thought": thought,
+                "action": "\n".join(actions),
+                "action_type": "tool",
+                "action_input": tool_calls[0]["name"] if tool_calls else "",
+                "tool_calls": tool_calls
+            }
+            if finish is not None:
+                # 同一步中Finish与工具调用并存时，答案是在看到Observation之前写出的，只执行工具调用
+                self.log.warning(f"[PARSE] 同一步中包含工具调用和Finish，忽略Finish: {finish}")
+                parsed["finish_rejected"] = finish
+            return parsed
                 
         except Exception as e:
             self.log.error(f"Failed to parse agent response: {e}")
@@ -475,7 +616,8 @@ class CustomReActAgent:
                 "thought": "",
                 "action": "",
                 "action_type": "error",
-                "action_input": str(e)
+                "action_input": str(e),
+                "tool_calls": []
             }
     
     def invoke(self, input_text: str) -> Dict[str, Any]:
@@ -500,14 +642,18 @@ class CustomReActAgent:
                 "tool_results": [],
                 "final_answer": None,
                 "error": None,
-                "is_finished": False
+                "is_finished": False,
+                "next_tools": None,
+                "scratchpad_manager": ScratchpadManager.from_config(self.config),
+                "timings": {"start": time.perf_counter()}
             }
             
             # 准备回调
             callbacks = [self.callback_handler]
             
-            # 执行图
-            result = self.app.invoke(initial_state, config={"callbacks": callbacks})
+            # 执行图，整个问题记录为一个span，节点/LLM/工具span挂在其下
+            with trace_span("react_agent", "graph", model=self.model_name):
+                result = self.app.invoke(initial_state, config={"callbacks": callbacks})
             
             self.log.info(f"[AGENT_END] Agent推理完成")
             
@@ -520,9 +666,20 @@ class CustomReActAgent:
                 "steps_taken": result.get("current_step", 0)
             }
             
+            # 从开始执行到首次调用工具的耗时
+            timings = result.get("timings") or {}
+            if "first_tool_call" in timings:
+                response["time_to_first_tool_call"] = timings["first_tool_call"] - timings["start"]
+            # 每一步LLM调用的耗时
+            response["agent_step_latencies"] = timings.get("agent_steps", [])
+            
+            # 每一步prompt的token数
+            if result.get("scratchpad_manager") is not None:
+                response["prompt_tokens"] = result["scratchpad_manager"].prompt_tokens
+            
             # 添加工具执行摘要
             if self.callback_handler:
-                tool_summary = self.callback_handler.get_tool_execution_summary()
+                tool_summary = self.get_execution_summary()
                 response["tool_execution_summary"] = tool_summary
                 self.log.info(f"[TOOL_SUMMARY] 工具执行摘要: {tool_summary}")
             
@@ -555,7 +712,10 @@ class CustomReActAgent:
                 "tool_results": [],
                 "final_answer": None,
                 "error": None,
-                "is_finished": False
+                "is_finished": False,
+                "next_tools": None,
+                "scratchpad_manager": ScratchpadManager.from_config(self.config),
+                "timings": {"start": time.perf_counter()}
             }
             
             # 准备回调
@@ -578,6 +738,8 @@ class CustomReActAgent:
         Args:
             tool: 要添加的工具
         """
+        if self.tool_cache is not None:
+            tool = memoize_tool(tool, self.tool_cache)
         self.tools.append(tool)
         self.tool_map[tool.name] = tool
         self.log.info(f"Added tool: {tool.name}")
@@ -631,8 +793,15 @@ class CustomReActAgent:
             执行摘要信息
         """
         if self.callback_handler:
-            return self.callback_handler.get_tool_execution_summary()
-        return {"total_tools": 0, "tools": []}
+            summary = self.callback_handler.get_tool_execution_summary()
+        else:
+            summary = {"total_tools": 0, "tools": []}
+        if self.tool_cache is not None:
+            summary["tool_cache"] = self.tool_cache.get_stats()
+        result_cache_stats = get_result_cache_stats()
+        if result_cache_stats:
+            summary["sql_result_cache"] = result_cache_stats
+        return summary
 
 
 # 创建默认的自定义ReAct Agent实例
@@ -682,6 +851,9 @@ def main():
     config_dir = Path(__file__).resolve().parent.parent / "conf"
     config.init(config_dir)
     
+    # 预热LLM适配器和HTTP连接
+    warm_up_adapters(config)
+    
     # 创建自定义ReAct Agent
     logger.info("初始化自定义ReAct Agent...")
     agent = create_default_custom_react_agent(
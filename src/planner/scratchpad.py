@@ -0,0 +1,195 @@
+"""
+Scratchpad Manager
+
+ReAct Agent的推理记录管理器，控制每一步prompt中scratchpad的大小:
+1. 超过单条预算的Observation替换为摘要(行数、首尾行、列统计)，原始结果保存在旁路存储中，
+   通过引用(如obs-3)访问
+2. scratchpad整体超过token预算时，从最早的Observation开始压缩为一行引用
+3. 记录每一步prompt的token数
+4. 数据库结果因读取上限被截断时，在Observation后注明
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+from src.utils.token_counter import estimate_tokens
+
+log = get_logger()
+
+
+def _format_rows(rows: List[Any]) -> str:
+    return "\n".join(json.dumps(row, ensure_ascii=False, default=str) for row in rows)
+
+
+def _column_stats(rows: List[Dict[str, Any]]) -> List[str]:
+    stats = []
+    for column in rows[0].keys():
+        values = [row.get(column) for row in rows if row.get(column) is not None]
+        numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if numbers and len(numbers) == len(values):
+            stats.append(
+                f"{column}: min={min(numbers):g}, max={max(numbers):g}, mean={sum(numbers) / len(numbers):g}"
+            )
+        else:
+            stats.append(f"{column}: {len(set(map(str, values)))}个不同值")
+    return stats
+
+
+def summarize_observation(output: Any, head_rows: int = 5, tail_rows: int = 2, max_chars: int = 1200) -> str:
+    """
+    生成大结果的摘要
+
+    Args:
+        output: 工具原始输出
+        head_rows: 保留的开头行数
+        tail_rows: 保留的结尾行数
+        max_chars: 文本类结果保留的最大字符数
+
+    Returns:
+        摘要文本
+    """
+    if isinstance(output, list) and output and all(isinstance(row, dict) for row in output):
+        parts = [f"共{len(output)}行，列: {', '.join(output[0].keys())}"]
+        parts.append(f"前{min(head_rows, len(output))}行:\n{_format_rows(output[:head_rows])}")
+        if len(output) > head_rows and tail_rows:
+            parts.append(f"后{min(tail_rows, len(output) - head_rows)}行:\n{_format_rows(output[-tail_rows:])}")
+        parts.append("列统计:\n" + "\n".join(_column_stats(output)))
+        return "\n".join(parts)
+
+    if isinstance(output, dict):
+        keys = list(output.keys())
+        shown = ", ".join(map(str, keys[:20]))
+        more = f" 等{len(keys)}项" if len(keys) > 20 else ""
+        return f"共{len(keys)}项: {shown}{more}"
+
+    text = str(output)
+    if len(text) <= max_chars:
+        return text
+    half = max_chars // 2
+    return f"{text[:half]}\n...(省略{len(text) - max_chars}字符)...\n{text[-half:]}"
+
+
+class ScratchpadManager:
+    """
+    有token预算的scratchpad
+
+    记录按顺序保存为条目，render()时拼接为与原先相同格式的字符串。
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        observation_max_tokens: int = 800,
+        head_rows: int = 5,
+        tail_rows: int = 2
+    ):
+        self.max_tokens = max_tokens
+        self.observation_max_tokens = observation_max_tokens
+        self.head_rows = head_rows
+        self.tail_rows = tail_rows
+        self.entries: List[Dict[str, Any]] = []
+        self.observations: Dict[str, Any] = {}
+        self.prompt_tokens: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "ScratchpadManager":
+        """
+        根据配置创建
+
+        配置项:
+            planner.scratchpad.max_tokens: scratchpad整体token预算
+            planner.scratchpad.observation_max_tokens: 单条Observation的token预算
+            planner.scratchpad.head_rows/tail_rows: 摘要保留的首尾行数
+        """
+        config = config or ConfigManager()
+        return cls(
+            max_tokens=config.get_int("planner.scratchpad.max_tokens", 6000),
+            observation_max_tokens=config.get_int("planner.scratchpad.observation_max_tokens", 800),
+            head_rows=config.get_int("planner.scratchpad.head_rows", 5),
+            tail_rows=config.get_int("planner.scratchpad.tail_rows", 2)
+        )
+
+    def add_step(self, thought: str, action: str) -> None:
+        """记录一步推理的Thought和Action"""
+        self.entries.append({"kind": "step", "text": f"\n{thought}\n{action}"})
+
+    def add_observation(self, output: Any, label: str = "Observation") -> str:
+        """
+        记录工具输出，超过单条预算时写入摘要并保存原始结果
+
+        Args:
+            output: 工具原始输出
+            label: Observation前缀，例如"Observation 2 [QueryDB]"
+
+        Returns:
+            原始结果的引用
+        """
+        ref = f"obs-{len(self.observations) + 1}"
+        self.observations[ref] = output
+
+        text = f"\n{label}: {output}"
+        tokens = estimate_tokens(text)
+        if tokens > self.observation_max_tokens:
+            summary = summarize_observation(output, self.head_rows, self.tail_rows)
+            text = f"\n{label} (摘要，完整结果引用 {ref}): {summary}"
+            log.info(f"[SCRATCHPAD] {ref} 约 {tokens} tokens，已替换为摘要 ({estimate_tokens(text)} tokens)")
+        # 数据库结果超过读取上限时注明已截断，避免把部分结果当作全部
+        note = getattr(output, "truncation_note", None)
+        if note:
+            text += f"\n(注意: {note})"
+
+        self.entries.append({"kind": "observation", "ref": ref, "label": label, "text": text})
+        self._compact()
+        return ref
+
+    def get_observation(self, ref: str) -> Any:
+        """通过引用获取原始工具输出"""
+        return self.observations.get(ref)
+
+    def _compact(self) -> None:
+        """整体超预算时，从最早的Observation开始压缩为一行引用，最近一条保持不变"""
+        total = sum(estimate_tokens(entry["text"]) for entry in self.entries)
+        if total <= self.max_tokens:
+            return
+        observation_entries = [entry for entry in self.entries if entry["kind"] == "observation"]
+        for entry in observation_entries[:-1]:
+            if entry.get("compacted"):
+                continue
+            before = estimate_tokens(entry["text"])
+            entry["text"] = f"\n{entry['label']}: (已压缩，完整结果引用 {entry['ref']})"
+            entry["compacted"] = True
+            total -= before - estimate_tokens(entry["text"])
+            if total <= self.max_tokens:
+                break
+        if total > self.max_tokens:
+            log.warning(f"[SCRATCHPAD] 压缩后仍约 {total} tokens，超过预算 {self.max_tokens}")
+
+    def render(self) -> str:
+        """拼接为prompt中的scratchpad文本"""
+        return "".join(entry["text"] for entry in self.entries)
+
+    def record_prompt(self, step: int, prompt: str, usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        记录一步prompt的token数
+
+        Args:
+            step: 步骤序号
+            prompt: 完整prompt
+            usage: 模型返回的token使用量(如有)
+
+        Returns:
+            本步记录
+        """
+        record = {
+            "step": step,
+            "estimated_prompt_tokens": estimate_tokens(prompt),
+            "scratchpad_tokens": estimate_tokens(self.render())
+        }
+        if usage and usage.get("input_tokens") is not None:
+            record["prompt_tokens"] = usage.get("input_tokens")
+        elif usage and usage.get("prompt_tokens") is not None:
+            record["prompt_tokens"] = usage.get("prompt_tokens")
+        self.prompt_tokens.append(record)
+        return record
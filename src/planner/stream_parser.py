@@ -0,0 +1,116 @@
+"""
+Incremental ReAct Parser
+
+流式解析ReAct输出: 逐段接收模型输出，一旦本轮动作完整即判定结束，
+调用方据此停止读取流(关闭HTTP流，取消剩余生成)并立即执行工具。
+
+判定规则(只检查已经换行结束的完整行):
+1. Finish[...] 的右括号出现即结束
+2. 至少有一个完整的Action行之后，出现非Action行(通常是模型自行编造的Observation或下一步Thought)即结束，
+   之前的内容作为本轮输出
+3. Action的方括号输入可以跨行，括号闭合之前不判定完整
+"""
+
+import re
+from typing import Optional
+
+ACTION_PREFIX = re.compile(r'^\s*Action(?:\s+Input)?\s*[\d.]*\s*[:：]?', re.IGNORECASE)
+FINISH_PATTERN = re.compile(r'^\s*Action\s*[\d.]*\s*[:：]?\s*finish\s*\[', re.IGNORECASE)
+
+
+class IncrementalReActParser:
+    """增量ReAct动作解析器"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.complete = False
+        # 本轮输出在buffer中的截止位置
+        self._cut = None
+        # 下一个待检查行的起始位置
+        self._line_start = 0
+        self._action_seen = False
+        self._open_brackets = 0
+        self._finish_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """本轮有效输出，结束后不包含多余的生成内容"""
+        return self.buffer[:self._cut] if self._cut is not None else self.buffer
+
+    def feed(self, chunk: str) -> bool:
+        """
+        追加一段模型输出
+
+        Args:
+            chunk: 文本片段
+
+        Returns:
+            本轮动作是否已经完整
+        """
+        if self.complete or not chunk:
+            return self.complete
+        self.buffer += chunk
+
+        if self._finish_start is not None and self._check_finish():
+            return True
+
+        while not self.complete:
+            newline = self.buffer.find("\n", self._line_start)
+            if newline < 0:
+                break
+            self._process_line(self._line_start, newline)
+            self._line_start = newline + 1
+
+        if not self.complete and self._open_brackets == 0:
+            self._check_tail()
+        return self.complete
+
+    def _check_tail(self) -> None:
+        """检查尚未换行的最后一行，尽早识别Finish或非Action行"""
+        tail = self.buffer[self._line_start:]
+        if self._finish_start is None and FINISH_PATTERN.match(tail):
+            self._finish_start = self._line_start
+            self._check_finish()
+            return
+        stripped = tail.lstrip()
+        if not self._action_seen or not stripped:
+            return
+        prefix = stripped[:len("action")].lower()
+        if not "action".startswith(prefix):
+            self._finish(self._line_start)
+
+    def _check_finish(self) -> bool:
+        close = self.buffer.find("]", self._finish_start)
+        if close >= 0:
+            self._finish(close + 1)
+        return self.complete
+
+    def _finish(self, cut: int) -> None:
+        self._cut = cut
+        self.complete = True
+
+    def _process_line(self, start: int, end: int) -> None:
+        line = self.buffer[start:end]
+
+        # 多行的Action输入，括号闭合前属于同一个动作
+        if self._open_brackets > 0:
+            self._open_brackets += line.count("[") - line.count("]")
+            return
+
+        if FINISH_PATTERN.match(line):
+            self._finish_start = start
+            self._check_finish()
+            return
+
+        if ACTION_PREFIX.match(line):
+            self._action_seen = True
+            self._open_brackets = max(0, line.count("[") - line.count("]"))
+            return
+
+        if self._action_seen and line.strip():
+            self._finish(start)
+
+    def finalize(self) -> str:
+        """流结束时调用，返回本轮有效输出"""
+        self.complete = True
+        return self.text
@@ -0,0 +1,245 @@
+"""
+Tool Result Cache
+
+ReAct Agent工具调用结果的记忆化层，同一问题内和跨问题复用相同工具调用的结果。
+缓存键为工具名 + 规范化后的输入，每个工具有独立的缓存策略:
+1. ttl_seconds: 条目有效期，0表示永不过期(如表结构信息)
+2. db_versioned: QueryDB数据库客户端的数据版本(SQLiteClient.db_version)变化后条目失效(如SQL查询结果)；
+   客户端不提供数据版本时(如MySQL)无法判断数据是否更新，该工具不缓存
+3. schema_versioned: 表结构目录刷新或失效时清空(如CheckDBInfo)
+4. max_entries: LRU容量
+未配置策略的工具不缓存。
+"""
+
+import functools
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.tools import Tool
+
+from src.config.config_manager import ConfigManager
+from src.dao.schema_catalog import add_schema_listener
+from src.models.llm_cache import MemoryLRUCache
+from src.utils.logger import get_logger
+from src.utils.tracing import annotate_span
+
+log = get_logger()
+
+# 引号内的字符串原样保留，引号外的连续空白压缩为一个空格
+_WHITESPACE_OUTSIDE_QUOTES = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+# 工具以字符串形式返回的错误信息不缓存
+ERROR_RESULT_PREFIXES = ("query_db:", "quote_analytics:")
+
+
+def normalize_tool_input(tool_input: Any) -> str:
+    """
+    规范化工具输入: 压缩引号外的空白、去掉结尾分号，非字符串输入序列化为排序后的JSON
+
+    Args:
+        tool_input: 工具输入
+
+    Returns:
+        规范化后的字符串
+    """
+    if tool_input is None:
+        return ""
+    if not isinstance(tool_input, str):
+        return json.dumps(tool_input, ensure_ascii=False, sort_keys=True, default=str)
+    text = _WHITESPACE_OUTSIDE_QUOTES.sub(lambda m: m.group(1) or " ", tool_input).strip()
+    return text.rstrip(";").strip()
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """空结果和错误信息不写入缓存"""
+    if result is None:
+        return False
+    if isinstance(result, str) and result.startswith(ERROR_RESULT_PREFIXES):
+        return False
+    return True
+
+
+@dataclass
+class ToolCachePolicy:
+    """单个工具的缓存策略"""
+    ttl_seconds: float = 0
+    db_versioned: bool = False
+    schema_versioned: bool = False
+    max_entries: int = 1024
+
+
+class ToolResultCache:
+    """按工具分区的结果缓存"""
+
+    def __init__(self, policies: Dict[str, ToolCachePolicy], version_fn: Optional[Callable[[], Any]] = None):
+        self.version_fn = version_fn
+        if version_fn is None:
+            skipped = [name for name, policy in policies.items() if policy.db_versioned]
+            if skipped:
+                log.info(f"[TOOL_CACHE] 数据库客户端不提供数据版本，不缓存 {skipped}")
+            policies = {name: policy for name, policy in policies.items() if not policy.db_versioned}
+        self.policies = dict(policies)
+        self._caches = {
+            name: MemoryLRUCache(max_entries=policy.max_entries, ttl_seconds=policy.ttl_seconds or None)
+            for name, policy in self.policies.items()
+        }
+        self._stats: Dict[str, Dict[str, int]] = {
+            name: {"hits": 0, "misses": 0, "invalidations": 0, "writes": 0} for name in self.policies
+        }
+        self._lock = threading.Lock()
+
+    def db_version(self) -> Any:
+        """数据库的数据版本，作为SQL结果的版本号"""
+        return self.version_fn() if self.version_fn else None
+
+    def is_cached_tool(self, tool_name: str) -> bool:
+        return tool_name in self._caches
+
+    def _count(self, tool_name: str, field: str) -> None:
+        with self._lock:
+            self._stats[tool_name][field] += 1
+
+    def get(self, tool_name: str, tool_input: Any) -> Optional[Dict[str, Any]]:
+        """
+        查找缓存
+
+        Returns:
+            命中时返回{"result": 工具输出}，否则返回None
+        """
+        cache = self._caches.get(tool_name)
+        if cache is None:
+            return None
+        entry = cache.get(normalize_tool_input(tool_input))
+        if entry is None:
+            self._count(tool_name, "misses")
+            return None
+        if self.policies[tool_name].db_versioned and entry["db_version"] != self.db_version():
+            self._count(tool_name, "invalidations")
+            self._count(tool_name, "misses")
+            return None
+        self._count(tool_name, "hits")
+        return entry
+
+    def set(self, tool_name: str, tool_input: Any, result: Any) -> None:
+        """写入缓存"""
+        cache = self._caches.get(tool_name)
+        if cache is None or not is_cacheable_result(result):
+            return
+        cache.set(normalize_tool_input(tool_input), {"result": result, "db_version": self.db_version()})
+        self._count(tool_name, "writes")
+
+    def clear(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def invalidate_schema(self, catalog_name: Optional[str] = None) -> None:
+        """表结构目录刷新或失效后清空schema_versioned工具的条目"""
+        for name, policy in self.policies.items():
+            if policy.schema_versioned and len(self._caches[name]):
+                self._caches[name].clear()
+                self._count(name, "invalidations")
+                log.info(f"[TOOL_CACHE] 表结构目录 {catalog_name} 已变更，清空 {name} 的缓存")
+
+    def inputs(self, tool_name: str) -> List[str]:
+        """工具已缓存结果的规范化输入，如QueryDB执行过的SQL"""
+        cache = self._caches.get(tool_name)
+        return cache.keys() if cache is not None else []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各工具的缓存统计"""
+        with self._lock:
+            per_tool = {name: dict(stats) for name, stats in self._stats.items()}
+        hits = sum(stats["hits"] for stats in per_tool.values())
+        misses = sum(stats["misses"] for stats in per_tool.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": {name: len(cache) for name, cache in self._caches.items()},
+            "tools": per_tool
+        }
+
+
+def memoize_tool(tool: Tool, cache: ToolResultCache) -> Tool:
+    """
+    为工具包装缓存层，未配置缓存策略的工具原样返回
+
+    Args:
+        tool: 原始工具
+        cache: 工具结果缓存
+
+    Returns:
+        带缓存的工具
+    """
+    if not cache.is_cached_tool(tool.name) or getattr(tool.func, "__tool_cache__", None) is cache:
+        return tool
+
+    func: Callable = tool.func
+
+    @functools.wraps(func)
+    def cached_func(*args, **kwargs):
+        tool_input = args[0] if args else (kwargs or None)
+        entry = cache.get(tool.name, tool_input)
+        annotate_span(cache_hit=entry is not None)
+        if entry is not None:
+            log.info(f"[TOOL_CACHE] {tool.name} 命中缓存")
+            return entry["result"]
+        result = func(*args, **kwargs)
+        cache.set(tool.name, tool_input, result)
+        return result
+
+    cached_func.__tool_cache__ = cache
+    return Tool(name=tool.name, description=tool.description, func=cached_func)
+
+
+def memoize_tools(tools: List[Tool], cache: Optional[ToolResultCache]) -> List[Tool]:
+    """为工具列表包装缓存层，cache为None时原样返回"""
+    if cache is None:
+        return list(tools)
+    return [memoize_tool(tool, cache) for tool in tools]
+
+
+def _db_version_fn() -> Optional[Callable[[], Any]]:
+    """QueryDB所用客户端的数据版本函数，客户端不提供时返回None"""
+    try:
+        from src.dao.db import get_db_client
+        return getattr(get_db_client(), "db_version", None)
+    except Exception as e:
+        log.warning(f"[TOOL_CACHE] 获取数据库客户端失败，QueryDB结果不缓存: {e}")
+        return None
+
+
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_loaded = False
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """
+    获取进程级共享的工具结果缓存
+
+    配置项:
+        planner.tool_cache.enabled: 是否启用
+        planner.tool_cache.policies: {工具名: {ttl_seconds, db_versioned, schema_versioned, max_entries}}
+        database.engine: db_versioned策略使用该引擎客户端的db_version()作为数据版本
+
+    Returns:
+        ToolResultCache实例，未启用时返回None
+    """
+    global _tool_cache, _tool_cache_loaded
+    if not _tool_cache_loaded:
+        with _tool_cache_lock:
+            if not _tool_cache_loaded:
+                config = ConfigManager()
+                if config.get_boolean("planner.tool_cache.enabled", True):
+                    policies = {
+                        name: ToolCachePolicy(**(options or {}))
+                        for name, options in (config.get("planner.tool_cache.policies", {}) or {}).items()
+                    }
+                    _tool_cache = ToolResultCache(policies, _db_version_fn())
+                    add_schema_listener(_tool_cache.invalidate_schema)
+                _tool_cache_loaded = True
+    return _tool_cache
@@ -0,0 +1,172 @@
+"""
+Parallel Tool Executor
+
+ReAct Agent的工具执行器: 同一轮推理中互不依赖的多个工具调用提交到共享线程池并发执行，
+按调用顺序返回结果，每个工具有独立的超时时间。
+超时从工具开始运行时计算，在线程池中排队的时间不计入；排队超过超时时间仍未开始的调用被取消。
+超时或失败的工具调用以错误结果返回，不影响同一轮中的其他调用。
+注意: Python线程无法被强制终止，运行中超时的调用会继续占用线程池的一个线程直到工具返回，
+占用中的线程数记录在abandoned中，线程池大小(planner.tool_max_workers)需为此留出余量。
+"""
+
+import contextvars
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.tools import Tool
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+from src.utils.tracing import trace_span
+
+log = get_logger()
+
+
+def invoke_tool(tool: Tool, tool_input: Any) -> Any:
+    """
+    调用工具函数，无参数的工具(如CheckDBInfo)忽略输入
+
+    Args:
+        tool: 工具
+        tool_input: 工具输入
+
+    Returns:
+        工具输出
+    """
+    try:
+        parameters = inspect.signature(tool.func).parameters
+    except (TypeError, ValueError):
+        return tool.func(tool_input)
+    if not parameters:
+        return tool.func()
+    return tool.func(tool_input)
+
+
+class ParallelToolExecutor:
+    """并发工具执行器"""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        default_timeout: float = 60.0,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="react-tool")
+        # 已超时但仍在运行、占用线程的调用数
+        self.abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    def get_timeout(self, tool_name: str) -> float:
+        return float(self.timeouts.get(tool_name, self.default_timeout))
+
+    @staticmethod
+    def _run(tool: Tool, tool_input: Any, state: Dict[str, Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        state["start"] = start
+        state["started"].set()
+        with trace_span(tool.name, "tool"):
+            output = invoke_tool(tool, tool_input)
+        return output, time.perf_counter() - start
+
+    def _release_abandoned(self, _future) -> None:
+        with self._abandoned_lock:
+            self.abandoned -= 1
+
+    def _abandon(self, future) -> None:
+        """运行中超时的调用无法取消，记录其占用的线程直到工具返回"""
+        with self._abandoned_lock:
+            self.abandoned += 1
+            abandoned = self.abandoned
+        future.add_done_callback(self._release_abandoned)
+        log.warning(f"[TOOLS_NODE] 超时的工具调用仍在运行，占用线程 {abandoned}/{self.max_workers}")
+
+    def execute(self, calls: List[Dict[str, Any]], tool_map: Dict[str, Tool]) -> List[Dict[str, Any]]:
+        """
+        并发执行一组工具调用
+
+        Args:
+            calls: [{"name": 工具名, "input": 工具输入}, ...]
+            tool_map: 工具名到工具的映射
+
+        Returns:
+            与calls顺序一致的结果列表，每项包含tool/input/output/error/duration
+        """
+        submitted = []
+        for call in calls:
+            tool = tool_map.get(call["name"])
+            if tool is None:
+                submitted.append((None, None, 0.0))
+                continue
+            # 沿用调用方的上下文，工具span挂在tools节点span之下
+            context = contextvars.copy_context()
+            state = {"started": threading.Event(), "start": None}
+            future = self._pool.submit(context.run, self._run, tool, call.get("input", ""), state)
+            submitted.append((future, state, time.perf_counter()))
+
+        results = []
+        for call, (future, state, submit_time) in zip(calls, submitted):
+            tool_name = call["name"]
+            result = {"tool": tool_name, "input": call.get("input", ""), "output": None, "error": None}
+            if future is None:
+                result["error"] = f"Tool '{tool_name}' not found"
+            else:
+                timeout = self.get_timeout(tool_name)
+                # 排队最多等待timeout，开始运行后再给完整的timeout
+                started = state["started"].wait(timeout=max(0.0, submit_time + timeout - time.perf_counter()))
+                if not started and future.cancel():
+                    result["error"] = f"Tool '{tool_name}' was not started within {timeout:g}s (tool pool busy)"
+                    result["duration"] = 0.0
+                else:
+                    state["started"].wait()
+                    remaining = max(0.0, state["start"] + timeout - time.perf_counter())
+                    try:
+                        result["output"], result["duration"] = future.result(timeout=remaining)
+                    except FutureTimeoutError:
+                        self._abandon(future)
+                        result["error"] = f"Tool '{tool_name}' timed out after {timeout:g}s"
+                        result["duration"] = timeout
+                    except Exception as e:
+                        result["error"] = f"Tool execution failed: {str(e)}"
+                        result["duration"] = time.perf_counter() - state["start"]
+            if result["error"]:
+                log.error(f"[TOOLS_NODE] {result['error']}")
+            results.append(result)
+        return results
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+_executor: Optional[ParallelToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ParallelToolExecutor:
+    """
+    获取进程级共享的工具执行器
+
+    配置项:
+        planner.tool_max_workers: 线程池大小
+        planner.tool_timeout_seconds: 默认工具超时时间
+        planner.tool_timeouts: 按工具名配置的超时时间
+
+    Returns:
+        ParallelToolExecutor实例
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = ConfigManager()
+                _executor = ParallelToolExecutor(
+                    max_workers=config.get_int("planner.tool_max_workers", 8),
+                    default_timeout=float(config.get("planner.tool_timeout_seconds", 60)),
+                    timeouts=config.get("planner.tool_timeouts", {}) or {}
+                )
+    return _executor
@@ -2,10 +2,12 @@ from .entity_prompt import ENTITY_EXTRACTION_PROMPT
 from .qu_prompt import QUERY_UNDERSTANDING_PROMPT
 from .segment_prompt import WORD_SEGMENTATION_PROMPT
 from .react_prompt import REACT_PROMPT
+from .fused_qu_prompt import FUSED_QU_PROMPT
 
 __all__ = [
     'ENTITY_EXTRACTION_PROMPT',
     'QUERY_UNDERSTANDING_PROMPT',
     'WORD_SEGMENTATION_PROMPT',
-    'REACT_PROMPT'
+    'REACT_PROMPT',
+    'FUSED_QU_PROMPT'
 ] 
\ No newline at end of file
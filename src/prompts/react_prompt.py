@@ -163,9 +163,12 @@ IMPORTANT: You MUST follow this format EXACTLY:
 7. Each Action must use a valid tool name from the available tools
 8. Do NOT include code blocks or markdown formatting in Action inputs
 9. Keep Action inputs simple and direct
-10. Do NOT use brackets [] around tool names in Action
+10. Do NOT wrap the tool name itself in brackets; brackets only enclose the tool input (see rule 13)
 11. Do NOT include SQL code in Action inputs, only describe what you want to do
 12. Use simple text for Action inputs, not complex queries
+13. Write the tool input in brackets after the tool name: "Action N ToolName[input]"; the input may span several lines
+14. If several tool calls in a step do not depend on each other, write one Action line per call in the same step; all of them run in parallel and their Observations are returned in the same order
+15. Do NOT write Finish in the same step as a tool call; wait for the Observations first
 
 请你完成以下任务：
 Begin!
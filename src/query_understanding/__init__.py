@@ -1,3 +1,12 @@
 from .qu_subgraph import build_qu_subgraph, QuState
+from .semantic_cache import QuSemanticCache, get_qu_semantic_cache
+from .segmenter import FinancialSegmenter, build_financial_dictionary, get_financial_segmenter
+from .entity_matcher import EntityMatcher, build_entity_matcher, get_entity_matcher
+from .intent_classifier import LocalIntentClassifier, get_intent_classifier
 
-__all__ = ['build_qu_subgraph', 'QuState'] 
\ No newline at end of file
+__all__ = [
+    'build_qu_subgraph', 'QuState', 'QuSemanticCache', 'get_qu_semantic_cache',
+    'FinancialSegmenter', 'build_financial_dictionary', 'get_financial_segmenter',
+    'EntityMatcher', 'build_entity_matcher', 'get_entity_matcher',
+    'LocalIntentClassifier', 'get_intent_classifier'
+]
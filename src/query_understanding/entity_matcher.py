@@ -0,0 +1,333 @@
+"""
+Entity Matcher
+
+基于Aho-Corasick自动机的金融实体匹配器，作为实体抽取的快速通道。
+自动机离线从博金杯数据库(基金名称/简称/代码、股票名称/代码、行业)和招股说明书
+标题列表(公司名称)构建，一次扫描查询即可抽取并归一化实体。
+
+自动机以扁平数组的形式保存为npz文件:
+- edge_keys/edge_targets: 按 (状态 << 21 | 字符码点) 排序的转移表，二分查找
+- fail/output/output_link: 失配指针、状态对应的模式、后缀链上最近的输出状态
+- payload: 模式文本及其实体类型、代码、规范名称(JSON)
+加载时无需重建trie，毫秒级完成。
+"""
+
+import json
+import threading
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.query_understanding.financial_vocab import VocabEntry, load_financial_vocabulary, resolve_path
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+CHAR_BITS = 21  # Unicode码点最多21位
+MIN_PATTERN_LENGTH = 2
+
+
+def _is_ascii_alnum(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class AhoCorasickAutomaton:
+    """
+    扁平数组表示的Aho-Corasick自动机
+
+    每个状态最多对应一个模式(以该状态结尾的最长模式即该状态本身)，
+    通过output_link遍历同一位置结束的所有较短模式。
+    """
+
+    def __init__(
+        self,
+        edge_keys: Sequence[int],
+        edge_targets: Sequence[int],
+        fail: Sequence[int],
+        output: Sequence[int],
+        output_link: Sequence[int],
+        pattern_lengths: Sequence[int]
+    ):
+        self.edge_keys = list(edge_keys)
+        self.edge_targets = list(edge_targets)
+        self.fail = list(fail)
+        self.output = list(output)
+        self.output_link = list(output_link)
+        self.pattern_lengths = list(pattern_lengths)
+
+    @classmethod
+    def build(cls, patterns: Sequence[str]) -> "AhoCorasickAutomaton":
+        """
+        从模式列表构建自动机
+
+        Args:
+            patterns: 模式字符串，下标即模式ID
+
+        Returns:
+            AhoCorasickAutomaton实例
+        """
+        goto: List[Dict[str, int]] = [{}]
+        output = [-1]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    output.append(-1)
+                state = next_state
+            output[state] = pattern_id
+
+        fail = [0] * len(goto)
+        output_link = [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail_target = goto[fallback].get(ch, 0)
+                fail[child] = fail_target if fail_target != child else 0
+                output_link[child] = fail[child] if output[fail[child]] >= 0 else output_link[fail[child]]
+
+        edges = sorted(
+            ((state << CHAR_BITS) | ord(ch), child)
+            for state, transitions in enumerate(goto)
+            for ch, child in transitions.items()
+        )
+        return cls(
+            edge_keys=[key for key, _ in edges],
+            edge_targets=[child for _, child in edges],
+            fail=fail,
+            output=output,
+            output_link=output_link,
+            pattern_lengths=[len(pattern) for pattern in patterns]
+        )
+
+    def _next_state(self, state: int, ch: str) -> int:
+        code = ord(ch)
+        while True:
+            key = (state << CHAR_BITS) | code
+            index = bisect_left(self.edge_keys, key)
+            if index < len(self.edge_keys) and self.edge_keys[index] == key:
+                return self.edge_targets[index]
+            if state == 0:
+                return 0
+            state = self.fail[state]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        扫描文本，产出全部匹配
+
+        Args:
+            text: 待匹配文本
+
+        Yields:
+            (start, end, pattern_id)，end不包含
+        """
+        state = 0
+        for position, ch in enumerate(text):
+            state = self._next_state(state, ch)
+            match_state = state if self.output[state] >= 0 else self.output_link[state]
+            while match_state > 0:
+                pattern_id = self.output[match_state]
+                yield position + 1 - self.pattern_lengths[pattern_id], position + 1, pattern_id
+                match_state = self.output_link[match_state]
+
+    @property
+    def state_count(self) -> int:
+        return len(self.fail)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "edge_keys": np.asarray(self.edge_keys, dtype=np.int64),
+            "edge_targets": np.asarray(self.edge_targets, dtype=np.int32),
+            "fail": np.asarray(self.fail, dtype=np.int32),
+            "output": np.asarray(self.output, dtype=np.int32),
+            "output_link": np.asarray(self.output_link, dtype=np.int32),
+            "pattern_lengths": np.asarray(self.pattern_lengths, dtype=np.int32)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "AhoCorasickAutomaton":
+        return cls(**{
+            name: arrays[name].tolist()
+            for name in ("edge_keys", "edge_targets", "fail", "output", "output_link", "pattern_lengths")
+        })
+
+
+class EntityMatcher:
+    """
+    金融实体匹配器
+
+    采用最左最长、互不重叠的匹配策略；纯字母数字模式(如股票代码)要求两侧不是字母数字，
+    避免在日期等数字串中误匹配。
+    """
+
+    def __init__(self, automaton: AhoCorasickAutomaton, payloads: List[Tuple[str, List[List[Optional[str]]]]]):
+        self.automaton = automaton
+        # payloads[pattern_id] = (模式文本, [[实体类型, 代码, 规范名称], ...])
+        self.payloads = payloads
+
+    @classmethod
+    def from_vocabulary(cls, entries: Sequence[VocabEntry]) -> "EntityMatcher":
+        """
+        从词表构建匹配器，同一文本对应多种实体类型时全部保留
+
+        Args:
+            entries: 词表条目
+
+        Returns:
+            EntityMatcher实例
+        """
+        grouped: Dict[str, List[List[Optional[str]]]] = {}
+        for entry in entries:
+            if len(entry.text) < MIN_PATTERN_LENGTH:
+                continue
+            meta = [entry.entity_type, entry.code, entry.canonical]
+            metas = grouped.setdefault(entry.text, [])
+            if meta not in metas:
+                metas.append(meta)
+
+        payloads = list(grouped.items())
+        automaton = AhoCorasickAutomaton.build([text for text, _ in payloads])
+        log.info(f"实体自动机构建完成，模式 {len(payloads)} 个，状态 {automaton.state_count} 个")
+        return cls(automaton, payloads)
+
+    def save(self, path: str) -> None:
+        """保存为npz文件"""
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(self.payloads, ensure_ascii=False).encode('utf-8')
+        with open(output, 'wb') as f:
+            np.savez(f, payload=np.frombuffer(payload, dtype=np.uint8), **self.automaton.to_arrays())
+        log.info(f"实体自动机已保存: {output} ({output.stat().st_size / 1024 / 1024:.1f}MB)")
+
+    @classmethod
+    def load(cls, path: str) -> "EntityMatcher":
+        """从npz文件加载"""
+        with np.load(path) as arrays:
+            payloads = [tuple(item) for item in json.loads(arrays["payload"].tobytes().decode('utf-8'))]
+            automaton = AhoCorasickAutomaton.from_arrays(arrays)
+        log.info(f"加载实体自动机: {path}，模式 {len(payloads)} 个")
+        return cls(automaton, payloads)
+
+    def _is_word_boundary(self, text: str, start: int, end: int) -> bool:
+        if _is_ascii_alnum(text[start]) and start > 0 and _is_ascii_alnum(text[start - 1]):
+            return False
+        if _is_ascii_alnum(text[end - 1]) and end < len(text) and _is_ascii_alnum(text[end]):
+            return False
+        return True
+
+    def extract(self, text: str) -> List[dict]:
+        """
+        抽取并归一化实体
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            实体列表，格式与实体抽取prompt一致，并附带code和canonical字段
+        """
+        if not text:
+            return []
+
+        matches = [
+            (start, end, pattern_id)
+            for start, end, pattern_id in self.automaton.iter_matches(text)
+            if self._is_word_boundary(text, start, end)
+        ]
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+        entities = []
+        covered_until = 0
+        for start, end, pattern_id in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            pattern, metas = self.payloads[pattern_id]
+            for entity_type, code, canonical in metas:
+                entity = {"entity_type": entity_type, "text": pattern, "start": start, "end": end}
+                if code:
+                    entity["code"] = code
+                if canonical:
+                    entity["canonical"] = canonical
+                entities.append(entity)
+        return entities
+
+    def extract_as_json(self, text: str) -> Optional[str]:
+        """
+        抽取实体并输出与实体抽取prompt一致的JSON格式
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            {"entities": [...], "relations": []} 格式的JSON字符串，未匹配到实体时返回None
+        """
+        entities = self.extract(text)
+        if not entities:
+            return None
+        return json.dumps({"entities": entities, "relations": []}, ensure_ascii=False)
+
+
+def build_entity_matcher(db_path: Optional[str], titles_path: Optional[str], output_path: str) -> EntityMatcher:
+    """
+    离线构建实体匹配器并保存
+
+    Args:
+        db_path: 博金杯数据库路径
+        titles_path: 招股说明书标题列表路径
+        output_path: 自动机输出路径
+
+    Returns:
+        EntityMatcher实例
+    """
+    entries = load_financial_vocabulary(db_path, titles_path, include_codes=True)
+    matcher = EntityMatcher.from_vocabulary(entries)
+    matcher.save(output_path)
+    return matcher
+
+
+_matcher: Optional[EntityMatcher] = None
+_matcher_loaded = False
+_matcher_lock = threading.Lock()
+
+
+def get_entity_matcher() -> Optional[EntityMatcher]:
+    """
+    获取进程级共享的实体匹配器
+
+    配置项:
+        query_understanding.entity_matcher.enabled: 是否启用
+        query_understanding.entity_matcher.path: 自动机文件路径
+
+    Returns:
+        EntityMatcher实例；未启用或自动机文件不存在时返回None
+    """
+    global _matcher, _matcher_loaded
+    if not _matcher_loaded:
+        with _matcher_lock:
+            if not _matcher_loaded:
+                config = ConfigManager()
+                if config.get_boolean("query_understanding.entity_matcher.enabled", True):
+                    path = resolve_path(
+                        config.get("query_understanding.entity_matcher.path", ".cache/entity_automaton.npz")
+                    )
+                    if path.exists():
+                        try:
+                            _matcher = EntityMatcher.load(str(path))
+                        except Exception as e:
+                            log.error(f"加载实体自动机失败: {e}")
+                    else:
+                        log.warning(f"实体自动机文件不存在，实体抽取全部使用LLM: {path}")
+                _matcher_loaded = True
+    return _matcher
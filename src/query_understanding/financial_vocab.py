@@ -0,0 +1,176 @@
+"""
+Financial Vocabulary
+
+从博金杯SQLite数据库和招股说明书标题列表中抽取金融领域词表，
+供本地分词词典和实体匹配使用。实体类型名称与实体抽取prompt中的定义保持一致。
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# 项目根目录，用于解析相对路径
+project_root = Path(__file__).resolve().parent.parent.parent
+
+
+@dataclass(frozen=True)
+class VocabEntry:
+    """词表条目"""
+    text: str
+    entity_type: str
+    code: Optional[str] = None  # 对应的基金代码/股票代码，用于实体归一化
+    canonical: Optional[str] = None  # 规范名称，例如基金简称对应的基金全称
+
+
+# (表名, 文本列, 实体类型, 代码列, 规范名称列)
+# 每条SQL只读取去重后的列值，避免把明细表全部读入内存
+VOCAB_QUERIES: List[Tuple[str, str, str, Optional[str], Optional[str]]] = [
+    ("基金基本信息", "基金全称", "基金", "基金代码", None),
+    ("基金基本信息", "基金简称", "基金简称", "基金代码", "基金全称"),
+    ("基金基本信息", "管理人", "基金管理人", None, None),
+    ("基金基本信息", "托管人", "基金托管人", None, None),
+    ("基金股票持仓明细", "股票名称", "股票", "股票代码", None),
+    ("A股公司行业划分表", "一级行业名称", "行业", None, None),
+    ("A股公司行业划分表", "二级行业名称", "行业", None, None),
+    ("A股公司行业划分表", "行业划分标准", "行业划分标准", None, None),
+    ("基金债券持仓明细", "债券名称", "债券", None, None),
+    ("基金可转债持仓明细", "债券名称", "可转债", "对应股票代码", None),
+]
+
+# 基金代码和股票代码，只用于实体匹配，不写入分词词典
+# 日行情表较大，DISTINCT需要全表扫描，只在离线构建时读取
+CODE_QUERIES: List[Tuple[str, str, str, Optional[str], Optional[str]]] = [
+    ("基金基本信息", "基金代码", "基金代码", "基金代码", "基金全称"),
+    ("A股票日行情表", "股票代码", "股票代码", "股票代码", None),
+    ("港股票日行情表", "股票代码", "股票代码", "股票代码", None),
+    ("A股公司行业划分表", "股票代码", "股票代码", "股票代码", None),
+]
+
+
+def resolve_path(path: Optional[str]) -> Optional[Path]:
+    """将相对路径解析为基于项目根目录的绝对路径"""
+    if not path:
+        return None
+    path = Path(path)
+    return path if path.is_absolute() else project_root / path
+
+
+def connect_readonly(db_path: Path) -> sqlite3.Connection:
+    """以只读方式打开SQLite数据库"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def _select_expr(column: Optional[str]) -> str:
+    return f"`{column}`" if column else "NULL"
+
+
+def _clean(value) -> Optional[str]:
+    return str(value).strip() if value is not None else None
+
+
+def _query_column(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    code_column: Optional[str],
+    canonical_column: Optional[str]
+) -> Iterable[Tuple[str, Optional[str], Optional[str]]]:
+    sql = (
+        f"SELECT DISTINCT `{column}`, {_select_expr(code_column)}, {_select_expr(canonical_column)} "
+        f"FROM `{table}` WHERE `{column}` IS NOT NULL"
+    )
+    for text, code, canonical in conn.execute(sql):
+        yield _clean(text), _clean(code), _clean(canonical)
+
+
+def load_db_vocabulary(db_path: Path, include_codes: bool = False) -> List[VocabEntry]:
+    """
+    从SQLite数据库抽取基金、股票、行业、债券等名称
+
+    Args:
+        db_path: 数据库文件路径
+        include_codes: 是否同时抽取基金代码和股票代码
+
+    Returns:
+        词表条目列表
+    """
+    queries = VOCAB_QUERIES + (CODE_QUERIES if include_codes else [])
+    entries: List[VocabEntry] = []
+    conn = connect_readonly(db_path)
+    try:
+        for table, column, entity_type, code_column, canonical_column in queries:
+            try:
+                count = 0
+                for text, code, canonical in _query_column(conn, table, column, code_column, canonical_column):
+                    if text:
+                        entries.append(VocabEntry(text=text, entity_type=entity_type, code=code, canonical=canonical))
+                        count += 1
+                log.info(f"从 {table}.{column} 抽取 {entity_type} {count} 个")
+            except sqlite3.Error as e:
+                log.warning(f"读取 {table}.{column} 失败: {e}")
+    finally:
+        conn.close()
+    return entries
+
+
+def load_title_vocabulary(titles_path: Path) -> List[VocabEntry]:
+    """
+    从招股说明书标题列表抽取公司名称
+
+    文件每行格式为"<文件名>: <公司名称>"
+
+    Args:
+        titles_path: 标题列表文件路径
+
+    Returns:
+        词表条目列表
+    """
+    entries = []
+    with open(titles_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if ':' not in line:
+                continue
+            name = line.split(':', 1)[1].strip()
+            if len(name) >= 4:
+                entries.append(VocabEntry(text=name, entity_type="公司名称"))
+    log.info(f"从 {titles_path} 抽取公司名称 {len(entries)} 个")
+    return entries
+
+
+def load_financial_vocabulary(
+    db_path: Optional[str],
+    titles_path: Optional[str],
+    include_codes: bool = False
+) -> List[VocabEntry]:
+    """
+    汇总数据库和标题列表中的金融词表，文件不存在时跳过对应来源
+
+    Args:
+        db_path: 数据库文件路径
+        titles_path: 标题列表文件路径
+        include_codes: 是否同时抽取基金代码和股票代码
+
+    Returns:
+        去重后的词表条目列表
+    """
+    entries: List[VocabEntry] = []
+
+    db_file = resolve_path(db_path)
+    if db_file and db_file.exists():
+        entries.extend(load_db_vocabulary(db_file, include_codes))
+    else:
+        log.warning(f"数据库文件不存在，跳过数据库词表: {db_file}")
+
+    titles_file = resolve_path(titles_path)
+    if titles_file and titles_file.exists():
+        entries.extend(load_title_vocabulary(titles_file))
+    else:
+        log.warning(f"标题列表文件不存在，跳过公司名称: {titles_file}")
+
+    # 保持顺序去重
+    return list(dict.fromkeys(entries))
@@ -0,0 +1,107 @@
+"""
+Fused Query Understanding
+
+融合模式的查询理解: 一次LLM调用同时返回分词、实体和意图。
+本模块负责严格解析融合输出，并将其拆分为与三个独立节点相同格式的结果，
+解析失败时抛出FusedOutputError，由子图回退到三节点并行模式。
+"""
+
+import json
+import re
+from typing import Any, Dict, List
+
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+FUSED_REQUIRED_FIELDS = ("segmented_words", "entities", "intentions")
+
+
+class FusedOutputError(ValueError):
+    """融合输出不符合约定格式"""
+
+
+def _strip_code_fence(text: str) -> str:
+    """去掉模型可能附带的markdown代码块标记"""
+    text = text.strip()
+    match = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    return match.group(1) if match else text
+
+
+def _require_str_list(value: Any, field: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise FusedOutputError(f"字段 {field} 必须是字符串数组")
+    return value
+
+
+def parse_fused_output(text: str) -> Dict[str, Any]:
+    """
+    严格解析融合查询理解的输出
+
+    Args:
+        text: 模型输出文本
+
+    Returns:
+        包含segmented_words、entities、relations、intentions的字典
+
+    Raises:
+        FusedOutputError: 输出不是合法JSON或字段缺失/类型错误
+    """
+    if not text:
+        raise FusedOutputError("融合输出为空")
+
+    try:
+        data = json.loads(_strip_code_fence(text))
+    except json.JSONDecodeError as e:
+        raise FusedOutputError(f"融合输出不是合法JSON: {e}") from e
+
+    if not isinstance(data, dict):
+        raise FusedOutputError("融合输出必须是JSON对象")
+
+    missing = [field for field in FUSED_REQUIRED_FIELDS if field not in data]
+    if missing:
+        raise FusedOutputError(f"融合输出缺少字段: {missing}")
+
+    segmented_words = _require_str_list(data["segmented_words"], "segmented_words")
+    intentions = _require_str_list(data["intentions"], "intentions")
+
+    entities = data["entities"]
+    if not isinstance(entities, list):
+        raise FusedOutputError("字段 entities 必须是数组")
+    for entity in entities:
+        if not isinstance(entity, dict) or "entity_type" not in entity or "text" not in entity:
+            raise FusedOutputError(f"实体格式错误: {entity}")
+
+    relations = data.get("relations", [])
+    if not isinstance(relations, list):
+        raise FusedOutputError("字段 relations 必须是数组")
+
+    return {
+        "segmented_words": segmented_words,
+        "entities": entities,
+        "relations": relations,
+        "intentions": intentions
+    }
+
+
+def split_fused_output(parsed: Dict[str, Any]) -> Dict[str, str]:
+    """
+    将融合结果拆分为三个独立节点的输出格式
+
+    Args:
+        parsed: parse_fused_output的返回值
+
+    Returns:
+        segmented_words/entities/intent三个字段，格式与分词、实体抽取、意图理解prompt的输出一致
+    """
+    return {
+        "segmented_words": json.dumps(
+            {"segmented_words": parsed["segmented_words"]}, ensure_ascii=False
+        ),
+        "entities": json.dumps(
+            {"entities": parsed["entities"], "relations": parsed["relations"]}, ensure_ascii=False
+        ),
+        "intent": json.dumps(
+            {"intentions": parsed["intentions"]}, ensure_ascii=False
+        )
+    }
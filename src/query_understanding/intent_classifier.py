@@ -0,0 +1,288 @@
+"""
+Local Intent Classifier
+
+基于字符n-gram哈希特征和多标签逻辑回归的本地意图分类器。
+训练数据来自意图理解节点记录的LLM输出，推理只需一次向量化和一次矩阵乘法，
+置信度不足的查询仍交给LLM处理。
+
+模型以npz格式保存: weights/bias为模型参数，labels为JSON编码的标签列表，
+dimension/ngram_range为特征参数，加载后即可直接推理。
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.query_understanding.financial_vocab import resolve_path
+from src.query_understanding.semantic_cache import HashingEmbedder, mask_slots
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+
+def parse_intent_output(output) -> List[str]:
+    """
+    解析意图理解节点的输出
+
+    Args:
+        output: {"intentions": [...]} 格式的JSON字符串、字典或意图列表
+
+    Returns:
+        意图列表，无法解析时返回空列表
+    """
+    if isinstance(output, list):
+        return [str(item) for item in output]
+    if isinstance(output, dict):
+        return [str(item) for item in output.get("intentions") or []]
+    if not output:
+        return []
+    match = re.search(r"\{.*\}", str(output), re.DOTALL)
+    if not match:
+        return []
+    try:
+        return parse_intent_output(json.loads(match.group(0)))
+    except json.JSONDecodeError:
+        return []
+
+
+def load_intent_samples(path: str) -> List[Tuple[str, List[str]]]:
+    """
+    读取意图训练样本
+
+    文件为JSONL格式，每行包含query(或question)和intentions(或intent)字段
+
+    Args:
+        path: 样本文件路径
+
+    Returns:
+        [(问题, 意图列表), ...]
+    """
+    samples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            query = record.get("query") or record.get("question")
+            intentions = parse_intent_output(record.get("intentions", record.get("intent")))
+            if query and intentions:
+                samples.append((query, intentions))
+    return samples
+
+
+class LocalIntentClassifier:
+    """
+    多标签意图分类器
+
+    每个意图一个二分类逻辑回归，预测概率不低于0.5的意图作为输出。
+    置信度定义为所有标签中 max(p, 1 - p) 的最小值，即最不确定的那个标签的确定程度。
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        dimension: int = 4096,
+        ngram_range: Tuple[int, int] = (1, 3)
+    ):
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.embedder = HashingEmbedder(dimension=dimension, ngram_range=ngram_range)
+
+    def _encode(self, query: str) -> np.ndarray:
+        # 日期、代码等槽位不影响意图，先替换为占位符
+        template, _ = mask_slots(query)
+        return self.embedder.encode(template)
+
+    @classmethod
+    def train(
+        cls,
+        samples: Sequence[Tuple[str, Sequence[str]]],
+        dimension: int = 4096,
+        ngram_range: Tuple[int, int] = (1, 3),
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4
+    ) -> "LocalIntentClassifier":
+        """
+        全批量梯度下降训练
+
+        Args:
+            samples: [(问题, 意图列表), ...]
+            dimension: 哈希特征维度
+            ngram_range: 字符n-gram范围
+            epochs: 迭代轮数
+            learning_rate: 学习率
+            l2: L2正则系数
+
+        Returns:
+            训练好的分类器
+        """
+        if not samples:
+            raise ValueError("训练样本为空")
+
+        labels = sorted({label for _, intentions in samples for label in intentions})
+        label_index = {label: i for i, label in enumerate(labels)}
+        classifier = cls(
+            labels,
+            np.zeros((len(labels), dimension), dtype=np.float32),
+            np.zeros(len(labels), dtype=np.float32),
+            dimension=dimension,
+            ngram_range=ngram_range
+        )
+
+        features = np.stack([classifier._encode(query) for query, _ in samples])
+        targets = np.zeros((len(samples), len(labels)), dtype=np.float32)
+        for row, (_, intentions) in enumerate(samples):
+            for label in intentions:
+                targets[row, label_index[label]] = 1.0
+
+        weights = np.zeros((dimension, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        count = len(samples)
+        for _ in range(epochs):
+            probs = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+            error = probs - targets
+            weights -= learning_rate * (features.T @ error / count + l2 * weights)
+            bias -= learning_rate * error.mean(axis=0)
+
+        classifier.weights = weights.T.copy()
+        classifier.bias = bias
+        log.info(f"意图分类器训练完成，样本 {count} 个，标签 {len(labels)} 个")
+        return classifier
+
+    def predict_proba(self, query: str) -> np.ndarray:
+        """返回每个标签的预测概率"""
+        logits = self.weights @ self._encode(query) + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict(self, query: str) -> Tuple[List[str], float]:
+        """
+        预测意图
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            (意图列表, 置信度)
+        """
+        probs = self.predict_proba(query)
+        intentions = [label for label, prob in zip(self.labels, probs) if prob >= 0.5]
+        confidence = float(np.min(np.maximum(probs, 1.0 - probs))) if len(probs) else 0.0
+        return intentions, confidence
+
+    def evaluate(self, samples: Iterable[Tuple[str, Sequence[str]]]) -> dict:
+        """
+        在样本集上评估
+
+        Returns:
+            包含exact_match(意图集合完全一致的比例)和平均单次推理耗时的字典
+        """
+        total = correct = 0
+        elapsed = 0.0
+        for query, intentions in samples:
+            start = time.perf_counter()
+            predicted, _ = self.predict(query)
+            elapsed += time.perf_counter() - start
+            total += 1
+            correct += int(set(predicted) == set(intentions))
+        return {
+            "samples": total,
+            "exact_match": correct / total if total else 0.0,
+            "avg_latency_ms": elapsed / total * 1000 if total else 0.0
+        }
+
+    def save(self, path: str) -> None:
+        """保存为npz文件"""
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'wb') as f:
+            np.savez(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                labels=np.frombuffer(json.dumps(self.labels, ensure_ascii=False).encode('utf-8'), dtype=np.uint8),
+                dimension=np.int32(self.embedder.dimension),
+                ngram_range=np.asarray(self.embedder.ngram_range, dtype=np.int32)
+            )
+        log.info(f"意图分类器已保存: {output}")
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        """从npz文件加载"""
+        with np.load(path) as data:
+            return cls(
+                labels=json.loads(data["labels"].tobytes().decode('utf-8')),
+                weights=data["weights"],
+                bias=data["bias"],
+                dimension=int(data["dimension"]),
+                ngram_range=tuple(int(n) for n in data["ngram_range"])
+            )
+
+
+_classifier: Optional[LocalIntentClassifier] = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+_sample_log_lock = threading.Lock()
+
+
+def get_intent_classifier() -> Optional[LocalIntentClassifier]:
+    """
+    获取进程级共享的本地意图分类器
+
+    配置项:
+        query_understanding.intent_classifier.enabled: 是否启用
+        query_understanding.intent_classifier.path: 模型文件路径
+
+    Returns:
+        LocalIntentClassifier实例；未启用或模型文件不存在时返回None
+    """
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        with _classifier_lock:
+            if not _classifier_loaded:
+                config = ConfigManager()
+                if config.get_boolean("query_understanding.intent_classifier.enabled", True):
+                    path = resolve_path(
+                        config.get("query_understanding.intent_classifier.path", ".cache/intent_classifier.npz")
+                    )
+                    if path.exists():
+                        try:
+                            _classifier = LocalIntentClassifier.load(str(path))
+                            log.info(f"加载本地意图分类器: {path}，标签 {len(_classifier.labels)} 个")
+                        except Exception as e:
+                            log.error(f"加载本地意图分类器失败: {e}")
+                    else:
+                        log.warning(f"本地意图分类器不存在，意图理解全部使用LLM: {path}")
+                _classifier_loaded = True
+    return _classifier
+
+
+def log_intent_sample(query: str, intent_output) -> None:
+    """
+    记录LLM意图理解结果，作为本地分类器的训练数据
+
+    配置项:
+        query_understanding.intent_classifier.sample_log_path: 样本文件路径，为空则不记录
+    """
+    path = ConfigManager().get("query_understanding.intent_classifier.sample_log_path")
+    intentions = parse_intent_output(intent_output)
+    if not path or not intentions:
+        return
+    output = resolve_path(path)
+    try:
+        with _sample_log_lock:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            with open(output, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"query": query, "intentions": intentions}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        log.warning(f"记录意图样本失败: {e}")
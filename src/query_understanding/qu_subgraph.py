@@ -1,4 +1,6 @@
 from typing import TypedDict, Annotated, Sequence
+import json
+import operator
 from langgraph.graph import StateGraph, END, START
 import jieba
 from src.models.qu_model import QuModel
@@ -6,7 +8,13 @@ from src.config.config_manager import ConfigManager
 from langchain_core.prompts import ChatPromptTemplate
 from src.prompts import WORD_SEGMENTATION_PROMPT, ENTITY_EXTRACTION_PROMPT, QUERY_UNDERSTANDING_PROMPT
 from src.utils.logger import get_logger
+from src.utils.tracing import traced_node
 from src.models.streaming_adapter import STREAMING_MODELS, StreamingLLMAdapter
+from src.query_understanding.semantic_cache import get_qu_semantic_cache
+from src.query_understanding.fused_qu import FusedOutputError, parse_fused_output, split_fused_output
+from src.query_understanding.segmenter import get_financial_segmenter
+from src.query_understanding.entity_matcher import get_entity_matcher
+from src.query_understanding.intent_classifier import get_intent_classifier, log_intent_sample
 
 log = get_logger()
 
@@ -23,33 +31,175 @@ class QuState(TypedDict):
     segment_model: str = None
     ner_model: str = None
     intent_model: str = None
+    qu_cache_hit: bool = None
+    qu_mode: str = None
+    fused_model: str = None
+    qu_fused_failed: bool = None
+    qu_usage: Annotated[list[dict], operator.add] = None
+
+PARALLEL_QU_NODES = ["word_segmentation", "ner", "intent_recognition"]
+# 各节点产出的状态字段
+QU_NODE_FIELDS = {"word_segmentation": "segmented_words", "ner": "entities", "intent_recognition": "intent"}
+
+def _get_config(state: QuState) -> ConfigManager:
+    return state.get("config") or ConfigManager()
+
+def get_qu_mode(state: QuState) -> str:
+    """Resolve the QU mode: explicit state override first, then query_understanding.mode config."""
+    if state.get("qu_mode"):
+        return state.get("qu_mode")
+    return _get_config(state).get("query_understanding.mode", "parallel")
+
+def _usage_entry(node_name: str, result: dict) -> list[dict]:
+    return [{"node": node_name, "token_usage": result.get("token_usage", {})}]
+
+def _local_segmentation(config: ConfigManager, query: str):
+    """Segment with jieba when the local engine is configured, otherwise return None."""
+    if config.get("query_understanding.segmentation_engine", "local") != "local":
+        return None
+    return get_financial_segmenter().segment_as_json(query)
+
+def _requires_llm_ner(config: ConfigManager, query: str) -> bool:
+    """Queries mentioning document-level entities (招股说明书 etc.) still need the LLM NER."""
+    keywords = config.get("query_understanding.entity_matcher.llm_keywords", []) or []
+    return any(keyword in query for keyword in keywords)
+
+def _local_entities(config: ConfigManager, query: str):
+    """Extract entities with the Aho-Corasick matcher, None when it is unavailable or finds nothing."""
+    matcher = get_entity_matcher()
+    if matcher is None or _requires_llm_ner(config, query):
+        return None
+    return matcher.extract_as_json(query)
 
 # Node functions
+def cache_lookup_node(state: QuState) -> dict:
+    """Look up the semantic cache before calling any LLM."""
+    cache = get_qu_semantic_cache()
+    if cache is None:
+        return {"qu_cache_hit": False}
+    query = state.get("query")
+    cached = cache.lookup(query)
+    if cached is None:
+        return {"qu_cache_hit": False}
+    # Segmentation and entities depend on the slot values (split dates, offsets), so recompute
+    # them for the new query whenever that is local; fields the cache could not keep stay None
+    config = _get_config(state)
+    try:
+        segmented_words = _local_segmentation(config, query)
+    except Exception as e:
+        log.warning(f"缓存命中后本地分词失败: {e}")
+        segmented_words = None
+    return {
+        "qu_cache_hit": True,
+        "segmented_words": segmented_words or cached.get("segmented_words"),
+        "entities": _local_entities(config, query) or cached.get("entities"),
+        "intent": cached.get("intent")
+    }
+
+def route_after_cache_lookup(state: QuState):
+    """Skip the LLM branches on a cache hit, running only the nodes whose result is still missing."""
+    if state.get("qu_cache_hit"):
+        missing = [node for node in PARALLEL_QU_NODES if state.get(QU_NODE_FIELDS[node]) is None]
+        return missing or "join"
+    if get_qu_mode(state) == "fused":
+        return "fused_qu"
+    return PARALLEL_QU_NODES
+
+def fused_qu_node(state: QuState) -> dict:
+    """Run segmentation, NER and intent recognition in a single structured-output LLM call."""
+    qu_model = QuModel(state, "fused")
+    try:
+        result = qu_model.call_llm_by_aliyun_api()
+    except Exception as e:
+        log.warning(f"融合查询理解调用失败，回退到并行模式: {e}")
+        return {"qu_fused_failed": True}
+    try:
+        parsed = parse_fused_output(result.get("final_output"))
+    except FusedOutputError as e:
+        log.warning(f"融合查询理解输出解析失败，回退到并行模式: {e}")
+        return {"qu_fused_failed": True, "qu_usage": _usage_entry("fused", result)}
+    return {
+        **split_fused_output(parsed),
+        "qu_fused_failed": False,
+        "qu_usage": _usage_entry("fused", result)
+    }
+
+def route_after_fused(state: QuState):
+    """Fall back to the three-node graph when the fused output could not be parsed."""
+    if state.get("qu_fused_failed"):
+        return PARALLEL_QU_NODES
+    return "join"
+
 def word_segmentation_node(state: QuState) -> dict:
+    config = _get_config(state)
+    try:
+        segmented_words = _local_segmentation(config, state.get("query"))
+    except Exception as e:
+        if not config.get_boolean("query_understanding.segmentation_llm_fallback", False):
+            raise
+        log.warning(f"本地分词失败，回退到LLM分词: {e}")
+        segmented_words = None
+    if segmented_words is not None:
+        return {
+            "segmented_words": segmented_words,
+            "qu_usage": [{"node": "word_segmentation", "token_usage": {}}]
+        }
+
     qu_model = QuModel(state, "word_segmentation")
     result = qu_model.call_llm_by_aliyun_api()
     segmented_words = result.get("final_output")
     return {    
-        "segmented_words": segmented_words
+        "segmented_words": segmented_words,
+        "qu_usage": _usage_entry("word_segmentation", result)
     }
 
 def ner_node(state: QuState) -> dict:
+    query = state.get("query")
+    entities = _local_entities(_get_config(state), query)
+    if entities is not None:
+        return {
+            "entities": entities,
+            "qu_usage": [{"node": "ner", "token_usage": {}}]
+        }
+
     qu_model = QuModel(state, "ner")
     result = qu_model.call_llm_by_aliyun_api()
     entities = result.get("final_output")
     return {
-        "entities": entities
+        "entities": entities,
+        "qu_usage": _usage_entry("ner", result)
     }
 
 def intent_recognition_node(state: QuState) -> dict:
+    query = state.get("query")
+    classifier = get_intent_classifier()
+    if classifier is not None:
+        intentions, confidence = classifier.predict(query)
+        threshold = float(_get_config(state).get("query_understanding.intent_classifier.confidence_threshold", 0.9))
+        if intentions and confidence >= threshold:
+            return {
+                "intent": json.dumps({"intentions": intentions}, ensure_ascii=False),
+                "qu_usage": [{"node": "intent", "token_usage": {}}]
+            }
+        log.info(f"本地意图分类置信度 {confidence:.3f} 低于阈值 {threshold}，使用LLM")
+
     qu_model = QuModel(state, "intent") 
     result = qu_model.call_llm_by_aliyun_api()
     intent = result.get("final_output")
+    log_intent_sample(query, intent)
     return {
-        "intent": intent
+        "intent": intent,
+        "qu_usage": _usage_entry("intent", result)
     }
 
 def join_node(state: QuState) -> dict:
+    cache = get_qu_semantic_cache()
+    if cache is not None and not state.get("qu_cache_hit") and not state.get("error"):
+        cache.store(state.get("query"), {
+            "segmented_words": state.get("segmented_words"),
+            "entities": state.get("entities"),
+            "intent": state.get("intent")
+        })
     return {
         "segmented_words": state.get("segmented_words"),
         "entities": state.get("entities"),
@@ -64,14 +214,25 @@ def build_qu_subgraph() -> StateGraph:
     qu_graph = StateGraph(QuState)
     
     # Add all nodes
-    qu_graph.add_node("word_segmentation", word_segmentation_node)
-    qu_graph.add_node("ner", ner_node)
-    qu_graph.add_node("intent_recognition", intent_recognition_node)
-    qu_graph.add_node("join", join_node)
-    # Set the entry point - we'll branch from here to all parallel nodes
-    qu_graph.add_edge(START, "word_segmentation")
-    qu_graph.add_edge(START, "ner")
-    qu_graph.add_edge(START, "intent_recognition")
+    qu_graph.add_node("cache_lookup", traced_node("qu.cache_lookup", cache_lookup_node))
+    qu_graph.add_node("word_segmentation", traced_node("qu.word_segmentation", word_segmentation_node))
+    qu_graph.add_node("ner", traced_node("qu.ner", ner_node))
+    qu_graph.add_node("intent_recognition", traced_node("qu.intent_recognition", intent_recognition_node))
+    qu_graph.add_node("fused_qu", traced_node("qu.fused_qu", fused_qu_node))
+    qu_graph.add_node("join", traced_node("qu.join", join_node))
+    # Set the entry point - check the semantic cache first, then either run the fused
+    # single-call node or branch to all parallel nodes on a miss
+    qu_graph.add_edge(START, "cache_lookup")
+    qu_graph.add_conditional_edges(
+        "cache_lookup",
+        route_after_cache_lookup,
+        PARALLEL_QU_NODES + ["fused_qu", "join"]
+    )
+    qu_graph.add_conditional_edges(
+        "fused_qu",
+        route_after_fused,
+        PARALLEL_QU_NODES + ["join"]
+    )
     qu_graph.add_edge("word_segmentation", "join")
     qu_graph.add_edge("ner", "join")
     qu_graph.add_edge("intent_recognition", "join")
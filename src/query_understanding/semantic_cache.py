@@ -0,0 +1,379 @@
+"""
+Query Understanding Semantic Cache
+
+查询理解结果的语义缓存。
+博金杯问题中大量问题仅在日期、股票代码、基金代码上有所不同，
+本模块先将这些槽位值替换为占位符得到问题模板，模板完全一致的问题复用其查询理解结果，
+并将槽位值重新代入，避免重复调用LLM。
+模板只差一个指标词(如收盘价/开盘价)的问题查询理解结果不同，因此不按向量相似度匹配。
+槽位值在结果中以拆分或归一化形式出现的字段不缓存(见find_leaked_slots)。
+HashingEmbedder也被本地意图分类器使用。
+"""
+
+import atexit
+import hashlib
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# 项目根目录，用于解析相对缓存路径
+project_root = Path(__file__).resolve().parent.parent.parent
+
+# 槽位识别规则，按顺序匹配，先匹配的规则优先
+SLOT_PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    ("DATE", re.compile(r"(?<!\d)(?:19|20)\d{2}年\d{1,2}月\d{1,2}日")),
+    ("DATE", re.compile(r"(?<!\d)(?:19|20)\d{2}[-/.]\d{1,2}[-/.]\d{1,2}(?!\d)")),
+    ("DATE", re.compile(r"(?<!\d)(?:19|20)\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])(?!\d)")),
+    ("FUND_CODE", re.compile(r"(?<=基金代码)[为是:：\s]*\d{6}(?!\d)|(?<=基金)[（(]?\d{6}(?!\d)")),
+    ("STOCK_CODE", re.compile(r"(?<![\d.])\d{6}(?:\.(?:SH|SZ|BJ))?(?![\d])|(?<![\d.])\d{5}\.HK")),
+    ("YEAR", re.compile(r"(?<!\d)(?:19|20)\d{2}年(?!\d)")),
+]
+
+PLACEHOLDER_PATTERN = re.compile(r"<[A-Z_]+_\d+>")
+
+
+def mask_slots(query: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    将问题中的日期、股票代码、基金代码等槽位替换为占位符
+
+    Args:
+        query: 原始问题
+
+    Returns:
+        (问题模板, [(占位符, 槽位值), ...])
+    """
+    spans: List[Tuple[int, int, str]] = []
+    for slot_type, pattern in SLOT_PATTERNS:
+        for match in pattern.finditer(query):
+            start, end = match.span()
+            value = match.group(0)
+            # 去掉前导的分隔符，仅保留数值部分
+            stripped = value.lstrip("为是:：（( ")
+            start += len(value) - len(stripped)
+            if any(start < s_end and end > s_start for s_start, s_end, _ in spans):
+                continue
+            spans.append((start, end, slot_type))
+    spans.sort()
+
+    template_parts = []
+    slots = []
+    counters: Dict[str, int] = {}
+    cursor = 0
+    for start, end, slot_type in spans:
+        index = counters.get(slot_type, 0)
+        counters[slot_type] = index + 1
+        placeholder = f"<{slot_type}_{index}>"
+        template_parts.append(query[cursor:start])
+        template_parts.append(placeholder)
+        slots.append((placeholder, query[start:end]))
+        cursor = end
+    template_parts.append(query[cursor:])
+
+    template = "".join(template_parts)
+    return re.sub(r"\s+", "", template), slots
+
+
+def substitute_slots(value: Any, mapping: Dict[str, str], whole_values: bool = False) -> Any:
+    """
+    递归地将结果中的字符串按映射替换
+
+    Args:
+        value: 字符串、列表或字典
+        mapping: 原文 -> 替换文本
+        whole_values: 只替换前后不紧接数字/字母的完整出现，
+            避免把槽位值当作子串替换进其他代码或数字(如600519替换进6005190)
+
+    Returns:
+        替换后的值
+    """
+    if not mapping:
+        return value
+    # 一次性替换，避免占位符与槽位值相互影响；长的优先匹配
+    pattern = "|".join(re.escape(k) for k in sorted(mapping, key=len, reverse=True))
+    if whole_values:
+        pattern = rf"(?<![0-9A-Za-z])(?:{pattern})(?![0-9A-Za-z])"
+    return _substitute(value, re.compile(pattern), mapping)
+
+
+def _substitute(value: Any, pattern: "re.Pattern", mapping: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return pattern.sub(lambda m: mapping[m.group(0)], value)
+    if isinstance(value, list):
+        return [_substitute(item, pattern, mapping) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, pattern, mapping) for key, item in value.items()}
+    return value
+
+
+def slot_fragments(placeholder: str, value: str) -> List[str]:
+    """
+    槽位值在查询理解结果中可能出现的其他形式
+
+    分词会把日期拆成年、月、日几个数字，实体抽取会把日期归一化为YYYYMMDD等格式，
+    代码可能去掉交易所后缀，这些形式都不是槽位值的完整出现，无法被掩码
+
+    Args:
+        placeholder: 占位符
+        value: 槽位值
+
+    Returns:
+        数字片段及日期的归一化形式
+    """
+    digits = re.findall(r"\d+", value)
+    fragments = set(digits)
+    if placeholder.startswith("<DATE_"):
+        if len(digits) == 1 and len(digits[0]) == 8:
+            digits = [digits[0][:4], digits[0][4:6], digits[0][6:]]
+        if len(digits) == 3:
+            year, month, day = digits[0], int(digits[1]), int(digits[2])
+            fragments.update([year, str(month), str(day), f"{month:02d}", f"{day:02d}",
+                              f"{year}{month:02d}{day:02d}", f"{year}-{month:02d}-{day:02d}"])
+    return sorted(fragments, key=len, reverse=True)
+
+
+def find_leaked_slots(result: Dict[str, Any], slots: List[Tuple[str, str]]) -> List[str]:
+    """
+    找出模板化后仍含有槽位值片段的结果字段
+
+    Args:
+        result: 模板化后的查询理解结果
+        slots: [(占位符, 槽位值), ...]
+
+    Returns:
+        字段名列表
+    """
+    fragments = {fragment for placeholder, value in slots for fragment in slot_fragments(placeholder, value)}
+    if not fragments:
+        return []
+    pattern = re.compile(r"(?<!\d)(?:" + "|".join(re.escape(f) for f in sorted(fragments, key=len, reverse=True))
+                         + r")(?!\d)")
+    return [key for key, value in result.items() if _contains(value, pattern)]
+
+
+def _contains(value: Any, pattern: "re.Pattern") -> bool:
+    if isinstance(value, str):
+        # 占位符中的序号不算槽位值
+        return pattern.search(PLACEHOLDER_PATTERN.sub("", value)) is not None
+    if isinstance(value, list):
+        return any(_contains(item, pattern) for item in value)
+    if isinstance(value, dict):
+        return any(_contains(item, pattern) for item in value.values())
+    return False
+
+
+class HashingEmbedder:
+    """
+    基于字符n-gram哈希的轻量级向量化器
+
+    无需加载模型，CPU上单次向量化耗时在微秒级，适合模板级别的相似度匹配。
+    """
+
+    def __init__(self, dimension: int = 1024, ngram_range: Tuple[int, int] = (1, 3)):
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+
+    def encode(self, text: str) -> np.ndarray:
+        """将文本编码为L2归一化向量"""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        # 占位符作为一个整体token，避免被拆成字符
+        tokens = re.findall(PLACEHOLDER_PATTERN.pattern + "|.", text)
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = "".join(tokens[i:i + n])
+                digest = hashlib.md5(gram.encode("utf-8")).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vector[bucket] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class QuSemanticCache:
+    """
+    查询理解语义缓存
+
+    以问题模板为键，缓存条目包含槽位签名以及模板化后的查询理解结果，命中要求模板完全一致且槽位签名一致。
+    结果中槽位值以其他形式出现的字段(分词把日期拆成"2021"/"03"/"05"、实体把日期归一化为"20210305")
+    无法代入新问题的槽位值，这些字段不缓存，命中时由查询理解节点重新计算。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        persist_path: Optional[str] = None,
+        save_interval: float = 30.0
+    ):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0}
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        if self.persist_path:
+            self.load()
+            # 写入按save_interval合并落盘，进程退出前保存剩余的修改
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _signature(slots: List[Tuple[str, str]]) -> Tuple[Tuple[str, int], ...]:
+        """
+        占位符及其取值的相等关系
+
+        缓存的问题中两个槽位取值相同时，结果里无法区分引用的是哪一个，
+        只能被取值同样相同的问题复用
+        """
+        first_seen: Dict[str, int] = {}
+        return tuple((placeholder, first_seen.setdefault(value, index))
+                     for index, (placeholder, value) in enumerate(slots))
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        查找同模板问题的查询理解结果
+
+        Args:
+            query: 原始问题
+
+        Returns:
+            代入当前槽位值后的结果字典(只含可以复用的字段)，未命中时返回None
+        """
+        template, slots = mask_slots(query)
+
+        with self._lock:
+            entry = self._entries.get(template)
+            if entry is None or entry["signature"] != self._signature(slots):
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+
+        log.info(f"命中查询理解语义缓存，模板: {template}")
+        return substitute_slots(entry["result"], dict(slots))
+
+    def store(self, query: str, result: Dict[str, Any]) -> None:
+        """
+        缓存问题的查询理解结果，结果中的槽位值会被替换为占位符
+
+        Args:
+            query: 原始问题
+            result: 查询理解结果(segmented_words/entities/intent)
+        """
+        template, slots = mask_slots(query)
+        # 只替换被掩码的槽位值的完整出现；取值相同的槽位统一用第一个占位符
+        mapping: Dict[str, str] = {}
+        for placeholder, value in slots:
+            mapping.setdefault(value, placeholder)
+        templated = substitute_slots(result, mapping, whole_values=True)
+
+        leaked = find_leaked_slots(templated, slots)
+        if leaked:
+            log.info(f"查询理解结果字段 {leaked} 含有未掩码的槽位值，不缓存这些字段")
+        templated = {key: value for key, value in templated.items() if key not in leaked and value is not None}
+        if not templated:
+            return
+
+        entry = {"signature": self._signature(slots), "result": templated}
+        with self._lock:
+            # 相同模板直接覆盖
+            self._entries[template] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["writes"] += 1
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+
+        if self.persist_path and due:
+            self.save()
+
+    def flush(self) -> None:
+        """保存尚未落盘的修改"""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        """将缓存持久化到磁盘"""
+        if not self.persist_path:
+            return
+        path = Path(self.persist_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {"entries": dict(self._entries)}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        with open(path, "wb") as f:
+            pickle.dump(data, f)
+
+    def load(self) -> None:
+        """从磁盘加载缓存"""
+        path = Path(self.persist_path)
+        if not path.exists():
+            return
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if not isinstance(data.get("entries"), dict):
+                log.warning("查询理解语义缓存格式已变更，忽略已有缓存")
+                return
+            with self._lock:
+                self._entries = OrderedDict(data["entries"])
+            log.info(f"加载查询理解语义缓存 {len(self._entries)} 条")
+        except Exception as e:
+            log.error(f"加载查询理解语义缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_qu_cache: Optional[QuSemanticCache] = None
+_qu_cache_lock = threading.Lock()
+
+
+def get_qu_semantic_cache() -> Optional[QuSemanticCache]:
+    """
+    获取进程级共享的查询理解语义缓存，未启用时返回None
+
+    配置项(qu_cache.*):
+        enabled: 是否启用
+        max_entries: 最大条目数
+        persist_path: 持久化文件路径(相对路径基于项目根目录)，为空则仅保存在内存中
+        save_interval_seconds: 两次落盘的最小间隔，期间的写入合并保存
+
+    Returns:
+        QuSemanticCache实例或None
+    """
+    global _qu_cache
+    config = ConfigManager()
+    if not config.get_boolean("qu_cache.enabled", True):
+        return None
+    if _qu_cache is None:
+        with _qu_cache_lock:
+            if _qu_cache is None:
+                persist_path = config.get("qu_cache.persist_path")
+                if persist_path and not Path(persist_path).is_absolute():
+                    persist_path = str(project_root / persist_path)
+                _qu_cache = QuSemanticCache(
+                    max_entries=config.get_int("qu_cache.max_entries", 10000),
+                    persist_path=persist_path,
+                    save_interval=float(config.get("qu_cache.save_interval_seconds", 30))
+                )
+    return _qu_cache
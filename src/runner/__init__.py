@@ -0,0 +1,12 @@
+"""
+Runner module
+"""
+
+from src.runner.batch_runner import BatchRunner, agent_answer, iter_questions, load_checkpoint
+
+__all__ = [
+    'BatchRunner',
+    'agent_answer',
+    'iter_questions',
+    'load_checkpoint'
+]
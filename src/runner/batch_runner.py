@@ -0,0 +1,340 @@
+"""
+Batch Question Runner
+
+批量运行博金杯问题文件:
+1. 从JSONL问题文件流式读取问题(每行包含id和question)
+2. 多进程执行，每个进程内用多个线程并发处理问题(LLM调用以网络I/O为主)
+3. 每完成一个问题立即追加写入检查点文件并落盘，崩溃或被限流中断后重新运行会跳过已完成的问题，
+   失败的问题在下次运行时重试
+4. 全部完成后按id顺序生成提交格式文件({"id", "question", "answer"})
+"""
+
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+AnswerFn = Callable[[Dict[str, Any]], str]
+
+
+def iter_questions(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取问题文件
+
+    Args:
+        path: JSONL文件路径，每行包含id和question字段
+
+    Yields:
+        问题记录
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record.setdefault("id", line_number)
+            yield record
+
+
+def load_checkpoint(path: str) -> Dict[Any, Dict[str, Any]]:
+    """
+    读取检查点文件，同一问题多次出现时以最后一次为准
+
+    Args:
+        path: 检查点文件路径
+
+    Returns:
+        {问题id: 结果记录}
+    """
+    results: Dict[Any, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 崩溃时最后一行可能只写了一半
+                log.warning(f"忽略检查点中不完整的行: {line[:80]}")
+                continue
+            results[record["id"]] = record
+    return results
+
+
+class CheckpointWriter:
+    """检查点文件追加写入器，每条记录写入后立即落盘"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        # 上次崩溃时最后一行可能没有换行，先补齐，避免与新记录拼在同一行
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _run_question(answer_fn: AnswerFn, record: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = {"id": record["id"], "question": record.get("question")}
+    try:
+        result["answer"] = answer_fn(record)
+        result["status"] = "ok"
+    except Exception as e:
+        result["answer"] = ""
+        result["status"] = "error"
+        result["error"] = str(e)
+    result["latency"] = time.perf_counter() - start
+    return result
+
+
+_thread_local = threading.local()
+
+
+def agent_answer(record: Dict[str, Any]) -> str:
+    """
+    默认的答题函数: 每个线程复用一个ReAct Agent实例
+
+    配置项:
+        runner.agent_model: Agent使用的模型
+        runner.max_steps: 最大推理步数
+    """
+    agent = getattr(_thread_local, "agent", None)
+    if agent is None:
+        from src.planner.planner import create_default_custom_react_agent
+        config = ConfigManager()
+        agent = create_default_custom_react_agent(
+            model_name=config.get("runner.agent_model", "qwen-turbo"),
+            config=config,
+            max_steps=config.get_int("runner.max_steps", 8)
+        )
+        _thread_local.agent = agent
+    result = agent.invoke(record["question"])
+    if result.get("error") and not result.get("final_answer"):
+        raise RuntimeError(result["error"])
+    return result.get("final_answer") or ""
+
+
+def _init_worker(config_dir: str, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    config = ConfigManager()
+    config.init(Path(config_dir))
+    for key, value in (config_overrides or {}).items():
+        config.update_config(key, value)
+    from src.models.adapter_pool import warm_up_adapters
+    warm_up_adapters(config)
+
+
+def _worker_main(
+    config_dir: str,
+    config_overrides: Optional[Dict[str, Any]],
+    answer_fn: AnswerFn,
+    concurrency: int,
+    task_queue,
+    result_queue
+) -> None:
+    """工作进程: 多个线程从任务队列取问题，结果放入结果队列，收到None后退出"""
+    _init_worker(config_dir, config_overrides)
+
+    def consume():
+        while True:
+            record = task_queue.get()
+            if record is None:
+                break
+            result_queue.put(_run_question(answer_fn, record))
+
+    threads = [threading.Thread(target=consume, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class BatchRunner:
+    """
+    批量答题执行器
+
+    processes为0时在当前进程内用线程池执行，便于调试。
+    config_overrides中的配置项(如llm_backend.mode)在每个工作进程加载配置后覆盖。
+    """
+
+    def __init__(
+        self,
+        questions_path: str,
+        checkpoint_path: str,
+        output_path: Optional[str] = None,
+        processes: int = 2,
+        concurrency: int = 4,
+        config_dir: Optional[str] = None,
+        answer_fn: AnswerFn = agent_answer,
+        retry_failed: bool = True,
+        limit: Optional[int] = None,
+        config_overrides: Optional[Dict[str, Any]] = None
+    ):
+        self.questions_path = questions_path
+        self.checkpoint_path = checkpoint_path
+        self.output_path = output_path
+        self.processes = processes
+        self.concurrency = max(1, concurrency)
+        self.config_dir = config_dir or str(project_root / "src" / "conf")
+        self.answer_fn = answer_fn
+        self.retry_failed = retry_failed
+        self.limit = limit
+        self.config_overrides = dict(config_overrides or {})
+        self.stats = {"skipped": 0, "completed": 0, "failed": 0}
+
+    def _pending_questions(self, done: Dict[Any, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for count, record in enumerate(iter_questions(self.questions_path)):
+            if self.limit is not None and count >= self.limit:
+                break
+            previous = done.get(record["id"])
+            if previous and (previous.get("status") == "ok" or not self.retry_failed):
+                self.stats["skipped"] += 1
+                continue
+            yield record
+
+    def _record_result(self, writer: CheckpointWriter, result: Dict[str, Any]) -> None:
+        writer.write(result)
+        if result["status"] == "ok":
+            self.stats["completed"] += 1
+        else:
+            self.stats["failed"] += 1
+            log.warning(f"问题 {result['id']} 失败: {result.get('error')}")
+        finished = self.stats["completed"] + self.stats["failed"]
+        if finished % 10 == 0:
+            log.info(f"批量答题进度: {self.stats}")
+
+    def _run_inline(self, pending: Iterator[Dict[str, Any]], writer: CheckpointWriter) -> None:
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            in_flight = set()
+            for record in pending:
+                in_flight.add(pool.submit(_run_question, self.answer_fn, record))
+                if len(in_flight) >= self.concurrency * 2:
+                    done = next(as_completed(in_flight))
+                    in_flight.remove(done)
+                    self._record_result(writer, done.result())
+            for future in as_completed(in_flight):
+                self._record_result(writer, future.result())
+
+    def _run_processes(self, pending: Iterator[Dict[str, Any]], writer: CheckpointWriter) -> None:
+        context = mp.get_context("spawn")
+        task_queue = context.Queue(maxsize=self.processes * self.concurrency * 2)
+        result_queue = context.Queue()
+        workers = [
+            context.Process(
+                target=_worker_main,
+                args=(self.config_dir, self.config_overrides, self.answer_fn, self.concurrency,
+                      task_queue, result_queue),
+                daemon=True
+            )
+            for _ in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        submitted = {"count": 0, "done": False}
+
+        def feed():
+            for record in pending:
+                task_queue.put(record)
+                submitted["count"] += 1
+            submitted["done"] = True
+            for _ in range(self.processes * self.concurrency):
+                task_queue.put(None)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        received = 0
+        try:
+            while not (submitted["done"] and received >= submitted["count"]):
+                try:
+                    result = result_queue.get(timeout=1)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        log.error("所有工作进程已退出，未完成的问题将在下次运行时继续")
+                        break
+                    continue
+                received += 1
+                self._record_result(writer, result)
+        finally:
+            for worker in workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+
+    def run(self) -> Dict[str, int]:
+        """
+        执行批量答题，完成后写出提交文件
+
+        Returns:
+            统计信息: skipped/completed/failed
+        """
+        done = load_checkpoint(self.checkpoint_path)
+        log.info(f"检查点中已有 {len(done)} 条记录: {self.checkpoint_path}")
+
+        writer = CheckpointWriter(self.checkpoint_path)
+        try:
+            pending = self._pending_questions(done)
+            if self.processes > 0:
+                self._run_processes(pending, writer)
+            else:
+                self._run_inline(pending, writer)
+        finally:
+            writer.close()
+
+        log.info(f"批量答题结束: {self.stats}")
+        if self.output_path:
+            self.write_submission(self.output_path)
+        return self.stats
+
+    def write_submission(self, output_path: str) -> int:
+        """
+        按问题文件顺序生成提交文件，未完成的问题答案为空
+
+        Args:
+            output_path: 提交文件路径
+
+        Returns:
+            已回答的问题数量
+        """
+        results = load_checkpoint(self.checkpoint_path)
+        answered = 0
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for record in iter_questions(self.questions_path):
+                result = results.get(record["id"]) or {}
+                answer = result.get("answer", "") if result.get("status") == "ok" else ""
+                answered += bool(answer)
+                f.write(json.dumps(
+                    {"id": record["id"], "question": record.get("question"), "answer": answer},
+                    ensure_ascii=False
+                ) + "\n")
+        log.info(f"提交文件已生成: {output_path}，已回答 {answered} 个问题")
+        return answered
@@ -12,7 +12,9 @@ import operator
 from langgraph.graph import StateGraph, END
 from src.query_understanding.qu_subgraph import build_qu_subgraph, QuState
 from src.config.config_manager import ConfigManager
+from src.models.adapter_pool import warm_up_adapters
 from src.utils.logger import logger, get_logger
+from src.utils.tracing import traced_node
 
 # Initialize config manager
 config_manager = ConfigManager()
@@ -53,6 +55,7 @@ class GraphState(TypedDict):
     segment_model: str = None
     ner_model: str = None
     intent_model: str = None
+    fused_model: str = None
 
 def start_node(state: GraphState) -> GraphState:
     """Initialize the state with the query."""
@@ -70,7 +73,8 @@ def map_qu_state_to_graph_state(qu_state: QuState) -> GraphState:
         "config": qu_state.get("config"),
         "segment_model": qu_state.get("segment_model"),
         "ner_model": qu_state.get("ner_model"),
-        "intent_model": qu_state.get("intent_model")
+        "intent_model": qu_state.get("intent_model"),
+        "fused_model": qu_state.get("fused_model")
     }
 
 # --- 5. Build the Graph ---
@@ -78,7 +82,7 @@ def build_graph():
     workflow = StateGraph(GraphState)
 
     # Add the start node
-    workflow.add_node("start", start_node)
+    workflow.add_node("start", traced_node("start", start_node))
 
     # Create the query understanding subgraph
     qu_subgraph = build_qu_subgraph()
@@ -91,7 +95,7 @@ def build_graph():
         return map_qu_state_to_graph_state(qu_result)
 
     # Add the query understanding node
-    workflow.add_node("query_understanding", qu_node)
+    workflow.add_node("query_understanding", traced_node("query_understanding", qu_node))
 
     # Set the entry point
     workflow.set_entry_point("start")
@@ -106,6 +110,8 @@ def build_graph():
 
 if __name__ == '__main__':
     # Example usage
+    # Warm up shared LLM adapters and HTTP connections before the first query
+    warm_up_adapters(config_manager)
     graph_app = build_graph()
     
     # Get logger instance
@@ -118,7 +124,8 @@ if __name__ == '__main__':
         "config": config_manager,
         "segment_model": config_manager.get("api.qwen.segment_model"),
         "ner_model": config_manager.get("api.qwen.ner_model"),
-        "intent_model": config_manager.get("api.qwen.intent_model")
+        "intent_model": config_manager.get("api.qwen.intent_model"),
+        "fused_model": config_manager.get("api.qwen.fused_model")
     }
 
     log.info(f"Invoking graph with query: '{test_query}'")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for parsing the actions of one ReAct step
+"""
+
+import sys
+import os
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.planner.planner import CustomReActAgent
+from src.utils.logger import get_logger
+
+
+class TestActionParser(unittest.TestCase):
+
+    def setUp(self):
+        # 只测试解析，不初始化模型和执行图
+        self.agent = CustomReActAgent.__new__(CustomReActAgent)
+        self.agent.log = get_logger()
+
+    def test_multiline_sql_input(self):
+        parsed = self.agent._parse_agent_response(
+            "Thought 2 需要查询收盘价\n"
+            "Action 2 QueryDB[SELECT [收盘价(元)]\n"
+            "FROM A股票日行情表\n"
+            "WHERE 股票代码 = '600519']\n"
+            "Action 2 CheckDBInfo[]\n"
+        )
+        self.assertEqual(parsed["action_type"], "tool")
+        self.assertEqual(parsed["thought"], "需要查询收盘价")
+        self.assertEqual(parsed["tool_calls"], [
+            {"name": "QueryDB", "input": "SELECT [收盘价(元)]\nFROM A股票日行情表\nWHERE 股票代码 = '600519'"},
+            {"name": "CheckDBInfo", "input": ""}
+        ])
+
+    def test_action_input_line(self):
+        parsed = self.agent._parse_agent_response("Thought 1 查表\nAction 1: ESSearch\nAction Input 1: 基金经理")
+        self.assertEqual(parsed["tool_calls"], [{"name": "ESSearch", "input": "基金经理"}])
+
+    def test_finish_alone(self):
+        parsed = self.agent._parse_agent_response("Thought 3 已得到结果\nAction 3 Finish[收盘价为1900.5元]")
+        self.assertEqual((parsed["action_type"], parsed["action_input"]), ("finish", "收盘价为1900.5元"))
+
+    def test_finish_with_tool_call_is_rejected(self):
+        parsed = self.agent._parse_agent_response(
+            "Thought 2 查询并作答\n"
+            "Action 2 QueryDB[SELECT 1]\n"
+            "Action 2 Finish[1]\n"
+        )
+        self.assertEqual(parsed["action_type"], "tool")
+        self.assertEqual(parsed["tool_calls"], [{"name": "QueryDB", "input": "SELECT 1"}])
+        self.assertEqual(parsed["finish_rejected"], "Finish[1]")
+
+    def test_stops_at_hallucinated_observation(self):
+        parsed = self.agent._parse_agent_response(
+            "Thought 1 先查看数据库\n"
+            "Action 1 CheckDBInfo[]\n"
+            "Observation 1 A股票日行情表...\n"
+            "Thought 2 查询\n"
+            "Action 2 QueryDB[SELECT 1]\n"
+            "Observation 2 1\n"
+            "Action 3 Finish[1]\n"
+        )
+        self.assertEqual(parsed["action_type"], "tool")
+        self.assertEqual(parsed["tool_calls"], [{"name": "CheckDBInfo", "input": ""}])
+        self.assertNotIn("finish_rejected", parsed)
+
+    def test_stops_after_finish(self):
+        parsed = self.agent._parse_agent_response("Thought 3 作答\nAction 3 Finish[100]\nAction 4 QueryDB[SELECT 1]")
+        self.assertEqual((parsed["action_type"], parsed["action_input"]), ("finish", "100"))
+
+
+if __name__ == "__main__":
+    unittest.main()
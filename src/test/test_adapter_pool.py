@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared StreamingLLMAdapter registry
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+import requests
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models.adapter_pool import (
+    DEFAULT_DASHSCOPE_URL,
+    clear_adapters,
+    get_adapter_from_config,
+    get_http_session,
+    get_streaming_adapter,
+    warm_up_adapters
+)
+
+
+class DictConfig:
+    """按点分路径读取的字典配置，代替ConfigManager"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key, default=None):
+        value = self.data
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    def get_boolean(self, key, default=False):
+        return bool(self.get(key, default))
+
+
+def qwen_config(**overrides):
+    qwen = {
+        "api_key": "test-key",
+        "base_url": "",
+        "model_version": "qwen-plus",
+        "segment_model": "qwen-turbo",
+        "ner_model": "qwen-turbo",
+        "intent_model": "qwen-max",
+        "default_params": {"temperature": 0.1},
+    }
+    qwen.update(overrides)
+    return DictConfig({"api": {"qwen": qwen}, "llm_backend": {"mode": "live"}})
+
+
+class TestAdapterPool(unittest.TestCase):
+    """Test cases for adapter_pool"""
+
+    def setUp(self):
+        clear_adapters()
+
+    def tearDown(self):
+        clear_adapters()
+
+    def test_same_key_returns_same_instance(self):
+        adapter = get_streaming_adapter("qwen-turbo", api_key="k", temperature=0.1, top_p=0.8)
+        self.assertIs(get_streaming_adapter("qwen-turbo", api_key="k", top_p=0.8, temperature=0.1), adapter)
+
+        variants = [
+            get_streaming_adapter("qwen-plus", api_key="k", temperature=0.1, top_p=0.8),
+            get_streaming_adapter("qwen-turbo", api_key="k", base_url="http://localhost:8000",
+                                  temperature=0.1, top_p=0.8),
+            get_streaming_adapter("qwen-turbo", api_key="k", stream_enabled=False, temperature=0.1, top_p=0.8),
+            get_streaming_adapter("qwen-turbo", api_key="k", cache_enabled=False, temperature=0.1, top_p=0.8),
+            get_streaming_adapter("qwen-turbo", api_key="k", streaming_models=["qwen-turbo"],
+                                  temperature=0.1, top_p=0.8),
+            get_streaming_adapter("qwen-turbo", api_key="k", temperature=0.7, top_p=0.8),
+        ]
+        self.assertEqual(len({id(variant) for variant in variants + [adapter]}), 7)
+
+    def test_adapters_share_session_per_base_url(self):
+        first = get_streaming_adapter("qwen-turbo", api_key="k")
+        second = get_streaming_adapter("qwen-plus", api_key="k")
+        other = get_streaming_adapter("qwen-turbo", api_key="k", base_url="http://localhost:8000")
+        self.assertIsNot(first, second)
+        self.assertIs(first._session, second._session)
+        self.assertIs(first._session, get_http_session(None))
+        self.assertIs(other._session, get_http_session("http://localhost:8000"))
+        self.assertIsNot(first._session, other._session)
+
+    def test_adapter_from_config(self):
+        config = qwen_config()
+        adapter = get_adapter_from_config(config, "qwen-turbo")
+        self.assertIs(get_adapter_from_config(qwen_config(), "qwen-turbo"), adapter)
+        self.assertEqual(adapter.model_version, "qwen-turbo")
+        self.assertEqual(adapter.default_params, {"temperature": 0.1})
+
+        changed = get_adapter_from_config(qwen_config(default_params={"temperature": 0.5}), "qwen-turbo")
+        self.assertIsNot(changed, adapter)
+        self.assertIsNot(get_adapter_from_config(qwen_config(stream_enabled=False), "qwen-turbo"), adapter)
+
+    def test_warm_up_registers_distinct_models(self):
+        config = qwen_config()
+        with patch.object(requests.Session, "head") as head:
+            models = warm_up_adapters(config)
+        self.assertEqual(models, ["qwen-plus", "qwen-turbo", "qwen-max"])
+        head.assert_called_once_with(DEFAULT_DASHSCOPE_URL, timeout=5)
+        # 预热后节点取到的是同一个适配器
+        with patch.object(requests.Session, "head") as head:
+            self.assertIs(get_adapter_from_config(config, "qwen-plus"), get_adapter_from_config(config, "qwen-plus"))
+            head.assert_not_called()
+
+    def test_warm_up_skips_network_for_offline_backend_and_when_disabled(self):
+        config = qwen_config()
+        config.data["llm_backend"]["mode"] = "synthetic"
+        with patch.object(requests.Session, "head") as head:
+            self.assertEqual(len(warm_up_adapters(config)), 3)
+        head.assert_not_called()
+
+        config = qwen_config(warm_up=False)
+        self.assertEqual(warm_up_adapters(config), [])
+
+    def test_warm_up_failure_is_not_raised(self):
+        with patch.object(requests.Session, "head", side_effect=requests.ConnectionError("offline")):
+            self.assertEqual(len(warm_up_adapters(qwen_config())), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed aggregate cube and its QueryDB router
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.aggregate_cube import CubeRouter, build_cube
+
+
+def create_source(path: Path):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, "昨收盘(元)" REAL, "今开盘(元)" REAL, '
+                 '"最高价(元)" REAL, "最低价(元)" REAL, "收盘价(元)" REAL, "成交量(股)" REAL, "成交金额(元)" REAL)')
+    conn.execute("CREATE TABLE A股公司行业划分表 (股票代码 TEXT, 交易日期 TEXT, 行业划分标准 TEXT, "
+                 "一级行业名称 TEXT, 二级行业名称 TEXT)")
+    conn.execute("CREATE TABLE 基金股票持仓明细 (基金代码 TEXT, 基金简称 TEXT, 持仓日期 TEXT, 股票代码 TEXT, "
+                 "股票名称 TEXT, 数量 REAL, 市值 REAL, 市值占基金资产净值比 REAL, 第N大重仓股 INTEGER, "
+                 "所在证券市场 TEXT, \"所属国家(地区)\" TEXT, 报告类型 TEXT)")
+    industries = ["机械", "银行", "医药"]
+    for day in ("20211124", "20211125"):
+        for code in range(60):
+            low = rng.uniform(5, 50)
+            conn.execute("INSERT INTO A股票日行情表 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (f"{code:06d}", day, low, low, low + rng.uniform(0, 5), low, low + 1,
+                          rng.randint(1000, 100000), rng.uniform(1e5, 1e7)))
+            industry = industries[code % 3]
+            conn.execute("INSERT INTO A股公司行业划分表 VALUES (?, ?, ?, ?, ?)",
+                         (f"{code:06d}", day, "中信行业分类", industry, industry + str(code % 2)))
+    for fund in range(3):
+        for stock in range(20):
+            conn.execute("INSERT INTO 基金股票持仓明细 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (f"00000{fund}", f"基金{fund}", "20210331", f"{stock:06d}", f"股票{stock}", 100,
+                          rng.uniform(1e6, 1e8), 0.01, stock + 1, "上交所", "中国", "季报"))
+    conn.commit()
+    conn.close()
+
+
+class TestAggregateCube(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        create_source(self.source)
+        self.cube = Path(self.tmpdir.name) / "aggregate_cube.db"
+        build_cube(str(self.source), str(self.cube), top_n=10)
+        self.router = CubeRouter(str(self.cube), str(self.source), check_interval=0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def base(self, sql):
+        conn = sqlite3.connect(self.source)
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute(sql).fetchall()]
+        conn.close()
+        return rows
+
+    def assertRouted(self, sql, route_name):
+        route = self.router.route(sql)
+        self.assertIsNotNone(route, sql)
+        self.assertEqual(route.name, route_name)
+        self.assertEqual(self.router.answer(sql), self.base(sql))
+
+    def test_daily_rank(self):
+        self.assertRouted("SELECT 股票代码, [成交量(股)] FROM A股票日行情表 WHERE 交易日 = '20211125' "
+                          "ORDER BY [成交量(股)] DESC LIMIT 5", "daily_rank")
+        self.assertRouted("SELECT a.股票代码, a.[最高价(元)] - a.[最低价(元)] AS 振幅 FROM A股票日行情表 a "
+                          "WHERE a.交易日 = '20211124' ORDER BY 振幅 DESC LIMIT 3;", "daily_rank")
+
+    def test_industry_daily(self):
+        self.assertRouted("SELECT AVG(a.[收盘价(元)]), COUNT(*) AS cnt FROM A股票日行情表 a JOIN A股公司行业划分表 b "
+                          "ON a.股票代码 = b.股票代码 AND a.交易日 = b.交易日期 WHERE b.行业划分标准 = '中信行业分类' "
+                          "AND b.一级行业名称 = '机械' AND a.交易日 = '20211125'", "industry_daily")
+        self.assertRouted("SELECT b.二级行业名称, SUM(a.[成交金额(元)]) AS 成交额 FROM A股票日行情表 a "
+                          "INNER JOIN A股公司行业划分表 b ON a.股票代码 = b.股票代码 AND a.交易日 = b.交易日期 "
+                          "WHERE b.行业划分标准 = '中信行业分类' AND a.交易日 = '20211124' "
+                          "GROUP BY b.二级行业名称 ORDER BY 成交额 DESC LIMIT 2", "industry_daily")
+        # 没有匹配行时与原表一样返回一行
+        self.assertRouted("SELECT AVG(a.[收盘价(元)]), COUNT(*) FROM A股票日行情表 a JOIN A股公司行业划分表 b "
+                          "ON a.股票代码 = b.股票代码 AND a.交易日 = b.交易日期 WHERE b.行业划分标准 = '中信行业分类' "
+                          "AND b.一级行业名称 = '汽车' AND a.交易日 = '20211125'", "industry_daily")
+
+    def test_fund_top_holdings(self):
+        self.assertRouted("SELECT * FROM 基金股票持仓明细 WHERE 基金简称 = '基金1' AND 持仓日期 = '20210331' "
+                          "ORDER BY 市值 DESC LIMIT 10", "fund_top_holdings")
+
+    def test_unroutable_queries_fall_back(self):
+        for sql in [
+            "SELECT 股票代码 FROM A股票日行情表 WHERE 交易日 = '20211125' ORDER BY [成交量(股)] DESC",
+            "SELECT 股票代码 FROM A股票日行情表 WHERE 交易日 = '20211125' ORDER BY [成交量(股)] DESC LIMIT 20",
+            "SELECT 股票代码 FROM A股票日行情表 WHERE 交易日 = '20211125' AND 股票代码 LIKE '6%' "
+            "ORDER BY [成交量(股)] DESC LIMIT 5",
+            "SELECT * FROM 基金股票持仓明细 WHERE 基金代码 = '000001' OR 持仓日期 = '20210331' "
+            "ORDER BY 市值 DESC LIMIT 1",
+            "SELECT AVG(a.[收盘价(元)]) FROM A股票日行情表 a JOIN A股公司行业划分表 b ON a.股票代码 = b.股票代码 "
+            "WHERE b.一级行业名称 = '机械' AND a.交易日 = '20211125'"
+        ]:
+            self.assertIsNone(self.router.route(sql), sql)
+            self.assertIsNone(self.router.answer(sql))
+
+    def test_stale_cube_is_not_used(self):
+        sql = ("SELECT 股票代码 FROM A股票日行情表 WHERE 交易日 = '20211125' "
+               "ORDER BY [成交量(股)] DESC LIMIT 5")
+        self.assertIsNotNone(self.router.answer(sql))
+        stat = self.source.stat()
+        os.utime(self.source, (stat.st_atime, stat.st_mtime + 10))
+        self.assertFalse(self.router.is_fresh())
+        self.assertIsNone(self.router.answer(sql))
+        self.assertEqual(self.router.get_stats()["stale"], 1)
+
+        build_cube(str(self.source), str(self.cube), top_n=10)
+        self.assertIsNotNone(self.router.answer(sql))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for the async LLM path (StreamingLLMAdapter async methods and aio_pool)
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models import aio_pool, llm_backend
+from src.models.aio_pool import close_aio_resources, get_aio_resources
+from src.models.llm_backend import LLMRecordStore, ReplayBackend, SyntheticBackend, set_llm_backend
+from src.models.llm_cache import LLMResponseCache, MemoryLRUCache
+from src.models.streaming_adapter import StreamingLLMAdapter
+
+QUESTION = "2021年营业收入是多少"
+ANSWER = "Thought 2 已查到\nAction 2 Finish[营业收入为100亿元]"
+
+
+class CountingBackend(SyntheticBackend):
+    """记录异步调用次数和同时在途的请求数"""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency_median=0.01, latency_sigma=0, ttft_median=0.01, ttft_sigma=0,
+                         tokens_per_second=10000, responses=[{"pattern": "营业收入", "response": ANSWER}],
+                         default_response="default", **kwargs)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def acall(self, model, messages, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().acall(model, messages, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncAdapter(unittest.TestCase):
+    """Test cases for _agenerate/_astream/_astream_dashscope/_anon_stream_call"""
+
+    def setUp(self):
+        self.saved_backend = (llm_backend._backend, llm_backend._backend_loaded)
+        self.backend = CountingBackend()
+        set_llm_backend(self.backend)
+        self.cache = LLMResponseCache(memory_cache=MemoryLRUCache(max_entries=8))
+        self.patches = [
+            patch("src.models.streaming_adapter.get_llm_cache", return_value=self.cache),
+            patch("src.models.streaming_adapter.get_rate_limiter", return_value=None),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        llm_backend._backend, llm_backend._backend_loaded = self.saved_backend
+
+    def create_llm(self, streaming: bool, **kwargs) -> StreamingLLMAdapter:
+        return StreamingLLMAdapter(model="qwen-turbo", api_key="test-key",
+                                   streaming_models=["qwen-turbo" if streaming else "qwen-max"], **kwargs)
+
+    @staticmethod
+    def run_async(coroutine_fn):
+        async def main():
+            try:
+                return await coroutine_fn()
+            finally:
+                await close_aio_resources()
+        return asyncio.run(main())
+
+    def test_agenerate_non_stream_then_cache_hit(self):
+        llm = self.create_llm(streaming=False)
+
+        async def invoke_twice():
+            first = await llm.ainvoke([HumanMessage(content=QUESTION)])
+            second = await llm.ainvoke([HumanMessage(content=QUESTION)])
+            return first, second
+
+        first, second = self.run_async(invoke_twice)
+        self.assertEqual((first.content, second.content), (ANSWER, ANSWER))
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+        self.assertGreater(first.response_metadata["token_usage"]["output_tokens"], 0)
+
+    def test_agenerate_streaming_model_joins_chunks(self):
+        llm = self.create_llm(streaming=True, cache_enabled=False)
+        result = self.run_async(lambda: llm.ainvoke([HumanMessage(content=QUESTION)]))
+        self.assertEqual(result.content, ANSWER)
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_astream_yields_chunks_then_serves_cache(self):
+        llm = self.create_llm(streaming=True)
+
+        async def stream_twice():
+            first = [chunk.content async for chunk in llm.astream([HumanMessage(content=QUESTION)])]
+            second = [chunk.content async for chunk in llm.astream([HumanMessage(content=QUESTION)])]
+            return first, second
+
+        first, second = self.run_async(stream_twice)
+        self.assertGreater(len(first), 1)
+        self.assertEqual("".join(first), ANSWER)
+        self.assertEqual("".join(second), ANSWER)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+    def test_astream_non_streaming_model_splits_result(self):
+        llm = self.create_llm(streaming=False, cache_enabled=False)
+
+        async def stream():
+            return [chunk.content async for chunk in llm.astream([HumanMessage(content=QUESTION)])]
+
+        chunks = self.run_async(stream)
+        self.assertEqual("".join(chunks), ANSWER)
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+
+    def test_non_stream_error_raises(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = LLMRecordStore(os.path.join(tmp_dir, "records.sqlite3"))
+            set_llm_backend(ReplayBackend(store, speed=0))
+            llm = self.create_llm(streaming=False, cache_enabled=False)
+            try:
+                with self.assertRaises(ValueError):
+                    self.run_async(lambda: llm.ainvoke([HumanMessage(content=QUESTION)]))
+            finally:
+                store.close()
+
+    def test_semaphore_limits_concurrent_requests(self):
+        llm = self.create_llm(streaming=False, cache_enabled=False)
+        get_int = aio_pool.ConfigManager.get_int
+
+        def limited(config, key, default=0):
+            return 2 if key == "api.qwen.async_max_concurrency" else get_int(config, key, default)
+
+        async def invoke_many():
+            return await asyncio.gather(*(llm.ainvoke([HumanMessage(content=f"{QUESTION} 第{i}次")])
+                                          for i in range(6)))
+
+        with patch.object(aio_pool.ConfigManager, "get_int", limited):
+            results = self.run_async(invoke_many)
+        self.assertEqual([result.content for result in results], [ANSWER] * 6)
+        self.assertEqual(self.backend.calls, 6)
+        self.assertEqual(self.backend.max_in_flight, 2)
+
+
+class TestAioPool(unittest.TestCase):
+    """Test cases for per-event-loop aiohttp sessions"""
+
+    def test_resources_shared_within_loop_and_isolated_across_loops(self):
+        async def acquire():
+            first = get_aio_resources()
+            second = get_aio_resources()
+            self.assertIs(first, second)
+            await close_aio_resources()
+            self.assertTrue(first[0].closed)
+            return first
+
+        first = asyncio.run(acquire())
+        second = asyncio.run(acquire())
+        self.assertIsNot(first[0], second[0])
+        self.assertIsNot(first[1], second[1])
+
+    def test_closed_session_is_recreated(self):
+        async def reopen():
+            session, _ = get_aio_resources()
+            await session.close()
+            reopened, _ = get_aio_resources()
+            try:
+                self.assertIsNot(session, reopened)
+                self.assertFalse(reopened.closed)
+            finally:
+                await close_aio_resources()
+
+        asyncio.run(reopen())
+
+
+if __name__ == "__main__":
+    unittest.main()
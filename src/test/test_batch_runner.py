@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch question runner
+"""
+
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.runner.batch_runner import BatchRunner, load_checkpoint
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for checkpointing and resuming"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.questions_path = os.path.join(self.temp_dir.name, "question.json")
+        with open(self.questions_path, 'w', encoding='utf-8') as f:
+            for i in range(6):
+                f.write(json.dumps({"id": i, "question": f"问题{i}"}, ensure_ascii=False) + "\n")
+        self.checkpoint_path = os.path.join(self.temp_dir.name, "checkpoint.jsonl")
+        self.output_path = os.path.join(self.temp_dir.name, "submission.jsonl")
+        self.calls = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _runner(self, answer_fn):
+        return BatchRunner(
+            self.questions_path, self.checkpoint_path, self.output_path,
+            processes=0, concurrency=3, answer_fn=answer_fn
+        )
+
+    def test_resume_retries_only_failed_questions(self):
+        def flaky(record):
+            self.calls.append(record["id"])
+            if record["id"] % 2:
+                raise RuntimeError("Throttling")
+            return f"答案{record['id']}"
+
+        stats = self._runner(flaky).run()
+        self.assertEqual((stats["completed"], stats["failed"]), (3, 3))
+
+        self.calls.clear()
+        stats = self._runner(lambda record: self.calls.append(record["id"]) or f"答案{record['id']}").run()
+        self.assertEqual(sorted(self.calls), [1, 3, 5])
+        self.assertEqual(stats["skipped"], 3)
+        self.assertTrue(all(r["status"] == "ok" for r in load_checkpoint(self.checkpoint_path).values()))
+
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            submission = [json.loads(line) for line in f]
+        self.assertEqual([row["id"] for row in submission], list(range(6)))
+        self.assertEqual(submission[5]["answer"], "答案5")
+
+    def test_truncated_checkpoint_line_is_ignored(self):
+        with open(self.checkpoint_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"id": 0, "status": "ok", "answer": "a"}) + "\n")
+            f.write('{"id": 1, "sta')
+        self.assertEqual(list(load_checkpoint(self.checkpoint_path)), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
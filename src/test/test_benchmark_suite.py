@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite
+"""
+
+import sys
+import os
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.benchmark.suite import BenchmarkSuite, compare_reports, percentile
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_measure_counts_errors_and_repeats(self):
+        suite = BenchmarkSuite(repeat=2, warmup=1)
+        calls = []
+
+        def fn(item):
+            calls.append(item)
+            if item == "boom":
+                raise ValueError(item)
+            return item
+
+        outputs = suite.measure("demo", fn, ["ok", "bad", "boom"], is_error=lambda output: output == "bad")
+        summary = suite.report()["benchmarks"]["demo"]
+        self.assertEqual(outputs, ["ok", "bad", None])
+        self.assertEqual(len(calls), 1 + 2 * 3)
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual(summary["errors"], 4)
+
+    def test_report_is_sorted_and_rounded(self):
+        suite = BenchmarkSuite()
+        suite.record("b", 0.0012345)
+        suite.record("a", None)
+        suite.skip("c", "unavailable")
+        benchmarks = suite.report({"rev": "x"})["benchmarks"]
+        self.assertEqual(list(benchmarks), ["b", "c"])
+        self.assertEqual(benchmarks["b"]["p50_ms"], 1.234)
+        self.assertEqual(benchmarks["c"], {"skipped": "unavailable"})
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+
+    def test_compare_reports(self):
+        baseline = {"benchmarks": {"x": {"p50_ms": 10.0, "p99_ms": 20.0}, "old": {"p50_ms": 1.0}}}
+        current = {"benchmarks": {"x": {"p50_ms": 12.0, "p99_ms": 15.0}, "new": {"p50_ms": 1.0}}}
+        statuses = {(row["name"], row["metric"]): row["status"] for row in compare_reports(baseline, current)}
+        self.assertEqual(statuses[("x", "p50_ms")], "regression")
+        self.assertEqual(statuses[("x", "p99_ms")], "improvement")
+        self.assertEqual(statuses[("old", None)], "removed")
+        self.assertEqual(statuses[("new", None)], "new")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite-to-MySQL bulk loader (SQLite file as the stand-in target)
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import String, Text, create_engine, inspect
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.bulk_loader import MAX_VARCHAR, BulkLoader, ColumnPlan, connect_source, plan_table
+
+
+class TestBulkLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(self.source)
+        conn.execute('CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, "收盘价(元)" REAL, "成交量(股)" INTEGER, '
+                     'PRIMARY KEY (股票代码, 交易日))')
+        conn.execute("CREATE INDEX idx_trade_date ON A股票日行情表 (交易日)")
+        conn.executemany("INSERT INTO A股票日行情表 VALUES (?, ?, ?, ?)",
+                         [(f"{code:06d}", f"202101{day:02d}", code + day / 10, code * day)
+                          for code in range(50) for day in range(1, 21)])
+        # 未声明类型、数字和文本混存的列
+        conn.execute("CREATE TABLE 基金基本信息 (基金代码, 基金全称 TEXT UNIQUE, 成立日期)")
+        conn.executemany("INSERT INTO 基金基本信息 VALUES (?, ?, ?)",
+                         [("000001", "华夏成长混合", 20011218), (2, "博时价值", "20030825"), (None, "空代码", None)])
+        conn.commit()
+        conn.close()
+        self.target = Path(self.tmpdir.name) / "target.db"
+        self.engine = create_engine(f"sqlite:///{self.target}", connect_args={"timeout": 30})
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def query(self, path, sql):
+        conn = sqlite3.connect(path)
+        rows = conn.execute(sql).fetchall()
+        conn.close()
+        return rows
+
+    def test_plan_infers_types_from_values(self):
+        conn = connect_source(str(self.source))
+        plan = plan_table(conn, "基金基本信息")
+        conn.close()
+        kinds = {column.name: (column.kind, column.mixed) for column in plan.columns}
+        self.assertEqual(kinds, {"基金代码": ("text", True), "基金全称": ("text", False), "成立日期": ("text", True)})
+        self.assertEqual(plan.rows, 3)
+        self.assertEqual([index["columns"] for index in plan.indexes], [["基金全称"]])
+
+    def test_varchar_length_stays_indexable(self):
+        self.assertEqual(ColumnPlan("c", "text", 10).sqlalchemy_type().length, 16)
+        self.assertEqual(ColumnPlan("c", "text", 300).sqlalchemy_type().length, 512)
+        for length in (513, 700, MAX_VARCHAR):
+            column_type = ColumnPlan("c", "text", length, primary_key=True).sqlalchemy_type()
+            self.assertIsInstance(column_type, String)
+            self.assertEqual(column_type.length, MAX_VARCHAR)
+        self.assertIsInstance(ColumnPlan("c", "text", MAX_VARCHAR + 1).sqlalchemy_type(), Text)
+
+    def test_parallel_load_copies_rows_and_indexes(self):
+        loader = BulkLoader(str(self.source), self.engine, batch_size=64, workers=2)
+        reports = loader.load()
+        self.assertEqual([(report.table, report.rows, report.error) for report in reports],
+                         [("A股票日行情表", 1000, None), ("基金基本信息", 3, None)])
+        self.assertGreater(reports[0].rows_per_sec, 0)
+
+        sql = 'SELECT 股票代码, 交易日, "收盘价(元)", "成交量(股)" FROM A股票日行情表 ORDER BY 1, 2'
+        self.assertEqual(self.query(self.target, sql), self.query(self.source, sql))
+        self.assertEqual(self.query(self.target, "SELECT * FROM 基金基本信息 ORDER BY rowid"),
+                         [("000001", "华夏成长混合", "20011218"), ("2", "博时价值", "20030825"), (None, "空代码", None)])
+
+        inspector = inspect(self.engine)
+        self.assertEqual(inspector.get_pk_constraint("A股票日行情表")["constrained_columns"], ["股票代码", "交易日"])
+        self.assertEqual([index["column_names"] for index in inspector.get_indexes("A股票日行情表")], [["交易日"]])
+        self.assertTrue(inspector.get_indexes("基金基本信息")[0]["unique"])
+
+    def test_existing_table_requires_replace(self):
+        BulkLoader(str(self.source), self.engine).load(["基金基本信息"])
+        report, = BulkLoader(str(self.source), self.engine).load(["基金基本信息"])
+        self.assertIn("已存在", report.error)
+        report, = BulkLoader(str(self.source), self.engine, replace=True).load(["基金基本信息"])
+        self.assertIsNone(report.error)
+        self.assertEqual(self.query(self.target, "SELECT COUNT(*) FROM 基金基本信息"), [(3,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
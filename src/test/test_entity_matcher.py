@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the Aho-Corasick entity matcher
+"""
+
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.query_understanding.entity_matcher import AhoCorasickAutomaton, EntityMatcher
+from src.query_understanding.financial_vocab import VocabEntry
+
+
+VOCAB = [
+    VocabEntry(text="华夏成长证券投资基金", entity_type="基金", code="000001"),
+    VocabEntry(text="华夏成长", entity_type="基金简称", code="000001", canonical="华夏成长证券投资基金"),
+    VocabEntry(text="000001", entity_type="基金代码", code="000001", canonical="华夏成长证券投资基金"),
+    VocabEntry(text="600519", entity_type="股票代码", code="600519"),
+    VocabEntry(text="贵州茅台", entity_type="股票", code="600519"),
+]
+
+
+class TestAhoCorasickAutomaton(unittest.TestCase):
+    """Test cases for the flat-array automaton"""
+
+    def test_overlapping_matches(self):
+        automaton = AhoCorasickAutomaton.build(["he", "she", "his", "hers"])
+        matches = sorted(automaton.iter_matches("ushers"))
+        self.assertEqual(matches, [(1, 4, 1), (2, 4, 0), (2, 6, 3)])
+
+
+class TestEntityMatcher(unittest.TestCase):
+    """Test cases for entity extraction and persistence"""
+
+    def setUp(self):
+        self.matcher = EntityMatcher.from_vocabulary(VOCAB)
+
+    def test_leftmost_longest(self):
+        entities = self.matcher.extract("华夏成长证券投资基金的管理费率是多少")
+        self.assertEqual(len(entities), 1)
+        self.assertEqual(entities[0]["entity_type"], "基金")
+        self.assertEqual((entities[0]["start"], entities[0]["end"]), (0, 10))
+
+    def test_normalization_and_code_boundary(self):
+        entities = self.matcher.extract("华夏成长在20000001的净值，贵州茅台(600519)")
+        texts = [entity["text"] for entity in entities]
+        self.assertEqual(texts, ["华夏成长", "贵州茅台", "600519"])
+        self.assertEqual(entities[0]["canonical"], "华夏成长证券投资基金")
+        self.assertEqual(entities[1]["code"], "600519")
+
+    def test_no_match_returns_none(self):
+        self.assertIsNone(self.matcher.extract_as_json("今天天气怎么样"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "automaton.npz")
+            self.matcher.save(path)
+            loaded = EntityMatcher.load(path)
+        query = "贵州茅台和华夏成长"
+        self.assertEqual(loaded.extract(query), self.matcher.extract(query))
+        self.assertEqual(json.loads(loaded.extract_as_json(query))["relations"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for fused query understanding output parsing
+"""
+
+import sys
+import os
+import json
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.query_understanding.fused_qu import FusedOutputError, parse_fused_output, split_fused_output
+
+
+VALID_OUTPUT = {
+    "segmented_words": ["20210105", "综合金融", "涨跌幅"],
+    "entities": [{"entity_type": "行业", "text": "综合金融", "start": 30, "end": 34}],
+    "relations": [],
+    "intentions": ["股票查询", "topk"]
+}
+
+
+class TestParseFusedOutput(unittest.TestCase):
+    """Test cases for parse_fused_output"""
+
+    def test_valid_output(self):
+        parsed = parse_fused_output(json.dumps(VALID_OUTPUT, ensure_ascii=False))
+        self.assertEqual(parsed["intentions"], ["股票查询", "topk"])
+
+    def test_code_fence_is_stripped(self):
+        text = "```json\n" + json.dumps(VALID_OUTPUT, ensure_ascii=False) + "\n```"
+        self.assertEqual(parse_fused_output(text)["segmented_words"][0], "20210105")
+
+    def test_invalid_json_raises(self):
+        with self.assertRaises(FusedOutputError):
+            parse_fused_output("分词结果: 20210105 / 综合金融")
+
+    def test_missing_field_raises(self):
+        data = dict(VALID_OUTPUT)
+        del data["intentions"]
+        with self.assertRaises(FusedOutputError):
+            parse_fused_output(json.dumps(data))
+
+    def test_wrong_entity_shape_raises(self):
+        data = dict(VALID_OUTPUT, entities=["综合金融"])
+        with self.assertRaises(FusedOutputError):
+            parse_fused_output(json.dumps(data, ensure_ascii=False))
+
+    def test_split_matches_node_formats(self):
+        split = split_fused_output(parse_fused_output(json.dumps(VALID_OUTPUT, ensure_ascii=False)))
+        self.assertEqual(json.loads(split["segmented_words"]), {"segmented_words": VALID_OUTPUT["segmented_words"]})
+        self.assertEqual(json.loads(split["intent"]), {"intentions": VALID_OUTPUT["intentions"]})
+        self.assertIn("relations", json.loads(split["entities"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
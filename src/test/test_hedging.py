@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged LLM requests
+"""
+
+import sys
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models import hedging
+from src.models.hedging import HedgedCaller, get_hedged_caller
+
+
+class TestHedgedCaller(unittest.TestCase):
+    """Test cases for HedgedCaller"""
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def create_caller(self, max_extra_ratio=1.0):
+        caller = HedgedCaller("qwen-test", self.executor, percentile=90, min_samples=5,
+                              max_extra_ratio=max_extra_ratio, min_delay=0.01)
+        for _ in range(5):
+            caller.latency.record(0.02)
+        return caller
+
+    def test_no_hedge_without_samples(self):
+        """延迟样本不足时直接调用，不发出对冲请求"""
+        caller = HedgedCaller("qwen-test", self.executor, min_samples=5)
+        self.assertEqual(caller.call(lambda: "ok"), "ok")
+        self.assertEqual(caller.stats["hedged"], 0)
+        self.assertEqual(len(caller.latency), 1)
+
+    def test_hedge_wins_and_loser_is_discarded(self):
+        """主请求卡住时对冲请求胜出，主请求完成后结果被丢弃"""
+        caller = self.create_caller()
+        attempts = []
+        release = threading.Event()
+        discarded = []
+
+        def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                release.wait(2)
+                return "slow"
+            return "fast"
+
+        start = time.perf_counter()
+        result = caller.call(request, discard=discarded.append)
+        elapsed = time.perf_counter() - start
+        release.set()
+        time.sleep(0.05)
+
+        self.assertEqual(result, "fast")
+        self.assertLess(elapsed, 1)
+        self.assertEqual(caller.stats["hedged"], 1)
+        self.assertEqual(caller.stats["hedge_wins"], 1)
+        self.assertEqual(discarded, ["slow"])
+
+    def test_budget_limits_extra_requests(self):
+        """额外请求预算耗尽后不再对冲"""
+        caller = self.create_caller(max_extra_ratio=0.0)
+        self.assertEqual(caller.call(lambda: time.sleep(0.1) or "ok"), "ok")
+        self.assertEqual(caller.stats["hedged"], 0)
+        self.assertEqual(caller.stats["budget_exhausted"], 1)
+
+    def test_rejected_result_waits_for_other_request(self):
+        """先完成但不成功的结果不会胜出"""
+        caller = self.create_caller()
+        attempts = []
+
+        def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                time.sleep(0.1)
+                return "error"
+            time.sleep(0.2)
+            return "ok"
+
+        self.assertEqual(caller.call(request, accept=lambda result: result == "ok"), "ok")
+
+    def test_stream_and_non_stream_use_separate_trackers(self):
+        """流式首个chunk延迟和非流式完整响应延迟分别统计"""
+        options = {"api.qwen.hedging": {"enabled": True, "min_samples": 1}}
+        with patch.dict(hedging._hedged_callers, clear=True), \
+                patch("src.models.hedging.ConfigManager.get", side_effect=lambda key, default=None: options.get(key, default)):
+            caller = get_hedged_caller("qwen-test")
+            stream_caller = get_hedged_caller("qwen-test", stream=True)
+            self.assertIsNot(caller, stream_caller)
+            self.assertIs(get_hedged_caller("qwen-test"), caller)
+            self.assertIs(get_hedged_caller("qwen-test", stream=True), stream_caller)
+
+            caller.latency.record(5.0)
+            stream_caller.latency.record(0.3)
+            self.assertEqual(caller.hedge_delay(), 5.0)
+            self.assertEqual(stream_caller.hedge_delay(), 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
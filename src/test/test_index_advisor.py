@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite index advisor
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.index_advisor import IndexAdvisor, extract_sql_from_logs, group_templates, sql_template
+
+
+class TestIndexAdvisor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, "最高价(元)" REAL, "最低价(元)" REAL, '
+                     '"收盘价(元)" REAL)')
+        rng = random.Random(0)
+        rows = [(f"{code:06d}", f"202111{day:02d}", rng.random() * 100, rng.random() * 50, rng.random() * 80)
+                for code in range(600) for day in range(1, 31)]
+        conn.executemany("INSERT INTO A股票日行情表 VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_templates_group_literals(self):
+        statements = [
+            "SELECT * FROM A股票日行情表 WHERE 股票代码 = '600519' AND 交易日 = '20211125';",
+            "SELECT *  FROM A股票日行情表 WHERE 股票代码 = '000001' AND 交易日 = '20211126'",
+            "SELECT 股票代码 FROM A股票日行情表 WHERE 股票代码 IN ('1', '2', '3') LIMIT 10"
+        ]
+        templates = group_templates(statements)
+        self.assertEqual([t.count for t in templates], [2, 1])
+        self.assertEqual(sql_template(statements[2]),
+                         "SELECT 股票代码 FROM A股票日行情表 WHERE 股票代码 IN (?) LIMIT ?")
+
+    def test_recommend_and_build(self):
+        statements = [
+            "SELECT \"收盘价(元)\" FROM A股票日行情表 WHERE 股票代码 = '000123' AND 交易日 = '20211125'",
+            "SELECT 股票代码, \"最高价(元)\" - \"最低价(元)\" FROM A股票日行情表 WHERE 交易日 = '20211110' "
+            "ORDER BY 2 DESC LIMIT 1"
+        ]
+        advisor = IndexAdvisor(str(self.db_path), repeat=1)
+        target = Path(self.tmpdir.name) / "indexed.db"
+        report = advisor.run(statements, str(target))
+
+        self.assertTrue(target.exists())
+        self.assertEqual(len(report["indexes"]), 2)
+        leading = {index["columns"][0] for index in report["indexes"]}
+        self.assertEqual(leading, {"股票代码", "交易日"})
+        for row in report["queries"]:
+            self.assertTrue(any(line.startswith("SCAN") for line in row["plan_before"]))
+            self.assertFalse(any(line.startswith("SCAN") and "INDEX" not in line for line in row["plan_after"]))
+
+        # 原库不被修改
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='index'").fetchone()[0], 0)
+        conn.close()
+
+    def test_extract_sql_from_logs(self):
+        log_path = Path(self.tmpdir.name) / "all.log"
+        log_path.write_text(
+            "2024-01-01 12:00:00 [INFO] [db_tool:18] - [DEBUG] query_db: SELECT *\n"
+            "FROM A股票日行情表 WHERE 交易日 = '20211125'\n"
+            "2024-01-01 12:00:00 [INFO] [db_tool:19] - [DEBUG] query_db: None\n"
+            "2024-01-01 12:00:01 [INFO] [db_tool:21] - [DEBUG] query_db: [{'股票代码': '600519'}]\n",
+            encoding="utf-8"
+        )
+        statements = extract_sql_from_logs([str(log_path)])
+        self.assertEqual(statements, ["SELECT *\nFROM A股票日行情表 WHERE 交易日 = '20211125'"])
+
+
+if __name__ == "__main__":
+    unittest.main()
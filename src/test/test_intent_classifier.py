@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the local intent classifier
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.query_understanding.intent_classifier import LocalIntentClassifier, parse_intent_output
+
+
+SAMPLES = [
+    ("600519在20210105的收盘价是多少？", ["股票行情查询"]),
+    ("000858在20200320的收盘价是多少？", ["股票行情查询"]),
+    ("300750在20211231的收盘价是多少元？", ["股票行情查询"]),
+    ("基金005827的管理人是哪家公司？", ["基金基本信息查询"]),
+    ("基金000001的管理人是谁？", ["基金基本信息查询"]),
+    ("基金110022的托管人是哪家公司？", ["基金基本信息查询"]),
+    ("20210105涨跌幅最大的前3只股票是？", ["股票行情指标计算", "topk"]),
+    ("20200506涨跌幅最大的前5只股票是？", ["股票行情指标计算", "topk"]),
+]
+
+
+class TestLocalIntentClassifier(unittest.TestCase):
+    """Test cases for training, prediction and persistence"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.classifier = LocalIntentClassifier.train(SAMPLES, dimension=512, epochs=200)
+
+    def test_fits_training_templates(self):
+        report = self.classifier.evaluate(SAMPLES)
+        self.assertEqual(report["exact_match"], 1.0)
+
+    def test_generalizes_over_slot_values(self):
+        intentions, confidence = self.classifier.predict("601318在20220810的收盘价是多少？")
+        self.assertEqual(intentions, ["股票行情查询"])
+        self.assertGreater(confidence, 0.5)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "intent.npz")
+            self.classifier.save(path)
+            loaded = LocalIntentClassifier.load(path)
+        query = "基金000002的托管人是谁？"
+        self.assertEqual(loaded.labels, self.classifier.labels)
+        np.testing.assert_allclose(loaded.predict_proba(query), self.classifier.predict_proba(query), rtol=1e-5)
+
+    def test_parse_intent_output(self):
+        self.assertEqual(parse_intent_output('```json\n{"intentions": ["topk"]}\n```'), ["topk"])
+        self.assertEqual(parse_intent_output("not json"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the record/replay and synthetic LLM backends
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models.llm_backend import (
+    LLMRecordStore,
+    RecordingBackend,
+    ReplayBackend,
+    SyntheticBackend,
+    make_response
+)
+
+MESSAGES = [{"role": "user", "content": "2021年营业收入是多少"}]
+
+
+class TestLLMBackends(unittest.TestCase):
+    """Test cases for the offline LLM backends"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = LLMRecordStore(os.path.join(self.temp_dir.name, "records.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_record_stream_then_replay_both_ways(self):
+        """录制流式响应后，流式和非流式请求都能回放出相同内容"""
+        chunks = [make_response("营业"), make_response("收入", usage={"input_tokens": 9, "output_tokens": 2})]
+        with patch("src.models.llm_backend.dashscope.Generation.call", return_value=iter(chunks)):
+            recorded = RecordingBackend(self.store).call("qwen-turbo", MESSAGES, stream=True, temperature=0.1)
+            self.assertEqual([c.output.choices[0].message.content for c in recorded], ["营业", "收入"])
+        self.assertEqual(len(self.store), 1)
+
+        replay = ReplayBackend(self.store, speed=0)
+        streamed = list(replay.call("qwen-turbo", MESSAGES, stream=True, incremental_output=True, temperature=0.1))
+        self.assertEqual([c.output.choices[0].message.content for c in streamed], ["营业", "收入"])
+        self.assertEqual(streamed[-1].usage["output_tokens"], 2)
+
+        response = replay.call("qwen-turbo", MESSAGES, result_format="message", temperature=0.1)
+        self.assertEqual(response.output.choices[0].message.content, "营业收入")
+
+    def test_replay_miss_and_partial_stream_not_recorded(self):
+        """提前关闭的流不写入记录；回放缺失时返回错误响应"""
+        chunks = [make_response("a"), make_response("b")]
+        with patch("src.models.llm_backend.dashscope.Generation.call", return_value=iter(chunks)):
+            stream = RecordingBackend(self.store).call("qwen-turbo", MESSAGES, stream=True)
+            next(stream)
+            stream.close()
+        self.assertEqual(len(self.store), 0)
+
+        response = ReplayBackend(self.store, speed=0).call("qwen-turbo", MESSAGES)
+        self.assertEqual((response.status_code, response.code), (404, "ReplayMiss"))
+
+    def test_synthetic_backend_is_deterministic(self):
+        """合成后端按规则匹配回复，相同种子得到相同的延迟序列"""
+        def plans():
+            backend = SyntheticBackend(responses=[{"pattern": "营业收入", "response": "Finish[100]"}],
+                                       default_response="default", seed=7)
+            return [backend.plan("qwen-turbo", MESSAGES, {"stream": True}) for _ in range(3)]
+
+        first, second = plans(), plans()
+        self.assertEqual(first[0]["content"], "Finish[100]")
+        self.assertEqual([p["chunks"] for p in first], [p["chunks"] for p in second])
+        self.assertGreater(first[0]["usage"]["output_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for LLM response cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models.llm_cache import (
+    LLMResponseCache,
+    MemoryLRUCache,
+    SQLiteCacheStore,
+    make_cache_key
+)
+
+
+class TestMakeCacheKey(unittest.TestCase):
+    """Test cases for cache key canonicalization"""
+
+    def test_param_order_does_not_matter(self):
+        messages = [{"role": "user", "content": "你好"}]
+        key1 = make_cache_key("qwen-turbo", {"temperature": 0.1, "top_p": 0.9}, messages)
+        key2 = make_cache_key("qwen-turbo", {"top_p": 0.9, "temperature": 0.1}, messages)
+        self.assertEqual(key1, key2)
+
+    def test_model_and_messages_change_key(self):
+        messages = [{"role": "user", "content": "你好"}]
+        base = make_cache_key("qwen-turbo", {}, messages)
+        self.assertNotEqual(base, make_cache_key("qwen-plus", {}, messages))
+        self.assertNotEqual(base, make_cache_key("qwen-turbo", {}, [{"role": "user", "content": "再见"}]))
+        self.assertNotEqual(base, make_cache_key("qwen-turbo", {"stop_sequences": ["\n"]}, messages))
+
+
+class TestMemoryLRUCache(unittest.TestCase):
+    """Test cases for the in-memory tier"""
+
+    def test_lru_eviction(self):
+        cache = MemoryLRUCache(max_entries=2)
+        cache.set("a", {"content": "A"})
+        cache.set("b", {"content": "B"})
+        cache.get("a")
+        cache.set("c", {"content": "C"})
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_ttl_expiry(self):
+        cache = MemoryLRUCache(max_entries=2, ttl_seconds=10)
+        with patch("src.models.llm_cache.time.time", return_value=1000.0):
+            cache.set("a", {"content": "A"})
+        with patch("src.models.llm_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("a"))
+
+
+class TestSQLiteCacheStore(unittest.TestCase):
+    """Test cases for the on-disk tier"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_roundtrip_across_instances(self):
+        store = SQLiteCacheStore(self.db_path)
+        store.set("k", {"content": "答案", "latency": 1.5})
+        store.close()
+
+        reopened = SQLiteCacheStore(self.db_path)
+        self.assertEqual(reopened.get("k")["content"], "答案")
+        reopened.close()
+
+    def test_size_based_eviction(self):
+        store = SQLiteCacheStore(self.db_path, max_bytes=200)
+        for i in range(5):
+            store.set(f"k{i}", {"content": "x" * 60})
+            time.sleep(0.001)
+        self.assertLessEqual(store.total_bytes(), 200)
+        self.assertIsNone(store.get("k0"))
+        self.assertIsNotNone(store.get("k4"))
+        store.close()
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Test cases for the two-tier cache and its statistics"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk = SQLiteCacheStore(os.path.join(self.tmp_dir.name, "cache.sqlite3"))
+        self.cache = LLMResponseCache(memory_cache=MemoryLRUCache(max_entries=8), disk_cache=self.disk)
+
+    def tearDown(self):
+        self.disk.close()
+        self.tmp_dir.cleanup()
+
+    def test_hit_miss_counters(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.set("k", {"content": "A", "latency": 2.0, "usage": {"total_tokens": 30}})
+        self.assertEqual(self.cache.get("k")["content"], "A")
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertAlmostEqual(stats["saved_seconds"], 2.0)
+        self.assertEqual(stats["saved_tokens"], 30)
+
+    def test_disk_hit_backfills_memory(self):
+        self.disk.set("k", {"content": "A"})
+        self.assertEqual(self.cache.get("k")["content"], "A")
+        self.assertEqual(self.cache.get_stats()["disk_hits"], 1)
+        self.assertEqual(self.cache.get("k")["content"], "A")
+        self.assertEqual(self.cache.get_stats()["memory_hits"], 1)
+
+    def test_disabled_cache_never_hits(self):
+        self.cache.enabled = False
+        self.cache.set("k", {"content": "A"})
+        self.assertIsNone(self.cache.get("k"))
+
+
+class TestStreamingAdapterCache(unittest.TestCase):
+    """Test cases for cache integration in StreamingLLMAdapter"""
+
+    def test_generate_served_from_cache(self):
+        from langchain_core.messages import HumanMessage
+        from src.models.streaming_adapter import StreamingLLMAdapter
+
+        cache = LLMResponseCache(memory_cache=MemoryLRUCache(max_entries=8))
+        response = MagicMock()
+        response.status_code = 200
+        response.output.choices[0].message.content = "缓存答案"
+        response.usage = {"total_tokens": 12}
+
+        with patch("src.models.streaming_adapter.get_llm_cache", return_value=cache), \
+                patch("src.models.streaming_adapter.dashscope.Generation.call", return_value=response) as mock_call:
+            llm = StreamingLLMAdapter(model="qwen-turbo", api_key="test-key")
+            first = llm.invoke([HumanMessage(content="问题")])
+            second = llm.invoke([HumanMessage(content="问题")])
+
+        self.assertEqual(first.content, "缓存答案")
+        self.assertEqual(second.content, "缓存答案")
+        self.assertEqual(mock_call.call_count, 1)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the query understanding semantic cache
+"""
+
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.query_understanding import qu_subgraph
+from src.query_understanding.segmenter import FinancialSegmenter
+from src.query_understanding.semantic_cache import (
+    QuSemanticCache,
+    find_leaked_slots,
+    mask_slots,
+    substitute_slots
+)
+
+
+class TestMaskSlots(unittest.TestCase):
+    """Test cases for slot masking"""
+
+    def test_date_and_stock_code(self):
+        template, slots = mask_slots("请查询在20211125日期，股票代码600519的收盘价")
+        self.assertEqual(template, "请查询在<DATE_0>日期，股票代码<STOCK_CODE_0>的收盘价")
+        self.assertEqual(slots, [("<DATE_0>", "20211125"), ("<STOCK_CODE_0>", "600519")])
+
+    def test_fund_code_and_chinese_date(self):
+        template, slots = mask_slots("基金代码为005549的基金在2021年6月30日的规模")
+        self.assertEqual(template, "基金代码为<FUND_CODE_0>的基金在<DATE_0>的规模")
+        self.assertEqual(dict(slots)["<FUND_CODE_0>"], "005549")
+
+    def test_substitute_nested(self):
+        value = {"entities": [{"value": "<DATE_0>"}], "intent": "查询<DATE_0>"}
+        result = substitute_slots(value, {"<DATE_0>": "20210105"})
+        self.assertEqual(result, {"entities": [{"value": "20210105"}], "intent": "查询20210105"})
+
+
+class TestQuSemanticCache(unittest.TestCase):
+    """Test cases for QuSemanticCache"""
+
+    def setUp(self):
+        self.cache = QuSemanticCache()
+        self.cache.store(
+            "请查询在20211125日期，股票代码600519的收盘价",
+            {
+                "segmented_words": "['查询', '20211125', '股票代码', '600519', '收盘价']",
+                "entities": "[{'type': '股票代码', 'value': '600519'}]",
+                "intent": "数据库查询"
+            }
+        )
+
+    def test_hit_resubstitutes_slots(self):
+        result = self.cache.lookup("请查询在20220105日期，股票代码000001的收盘价")
+        self.assertIsNotNone(result)
+        self.assertIn("20220105", result["segmented_words"])
+        self.assertIn("000001", result["entities"])
+        self.assertNotIn("600519", result["entities"])
+        self.assertEqual(result["intent"], "数据库查询")
+
+    def test_different_template_misses(self):
+        self.assertIsNone(self.cache.lookup("招股说明书中江苏爱康太阳能科技股份有限公司的实际控制人是谁"))
+
+    def test_different_metric_misses(self):
+        # 只差指标词的问题不能复用收盘价的结果
+        question = "请帮我查询一下在{}这一天，股票代码为{}的这支股票在当日交易结束时的{}是多少元，保留两位小数"
+        self.cache.store(question.format("20211125", "600519", "收盘价"), {"intent": "收盘价查询"})
+        self.assertIsNone(self.cache.lookup(question.format("20220105", "000001", "开盘价")))
+        self.cache.store(question.format("20211125", "600519", "开盘价"), {"intent": "开盘价查询"})
+        self.assertEqual(self.cache.lookup(question.format("20220105", "000001", "开盘价"))["intent"], "开盘价查询")
+        self.assertEqual(self.cache.lookup(question.format("20220105", "000001", "收盘价"))["intent"], "收盘价查询")
+
+    def test_store_templates_only_masked_values(self):
+        self.cache.store("股票代码600519在20211125和20211125的收盘价",
+                         {"entities": "['600519', '6005190', '20211125']"})
+        result = self.cache.lookup("股票代码000001在20220105和20220105的收盘价")
+        self.assertEqual(result["entities"], "['000001', '6005190', '20220105']")
+        # 缓存时两个日期相同，无法区分各自的引用
+        self.assertIsNone(self.cache.lookup("股票代码000001在20220105和20220106的收盘价"))
+
+    def test_slot_signature_must_match(self):
+        self.assertIsNone(self.cache.lookup("请查询在20220105日期，股票代码000001和600000的收盘价"))
+
+    def test_stats(self):
+        self.cache.lookup("请查询在20220105日期，股票代码000001的收盘价")
+        self.cache.lookup("今天天气怎么样")
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+
+class TestSlotLeaks(unittest.TestCase):
+    """Slot values that the segmenter splits or NER normalizes must not be cached"""
+
+    QUESTION = "{}，股票代码600519的收盘价是多少？"
+
+    def setUp(self):
+        self.segmenter = FinancialSegmenter()
+        self.cache = QuSemanticCache()
+        first = self.QUESTION.format("2021年03月05日")
+        self.cache.store(first, {
+            "segmented_words": self.segmenter.segment_as_json(first),
+            "entities": json.dumps({"entities": [{"entity_type": "日期", "text": "20210305"},
+                                                 {"entity_type": "股票代码", "text": "600519"}]},
+                                   ensure_ascii=False),
+            "intent": json.dumps({"intentions": ["查询股票行情"]}, ensure_ascii=False)
+        })
+
+    def test_split_and_normalized_dates_are_not_reused(self):
+        words = json.loads(self.segmenter.segment_as_json(self.QUESTION.format("2021年03月05日")))
+        self.assertIn("2021", words["segmented_words"])
+
+        result = self.cache.lookup(self.QUESTION.format("2020年11月12日"))
+        self.assertEqual(set(result), {"intent"})
+        self.assertNotIn("2021", json.dumps(result, ensure_ascii=False))
+
+    def test_leaked_fields(self):
+        slots = [("<DATE_0>", "2021年3月5日")]
+        self.assertEqual(find_leaked_slots({"a": ["2021", "年"], "b": "<DATE_0>的收盘价", "c": "20210305",
+                                            "d": {"date": "2021-03-05"}, "e": "第13名"}, slots),
+                         ["a", "c", "d"])
+        self.assertEqual(find_leaked_slots({"a": "<DATE_0>"}, [("<DATE_0>", "20210305")]), [])
+
+    def test_hit_recomputes_segmentation_locally(self):
+        query = self.QUESTION.format("2020年11月12日")
+        with patch("src.query_understanding.qu_subgraph.get_qu_semantic_cache", return_value=self.cache), \
+                patch("src.query_understanding.qu_subgraph.get_financial_segmenter", return_value=self.segmenter), \
+                patch("src.query_understanding.qu_subgraph.get_entity_matcher", return_value=None):
+            state = qu_subgraph.cache_lookup_node({"query": query})
+        self.assertTrue(state["qu_cache_hit"])
+        self.assertEqual(state["segmented_words"], self.segmenter.segment_as_json(query))
+        self.assertIsNone(state["entities"])
+        self.assertEqual(json.loads(state["intent"]), {"intentions": ["查询股票行情"]})
+        # 只有实体需要重新抽取
+        self.assertEqual(qu_subgraph.route_after_cache_lookup(state), ["ner"])
+
+
+class TestPersistence(unittest.TestCase):
+    """Writes are batched and saved at most once per save_interval"""
+
+    def test_save_is_debounced(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "qu_cache.pkl")
+            cache = QuSemanticCache(persist_path=path, save_interval=3600)
+            with patch.object(cache, "save", wraps=cache.save) as save:
+                for code in ("600519", "000001", "600000"):
+                    cache.store(f"股票代码{code}的{code[-1]}号收盘价", {"intent": "查询"})
+                self.assertEqual(save.call_count, 0)
+                cache.flush()
+                cache.flush()
+                self.assertEqual(save.call_count, 1)
+            self.assertEqual(QuSemanticCache(persist_path=path).get_stats()["entries"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar daily-quote snapshot
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.analytics.quote_snapshot import QuoteSnapshot, evaluate_expression, export_snapshot
+
+QUOTES = [
+    # 股票代码, 交易日, 昨收盘, 今开盘, 最高价, 最低价, 收盘价, 成交量, 成交金额
+    ("600031", "20211124", 20.0, 20.1, 21.0, 19.5, 20.5, 1000, 20500),
+    ("600031", "20211125", 20.5, 20.6, 22.0, 20.0, 21.5, 1200, 25800),
+    ("600031", "20211126", 21.5, 21.4, 21.8, 21.0, 21.2, 900, 19080),
+    ("000157", "20211124", 7.0, 7.1, 7.3, 6.9, 7.2, 5000, 36000),
+    ("000157", "20211125", 7.2, 7.2, 7.6, 7.1, 7.5, 5200, 39000),
+    ("000157", "20211126", 7.5, 7.4, 7.7, 7.3, 7.4, 4800, 35520),
+    ("600519", "20211125", 1900.0, 1905.0, 1950.0, 1890.0, 1920.0, 300, 576000),
+]
+
+INDUSTRY = [
+    ("600031", "20211125", "中信行业分类", "机械", "工程机械"),
+    ("000157", "20211125", "中信行业分类", "机械", "工程机械"),
+    ("600519", "20211125", "中信行业分类", "食品饮料", "酒类"),
+    ("600519", "20211125", "申万行业分类", "食品饮料", "白酒"),
+]
+
+
+class TestQuoteSnapshot(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        db_path = Path(cls.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, "昨收盘(元)" REAL, "今开盘(元)" REAL, '
+                     '"最高价(元)" REAL, "最低价(元)" REAL, "收盘价(元)" REAL, "成交量(股)" REAL, "成交金额(元)" REAL)')
+        conn.execute("CREATE TABLE A股公司行业划分表 (股票代码 TEXT, 交易日期 TEXT, 行业划分标准 TEXT, "
+                     "一级行业名称 TEXT, 二级行业名称 TEXT)")
+        conn.executemany("INSERT INTO A股票日行情表 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", QUOTES)
+        conn.executemany("INSERT INTO A股公司行业划分表 VALUES (?, ?, ?, ?, ?)", INDUSTRY)
+        conn.commit()
+        conn.close()
+        cls.root = Path(cls.tmpdir.name) / "snapshot"
+        export_snapshot(str(db_path), str(cls.root), ["A股票日行情表", "A股公司行业划分表"])
+        cls.snapshot = QuoteSnapshot(str(cls.root))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_partitions_sorted_by_date(self):
+        table = self.snapshot.table("A股票日行情表")
+        self.assertEqual(table.dates.tolist(), [20211124, 20211125, 20211126])
+        rows = table.row_range(20211125, 20211125)
+        self.assertEqual(rows.stop - rows.start, 3)
+        self.assertEqual(sorted(table.decode("股票代码", table.column("股票代码")[rows])), ["000157", "600031", "600519"])
+
+    def test_industry_cross_section_top_k(self):
+        result = self.snapshot.query("A股票日行情表", "最高价(元)-最低价(元)", date="20211125",
+                                     industry="机械", industry_standard="中信行业分类", top_k=1)
+        self.assertEqual(result, [{"code": "600031", "date": "20211125", "value": 2.0}])
+        self.assertEqual(self.snapshot.industry_codes("白酒"), ["600519"])
+
+    def test_group_by_and_rolling(self):
+        result = self.snapshot.query("A股票日行情表", "成交量(股)", start_date="20211124", end_date="20211126",
+                                     codes=["600031", "000157"], group_by="code", agg="sum")
+        self.assertEqual(result, [{"code": "000157", "value": 15000.0}, {"code": "600031", "value": 3100.0}])
+
+        result = self.snapshot.query("A股票日行情表", "收盘价(元)", codes=["600031"],
+                                     rolling_window=2, rolling_agg="mean", ascending=True)
+        self.assertEqual([(r["date"], r["value"]) for r in result], [("20211125", 21.0), ("20211126", 21.35)])
+
+    def test_expression_rejects_code(self):
+        with self.assertRaises(ValueError):
+            evaluate_expression("__import__('os')", ["收盘价(元)"], lambda name: [])
+
+
+if __name__ == "__main__":
+    unittest.main()
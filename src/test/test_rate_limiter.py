@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the DashScope rate limiter
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    FileTokenBucket,
+    ModelRateLimiter,
+    TokenBucket
+)
+
+
+def response(status_code=200, code="", usage=None):
+    return SimpleNamespace(status_code=status_code, code=code, message=code, usage=usage)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for ModelRateLimiter"""
+
+    def create_limiter(self, **kwargs):
+        limiter = ModelRateLimiter("qwen-test", initial_delay=0.001, max_delay=0.01, **kwargs)
+        limiter.concurrency.decrease_interval = 0
+        return limiter
+
+    def test_retries_throttled_response_and_backs_off_concurrency(self):
+        """限流响应退避重试，并发上限减半"""
+        limiter = self.create_limiter(max_attempts=3)
+        replies = [response(429, "Throttling.RateQuota"), response(200, usage={"total_tokens": 10})]
+        result = limiter.call(lambda: replies.pop(0))
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(limiter.stats["retries"], 1)
+        self.assertEqual(limiter.stats["throttled"], 1)
+        self.assertLess(limiter.concurrency.limit, 8)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+    def test_non_retryable_error_and_exhausted_retries(self):
+        """参数错误不重试；重试耗尽返回最后一次失败响应"""
+        limiter = self.create_limiter(max_attempts=2)
+        calls = []
+        result = limiter.call(lambda: calls.append(1) or response(400, "InvalidParameter"))
+        self.assertEqual((result.status_code, len(calls)), (400, 1))
+
+        calls.clear()
+        result = limiter.call(lambda: calls.append(1) or response(503, "ServiceUnavailable"))
+        self.assertEqual((result.status_code, len(calls)), (503, 2))
+
+    def test_stream_retries_before_first_chunk(self):
+        """流式调用在第一个chunk被限流时重试，产出内容后正常透传"""
+        limiter = self.create_limiter(max_attempts=3)
+        streams = [
+            iter([response(429, "Throttling")]),
+            iter([response(200), response(200, usage={"input_tokens": 5, "output_tokens": 3})])
+        ]
+        chunks = list(limiter.call_stream(lambda: streams.pop(0)))
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(limiter.stats["retries"], 1)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+    def test_aimd_concurrency(self):
+        """成功时缓慢增加并发上限，限流时按比例减小且不低于下限"""
+        concurrency = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=5, decrease_interval=0)
+        for _ in range(8):
+            concurrency.on_success()
+        self.assertGreater(concurrency.limit, 5 - 0.01)
+        for _ in range(10):
+            concurrency.on_throttle()
+        self.assertEqual(concurrency.limit, 1)
+
+    def test_token_buckets(self):
+        """配额不足时返回等待时间；文件令牌桶在多个实例间共享状态"""
+        bucket = TokenBucket(rate_per_second=10, capacity=10)
+        self.assertEqual(bucket.reserve(10), 0)
+        self.assertAlmostEqual(bucket.reserve(5), 0.5, places=1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "model.tokens.json")
+            first = FileTokenBucket(path, rate_per_second=1, capacity=100)
+            second = FileTokenBucket(path, rate_per_second=1, capacity=100)
+            self.assertEqual(first.reserve(80), 0)
+            self.assertGreater(second.reserve(40), 19)
+
+    def test_async_calls_respect_concurrency_limit(self):
+        """异步调用与同步调用一样占用AIMD并发名额"""
+        limiter = self.create_limiter(concurrency=AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2))
+        active = {"now": 0, "max": 0}
+
+        async def call():
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return response(200)
+
+        async def stream():
+            async def chunks():
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+                for _ in range(3):
+                    await asyncio.sleep(0.005)
+                    yield response(200)
+                active["now"] -= 1
+            return chunks()
+
+        async def consume():
+            return [chunk async for chunk in limiter.acall_stream(stream)]
+
+        async def main():
+            return await asyncio.gather(*(limiter.acall(call) for _ in range(4)), *(consume() for _ in range(4)))
+
+        results = asyncio.run(main())
+        self.assertEqual([len(chunks) for chunks in results[4:]], [3] * 4)
+        self.assertEqual(active["max"], 2)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+    def test_async_reserve_runs_file_bucket_off_event_loop(self):
+        """文件令牌桶的文件锁在线程中获取，不阻塞事件循环"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            limiter = self.create_limiter(requests_per_minute=600, shared_state_dir=temp_dir)
+            update = FileTokenBucket._update
+            threads = []
+
+            def record(bucket, delta):
+                threads.append(threading.get_ident())
+                return update(bucket, delta)
+
+            async def main():
+                await limiter.acall(lambda: asyncio.sleep(0, response(200)))
+                return threading.get_ident()
+
+            with patch.object(FileTokenBucket, "_update", record):
+                loop_thread = asyncio.run(main())
+            self.assertTrue(threads)
+            self.assertNotIn(loop_thread, threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
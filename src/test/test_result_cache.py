@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQL result cache
+"""
+
+import sys
+import os
+import threading
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.result_cache import ResultCache, canonicalize_sql, decode_rows, encode_rows
+
+
+class TestCanonicalizeSQL(unittest.TestCase):
+
+    def test_equivalent_queries_share_key(self):
+        first = canonicalize_sql("SELECT a.[收盘价(元)] FROM A股票日行情表 a "
+                                 "WHERE a.股票代码 = '600519' AND a.交易日 = '20210104';")
+        second = canonicalize_sql("select  x.`收盘价(元)`\n from A股票日行情表 as x  -- 茅台\n"
+                                  "where x.交易日='20210104' and '600519' = x.股票代码")
+        self.assertEqual(first.canonical, second.canonical)
+        self.assertEqual(first.tables, frozenset({"a股票日行情表"}))
+
+        self.assertEqual(canonicalize_sql("SELECT * FROM t WHERE c IN ('b', 'a')").canonical,
+                         canonicalize_sql("SELECT * FROM t WHERE c IN ('a','b')").canonical)
+
+    def test_literals_distinguish_keys_not_templates(self):
+        first = canonicalize_sql("SELECT 单位净值 FROM 基金日行情表 WHERE 基金代码 = '000001'")
+        second = canonicalize_sql("SELECT 单位净值 FROM 基金日行情表 WHERE 基金代码 = '000002'")
+        self.assertNotEqual(first.canonical, second.canonical)
+        self.assertEqual(first.template, second.template)
+        # OR条件的顺序不调整
+        self.assertNotEqual(canonicalize_sql("SELECT 1 FROM t WHERE a = 1 OR b = 2 AND c = 3").canonical,
+                            canonicalize_sql("SELECT 1 FROM t WHERE b = 2 AND c = 3 OR a = 1").canonical)
+
+    def test_and_inside_case_is_not_reordered(self):
+        first = ("SELECT * FROM t WHERE CASE WHEN a = 1 AND b = 2 THEN 0 ELSE 1 END = 1 "
+                 "AND CASE WHEN c = 3 AND d = 4 THEN 0 ELSE 1 END = 1")
+        second = ("SELECT * FROM t WHERE CASE WHEN a = 1 AND d = 4 THEN 0 ELSE 1 END = 1 "
+                  "AND CASE WHEN c = 3 AND b = 2 THEN 0 ELSE 1 END = 1")
+        self.assertNotEqual(canonicalize_sql(first).canonical, canonicalize_sql(second).canonical)
+        # CASE整体仍作为一个条件参与排序
+        case = "CASE WHEN a = 1 AND b = 2 THEN 1 END = 1"
+        self.assertEqual(canonicalize_sql(f"SELECT * FROM t WHERE x = 1 AND {case}").canonical,
+                         canonicalize_sql(f"SELECT * FROM t WHERE {case} AND x = 1").canonical)
+
+    def test_statement_kinds(self):
+        self.assertFalse(canonicalize_sql("SELECT NOW()").cacheable)
+        write = canonicalize_sql("INSERT INTO fund_info (code) VALUES ('1')")
+        self.assertEqual((write.kind, write.tables), ("write", frozenset({"fund_info"})))
+        self.assertEqual(canonicalize_sql("UPDATE `db`.`Fund_Info` SET a = 1").tables, frozenset({"fund_info"}))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResultCache(max_bytes=4096, max_entries=100, compress_min_bytes=256)
+        self.calls = 0
+
+    def run_query(self, sql, rows=None):
+        def run():
+            self.calls += 1
+            return rows if rows is not None else [{"code": "600519", "close": 1900.5}]
+        return self.cache.execute(sql, None, run)
+
+    def test_hit_and_template_stats(self):
+        self.run_query("SELECT * FROM t WHERE code = '600519'")
+        result = self.run_query("select * from t where code='600519'")
+        self.run_query("SELECT * FROM t WHERE code = '000001'")
+        self.assertEqual(result, [{"code": "600519", "close": 1900.5}])
+        self.assertEqual(self.calls, 2)
+
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["templates"][0]["template"], "SELECT * FROM t WHERE code = ?")
+        self.assertAlmostEqual(stats["templates"][0]["hit_rate"], 1 / 3)
+
+    def test_size_aware_eviction(self):
+        rows = [{"id": i, "name": f"row-{i}" * 3} for i in range(40)]
+        blob = encode_rows(rows, compress_min_bytes=1 << 30)
+        self.assertEqual(decode_rows(blob), rows)
+        self.assertLess(len(encode_rows(rows, compress_min_bytes=0)), len(blob))
+
+        for i in range(20):
+            self.run_query(f"SELECT * FROM t WHERE id = {i}", rows)
+        stats = self.cache.get_stats()
+        self.assertLessEqual(stats["bytes"], 4096)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_write_invalidates_table(self):
+        self.run_query("SELECT * FROM t WHERE code = '600519'")
+        self.run_query("SELECT * FROM other")
+        self.cache.execute("UPDATE t SET close = 1 WHERE code = '600519'", None, lambda: [])
+        self.run_query("SELECT * FROM t WHERE code = '600519'")
+        self.run_query("SELECT * FROM other")
+        self.assertEqual(self.calls, 3)
+
+    def test_write_during_query_skips_store(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_run():
+            started.set()
+            release.wait(5)
+            return [{"close": 1.0}]
+
+        worker = threading.Thread(target=self.cache.execute, args=("SELECT close FROM t", None, slow_run))
+        worker.start()
+        started.wait(5)
+        self.cache.invalidate_sql("DELETE FROM t")
+        release.set()
+        worker.join()
+        self.assertEqual(self.cache.get_stats()["entries"], 0)
+
+    def test_version_change_invalidates(self):
+        version = [1]
+        cache = ResultCache(version_fn=lambda: version[0])
+        cache.execute("SELECT 1 FROM t", None, lambda: [{"1": 1}])
+        version[0] = 2
+        self.assertIsNone(cache.get(canonicalize_sql("SELECT 1 FROM t")))
+        self.assertEqual(cache.get_stats()["invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
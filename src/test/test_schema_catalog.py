@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the schema metadata catalog
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.db import _render_create_table
+from src.dao.schema_catalog import SchemaCatalog, changes_schema
+from src.dao.sqlite_client import SQLiteClient
+
+
+class TestSchemaCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE A股票日行情表 (股票代码 TEXT NOT NULL, 交易日 TEXT, 收盘价 REAL DEFAULT 0, "
+                     "PRIMARY KEY (股票代码, 交易日))")
+        conn.execute("CREATE TABLE 基金基本信息 (基金代码 TEXT, 基金全称 TEXT)")
+        conn.execute("CREATE INDEX idx_fund_code ON 基金基本信息 (基金代码)")
+        conn.commit()
+        conn.close()
+
+        SQLiteClient._instance = None
+        self.client = SQLiteClient()
+        self.client.db_path = self.db_path
+        self.catalog_path = Path(self.tmpdir.name) / "schema" / "schema_sqlite.json"
+        self.loads = 0
+
+        def loader():
+            self.loads += 1
+            return self.client.load_schema()
+
+        self.catalog = SchemaCatalog("sqlite", loader, self.client.schema_fingerprint, self.catalog_path)
+        self.client.schema_catalog = self.catalog
+
+    def tearDown(self):
+        self.client.close()
+        SQLiteClient._instance = None
+        self.tmpdir.cleanup()
+
+    def test_bulk_load_answers_table_info(self):
+        self.assertEqual(self.client.get_tables(), ["A股票日行情表", "基金基本信息"])
+        info = self.client.get_table_info("基金基本信息")
+        self.assertEqual(info[0]["Table"], "基金基本信息")
+        self.assertIn("CREATE TABLE 基金基本信息", info[0]["Create Table"])
+
+        quote = self.catalog.get_table("A股票日行情表")
+        self.assertEqual([column["name"] for column in quote["columns"]], ["股票代码", "交易日", "收盘价"])
+        self.assertFalse(quote["columns"][0]["nullable"])
+        self.assertTrue(quote["columns"][1]["primary_key"])
+        self.assertEqual(quote["columns"][2]["default"], "0")
+        self.assertEqual(self.catalog.get_table("基金基本信息")["indexes"],
+                         [{"name": "idx_fund_code", "unique": False, "columns": ["基金代码"]}])
+
+        for _ in range(3):
+            self.client.get_table_info("A股票日行情表")
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.client.get_table_info("不存在的表"), [])
+
+    def test_disk_copy_is_reused_until_schema_changes(self):
+        self.client.get_tables()
+        self.assertTrue(self.catalog_path.exists())
+
+        restarted = SchemaCatalog("sqlite", lambda: self.fail("不应访问数据库"),
+                                  self.client.schema_fingerprint, self.catalog_path)
+        self.assertEqual(restarted.get_tables(), ["A股票日行情表", "基金基本信息"])
+        self.assertEqual(restarted.get_stats()["disk_loads"], 1)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("ALTER TABLE 基金基本信息 ADD COLUMN 管理人 TEXT")
+        conn.commit()
+        conn.close()
+        # 运行期间由内存回答，refresh后读取新结构
+        self.client.close()
+        self.assertNotIn("管理人", self.client.get_table_info("基金基本信息")[0]["Create Table"])
+        self.catalog.refresh()
+        self.assertIn("管理人", self.client.get_table_info("基金基本信息")[0]["Create Table"])
+        self.assertEqual(self.loads, 2)
+
+        self.catalog.invalidate()
+        self.client.get_tables()
+        self.assertEqual((self.loads, self.catalog.get_stats()["disk_loads"]), (2, 1))
+
+    def test_mysql_create_table_rendering(self):
+        table = {
+            "engine": "InnoDB", "comment": "基金信息",
+            "columns": [
+                {"name": "id", "type": "int", "nullable": False, "default": None, "extra": "auto_increment"},
+                {"name": "code", "type": "varchar(16)", "nullable": True, "default": "0'1", "comment": "代码"},
+                {"name": "created_at", "type": "datetime", "nullable": True, "default": "CURRENT_TIMESTAMP"}
+            ],
+            "indexes": [{"name": "PRIMARY", "unique": True, "columns": ["id"]},
+                        {"name": "idx_code", "unique": True, "columns": ["code"]}]
+        }
+        self.assertEqual(_render_create_table("fund_info", table),
+                         "CREATE TABLE `fund_info` (\n"
+                         "  `id` int NOT NULL auto_increment,\n"
+                         "  `code` varchar(16) DEFAULT '0''1' COMMENT '代码',\n"
+                         "  `created_at` datetime DEFAULT CURRENT_TIMESTAMP,\n"
+                         "  PRIMARY KEY (`id`),\n"
+                         "  UNIQUE KEY `idx_code` (`code`)\n"
+                         ") ENGINE=InnoDB COMMENT='基金信息'")
+        self.assertTrue(changes_schema("  alter table fund_info add column x int"))
+        self.assertFalse(changes_schema("UPDATE fund_info SET code = 'create'"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded ReAct scratchpad
+"""
+
+import sys
+import os
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.planner.scratchpad import ScratchpadManager, estimate_tokens, summarize_observation
+
+
+ROWS = [{"股票代码": f"{600000 + i}", "收盘价": float(i)} for i in range(300)]
+
+
+class TestScratchpadManager(unittest.TestCase):
+    """Test cases for observation summaries and compaction"""
+
+    def test_summary_contains_counts_and_stats(self):
+        summary = summarize_observation(ROWS, head_rows=2, tail_rows=1)
+        self.assertIn("共300行", summary)
+        self.assertIn("600299", summary)
+        self.assertIn("收盘价: min=0, max=299", summary)
+
+    def test_large_observation_is_summarized_with_reference(self):
+        scratchpad = ScratchpadManager(max_tokens=10000, observation_max_tokens=200)
+        ref = scratchpad.add_observation(ROWS)
+        text = scratchpad.render()
+        self.assertIn(ref, text)
+        self.assertLess(estimate_tokens(text), estimate_tokens(str(ROWS)))
+        self.assertIs(scratchpad.get_observation(ref), ROWS)
+
+    def test_compacts_oldest_observations_over_budget(self):
+        scratchpad = ScratchpadManager(max_tokens=300, observation_max_tokens=250)
+        first = scratchpad.add_observation("甲" * 200)
+        scratchpad.add_step("思考", "Echo[x]")
+        last = scratchpad.add_observation("乙" * 200)
+        text = scratchpad.render()
+        self.assertIn(f"已压缩，完整结果引用 {first}", text)
+        self.assertIn("乙" * 200, text)
+        self.assertEqual(scratchpad.get_observation(first), "甲" * 200)
+        self.assertNotEqual(first, last)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the local financial segmenter
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import unittest
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.query_understanding.segmenter import FinancialSegmenter, build_financial_dictionary
+
+
+class TestFinancialSegmenter(unittest.TestCase):
+    """Test cases for dictionary building and segmentation"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE 基金基本信息 (基金代码 TEXT, 基金全称 TEXT, 基金简称 TEXT, 管理人 TEXT, 托管人 TEXT)")
+        conn.execute("INSERT INTO 基金基本信息 VALUES ('000001', '华夏成长证券投资基金', '华夏成长混合', '华夏基金管理有限公司', '中国建设银行股份有限公司')")
+        conn.execute("CREATE TABLE A股公司行业划分表 (一级行业名称 TEXT, 二级行业名称 TEXT, 行业划分标准 TEXT)")
+        conn.execute("INSERT INTO A股公司行业划分表 VALUES ('综合金融', '资产管理', '中信行业分类')")
+        conn.commit()
+        conn.close()
+        self.dict_path = os.path.join(self.temp_dir.name, "dict.txt")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_dictionary_skips_missing_tables(self):
+        count = build_financial_dictionary(self.db_path, None, self.dict_path)
+        with open(self.dict_path, 'r', encoding='utf-8') as f:
+            words = [line.split()[0] for line in f]
+        self.assertEqual(count, len(words))
+        self.assertIn("华夏成长混合", words)
+        self.assertIn("综合金融", words)
+
+    def test_segment_keeps_entities_whole(self):
+        build_financial_dictionary(self.db_path, None, self.dict_path)
+        segmenter = FinancialSegmenter(self.dict_path)
+        words = segmenter.segment("华夏成长混合在20210105的单位净值是多少？")
+        self.assertIn("华夏成长混合", words)
+        self.assertIn("单位净值", words)
+        self.assertNotIn("？", words)
+
+        data = json.loads(segmenter.segment_as_json("综合金融行业"))
+        self.assertIn("综合金融", data["segmented_words"])
+
+
+if __name__ == '__main__':
+    unittest.main()
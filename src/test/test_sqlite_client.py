@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the read-only SQLite query engine
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.sqlite_client import SQLiteClient
+
+
+class TestSQLiteClient(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, 收盘价 REAL)")
+        conn.executemany("INSERT INTO A股票日行情表 VALUES (?, ?, ?)",
+                         [("600519", "20211125", 1900.0), ("000001", "20211125", 18.2)])
+        conn.commit()
+        conn.close()
+
+        SQLiteClient._instance = None
+        self.client = SQLiteClient()
+        self.client.db_path = self.db_path
+        # 表结构目录写到临时目录，不写入项目的.cache
+        if self.client.schema_catalog is not None:
+            self.client.schema_catalog.path = Path(self.tmpdir.name) / "schema_sqlite.json"
+        self.client.query_timeout = 5
+
+    def tearDown(self):
+        self.client.close()
+        SQLiteClient._instance = None
+        self.tmpdir.cleanup()
+
+    def test_query_returns_dicts_and_binds_params(self):
+        rows = self.client.execute_sql("SELECT 股票代码, 收盘价 FROM A股票日行情表 WHERE 股票代码 = :code",
+                                       {"code": "600519"})
+        self.assertEqual(rows, [{"股票代码": "600519", "收盘价": 1900.0}])
+        self.assertEqual(self.client.get_tables(), ["A股票日行情表"])
+        self.assertIn("CREATE TABLE", self.client.get_table_info("A股票日行情表")[0]["Create Table"])
+
+    def test_connection_is_read_only_and_per_thread(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            self.client.execute_sql("DELETE FROM A股票日行情表")
+
+        connections = [self.client.get_connection()]
+        worker = threading.Thread(target=lambda: connections.append(self.client.get_connection()))
+        worker.start()
+        worker.join()
+        self.assertIs(self.client.get_connection(), connections[0])
+        self.assertIsNot(connections[0], connections[1])
+
+    def test_long_query_times_out(self):
+        sql = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+               "SELECT count(*) FROM n")
+        with self.assertRaises(TimeoutError):
+            self.client.execute_sql(sql, timeout=0.05)
+        # 超时后连接仍可继续使用
+        self.assertEqual(len(self.client.execute_sql("SELECT * FROM A股票日行情表")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental ReAct stream parser
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.models import llm_backend
+from src.models.llm_backend import SyntheticBackend, set_llm_backend
+from src.models.llm_cache import LLMResponseCache, MemoryLRUCache
+from src.models.streaming_adapter import StreamingLLMAdapter
+from src.planner.planner import CustomReActAgent
+from src.planner.stream_parser import IncrementalReActParser
+from src.utils.logger import get_logger
+
+
+def feed_chars(parser, text):
+    """逐字符输入，返回判定完整时已消费的字符数"""
+    for index, ch in enumerate(text, 1):
+        if parser.feed(ch):
+            return index
+    parser.finalize()
+    return len(text)
+
+
+class TestIncrementalReActParser(unittest.TestCase):
+    """Test cases for IncrementalReActParser"""
+
+    def test_stops_before_hallucinated_observation(self):
+        parser = IncrementalReActParser()
+        output = "查询行情\nAction 1 QueryDB[SELECT 1]\nAction 1 CheckDBInfo\nObservation 1 编造的结果"
+        consumed = feed_chars(parser, output)
+        self.assertEqual(parser.text, "查询行情\nAction 1 QueryDB[SELECT 1]\nAction 1 CheckDBInfo\n")
+        self.assertLess(consumed, len(output))
+
+    def test_finish_completes_on_closing_bracket(self):
+        parser = IncrementalReActParser()
+        consumed = feed_chars(parser, "完成\nAction 3 Finish[600120, 0.00%] 之后的内容")
+        self.assertTrue(parser.complete)
+        self.assertTrue(parser.text.endswith("Finish[600120, 0.00%]"))
+        self.assertEqual(consumed, len(parser.text))
+
+    def test_multiline_action_input(self):
+        parser = IncrementalReActParser()
+        feed_chars(parser, "Action 2 QueryDB[SELECT *\nFROM t\nWHERE a = 1]\nThought 3 next")
+        self.assertEqual(parser.text, "Action 2 QueryDB[SELECT *\nFROM t\nWHERE a = 1]\n")
+
+    def test_incomplete_stream_returns_everything(self):
+        parser = IncrementalReActParser()
+        feed_chars(parser, "只有思考，没有动作")
+        self.assertEqual(parser.text, "只有思考，没有动作")
+
+
+class StreamingConfig:
+    def get_boolean(self, key, default=False):
+        return key == "planner.streaming_parse"
+
+
+class TestEarlyStopCache(unittest.TestCase):
+    """Agent steps cut short by the stream parser are cached under the early-stop key"""
+
+    STEP = "Thought 1 查询\nAction 1 QueryDB[SELECT 1]\nObservation 1 编造的结果\nAction 2 Finish[1]"
+
+    def setUp(self):
+        self.saved_backend = (llm_backend._backend, llm_backend._backend_loaded)
+        self.backend = SyntheticBackend(ttft_median=0.001, ttft_sigma=0, tokens_per_second=100000,
+                                        responses=[{"pattern": "问题", "response": self.STEP}])
+        set_llm_backend(self.backend)
+        self.cache = LLMResponseCache(memory_cache=MemoryLRUCache(max_entries=8))
+        self.patches = [
+            patch("src.models.streaming_adapter.get_llm_cache", return_value=self.cache),
+            patch.object(self.backend, "call", wraps=self.backend.call),
+        ]
+        self.calls = [patcher.start() for patcher in self.patches][1]
+
+        self.agent = CustomReActAgent.__new__(CustomReActAgent)
+        self.agent.log = get_logger()
+        self.agent.config = StreamingConfig()
+        self.agent.llm = StreamingLLMAdapter(model="qwen-max", api_key="test-key", streaming_models=[])
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        llm_backend._backend, llm_backend._backend_loaded = self.saved_backend
+
+    def test_truncated_step_is_cached_and_replayed(self):
+        expected = "Thought 1 查询\nAction 1 QueryDB[SELECT 1]\n"
+        self.assertEqual(self.agent._call_llm("问题").content, expected)
+        self.assertEqual(self.agent._call_llm("问题").content, expected)
+        self.assertEqual(self.calls.call_count, 1)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+        # 完整输出的请求不会命中截断的缓存
+        self.assertEqual(self.agent.llm.invoke("问题").content, self.STEP)
+        self.assertEqual(self.calls.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
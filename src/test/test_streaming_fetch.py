@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for batched result fetching with row/byte caps
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao.sqlite_client import SQLiteClient
+from src.dao.streaming import FetchLimits, RowBatch, collect_rows
+from src.planner.scratchpad import ScratchpadManager
+
+
+class TestStreamingFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "博金杯比赛数据.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE A股票日行情表 (股票代码 TEXT, 交易日 TEXT, 收盘价 REAL, 成交量 INTEGER)")
+        conn.executemany("INSERT INTO A股票日行情表 VALUES (?, ?, ?, ?)",
+                         [(f"{code:06d}", "20211125", code + 0.5, code * 100) for code in range(250)])
+        conn.commit()
+        conn.close()
+
+        SQLiteClient._instance = None
+        self.client = SQLiteClient()
+        self.client.db_path = self.db_path
+        # 表结构目录写到临时目录，不写入项目的.cache
+        if self.client.schema_catalog is not None:
+            self.client.schema_catalog.path = Path(self.tmpdir.name) / "schema_sqlite.json"
+        self.client.fetch_limits = FetchLimits(batch_size=40, max_rows=100, max_bytes=0)
+        self.client.result_cache.clear()
+
+    def tearDown(self):
+        self.client.close()
+        SQLiteClient._instance = None
+        self.tmpdir.cleanup()
+
+    def test_iter_batches_yields_tuples_and_columns(self):
+        batches = list(self.client.iter_batches("SELECT 股票代码, 收盘价, 成交量 FROM A股票日行情表"))
+        self.assertEqual([len(batch) for batch in batches], [40] * 6 + [10])
+        self.assertEqual(batches[0].rows[1], ("000001", 1.5, 100))
+        self.assertEqual(batches[0].to_dicts()[0], {"股票代码": "000000", "收盘价": 0.5, "成交量": 0})
+
+        columns = batches[0].to_columns()
+        self.assertEqual(columns["成交量"].dtype, np.int64)
+        self.assertEqual(columns["股票代码"].dtype, object)
+        mixed = RowBatch(["v"], [(1,), (None,), (2.5,)]).to_columns()["v"]
+        self.assertEqual(mixed.dtype, np.float64)
+        self.assertTrue(np.isnan(mixed[1]))
+
+    def test_row_cap_truncates_and_skips_cache(self):
+        sql = "SELECT * FROM A股票日行情表"
+        rows = self.client.execute_sql(sql)
+        self.assertEqual(len(rows), 100)
+        self.assertTrue(rows.truncated)
+        self.assertEqual(rows.reason, "max_rows")
+        self.assertEqual(self.client.result_cache.get_stats()["entries"], 0)
+
+        exact = self.client.execute_sql("SELECT * FROM A股票日行情表 LIMIT 100")
+        self.assertFalse(exact.truncated)
+        self.assertIsNone(exact.truncation_note)
+        self.assertEqual(self.client.result_cache.get_stats()["entries"], 1)
+
+    def test_byte_cap_stops_reading(self):
+        consumed = []
+
+        def batches():
+            for index in range(100):
+                consumed.append(index)
+                yield RowBatch(["text"], [("x" * 1000,)] * 10)
+
+        result = collect_rows(batches(), FetchLimits(max_bytes=50000))
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.reason, "max_bytes")
+        self.assertLessEqual(result.approx_bytes, 50000)
+        self.assertLess(len(consumed), 10)
+
+    def test_observation_notes_truncation(self):
+        rows = self.client.execute_sql("SELECT 股票代码 FROM A股票日行情表")
+        scratchpad = ScratchpadManager(observation_max_tokens=100)
+        scratchpad.add_observation(rows)
+        self.assertIn("已截断为前100行", scratchpad.render())
+        self.assertIs(scratchpad.get_observation("obs-1"), rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
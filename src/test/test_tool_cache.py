@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the tool result cache
+"""
+
+import sys
+import os
+import tempfile
+import time
+import unittest
+
+from langchain_core.tools import Tool
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.dao import schema_catalog
+from src.dao.schema_catalog import SchemaCatalog, add_schema_listener
+from src.planner.tool_cache import ToolCachePolicy, ToolResultCache, memoize_tool, normalize_tool_input
+from src.planner.tool_executor import invoke_tool
+
+
+class TestToolResultCache(unittest.TestCase):
+    """Test cases for tool memoization"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        open(self.db_path, 'w').close()
+        self.cache = ToolResultCache(
+            {"QueryDB": ToolCachePolicy(db_versioned=True), "CheckDBInfo": ToolCachePolicy(schema_versioned=True)},
+            lambda: os.stat(self.db_path).st_mtime_ns
+        )
+        self.calls = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _query(self, sql):
+        self.calls.append(sql)
+        return [{"sql": sql}]
+
+    def test_normalize_keeps_quoted_text(self):
+        self.assertEqual(
+            normalize_tool_input("SELECT  *\n FROM t WHERE name = 'a  b' ;"),
+            "SELECT * FROM t WHERE name = 'a  b'"
+        )
+
+    def test_sql_results_invalidated_by_db_mtime(self):
+        tool = memoize_tool(Tool(name="QueryDB", description="", func=self._query), self.cache)
+        tool.func("SELECT 1")
+        tool.func("SELECT   1;")
+        self.assertEqual(len(self.calls), 1)
+
+        later = time.time() + 10
+        os.utime(self.db_path, (later, later))
+        tool.func("SELECT 1")
+        self.assertEqual(len(self.calls), 2)
+
+        stats = self.cache.get_stats()["tools"]["QueryDB"]
+        self.assertEqual((stats["hits"], stats["invalidations"]), (1, 1))
+
+    def test_no_arg_tool_and_uncached_tool(self):
+        schema_calls = []
+        check_db_info = Tool(name="CheckDBInfo", description="", func=lambda: schema_calls.append(1) or {"t": []})
+        wrapped = memoize_tool(check_db_info, self.cache)
+        invoke_tool(wrapped, "")
+        invoke_tool(wrapped, "")
+        self.assertEqual(len(schema_calls), 1)
+
+        other = Tool(name="ESSearch", description="", func=self._query)
+        self.assertIs(memoize_tool(other, self.cache), other)
+
+    def test_db_versioned_tool_not_cached_without_version(self):
+        # 如MySQL客户端不提供数据版本，无法判断数据是否更新
+        cache = ToolResultCache({"QueryDB": ToolCachePolicy(db_versioned=True), "CheckDBInfo": ToolCachePolicy()})
+        query_db = Tool(name="QueryDB", description="", func=self._query)
+        self.assertIs(memoize_tool(query_db, cache), query_db)
+        self.assertEqual(list(cache.policies), ["CheckDBInfo"])
+
+    def test_schema_refresh_clears_check_db_info(self):
+        schema_calls = []
+        check_db_info = memoize_tool(
+            Tool(name="CheckDBInfo", description="", func=lambda: schema_calls.append(1) or {"t": []}), self.cache
+        )
+        query_db = memoize_tool(Tool(name="QueryDB", description="", func=self._query), self.cache)
+        invoke_tool(check_db_info, "")
+        query_db.func("SELECT 1")
+
+        catalog = SchemaCatalog("test", loader=lambda: {"t": {"columns": []}}, fingerprint_fn=lambda: "v1")
+        saved_listeners = list(schema_catalog._schema_listeners)
+        add_schema_listener(self.cache.invalidate_schema)
+        try:
+            catalog.refresh()
+        finally:
+            schema_catalog._schema_listeners[:] = saved_listeners
+
+        invoke_tool(check_db_info, "")
+        query_db.func("SELECT 1")
+        self.assertEqual(len(schema_calls), 2)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.get_stats()["tools"]["CheckDBInfo"]["invalidations"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel tool executor
+"""
+
+import sys
+import os
+import time
+import unittest
+
+from langchain_core.tools import Tool
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.planner.tool_executor import ParallelToolExecutor
+
+
+def slow_echo(text):
+    time.sleep(0.2)
+    return text
+
+
+def failing_tool(text):
+    raise RuntimeError("boom")
+
+
+TOOL_MAP = {
+    "Echo": Tool(name="Echo", description="echo", func=slow_echo),
+    "Slow": Tool(name="Slow", description="slow", func=slow_echo),
+    "Fail": Tool(name="Fail", description="fail", func=failing_tool),
+    "NoArg": Tool(name="NoArg", description="no argument", func=lambda: "info"),
+}
+
+
+class TestParallelToolExecutor(unittest.TestCase):
+    """Test cases for ParallelToolExecutor"""
+
+    def setUp(self):
+        self.executor = ParallelToolExecutor(max_workers=4, default_timeout=5, timeouts={"Slow": 0.05})
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_runs_concurrently_in_order(self):
+        start = time.perf_counter()
+        results = self.executor.execute(
+            [{"name": "Echo", "input": "a"}, {"name": "Echo", "input": "b"}, {"name": "Echo", "input": "c"}],
+            TOOL_MAP
+        )
+        elapsed = time.perf_counter() - start
+        self.assertEqual([result["output"] for result in results], ["a", "b", "c"])
+        self.assertLess(elapsed, 0.5)
+
+    def test_errors_do_not_affect_other_calls(self):
+        results = self.executor.execute(
+            [
+                {"name": "Slow", "input": "x"},
+                {"name": "Fail", "input": ""},
+                {"name": "Missing", "input": ""},
+                {"name": "NoArg", "input": "ignored"},
+            ],
+            TOOL_MAP
+        )
+        self.assertIn("timed out", results[0]["error"])
+        self.assertIn("boom", results[1]["error"])
+        self.assertIn("not found", results[2]["error"])
+        self.assertEqual(results[3]["output"], "info")
+        self.assertIsNone(results[3]["error"])
+
+    def test_timeout_starts_when_tool_runs(self):
+        # 单线程池: 第二个调用排队0.2s，开始运行后仍有完整的0.3s
+        executor = ParallelToolExecutor(max_workers=1, default_timeout=0.3)
+        try:
+            results = executor.execute([{"name": "Echo", "input": "a"}, {"name": "Echo", "input": "b"}], TOOL_MAP)
+        finally:
+            executor.shutdown()
+        self.assertEqual([result["output"] for result in results], ["a", "b"])
+        self.assertEqual([result["error"] for result in results], [None, None])
+
+    def test_timed_out_call_holds_thread_until_done(self):
+        executor = ParallelToolExecutor(max_workers=1, default_timeout=0.05)
+        try:
+            results = executor.execute([{"name": "Echo", "input": "a"}, {"name": "Echo", "input": "b"}], TOOL_MAP)
+            self.assertIn("timed out", results[0]["error"])
+            # 第一个调用仍占用唯一的线程，第二个调用排队超时后被取消
+            self.assertIn("not started", results[1]["error"])
+            self.assertEqual(executor.abandoned, 1)
+            time.sleep(0.3)
+            self.assertEqual(executor.abandoned, 0)
+        finally:
+            executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for tracing spans, histograms and exporters
+"""
+
+import sys
+import os
+import unittest
+import urllib.request
+
+# Add the project root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from langchain_core.tools import Tool
+
+from src.planner.tool_executor import ParallelToolExecutor
+from src.utils.tracing import (
+    LatencyHistogram, Tracer, annotate_span, current_span, get_tracer, increment_span,
+    set_tracer, start_trace_server, trace_span, traced
+)
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = Tracer()
+        set_tracer(self.tracer)
+
+    def tearDown(self):
+        set_tracer(None)
+
+    def test_histogram_percentiles_are_close(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 * 0.02)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 * 0.02)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(histogram.cumulative_counts((0.1, 2.0)), [100, 1000])
+
+    def test_spans_nest_and_collect_attributes(self):
+        with trace_span("agent", "node"):
+            with trace_span("qwen-turbo", "llm") as span:
+                annotate_span(tokens_in=10, tokens_out=3, cache_hit=True)
+                increment_span("retries")
+                increment_span("retries")
+            with self.assertRaises(ValueError):
+                with trace_span("QueryDB", "tool"):
+                    raise ValueError("boom")
+
+        spans = {span.name: span for span in self.tracer.spans}
+        self.assertEqual(spans["qwen-turbo"].parent_id, spans["agent"].span_id)
+        self.assertEqual(spans["QueryDB"].attributes["error"], "ValueError")
+        summary = self.tracer.summary()
+        self.assertEqual(summary["llm/qwen-turbo"]["retries"], 2)
+        self.assertEqual(summary["llm/qwen-turbo"]["tokens_in"], 10)
+        self.assertEqual(summary["tool/QueryDB"]["errors"], 1)
+
+    def test_traced_generator_and_nested_calls(self):
+        @traced("llm", lambda *args: "model")
+        def stream():
+            yield 1
+            yield 2
+
+        @traced("llm", lambda *args: "model")
+        def outer():
+            return list(stream())
+
+        self.assertEqual(outer(), [1, 2])
+        generator = stream()
+        next(generator)
+        generator.close()
+        self.assertEqual(self.tracer.summary()["llm/model"]["count"], 2)
+        self.assertIsNone(current_span())
+
+    def test_tool_spans_are_children_of_the_caller(self):
+        executor = ParallelToolExecutor(max_workers=2)
+        tools = {"Echo": Tool(name="Echo", description="echo", func=lambda text: text)}
+        with trace_span("tools", "node"):
+            results = executor.execute([{"name": "Echo", "input": "a"}, {"name": "Echo", "input": "b"}], tools)
+        executor.shutdown()
+        self.assertEqual([result["output"] for result in results], ["a", "b"])
+        node = next(span for span in self.tracer.spans if span.name == "tools")
+        tool_spans = [span for span in self.tracer.spans if span.category == "tool"]
+        self.assertEqual(len(tool_spans), 2)
+        self.assertTrue(all(span.parent_id == node.span_id for span in tool_spans))
+
+    def test_exporters_and_http_endpoint(self):
+        with trace_span("qu.ner", "node"):
+            pass
+        events = self.tracer.chrome_trace()["traceEvents"]
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["name"], "qu.ner")
+
+        server = start_trace_server(self.tracer, port=0)
+        try:
+            host, port = server.server_address[:2]
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                text = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+        self.assertIn('qa_span_duration_seconds_bucket{category="node",name="qu.ner",le="+Inf"} 1', text)
+        self.assertIn('qa_span_duration_seconds_count{category="node",name="qu.ner"} 1', text)
+
+    def test_disabled_tracer_is_a_noop(self):
+        set_tracer(None)
+        self.assertIsNone(get_tracer())
+        with trace_span("agent", "node") as span:
+            span.set("tokens_in", 1)
+            annotate_span(cache_hit=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
-from src.dao.db import MySQLClient
+from src.dao.db import get_db_client
+from src.dao.aggregate_cube import get_cube_router
 from typing import Dict, Any, Optional
 from src.utils.logger import get_logger
 
@@ -18,8 +19,14 @@ def query_db(sql: str, params: Optional[Dict[str, Any]] = None):
     log.info(f"[DEBUG] query_db: {sql}")
     log.info(f"[DEBUG] query_db: {params}")
     try:
-        result = MySQLClient().execute_sql(sql, params)
+        # 能由预计算聚合库等价回答的查询不访问原表
+        router = get_cube_router()
+        result = router.answer(sql) if router is not None and not params else None
+        if result is None:
+            result = get_db_client().execute_sql(sql, params)
         log.info(f"[DEBUG] query_db: {result}")
+        if getattr(result, "truncated", False):
+            log.warning(f"[DEBUG] query_db: {result.truncation_note}")
         return result
     except Exception as e:
         log.error(f"[DEBUG] query_db: {e}")
@@ -28,10 +35,6 @@ def query_db(sql: str, params: Optional[Dict[str, Any]] = None):
 
 def check_db_info():
     log.info(f"[DEBUG] check_db_info")
-    # 获取所有表名
-    tables = MySQLClient().get_tables()
-    table_info = {}
-    # 获取每个表结构
-    for table in tables:
-        table_info[table] = MySQLClient().get_table_info(table)
-    return table_info
\ No newline at end of file
+    # 表名和表结构由客户端的表结构目录在内存中回答，不逐表访问数据库
+    client = get_db_client()
+    return {name: client.get_table_info(name) for name in client.get_tables()}
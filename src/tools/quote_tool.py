@@ -0,0 +1,42 @@
+import json
+from typing import Any, Dict, List, Union
+
+from src.analytics.quote_snapshot import get_quote_snapshot
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+QUERY_FIELDS = (
+    "table", "metric", "date", "start_date", "end_date", "codes", "industry", "industry_standard",
+    "rolling_window", "rolling_agg", "group_by", "agg", "top_k", "ascending"
+)
+
+
+def quote_analytics(query: Union[str, Dict[str, Any]]) -> Union[List[Dict[str, Any]], str]:
+    """
+    在日行情列式快照上执行向量化查询
+
+    Args:
+        query: JSON字符串或字典，字段见QuoteSnapshot.query，
+            例如 {"table": "A股票日行情表", "date": "20211125", "industry": "机械",
+                  "industry_standard": "中信行业分类", "metric": "最高价(元)-最低价(元)", "top_k": 1}
+
+    Returns:
+        查询结果列表，出错时返回以"quote_analytics:"开头的错误信息
+    """
+    log.info(f"[DEBUG] quote_analytics: {query}")
+    try:
+        snapshot = get_quote_snapshot()
+        if snapshot is None:
+            return "quote_analytics: 行情快照未导出，请使用QueryDB"
+        params = json.loads(query) if isinstance(query, str) else dict(query)
+        unknown = set(params) - set(QUERY_FIELDS)
+        if unknown:
+            return f"quote_analytics: 不支持的字段 {sorted(unknown)}"
+        params.setdefault("table", "A股票日行情表")
+        result = snapshot.query(**params)
+        log.info(f"[DEBUG] quote_analytics: {len(result)} rows")
+        return result
+    except Exception as e:
+        log.error(f"[DEBUG] quote_analytics: {e}")
+        return f"quote_analytics: {str(e)}"
@@ -0,0 +1,39 @@
+"""
+Token Estimation
+
+不依赖分词器的token数粗略估计，用于prompt预算控制和限流配额估算。
+"""
+
+import re
+from typing import Any, Dict, List
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估计token数: 中文字符约1个token，其余字符约4个字符1个token
+
+    Args:
+        text: 文本
+
+    Returns:
+        估计的token数
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    估计消息列表的token数，每条消息额外计入少量角色标记开销
+
+    Args:
+        messages: [{"role": ..., "content": ...}, ...]
+
+    Returns:
+        估计的token数
+    """
+    return sum(estimate_tokens(str(message.get("content") or "")) + 4 for message in messages)
@@ -0,0 +1,494 @@
+"""
+Tracing
+
+问答流程的链路追踪和延迟统计:
+1. span记录一次操作的开始/结束时间和属性(输入/输出token数、缓存命中、重试次数、错误)，
+   通过contextvars维护父子关系，覆盖LangGraph节点、LLM调用和工具调用
+2. 结束的span按(类别, 名称)汇总到HDR风格的对数分桶直方图，相对误差约1%，内存占用与样本数无关
+3. 导出为Chrome trace-event JSON(chrome://tracing或Perfetto打开)和Prometheus文本格式，
+   可选在本地启动HTTP服务提供/metrics和/trace
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+log = get_logger()
+
+# Prometheus直方图的桶上界(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class LatencyHistogram:
+    """
+    HDR风格的延迟直方图
+
+    以微秒为单位，每个2的幂区间再均分为2^(significant_bits-1)个子桶，
+    桶宽与数值成比例，significant_bits=7时相对误差不超过约1.6%
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, micros: int) -> int:
+        shift = max(0, micros.bit_length() - self.significant_bits)
+        return (shift << self.significant_bits) + (micros >> shift)
+
+    def _value(self, index: int) -> float:
+        """桶中点对应的秒数"""
+        shift = index >> self.significant_bits
+        sub = index & ((1 << self.significant_bits) - 1)
+        return ((sub << shift) + ((1 << shift) - 1) / 2) / 1e6
+
+    def record(self, seconds: float) -> None:
+        index = self._index(max(0, int(seconds * 1e6)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        计算分位数
+
+        Args:
+            q: 分位数(0-100)
+
+        Returns:
+            延迟秒数，没有样本时返回None
+        """
+        if not self.count:
+            return None
+        target = max(1, q / 100 * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self.max, max(self.min, self._value(index)))
+        return self.max
+
+    def cumulative_counts(self, bounds: Tuple[float, ...]) -> List[int]:
+        """每个上界以内的样本数，用于Prometheus直方图的_bucket"""
+        values = sorted((self._value(index), count) for index, count in self.counts.items())
+        result = []
+        seen = 0
+        position = 0
+        for bound in bounds:
+            while position < len(values) and values[position][0] <= bound:
+                seen += values[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+
+class Span:
+    """一次被追踪的操作"""
+
+    __slots__ = ("name", "category", "span_id", "parent_id", "start", "end", "thread_id", "attributes")
+
+    def __init__(self, name: str, category: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread_id = threading.get_native_id()
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def incr(self, key: str, amount: float = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+
+class SpanStats:
+    """同一(类别, 名称)下所有span的汇总"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.errors = 0
+
+    def add(self, span: Span) -> None:
+        attributes = span.attributes
+        self.histogram.record(span.duration)
+        self.tokens_in += int(attributes.get("tokens_in") or 0)
+        self.tokens_out += int(attributes.get("tokens_out") or 0)
+        self.cache_hits += 1 if attributes.get("cache_hit") else 0
+        self.retries += int(attributes.get("retries") or 0)
+        self.errors += 1 if attributes.get("error") else 0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Tracer:
+    """span收集、直方图汇总和导出"""
+
+    def __init__(self, max_spans: int = 100000, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.spans: deque = deque(maxlen=max_spans)
+        self.stats: Dict[Tuple[str, str], SpanStats] = {}
+        self._lock = threading.Lock()
+        # perf_counter与墙上时间的偏移，使不同进程导出的trace可以对齐
+        self._epoch = time.time() - time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "internal", **attributes) -> Iterator[Span]:
+        """
+        追踪一段操作，期间该span为当前span，异常会记录到error属性后继续抛出
+
+        Args:
+            name: span名称
+            category: 类别(node/llm/tool等)
+            **attributes: 初始属性
+        """
+        parent = _current_span.get()
+        span = Span(name, category, parent, attributes)
+        _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.set("error", type(e).__name__)
+            raise
+        finally:
+            _current_span.set(parent)
+            span.end = time.perf_counter()
+            self.finish(span)
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            key = (span.category, span.name)
+            if key not in self.stats:
+                self.stats[key] = SpanStats()
+            self.stats[key].add(span)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.stats.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """按"类别/名称"汇总的次数、分位数(毫秒)、token、缓存命中、重试和错误数"""
+        with self._lock:
+            items = sorted(self.stats.items())
+            result = {}
+            for (category, name), stats in items:
+                histogram = stats.histogram
+                result[f"{category}/{name}"] = {
+                    "count": histogram.count,
+                    "p50_ms": round(histogram.percentile(50) * 1000, 3),
+                    "p90_ms": round(histogram.percentile(90) * 1000, 3),
+                    "p99_ms": round(histogram.percentile(99) * 1000, 3),
+                    "max_ms": round(histogram.max * 1000, 3),
+                    "tokens_in": stats.tokens_in,
+                    "tokens_out": stats.tokens_out,
+                    "cache_hits": stats.cache_hits,
+                    "retries": stats.retries,
+                    "errors": stats.errors
+                }
+        return result
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """导出为Chrome trace-event格式(完整事件"X"，时间单位微秒)"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = {key: value if isinstance(value, (bool, int, float, str)) or value is None else str(value)
+                    for key, value in span.attributes.items()}
+            args["span_id"] = span.span_id
+            if span.parent_id is not None:
+                args["parent_id"] = span.parent_id
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((self._epoch + span.start) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        log.info(f"[TRACE] Chrome trace已写出: {path}")
+
+    def prometheus_text(self) -> str:
+        """导出为Prometheus文本格式"""
+        with self._lock:
+            items = sorted(self.stats.items())
+            lines = [
+                "# HELP qa_span_duration_seconds Span duration by category and name.",
+                "# TYPE qa_span_duration_seconds histogram"
+            ]
+            counters = {
+                "qa_span_tokens_in_total": ("Input tokens.", lambda stats: stats.tokens_in),
+                "qa_span_tokens_out_total": ("Output tokens.", lambda stats: stats.tokens_out),
+                "qa_span_cache_hits_total": ("Spans served from a cache.", lambda stats: stats.cache_hits),
+                "qa_span_retries_total": ("Retried calls.", lambda stats: stats.retries),
+                "qa_span_errors_total": ("Spans that ended with an error.", lambda stats: stats.errors)
+            }
+            for (category, name), stats in items:
+                labels = f'category="{_escape_label(category)}",name="{_escape_label(name)}"'
+                histogram = stats.histogram
+                for bound, count in zip(self.buckets, histogram.cumulative_counts(self.buckets)):
+                    lines.append(f'qa_span_duration_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+                lines.append(f'qa_span_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"qa_span_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"qa_span_duration_seconds_count{{{labels}}} {histogram.count}")
+            for metric, (help_text, value) in counters.items():
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for (category, name), stats in items:
+                    labels = f'category="{_escape_label(category)}",name="{_escape_label(name)}"'
+                    lines.append(f"{metric}{{{labels}}} {value(stats)}")
+        return "\n".join(lines) + "\n"
+
+
+class _TraceRequestHandler(BaseHTTPRequestHandler):
+    tracer: Tracer = None
+
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            body = self.tracer.prometheus_text().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.startswith("/trace"):
+            body = json.dumps(self.tracer.chrome_trace(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.startswith("/summary"):
+            body = json.dumps(self.tracer.summary(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_trace_server(tracer: Tracer, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """
+    在后台线程启动HTTP服务: /metrics(Prometheus)、/trace(Chrome trace)、/summary(汇总JSON)
+
+    Args:
+        tracer: 追踪器
+        host: 监听地址
+        port: 端口，0表示随机端口
+
+    Returns:
+        HTTP服务实例，server_address为实际监听地址
+    """
+    handler = type("TraceRequestHandler", (_TraceRequestHandler,), {"tracer": tracer})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="trace-server", daemon=True).start()
+    log.info(f"[TRACE] 指标服务已启动: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
+
+
+_tracer: Optional[Tracer] = None
+_tracer_loaded = False
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    获取进程级共享的追踪器
+
+    配置项:
+        tracing.enabled: 是否启用
+        tracing.max_spans: 内存中保留用于导出的span数量上限
+        tracing.http_host / tracing.http_port: http_port大于0时启动本地指标服务
+        tracing.chrome_trace_path: 非空时进程退出前写出Chrome trace文件
+
+    Returns:
+        Tracer实例，未启用时返回None
+    """
+    global _tracer, _tracer_loaded
+    if _tracer_loaded:
+        return _tracer
+    with _tracer_lock:
+        if not _tracer_loaded:
+            config = ConfigManager()
+            if config.get_boolean("tracing.enabled", False):
+                _tracer = Tracer(max_spans=config.get_int("tracing.max_spans", 100000))
+                port = config.get_int("tracing.http_port", 0)
+                if port > 0:
+                    try:
+                        start_trace_server(_tracer, config.get("tracing.http_host", "127.0.0.1"), port)
+                    except OSError as e:
+                        log.warning(f"[TRACE] 指标服务启动失败: {e}")
+                trace_path = config.get("tracing.chrome_trace_path", "")
+                if trace_path:
+                    atexit.register(_tracer.write_chrome_trace, trace_path)
+            _tracer_loaded = True
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """替换进程级追踪器(None表示关闭)，用于测试和基准脚本"""
+    global _tracer, _tracer_loaded
+    with _tracer_lock:
+        _tracer = tracer
+        _tracer_loaded = True
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空span"""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def incr(self, key: str, amount: float = 1) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@contextmanager
+def trace_span(name: str, category: str = "internal", **attributes) -> Iterator[Any]:
+    """追踪一段操作，追踪关闭时开销只有一次配置检查"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    with tracer.span(name, category, **attributes) as span:
+        yield span
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def annotate_span(**attributes) -> None:
+    """为当前span设置属性(如cache_hit、tokens_in)，没有当前span时忽略"""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def increment_span(key: str, amount: float = 1) -> None:
+    """累加当前span的计数属性(如retries)，没有当前span时忽略"""
+    span = _current_span.get()
+    if span is not None:
+        span.incr(key, amount)
+
+
+def traced(category: str, name: Optional[Callable[..., str]] = None) -> Callable:
+    """
+    追踪函数调用的装饰器，支持普通函数、协程、生成器和异步生成器
+
+    生成器的span覆盖整个迭代过程；同一调用链中嵌套的同名span只记录最外层，
+    避免一个方法委托给另一个被追踪的方法时重复计数
+
+    Args:
+        category: span类别
+        name: 根据调用参数计算span名称的函数，默认使用函数名
+    """
+    def decorator(fn: Callable) -> Callable:
+        def span_name(args, kwargs) -> str:
+            return name(*args, **kwargs) if name else fn.__name__
+
+        def nested(span_label: str) -> bool:
+            span = _current_span.get()
+            return span is not None and span.category == category and span.name == span_label
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def async_gen_wrapper(*args, **kwargs):
+                label = span_name(args, kwargs)
+                if nested(label):
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                    return
+                with trace_span(label, category):
+                    iterator = fn(*args, **kwargs)
+                    try:
+                        async for item in iterator:
+                            yield item
+                    finally:
+                        await iterator.aclose()
+            return async_gen_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                label = span_name(args, kwargs)
+                if nested(label):
+                    return (yield from fn(*args, **kwargs))
+                with trace_span(label, category):
+                    return (yield from fn(*args, **kwargs))
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                label = span_name(args, kwargs)
+                if nested(label):
+                    return await fn(*args, **kwargs)
+                with trace_span(label, category):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            label = span_name(args, kwargs)
+            if nested(label):
+                return fn(*args, **kwargs)
+            with trace_span(label, category):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def traced_node(name: str, node: Callable) -> Callable:
+    """包装LangGraph节点函数，每次执行记录一个node类别的span"""
+    return traced("node", lambda *args, **kwargs: name)(node)